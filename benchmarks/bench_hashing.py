@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prueba de rendimiento del servicio de resúmenes sobre un árbol sintético.
+
+Genera en una carpeta temporal un árbol de archivos de tamaños variados y mide
+el rendimiento (MB/s y archivos/s) de:
+- el cálculo en un solo proceso,
+- el cálculo repartido entre procesos,
+- la segunda pasada, resuelta con la caché (mtime, tamaño).
+
+Uso:
+    python benchmarks/bench_hashing.py [--files N] [--size-kb KB] [--workers N]
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+# Añadir el directorio raíz al path para importaciones
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.hashing import ContentHasher
+
+def create_tree(root, files, mean_size_kb, seed=1234):
+    """
+    Crea un árbol sintético de archivos.
+    
+    Los tamaños siguen una distribución exponencial (muchos archivos pequeños
+    y algunos grandes), como en un proyecto real.
+    
+    Args:
+        root (str): Carpeta donde crear el árbol
+        files (int): Número de archivos
+        mean_size_kb (int): Tamaño medio de los archivos en KB
+        seed (int): Semilla para que el árbol sea reproducible
+    
+    Returns:
+        tuple: (lista de rutas, bytes totales)
+    """
+    rng = random.Random(seed)
+    line = b"def function_%d(value):\n    return value * 2  # comentario\n"
+    paths = []
+    total = 0
+    for index in range(files):
+        folder = os.path.join(root, f"pkg{index % 20}", f"mod{index % 7}")
+        os.makedirs(folder, exist_ok=True)
+        size = max(64, int(rng.expovariate(1.0 / (mean_size_kb * 1024))))
+        chunk = line % index
+        data = (chunk * (size // len(chunk) + 1))[:size]
+        path = os.path.join(folder, f"file{index}.py")
+        with open(path, 'wb') as f:
+            f.write(data)
+        paths.append(path)
+        total += size
+    return paths, total
+
+def measure(label, hasher, paths, total_bytes, parallel):
+    """
+    Mide una pasada del servicio de resúmenes y muestra el resultado.
+    
+    Returns:
+        dict: Resúmenes obtenidos
+    """
+    start = time.perf_counter()
+    digests = hasher.hash_files(paths, parallel=parallel)
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print(f"{label:<28} {elapsed:8.3f} s  {total_bytes / elapsed / 1e6:9.1f} MB/s  "
+          f"{len(paths) / elapsed:10.0f} archivos/s")
+    return digests
+
+def main():
+    """Función principal de la prueba."""
+    parser = argparse.ArgumentParser(description="Rendimiento del servicio de resúmenes")
+    parser.add_argument("--files", type=int, default=2000, help="Número de archivos del árbol")
+    parser.add_argument("--size-kb", type=int, default=64, help="Tamaño medio de los archivos (KB)")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos de trabajo")
+    args = parser.parse_args()
+    
+    root = tempfile.mkdtemp(prefix="bench_hashing_")
+    try:
+        paths, total = create_tree(os.path.join(root, "tree"), args.files, args.size_kb)
+        print(f"Árbol sintético: {len(paths)} archivos, {total / 1e6:.1f} MB")
+        
+        serial = ContentHasher(os.path.join(root, "serial.json"), args.workers)
+        serial_digests = measure("Un proceso", serial, paths, total, parallel=False)
+        
+        parallel = ContentHasher(os.path.join(root, "parallel.json"), args.workers)
+        parallel_digests = measure(f"{parallel.max_workers} procesos", parallel, paths, total, parallel=True)
+        
+        # Segunda pasada con la caché recargada desde disco
+        cached = ContentHasher(os.path.join(root, "parallel.json"), args.workers)
+        cached.load()
+        cached_digests = measure("Con caché", cached, paths, total, parallel=True)
+        
+        if not serial_digests == parallel_digests == cached_digests:
+            print("ERROR: los resúmenes no coinciden entre pasadas")
+            return 1
+        return 0
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    sys.exit(main())
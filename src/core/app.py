@@ -13,8 +13,20 @@ from tkinter import ttk, filedialog, messagebox, simpledialog
 # Importaciones internas
 from src.utils.file_utils import ensure_directory_exists, save_to_file, create_custom_scroll_event
 from src.utils.clipboard import copy_to_clipboard
+from src.utils.app_settings import get_app_setting
+from src.utils.background import run_in_background
 from src.core.file_manager import FileManager
 from src.core.selection_manager import SelectionManager
+from src.core.token_counter import TokenCounter
+from src.core.scan_index import ScanIndex
+from src.core.symbol_index import SymbolIndex
+from src.core.import_graph import ImportGraph
+from src.core.call_graph import CallGraph
+from src.core.near_duplicates import NearDuplicateIndex, update_signatures
+from src.core.relevance_index import RelevanceIndex
+from src.core.related_files import RelatedFilesIndex
+from src.core.repo_map import RepoMap
+from src.core.project_index import ProjectIndex, refresh_project_index
 from src.core.instructions.instruction_manager import InstructionManager
 from src.utils.syntax_highlighter import SyntaxHighlighter
 from src.gui.styling.themes import ThemeManager
@@ -22,11 +34,15 @@ from src.gui.styling.icons import IconManager
 from src.gui.panels.file_tree_panel import FileTreePanel
 from src.gui.panels.content_panel import FileContentPanel
 from src.gui.panels.context_panel import ContextPanel
+from src.gui.panels.suggestions_panel import SuggestionsPanel
 from src.gui.dialogs.instructions_dialog import show_instructions_dialog
 
 class ContextSelectorApp(tk.Tk):
     """Clase principal que implementa la interfaz gráfica del selector de contexto."""
     
+    # Intervalo (ms) con el que se actualiza el índice persistente del proyecto
+    PROJECT_INDEX_REFRESH_MS = 60 * 1000
+    
     def __init__(self):
         """Inicializa la aplicación y configura la interfaz gráfica."""
         super().__init__()
@@ -39,12 +55,43 @@ class ContextSelectorApp(tk.Tk):
         # Variables de estado
         self.current_folder = None
         self.current_file = None
+        self.context_budget = ContextPanel.DEFAULT_BUDGET
+        # Líneas que se añaden alrededor de cada selección al ampliar el contexto
+        self.context_window_radius = 50
+        # Índice de símbolos del proyecto y tarea que construye los índices del proyecto
+        self.symbol_index = None
+        self._project_indexes_task = None
+        # Grafo de importaciones del proyecto (para añadir dependencias)
+        self.import_graph = None
+        # Grafo de llamadas (se crea al usarlo con el índice de símbolos vigente)
+        self.call_graph = None
+        # Grupos de archivos casi duplicados (se calculan junto al índice de símbolos)
+        self.near_duplicates = None
+        # Índice BM25 para sugerir archivos relevantes y tarea que busca las sugerencias
+        self.relevance_index = None
+        self._suggestions_task = None
+        # Matriz TF-IDF para buscar archivos relacionados (se construye junto al índice de relevancia)
+        self.related_files = None
+        # Mapa del repositorio para la cabecera del contexto (se actualiza junto a los índices)
+        self.repo_map = None
+        # Índice persistente de la búsqueda en el proyecto: se actualiza al cargar
+        # la carpeta y después periódicamente, si está activado en la
+        # configuración o se ha usado en la búsqueda
+        self._project_index_requested = False
+        self._project_index_task = None
+        self._project_index_timer = None
+        # Instrucción usada como consulta de las sugerencias
+        self._suggested_instruction = None
         
         # Inicializar componentes
         self.file_manager = FileManager()
         self.syntax_highlighter = SyntaxHighlighter()
         self.instruction_manager = InstructionManager()
-        self.selection_manager = SelectionManager(self.instruction_manager)
+        self.token_counter = TokenCounter()
+        self.selection_manager = SelectionManager(self.instruction_manager, self.token_counter)
+        # Estructura de los archivos (compartida por la selección estructural del
+        # visor y la ampliación de selecciones al bloque que las contiene)
+        self.structure_builder = self.selection_manager.structure_builder
         self.theme_manager = ThemeManager()
         
         # Registrar como observador
@@ -71,10 +118,12 @@ class ContextSelectorApp(tk.Tk):
         self._create_main_layout()
         
         self.context_panel.set_remove_handler(self._remove_selected_text)
+        self.context_panel.set_priority_handler(self._set_selected_file_priority)
         create_custom_scroll_event(self)
         
-        # Aplicar tema configurado
+        # Aplicar tema y configuración avanzada
         self._apply_theme()
+        self._apply_settings()
         
         # Cargar la carpeta anterior si existe
         if self.current_folder:
@@ -101,8 +150,19 @@ class ContextSelectorApp(tk.Tk):
         edit_menu = tk.Menu(self.menu_bar, tearoff=0)
         edit_menu.add_command(label="Copiar selección", command=self._copy_selection, accelerator="Ctrl+C")
         edit_menu.add_command(label="Añadir selección al contexto", command=self._add_selection, accelerator="Alt+A")
+        edit_menu.add_command(label="Ampliar selección", command=lambda: self.file_content_panel.grow_selection(),
+                              accelerator="Alt+Arriba")
+        edit_menu.add_command(label="Reducir selección", command=lambda: self.file_content_panel.shrink_selection(),
+                              accelerator="Alt+Abajo")
         edit_menu.add_separator()
         
+        # Submenú para convertir las selecciones del contexto en ventanas más amplias
+        windows_menu = tk.Menu(edit_menu, tearoff=0)
+        windows_menu.add_command(label="Ampliar ±N líneas...", command=self._expand_context_windows)
+        windows_menu.add_command(label="Ampliar al bloque que las contiene",
+                                 command=lambda: self._expand_context_windows(to_block=True))
+        edit_menu.add_cascade(label="Ampliar selecciones del contexto", menu=windows_menu)
+        
         # Submenú para selecciones múltiples
         multi_select_menu = tk.Menu(edit_menu, tearoff=0)
         multi_select_menu.add_command(
@@ -124,6 +184,8 @@ class ContextSelectorApp(tk.Tk):
         
         edit_menu.add_separator()
         edit_menu.add_command(label="Buscar en selecciones", command=self._search_selections, accelerator="Ctrl+F")
+        edit_menu.add_command(label="Buscar en el proyecto", command=self._search_project, accelerator="Ctrl+Shift+F")
+        edit_menu.add_command(label="Ir a símbolo...", command=self._quick_open_symbol, accelerator="Ctrl+P")
         edit_menu.add_separator()
         edit_menu.add_command(label="Estadísticas del contexto", command=self._show_context_stats, accelerator="Ctrl+T")
         edit_menu.add_command(label="Limpiar contexto", command=self._clear_context, accelerator="Ctrl+L")
@@ -154,6 +216,8 @@ class ContextSelectorApp(tk.Tk):
         self.bind("<Control-l>", lambda event: self._clear_context())
         self.bind("<Alt-a>", lambda event: self._add_selection())
         self.bind("<Control-f>", lambda event: self._search_selections())
+        self.bind("<Control-Shift-F>", lambda event: self._search_project())
+        self.bind("<Control-p>", lambda event: self._quick_open_symbol())
         self.bind("<Control-Shift-s>", lambda event: self._save_selections())
         self.bind("<Control-Shift-o>", lambda event: self._load_selections())
         
@@ -175,7 +239,12 @@ class ContextSelectorApp(tk.Tk):
             self,
             on_file_select=self._on_file_select,
             on_checkbox_click=self._on_checkbox_click,
-            on_add_selected_files=self._add_selected_files_to_context
+            on_add_selected_files=self._add_selected_files_to_context,
+            on_add_with_dependencies=self._add_files_with_dependencies,
+            on_add_outline=self._add_selected_files_as_outline,
+            on_select_similar=self._select_similar_files,
+            on_add_without_near_duplicates=self._add_selected_without_near_duplicates,
+            on_show_related=self._show_related_to_items
         )
         self.main_paned.add(self.file_tree_panel.frame, weight=1)
         
@@ -188,7 +257,10 @@ class ContextSelectorApp(tk.Tk):
             self.right_paned,
             syntax_highlighter=self.syntax_highlighter,
             on_add_selection=self._add_selection_from_panel,
-            on_context_menu=self._show_file_context_menu
+            on_context_menu=self._show_file_context_menu,
+            on_add_whole_file=self._add_current_file_to_context,
+            on_pull_callees=self._pull_in_callees,
+            get_structure=self.structure_builder.get_structure
         )
         self.right_paned.add(self.file_content_panel.frame, weight=2)
         
@@ -200,9 +272,24 @@ class ContextSelectorApp(tk.Tk):
             on_clear=self._clear_context,
             on_context_menu=self._show_context_menu,
             on_stats=self._show_context_stats,
-            on_instructions=self._manage_instructions
+            on_instructions=self._manage_instructions,
+            on_budget_change=self._on_context_budget_change,
+            on_pack=self._pack_context_to_budget,
+            on_reset_pack=self.selection_manager.reset_packing
         )
         self.right_paned.add(self.context_panel.frame, weight=1)
+        self.context_panel.breakdown_provider = self.selection_manager.get_token_breakdown
+        self.context_panel.set_budget(self.context_budget)
+        
+        # Panel lateral de archivos sugeridos
+        self.suggestions_panel = SuggestionsPanel(
+            self,
+            on_suggest=self._suggest_files,
+            on_add=self._add_suggested_file,
+            on_open=self._load_file_content,
+            on_use_instruction=self._suggest_from_instruction
+        )
+        self.main_paned.add(self.suggestions_panel.frame, weight=1)
         
         # Configurar el gestor de instrucciones
         self.context_panel.set_instruction_manager(self.instruction_manager)
@@ -212,6 +299,7 @@ class ContextSelectorApp(tk.Tk):
         try:
             # Actualizar la visualización del contexto
             self._update_context_display()
+            self._update_token_meter()
             
             # Actualizar los resaltados visuales si el archivo actual está abierto
             if self.current_file:
@@ -230,8 +318,15 @@ class ContextSelectorApp(tk.Tk):
             # Actualizar el desplegable de instrucciones
             self.context_panel.update_from_instruction_manager()
             
+            # Sugerir archivos para la nueva instrucción, salvo que el usuario
+            # haya escrito otra descripción de la tarea
+            query = self.suggestions_panel.get_query()
+            if not query or query == self._suggested_instruction:
+                self._suggest_from_instruction(quiet=True)
+            
             # Actualizar la visualización del contexto si hay instrucciones
             self._update_context_display()
+            self._update_token_meter()
         except Exception as e:
             print(f"Error en update_from_instruction_manager: {str(e)}")
             import traceback
@@ -263,6 +358,251 @@ class ContextSelectorApp(tk.Tk):
         # Añadir cada archivo/carpeta al árbol
         for file_info in files:
             self._add_file_to_tree(file_info, "")
+        
+        # Cerrar el índice de relevancia de la carpeta anterior cuando termine la
+        # actualización cancelada (close() espera a la escritura en curso)
+        if self._project_indexes_task is not None:
+            self._project_indexes_task.cancel()
+        if self.relevance_index is not None:
+            previous_index = self.relevance_index
+            run_in_background(self, lambda cancel_event: previous_index.close())
+        
+        # Construir (o actualizar) los índices del proyecto en segundo plano
+        self.relevance_index = RelevanceIndex(self.current_folder)
+        self.related_files = RelatedFilesIndex()
+        self.repo_map = RepoMap(self.current_folder)
+        self.selection_manager.repo_map = self.repo_map
+        self.suggestions_panel.set_root_folder(self.current_folder)
+        self._start_project_indexes()
+        
+        # Grafo de importaciones (se analiza bajo demanda y se guarda en caché)
+        self.import_graph = ImportGraph(self.current_folder)
+        self.import_graph.load()
+    
+    def _start_project_indexes(self):
+        """
+        Construye o actualiza en segundo plano los índices de la carpeta actual.
+        
+        Ver _build_project_indexes; al terminar se llama a _on_project_indexes_ready.
+        """
+        if self._project_indexes_task is not None:
+            self._project_indexes_task.cancel()
+        if self._project_index_task is not None:
+            self._project_index_task.cancel()
+        self._schedule_project_index_refresh(enabled=False)
+        
+        root = self.current_folder
+        self.symbol_index = SymbolIndex(root, self.file_manager)
+        self.near_duplicates = None
+        # Los índices se pasan al hilo: si se abre otra carpeta, la tarea
+        # cancelada sigue trabajando sobre los suyos
+        indexes = {
+            'symbols': self.symbol_index,
+            'relevance': self.relevance_index,
+            'related': self.related_files,
+            'repo_map': self.repo_map,
+            'project_index': self._project_index_wanted()
+        }
+        
+        self._project_indexes_task = run_in_background(
+            self,
+            lambda cancel_event: self._build_project_indexes(root, indexes, cancel_event),
+            on_done=self._on_project_indexes_ready
+        )
+    
+    def _build_project_indexes(self, root, indexes, cancel_event):
+        """
+        Actualiza los índices de un proyecto (en segundo plano).
+        
+        Se escanea la carpeta una vez y, con ese escaneo, se actualizan por
+        orden el índice de símbolos, el índice persistente de la búsqueda (si
+        está activado), el índice de relevancia (BM25) con la matriz TF-IDF de
+        archivos relacionados y el mapa del repositorio, y por último las firmas
+        MinHash de los archivos casi duplicados.
+        
+        Args:
+            root (str): Carpeta del proyecto
+            indexes (dict): Índices a actualizar ('symbols', 'relevance',
+                'related', 'repo_map') y si se actualiza 'project_index'
+            cancel_event (threading.Event): Señal de cancelación
+        
+        Returns:
+            NearDuplicateIndex: Grupos de casi duplicados o None si se canceló
+        """
+        # Cargar la caché primero para que la búsqueda esté disponible enseguida
+        indexes['symbols'].load()
+        scan_index = ScanIndex(root)
+        scan_index.load()
+        scan_index.refresh(self.file_manager.iter_code_files(root))
+        
+        if not cancel_event.is_set():
+            self._update_symbol_index(indexes['symbols'], scan_index, cancel_event)
+        if indexes['project_index'] and not cancel_event.is_set():
+            self._update_project_search_index(root, scan_index)
+        if indexes['relevance'] is not None and not cancel_event.is_set():
+            self._update_relevance_indexes(indexes, scan_index, cancel_event)
+        
+        if cancel_event.is_set():
+            return None
+        return self._update_near_duplicates(scan_index, cancel_event)
+    
+    def _update_symbol_index(self, symbol_index, scan_index, cancel_event):
+        """Actualiza el índice de símbolos y lo guarda si ha cambiado."""
+        parsed = symbol_index.update(scan_index.entries, cancel_event)
+        if parsed and not cancel_event.is_set():
+            symbol_index.save()
+    
+    def _update_project_search_index(self, root, scan_index):
+        """Actualiza el índice persistente de la búsqueda en el proyecto."""
+        try:
+            refresh_project_index(root, scan_index.entries)
+        except Exception as e:
+            print(f"Error al actualizar el índice del proyecto: {str(e)}")
+    
+    def _update_relevance_indexes(self, indexes, scan_index, cancel_event):
+        """
+        Actualiza el índice de relevancia (BM25) de las sugerencias y lo que
+        depende de él: la matriz TF-IDF de archivos relacionados y el mapa del
+        repositorio.
+        """
+        relevance_index = indexes['relevance']
+        try:
+            relevance_index.update(scan_index.entries, cancel_event)
+            if not cancel_event.is_set():
+                indexes['related'].sync(relevance_index, cancel_event)
+            if not cancel_event.is_set():
+                indexes['repo_map'].sync(scan_index.entries, indexes['symbols'], relevance_index, cancel_event)
+        except Exception as e:
+            # Si se canceló (se abrió otra carpeta), el índice puede estar ya cerrado
+            if not cancel_event.is_set():
+                print(f"Error al actualizar el índice de relevancia: {str(e)}")
+    
+    def _update_near_duplicates(self, scan_index, cancel_event):
+        """
+        Calcula las firmas MinHash (se guardan en el índice de escaneo) y agrupa
+        los archivos casi duplicados.
+        
+        Returns:
+            NearDuplicateIndex: Grupos calculados o None si se canceló
+        """
+        update_signatures(scan_index, cancel_event)
+        if cancel_event.is_set():
+            return None
+        scan_index.save()
+        
+        near_duplicates = NearDuplicateIndex()
+        near_duplicates.build_from_scan_index(scan_index)
+        return near_duplicates
+    
+    def _on_project_indexes_ready(self, near_duplicates):
+        """
+        Aplica en la interfaz los índices recién actualizados: marca los casi
+        duplicados en el árbol, actualiza el contador de tokens (el mapa del
+        repositorio cuenta en el contexto) y programa la actualización periódica
+        del índice persistente de la búsqueda.
+        
+        Args:
+            near_duplicates (NearDuplicateIndex): Grupos calculados (None si se canceló)
+        """
+        if near_duplicates is None:
+            return
+        self.near_duplicates = near_duplicates
+        self._mark_near_duplicates()
+        if self.selection_manager.repo_map_enabled:
+            self._update_token_meter()
+        self._schedule_project_index_refresh()
+    
+    def _mark_near_duplicates(self):
+        """Marca en el árbol de archivos los que tienen casi duplicados."""
+        tree = self.file_tree_panel.file_tree
+        for item_id, file_path in self._iter_tree_files():
+            tags = [tag for tag in tree.item(item_id, "tags") if tag != "near_duplicate"]
+            if self.near_duplicates.get_cluster(file_path):
+                tags.append("near_duplicate")
+            tree.item(item_id, tags=tags)
+    
+    def _project_index_wanted(self):
+        """
+        Indica si hay que mantener al día el índice persistente del proyecto.
+        
+        Returns:
+            bool: True si está activado (o se ha usado) y SQLite incluye FTS5
+        """
+        wanted = self._project_index_requested or get_app_setting('advanced', 'project_index', False)
+        return bool(wanted) and ProjectIndex.is_available()
+    
+    def _schedule_project_index_refresh(self, delay=None, enabled=True):
+        """
+        Programa la próxima actualización del índice persistente del proyecto.
+        
+        Args:
+            delay (int, optional): Espera (ms); por defecto PROJECT_INDEX_REFRESH_MS
+            enabled (bool): False para solo cancelar la actualización programada
+        """
+        if self._project_index_timer is not None:
+            self.after_cancel(self._project_index_timer)
+            self._project_index_timer = None
+        if enabled and self.current_folder and self._project_index_wanted():
+            self._project_index_timer = self.after(
+                self.PROJECT_INDEX_REFRESH_MS if delay is None else delay,
+                self._refresh_project_index
+            )
+    
+    def _refresh_project_index(self):
+        """Actualiza en segundo plano el índice persistente del proyecto."""
+        self._project_index_timer = None
+        tasks = (self._project_indexes_task, self._project_index_task)
+        if any(task is not None and task.is_running() for task in tasks):
+            # Ya se está actualizando junto a los demás índices
+            self._schedule_project_index_refresh()
+            return
+        
+        root = self.current_folder
+        file_manager = self.file_manager
+        
+        def refresh(cancel_event):
+            # Sin cargar ni guardar el índice de escaneo: solo hacen falta los
+            # estados actuales, y ProjectIndex compara con los suyos
+            scan_index = ScanIndex(root)
+            scan_index.refresh(file_manager.iter_code_files(root))
+            if not cancel_event.is_set():
+                refresh_project_index(root, scan_index.entries)
+        
+        def on_error(error):
+            print(f"Error al actualizar el índice del proyecto: {str(error)}")
+            self._schedule_project_index_refresh()
+        
+        self._project_index_task = run_in_background(
+            self, refresh,
+            on_done=lambda _: self._schedule_project_index_refresh(),
+            on_error=on_error
+        )
+    
+    def _on_project_index_search(self):
+        """Empieza a mantener al día el índice persistente al usarlo en una búsqueda."""
+        if self._project_index_requested:
+            return
+        self._project_index_requested = True
+        if self._project_index_timer is None and not (
+                self._project_index_task is not None and self._project_index_task.is_running()):
+            self._schedule_project_index_refresh()
+    
+    def _iter_tree_files(self, parent=''):
+        """
+        Recorre los archivos del árbol.
+        
+        Args:
+            parent (str): Elemento desde el que recorrer (la raíz por defecto)
+            
+        Yields:
+            tuple: (ID del elemento, ruta completa del archivo)
+        """
+        tree = self.file_tree_panel.file_tree
+        for item_id in tree.get_children(parent):
+            if "file" in tree.item(item_id, "tags"):
+                yield item_id, self._get_full_path(item_id, tree)
+            else:
+                yield from self._iter_tree_files(item_id)
     
     def _add_file_to_tree(self, file_info, parent):
         """Añade un archivo o carpeta al árbol de archivos con ícono."""
@@ -368,6 +708,7 @@ class ContextSelectorApp(tk.Tk):
                         # Actualizar según el nuevo estado
                         if new_state == "☑":
                             self._add_complete_file_to_context(file_path)
+                            self._show_related_files([file_path])
                         else:
                             self.selection_manager.remove_file(file_path)
     
@@ -394,6 +735,10 @@ class ContextSelectorApp(tk.Tk):
             self.current_file = file_path
             self.file_content_panel.load_file(file_path)
             
+            # Analizar su estructura en segundo plano para que la selección
+            # estructural responda al instante
+            run_in_background(self, lambda cancel_event: self.structure_builder.get_structure(file_path))
+            
             # Aplicar resaltado a las selecciones previas (si existen)
             ranges = self.selection_manager.get_selection_ranges(file_path)
             if ranges:
@@ -409,10 +754,11 @@ class ContextSelectorApp(tk.Tk):
         
         # Obtener la selección actual
         try:
-            selection = text_widget.get(tk.SEL_FIRST, tk.SEL_LAST)
             # Guardar también las posiciones de la selección
             sel_start = text_widget.index(tk.SEL_FIRST)
             sel_end = text_widget.index(tk.SEL_LAST)
+            # Texto original (las líneas largas truncadas se leen completas del archivo)
+            selection = self.file_content_panel.get_original_text(sel_start, sel_end)
         except tk.TclError:
             messagebox.showinfo("Sin selección", "No hay texto seleccionado")
             return
@@ -420,11 +766,17 @@ class ContextSelectorApp(tk.Tk):
         if not selection:
             return
         
+        # Las posiciones solo se guardan si son líneas del archivo (en la vista
+        # previa de un archivo grande, el final mostrado no lo es)
+        selection_range = (sel_start, sel_end)
+        if self.file_content_panel.get_file_lines(sel_start, sel_end) is None:
+            selection_range = None
+        
         # Usar el SelectionManager para añadir la selección
         success = self.selection_manager.add_selection(
             self.current_file, 
             selection, 
-            (sel_start, sel_end)
+            selection_range
         )
         
         if not success:
@@ -443,7 +795,9 @@ class ContextSelectorApp(tk.Tk):
     def _show_file_context_menu(self, event, text_widget, menu):
         """Muestra el menú contextual en el área de contenido de archivo."""
         try:
-            text_widget.selection_get()
+            # Sin selección el menú solo tiene sentido para la selección estructural
+            if not text_widget.tag_ranges(tk.SEL) and not self.current_file:
+                return
             menu.tk_popup(event.x_root, event.y_root)
         except:
             pass
@@ -467,13 +821,82 @@ class ContextSelectorApp(tk.Tk):
         except Exception as e:
             messagebox.showerror("Error al cargar archivo", f"No se pudo cargar el archivo: {str(e)}")
 
+    def _add_current_file_to_context(self):
+        """Añade el archivo abierto en el visor, completo y sin truncar, al contexto."""
+        if not self.current_file:
+            return
+        
+        self._add_complete_file_to_context(self.current_file)
+        self._update_checkbox_state(self.current_file, True)
+
     def _update_context_display(self):
         """Actualiza la visualización del contexto seleccionado."""
-        # Obtener todas las selecciones del SelectionManager
-        selections = self.selection_manager.get_all_selections()
+        # Obtener las selecciones del SelectionManager (con el ajuste al presupuesto aplicado)
+        selections = self.selection_manager.get_effective_context()
         
         # Actualizar el panel de contexto
-        self.context_panel.update_context(selections)
+        self.context_panel.update_context(selections, self.selection_manager.get_all_selection_lines())
+
+    def _update_token_meter(self):
+        """Actualiza el medidor de tokens del panel de contexto."""
+        self.context_panel.update_token_meter(
+            self.selection_manager.get_context_tokens(),
+            self.token_counter.get_method_label()
+        )
+    
+    def _pack_context_to_budget(self, budget):
+        """
+        Ajusta el contexto al presupuesto de tokens del medidor.
+        
+        Si hay una descripción de la tarea (o una instrucción activa), los
+        archivos más relevantes para ella tienen preferencia.
+        
+        Args:
+            budget (int): Presupuesto de tokens
+        """
+        if not self.selection_manager.selections:
+            messagebox.showinfo("Sin contexto", "No hay contexto para ajustar")
+            return
+        
+        relevance = None
+        query = self.suggestions_panel.get_query() or self.instruction_manager.get_current_instruction_content()
+        if query and self.relevance_index is not None:
+            try:
+                relevance = self.relevance_index.get_relevance(query, list(self.selection_manager.selections))
+            except Exception as e:
+                print(f"Error al calcular la relevancia: {str(e)}")
+        
+        result = self.selection_manager.pack_to_budget(budget, relevance=relevance or None)
+        counts = result['counts']
+        messagebox.showinfo(
+            "Contexto ajustado",
+            f"Archivos completos: {counts.get('full', 0)}\n"
+            f"Solo el inicio: {counts.get('head', 0)}\n"
+            f"Excluidos: {counts.get('excluded', 0)}\n\n"
+            f"Tokens: {self.selection_manager.get_context_tokens()} de {budget}\n"
+            "Use \"Deshacer ajuste\" para volver a incluir todo."
+        )
+    
+    def _set_selected_file_priority(self, priority):
+        """
+        Cambia la prioridad del archivo de la selección resaltada en el contexto.
+        
+        Args:
+            priority (str): 'alta', 'normal' o 'baja'
+        """
+        if hasattr(self, 'current_context_selection'):
+            file_path = self.current_context_selection[0]
+            self.selection_manager.set_priority(file_path, priority)
+    
+    def _on_context_budget_change(self, budget_label):
+        """
+        Guarda el tamaño de contexto elegido en el medidor.
+        
+        Args:
+            budget_label (str): Etiqueta del tamaño de contexto
+        """
+        self.context_budget = budget_label
+        self._save_settings()
 
     def _show_context_menu(self, event, text_widget, menu):
         """Muestra el menú contextual en el área de contexto."""
@@ -504,6 +927,7 @@ class ContextSelectorApp(tk.Tk):
                         
                         # Guardar la referencia a la selección para poder eliminarla
                         self.current_context_selection = (file_path, idx, is_whole_file)
+                        self.context_panel.priority_var.set(self.selection_manager.get_priority(file_path))
                         
                         # Mostrar el menú contextual
                         menu.tk_popup(event.x_root, event.y_root)
@@ -526,7 +950,10 @@ class ContextSelectorApp(tk.Tk):
         context = self.selection_manager.get_formatted_context()
         if context:
             copy_to_clipboard(self, context)
-            messagebox.showinfo("Contexto copiado", "El contexto ha sido copiado al portapapeles")
+            tokens = self.token_counter.count(context)
+            messagebox.showinfo("Contexto copiado", 
+                              f"El contexto ha sido copiado al portapapeles\n"
+                              f"Tokens {self.token_counter.get_method_label()}: {tokens}")
         else:
             messagebox.showinfo("Sin contexto", "No hay contexto para copiar")
 
@@ -545,7 +972,10 @@ class ContextSelectorApp(tk.Tk):
         
         if file_path:
             save_to_file(context, file_path)
-            messagebox.showinfo("Contexto guardado", f"El contexto ha sido guardado en:\n{file_path}")
+            tokens = self.token_counter.count(context)
+            messagebox.showinfo("Contexto guardado", 
+                              f"El contexto ha sido guardado en:\n{file_path}\n"
+                              f"Tokens {self.token_counter.get_method_label()}: {tokens}")
 
     def _clear_context(self):
         """Limpia todo el contexto seleccionado."""
@@ -576,12 +1006,30 @@ class ContextSelectorApp(tk.Tk):
         
         if file_path:
             if self.selection_manager.load_selections_from_file(file_path):
-                messagebox.showinfo("Selecciones cargadas", "Las selecciones han sido cargadas correctamente")
+                changed_files = self.selection_manager.changed_files
+                if changed_files:
+                    names = "\n".join(os.path.basename(path) for path in changed_files[:10])
+                    if len(changed_files) > 10:
+                        names += f"\n... y {len(changed_files) - 10} más"
+                    messagebox.showwarning(
+                        "Selecciones cargadas",
+                        "Las selecciones han sido cargadas, pero estos archivos han cambiado "
+                        f"desde que se guardaron:\n\n{names}"
+                    )
+                else:
+                    messagebox.showinfo("Selecciones cargadas", "Las selecciones han sido cargadas correctamente")
             else:
                 messagebox.showerror("Error", "No se pudieron cargar las selecciones")
 
-    def _update_checkbox_state(self, file_path, checked):
-        """Actualiza el estado de la casilla de verificación para un archivo."""
+    def _update_checkbox_state(self, file_path, checked, outline=False):
+        """
+        Actualiza el estado de la casilla de verificación para un archivo.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            checked (bool): Si el archivo está incluido en el contexto
+            outline (bool): Si se incluye solo como esquema
+        """
         # Encontrar el ítem en el árbol que corresponde a esta ruta
         file_name = os.path.basename(file_path)
         
@@ -590,7 +1038,10 @@ class ContextSelectorApp(tk.Tk):
             full_path = self._get_full_path(item_id, self.file_tree_panel.file_tree)
             if full_path == file_path:
                 # Actualizar el valor en el árbol
-                new_state = "☑" if checked else "☐"
+                if not checked:
+                    new_state = "☐"
+                else:
+                    new_state = "◧" if outline else "☑"
                 self.file_tree_panel.file_tree.item(item_id, values=(new_state,))
                 break
 
@@ -609,49 +1060,219 @@ class ContextSelectorApp(tk.Tk):
 
     def _search_selections(self):
         """Abre un diálogo para buscar en las selecciones."""
-        search_text = simpledialog.askstring("Buscar", "Texto a buscar en las selecciones:")
-        if not search_text:
+        if not self.selection_manager.selections:
+            messagebox.showinfo("Búsqueda", "No hay selecciones en las que buscar.")
+            return
+        
+        from src.gui.dialogs.search_dialog import show_search_dialog
+        show_search_dialog(self, self.selection_manager, on_open_match=self._open_file_at_line)
+    
+    def _search_project(self):
+        """Abre un diálogo para buscar en todos los archivos del proyecto."""
+        if not self.current_folder:
+            messagebox.showinfo("Búsqueda", "Abra primero una carpeta.")
+            return
+        
+        from src.gui.dialogs.project_search_dialog import show_project_search_dialog
+        show_project_search_dialog(
+            self,
+            self.file_manager,
+            self.current_folder,
+            on_open_match=self._open_file_at_line,
+            on_add_file=self._add_search_result_file,
+            on_add_lines=self._add_lines_around,
+            on_index_search=self._on_project_index_search
+        )
+    
+    def _add_search_result_file(self, file_path):
+        """
+        Añade al contexto el archivo completo de un resultado de búsqueda.
+        
+        Args:
+            file_path (str): Ruta del archivo
+        """
+        self._add_complete_file_to_context(file_path)
+        self._update_checkbox_state(file_path, True)
+    
+    def _add_lines_around(self, file_path, line, radius):
+        """
+        Añade al contexto las líneas que rodean a una línea de un archivo.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            line (int): Línea central (desde 1)
+            radius (int): Número de líneas antes y después
+        """
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                content = f.read()
+        except Exception as e:
+            messagebox.showerror("Error al cargar archivo", f"No se pudo cargar el archivo: {str(e)}")
             return
         
-        results = self.selection_manager.search_in_selections(search_text)
+        if not self.selection_manager.add_line_window(file_path, content, line, radius):
+            if self.selection_manager.is_whole_file_in_context(file_path):
+                messagebox.showinfo("Archivo ya incluido",
+                                    "El archivo completo ya está incluido en el contexto.")
+            else:
+                messagebox.showinfo("Selección duplicada",
+                                    "Estas líneas ya han sido añadidas al contexto.")
+    
+    def _expand_context_windows(self, to_block=False):
+        """
+        Amplía todas las selecciones de líneas del contexto y funde las que se solapan.
         
-        if not results:
-            messagebox.showinfo("Búsqueda", f"No se encontró '{search_text}' en ninguna selección.")
+        Args:
+            to_block (bool): Ampliar al bloque que contiene cada selección en
+                lugar de un número de líneas
+        """
+        radius = 0
+        if not to_block:
+            radius = simpledialog.askinteger(
+                "Ampliar selecciones",
+                "Líneas que se añaden antes y después de cada selección:",
+                parent=self, initialvalue=self.context_window_radius, minvalue=1, maxvalue=5000
+            )
+            if radius is None:
+                return
+            self.context_window_radius = radius
+        
+        changed_files, windows = self.selection_manager.expand_selections(radius, to_block)
+        if not changed_files:
+            messagebox.showinfo("Ampliar selecciones",
+                                "No hay selecciones de líneas en el contexto que se puedan ampliar.")
+    
+    def _quick_open_symbol(self):
+        """Abre la búsqueda rápida de símbolos del proyecto."""
+        if not self.current_folder or self.symbol_index is None:
+            messagebox.showinfo("Ir a símbolo", "Abra primero una carpeta.")
             return
         
-        # Crear una ventana para mostrar resultados
-        search_window = tk.Toplevel(self)
-        search_window.title(f"Resultados de búsqueda: '{search_text}'")
-        search_window.geometry("600x400")
+        from src.gui.dialogs.quick_open_dialog import show_quick_open_dialog
+        show_quick_open_dialog(
+            self,
+            self.symbol_index,
+            self.current_folder,
+            on_add_symbol=self._add_symbol_to_context,
+            on_open_symbol=lambda symbol: self._open_file_at_line(symbol.file_path, symbol.start_line),
+            is_indexing=lambda: self._project_indexes_task is not None and self._project_indexes_task.is_running()
+        )
+    
+    def _add_symbol_to_context(self, symbol):
+        """
+        Añade al contexto el código de un símbolo (clase, función...).
+        
+        Args:
+            symbol (Symbol): Símbolo del índice
+        """
+        try:
+            with open(symbol.file_path, 'r', encoding='utf-8', errors='replace') as f:
+                content = f.read()
+        except Exception as e:
+            messagebox.showerror("Error al cargar archivo", f"No se pudo cargar el archivo: {str(e)}")
+            return
+        
+        if not self.selection_manager.add_line_range(symbol.file_path, content, symbol.start_line, symbol.end_line):
+            if self.selection_manager.is_whole_file_in_context(symbol.file_path):
+                messagebox.showinfo("Archivo ya incluido",
+                                    "El archivo completo ya está incluido en el contexto.")
+            else:
+                messagebox.showinfo("Selección duplicada",
+                                    f"{symbol.qualname} ya está incluido en el contexto.")
+    
+    def _pull_in_callees(self, text_widget):
+        """
+        Muestra las definiciones llamadas desde la selección del visor para añadirlas al contexto.
+        
+        Args:
+            text_widget: Widget de texto con la selección
+        """
+        if not self.current_file or self.symbol_index is None:
+            return
+        if os.path.splitext(self.current_file)[1].lower() != '.py':
+            messagebox.showinfo("Añadir funciones llamadas",
+                                "Las funciones llamadas solo se buscan en archivos Python.")
+            return
         
-        # Crear un Treeview para mostrar los resultados
-        tree_frame = ttk.Frame(search_window)
-        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        try:
+            lines = self.file_content_panel.get_file_lines(text_widget.index(tk.SEL_FIRST),
+                                                           text_widget.index(tk.SEL_LAST))
+        except tk.TclError:
+            messagebox.showinfo("Sin selección", "No hay texto seleccionado")
+            return
+        if lines is None:
+            messagebox.showinfo("Añadir funciones llamadas",
+                                "La selección está en el final de la vista previa de un archivo grande, "
+                                "cuyas líneas no se conocen. Cargue el archivo hasta esa parte.")
+            return
+        first_line, last_line = lines
         
-        tree = ttk.Treeview(tree_frame, columns=("file", "selection", "position"))
-        tree.heading("#0", text="Archivo")
-        tree.heading("file", text="Archivo")
-        tree.heading("selection", text="Selección")
-        tree.heading("position", text="Posición")
+        if self.call_graph is None or self.call_graph.symbol_index is not self.symbol_index:
+            self.call_graph = CallGraph(self.symbol_index, self.import_graph)
         
-        tree.column("#0", width=0, stretch=tk.NO)
-        tree.column("file", width=150)
-        tree.column("selection", width=300)
-        tree.column("position", width=100)
+        remaining = self.context_panel.get_budget_tokens() - self.selection_manager.get_context_tokens()
         
-        tree.pack(fill=tk.BOTH, expand=True)
+        from src.gui.dialogs.callees_dialog import show_callees_dialog
+        show_callees_dialog(
+            self,
+            self.call_graph,
+            self.current_file,
+            first_line,
+            last_line,
+            self.current_folder,
+            token_cost=self._get_symbol_token_cost,
+            remaining_tokens=remaining,
+            on_confirm=self._add_symbols_to_context
+        )
+    
+    def _get_symbol_token_cost(self, symbol):
+        """
+        Cuenta los tokens que ocuparía el código de un símbolo en el contexto.
         
-        # Llenar el árbol con resultados
-        for file_path, file_results in results.items():
-            file_name = os.path.basename(file_path)
+        Args:
+            symbol (Symbol): Símbolo del índice
             
-            for i, (selection_idx, selection, start, end) in enumerate(file_results):
-                # Truncar la selección si es muy larga
-                preview = selection
-                if len(preview) > 50:
-                    preview = preview[:47] + "..."
-                
-                tree.insert("", "end", text="", values=(file_name, preview, f"{start}-{end}"))
+        Returns:
+            int: Número de tokens
+        """
+        text = self.call_graph.get_symbol_text(symbol)
+        return self.selection_manager.count_tokens(text, os.path.splitext(symbol.file_path)[1].lower())
+    
+    def _add_symbols_to_context(self, symbols):
+        """
+        Añade al contexto el código de varios símbolos, leyendo cada archivo una vez.
+        
+        Args:
+            symbols (list): Símbolos del índice
+        """
+        contents = {}
+        for symbol in symbols:
+            if symbol.file_path not in contents:
+                try:
+                    with open(symbol.file_path, 'r', encoding='utf-8', errors='replace') as f:
+                        contents[symbol.file_path] = f.read()
+                except Exception as e:
+                    print(f"Error al leer {symbol.file_path}: {str(e)}")
+                    contents[symbol.file_path] = None
+            content = contents[symbol.file_path]
+            if content is not None:
+                self.selection_manager.add_line_range(symbol.file_path, content, symbol.start_line, symbol.end_line)
+    
+    def _open_file_at_line(self, file_path, line):
+        """
+        Abre un archivo en el visor y muestra una línea.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            line (int): Número de línea (desde 1)
+        """
+        if not os.path.isfile(file_path):
+            messagebox.showinfo("Archivo no disponible", f"No se encuentra el archivo:\n{file_path}")
+            return
+        
+        if self.current_file != file_path:
+            self._load_file_content(file_path)
+        self.file_content_panel.show_line(line)
 
     def _show_context_stats(self):
         """Muestra estadísticas sobre el contexto actual."""
@@ -662,6 +1283,74 @@ class ContextSelectorApp(tk.Tk):
         from src.gui.dialogs.stats_dialog import show_stats_dialog
         show_stats_dialog(self, stats)
         
+    def _add_files_with_dependencies(self, selected_items):
+        """
+        Muestra las dependencias locales de los archivos seleccionados para añadirlas al contexto.
+        
+        Args:
+            selected_items: Lista de IDs de elementos seleccionados en el árbol
+        """
+        if self.import_graph is None:
+            return
+        
+        tree = self.file_tree_panel.file_tree
+        file_paths = []
+        for item_id in selected_items:
+            if "file" in tree.item(item_id, "tags"):
+                file_path = self._get_full_path(item_id, tree)
+                if file_path and os.path.isfile(file_path):
+                    file_paths.append(file_path)
+        if not file_paths:
+            return
+        
+        remaining = self.context_panel.get_budget_tokens() - self.selection_manager.get_context_tokens()
+        
+        from src.gui.dialogs.dependencies_dialog import show_dependencies_dialog
+        show_dependencies_dialog(
+            self,
+            self.import_graph,
+            file_paths,
+            self.current_folder,
+            token_cost=self._get_file_token_cost,
+            remaining_tokens=remaining,
+            on_confirm=self._add_files_to_context,
+            in_context=list(self.selection_manager.selections)
+        )
+    
+    def _get_file_token_cost(self, file_path):
+        """
+        Cuenta los tokens que ocuparía un archivo completo en el contexto.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            
+        Returns:
+            int: Número de tokens (0 si no se puede leer)
+        """
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                content = f.read()
+        except OSError:
+            return 0
+        return self.selection_manager.count_tokens(content, os.path.splitext(file_path)[1].lower())
+    
+    def _add_files_to_context(self, file_paths):
+        """
+        Añade varios archivos completos al contexto y marca sus casillas.
+        
+        Args:
+            file_paths (list): Rutas de los archivos
+        """
+        success_count, error_count = self.selection_manager.add_multiple_files(file_paths)
+        for file_path in file_paths:
+            self._update_checkbox_state(file_path, True)
+        
+        if error_count > 0:
+            messagebox.showerror(
+                "Error al añadir archivos",
+                f"Se añadieron {success_count} archivos, pero hubo {error_count} errores."
+            )
+    
     def _add_selected_files_to_context(self, selected_items):
         """
         Añade múltiples archivos seleccionados al contexto.
@@ -715,6 +1404,190 @@ class ContextSelectorApp(tk.Tk):
                 f"Se omitieron {skipped_dirs} directorios."
             )
     
+    def _add_selected_files_as_outline(self, selected_items):
+        """
+        Añade los archivos seleccionados al contexto solo como esquema.
+        
+        Args:
+            selected_items: Lista de IDs de elementos seleccionados en el árbol
+        """
+        tree = self.file_tree_panel.file_tree
+        file_paths = []
+        for item_id in selected_items:
+            if "file" in tree.item(item_id, "tags"):
+                file_path = self._get_full_path(item_id, tree)
+                if file_path and os.path.isfile(file_path):
+                    file_paths.append((item_id, file_path))
+        if not file_paths:
+            return
+        
+        success_count, error_count = self.selection_manager.add_multiple_files(
+            [path for _, path in file_paths], outline=True)
+        
+        for item_id, file_path in file_paths:
+            if self.selection_manager.is_outline_file(file_path):
+                tree.item(item_id, values=("◧",))
+        
+        if error_count > 0:
+            messagebox.showwarning(
+                "Esquema no disponible",
+                f"Se añadieron {success_count} archivos como esquema.\n"
+                f"No se pudo generar el esquema de {error_count} archivos "
+                f"(lenguaje no soportado o error de lectura)."
+            )
+    
+    def _select_similar_files(self, selected_items):
+        """
+        Selecciona en el árbol los archivos casi duplicados de los seleccionados.
+        
+        Args:
+            selected_items: Lista de IDs de elementos seleccionados en el árbol
+        """
+        if self.near_duplicates is None:
+            messagebox.showinfo("Archivos similares", "El análisis de archivos similares aún no ha terminado.")
+            return
+        
+        tree = self.file_tree_panel.file_tree
+        similar = set()
+        for item_id in selected_items:
+            if "file" in tree.item(item_id, "tags"):
+                similar.update(self.near_duplicates.get_cluster(self._get_full_path(item_id, tree)))
+        if not similar:
+            messagebox.showinfo("Archivos similares", "No se encontraron archivos casi duplicados.")
+            return
+        
+        items = [item_id for item_id, file_path in self._iter_tree_files() if file_path in similar]
+        for item_id in items:
+            parent = tree.parent(item_id)
+            while parent:
+                tree.item(parent, open=True)
+                parent = tree.parent(parent)
+        tree.selection_set(items)
+        tree.see(items[0])
+    
+    def _add_selected_without_near_duplicates(self, selected_items):
+        """
+        Añade los archivos seleccionados dejando uno solo por grupo de casi duplicados.
+        
+        Args:
+            selected_items: Lista de IDs de elementos seleccionados en el árbol
+        """
+        if self.near_duplicates is None:
+            self._add_selected_files_to_context(selected_items)
+            return
+        
+        tree = self.file_tree_panel.file_tree
+        item_paths = [(item_id, self._get_full_path(item_id, tree)) for item_id in selected_items
+                      if "file" in tree.item(item_id, "tags")]
+        representatives = set(self.near_duplicates.pick_representatives([path for _, path in item_paths]))
+        kept_items = [item_id for item_id, file_path in item_paths if file_path in representatives]
+        
+        self._add_selected_files_to_context(kept_items)
+        
+        skipped = len(item_paths) - len(kept_items)
+        if skipped:
+            messagebox.showinfo(
+                "Casi duplicados omitidos",
+                f"Se omitieron {skipped} archivos casi idénticos a otros de la selección."
+            )
+    
+    def _suggest_files(self, query):
+        """
+        Busca en segundo plano los archivos más relevantes para una descripción de la tarea.
+        
+        Args:
+            query (str): Descripción de la tarea o instrucción
+        """
+        if self.relevance_index is None:
+            self.suggestions_panel.set_status("Abra una carpeta para obtener sugerencias")
+            return
+        if self._suggestions_task is not None:
+            self._suggestions_task.cancel()
+        
+        relevance_index = self.relevance_index
+        exclude = set(self.selection_manager.selections)
+        self.suggestions_panel.set_status("Buscando archivos relevantes...")
+        
+        def show_error(error):
+            self.suggestions_panel.set_status(f"Error al buscar sugerencias: {str(error)}")
+        
+        self._suggestions_task = run_in_background(
+            self,
+            lambda cancel_event: relevance_index.search(query, limit=30, exclude=exclude),
+            on_done=self.suggestions_panel.set_results,
+            on_error=show_error
+        )
+    
+    def _suggest_from_instruction(self, quiet=False):
+        """
+        Usa la instrucción actual como descripción de la tarea y busca sugerencias.
+        
+        Args:
+            quiet (bool): No avisar si no hay ninguna instrucción seleccionada
+        """
+        content = self.instruction_manager.get_current_instruction_content()
+        if not content:
+            if not quiet:
+                self.suggestions_panel.set_status("No hay ninguna instrucción seleccionada")
+            return
+        self._suggested_instruction = content.strip()
+        self.suggestions_panel.set_query(self._suggested_instruction)
+        self._suggest_files(self._suggested_instruction)
+    
+    def _show_related_files(self, file_paths):
+        """
+        Muestra en el panel lateral los archivos más parecidos a unos archivos.
+        
+        Args:
+            file_paths (list): Rutas de los archivos de partida
+        """
+        if self.related_files is None or self.related_files.is_empty():
+            return
+        
+        try:
+            results = self.related_files.related(file_paths, limit=30)
+        except Exception as e:
+            print(f"Error al buscar archivos relacionados: {str(e)}")
+            return
+        
+        in_context = self.selection_manager.selections
+        results = [result for result in results if result[0] not in in_context][:15]
+        names = ", ".join(os.path.basename(path) for path in file_paths[:3])
+        if len(file_paths) > 3:
+            names += "..."
+        if results:
+            status = f"Archivos relacionados con {names}. Pulse ＋ para añadir uno al contexto."
+        else:
+            status = f"No se encontraron archivos relacionados con {names}"
+        self.suggestions_panel.set_results(results, status)
+    
+    def _show_related_to_items(self, selected_items):
+        """
+        Muestra los archivos relacionados con los elementos seleccionados en el árbol.
+        
+        Args:
+            selected_items: Lista de IDs de elementos seleccionados en el árbol
+        """
+        if self.related_files is None or self.related_files.is_empty():
+            messagebox.showinfo("Archivos relacionados", "El análisis del proyecto aún no ha terminado.")
+            return
+        
+        tree = self.file_tree_panel.file_tree
+        file_paths = [self._get_full_path(item_id, tree) for item_id in selected_items
+                      if "file" in tree.item(item_id, "tags")]
+        if file_paths:
+            self._show_related_files(file_paths)
+    
+    def _add_suggested_file(self, file_path):
+        """
+        Añade al contexto un archivo sugerido y lo quita de la lista.
+        
+        Args:
+            file_path (str): Ruta del archivo
+        """
+        self._add_files_to_context([file_path])
+        self.suggestions_panel.remove_file(file_path)
+    
     def _open_settings(self):
         """Abre el diálogo de configuración."""
         from src.gui.dialogs.settings_dialog import open_settings_dialog
@@ -744,6 +1617,9 @@ class ContextSelectorApp(tk.Tk):
                 # Restaurar última carpeta
                 if "last_folder" in settings and os.path.exists(settings["last_folder"]):
                     self.current_folder = settings["last_folder"]
+                
+                # Restaurar el tamaño de contexto del medidor de tokens
+                self.context_budget = settings.get("context_budget", self.context_budget)
             
             # Cargar configuración de temas y preferencias
             app_settings_file = os.path.join(config_dir, "app_settings.json")
@@ -768,7 +1644,8 @@ class ContextSelectorApp(tk.Tk):
             ensure_directory_exists(config_dir)
             
             settings = {
-                "last_folder": self.current_folder
+                "last_folder": self.current_folder,
+                "context_budget": self.context_budget
             }
             
             config_file = os.path.join(config_dir, "settings.json")
@@ -779,12 +1656,71 @@ class ContextSelectorApp(tk.Tk):
             
     def _apply_theme(self):
         """Aplica el tema configurado a todos los componentes."""
+        # Releer el tema guardado (puede haber cambiado desde el diálogo de configuración)
+        self.theme_manager.set_theme(get_app_setting('general', 'theme', self.theme_manager.current_theme))
+        
         # Aplicar tema a nivel de aplicación
         colors = self.theme_manager.apply_theme(self)
         
+        # Recolorear los tags del resaltado sin volver a analizar el archivo abierto
+        self.syntax_highlighter.update_theme(
+            self.theme_manager.current_theme,
+            self.file_content_panel.content_text
+        )
+        
         # Actualizar los iconos con el nuevo tema
         self.icon_manager.update_icons()
     
+    def _apply_settings(self):
+        """Aplica la configuración avanzada guardada a los componentes."""
+        self.syntax_highlighter.set_budget(
+            max_bytes=get_app_setting('advanced', 'highlight_max_kb', 1024) * 1024,
+            max_ms=get_app_setting('advanced', 'highlight_max_ms', 300)
+        )
+        self.file_content_panel.set_large_file_limits(
+            threshold_bytes=get_app_setting('advanced', 'large_file_threshold_kb', 2048) * 1024,
+            cap_bytes=get_app_setting('advanced', 'large_file_cap_mb', 20) * 1024 * 1024
+        )
+        
+        # Guarda de líneas largas: el visor trunca o ajusta y el resaltador las omite
+        long_line_threshold = get_app_setting('advanced', 'long_line_threshold', 10000)
+        long_line_mode = get_app_setting('advanced', 'long_line_mode', "Truncar")
+        self.file_content_panel.set_long_line_options(
+            threshold=long_line_threshold,
+            mode="wrap" if long_line_mode == "Ajustar" else "truncate"
+        )
+        self.syntax_highlighter.set_budget(max_line_length=long_line_threshold)
+        
+        # Método de conteo de tokens (el vocabulario BPE se carga al primer uso)
+        if self.token_counter.configure(
+            method=get_app_setting('advanced', 'token_method', TokenCounter.METHOD_SIMPLE),
+            vocab_path=get_app_setting('advanced', 'bpe_vocab_path', "")
+        ):
+            if self.repo_map is not None:
+                self.repo_map.invalidate()
+            self.selection_manager.recount_tokens(clear_cache=True)
+        self._update_token_meter()
+        
+        # Minimización del código al exportar
+        self.selection_manager.set_minify_options(
+            get_app_setting('format', 'minify', False),
+            strip_docstrings=get_app_setting('format', 'minify_docstrings', True),
+            indent_tabs=get_app_setting('format', 'minify_indent_tabs', False)
+        )
+        self.selection_manager.set_dedup_options(
+            get_app_setting('format', 'dedup', False),
+            min_lines=get_app_setting('format', 'dedup_min_lines', 6)
+        )
+        self.selection_manager.set_repo_map_options(
+            get_app_setting('format', 'repo_map', False),
+            max_tokens=get_app_setting('format', 'repo_map_tokens', 1000)
+        )
+        self._update_token_meter()
+        
+        # Índice persistente de la búsqueda (puede haberse activado o desactivado)
+        if self._project_indexes_task is None or not self._project_indexes_task.is_running():
+            self._schedule_project_index_refresh()
+    
     def _remove_selected_text(self):
         """Elimina la selección actualmente resaltada en el área de contexto."""
         if hasattr(self, 'current_context_selection'):
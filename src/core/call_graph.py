@@ -0,0 +1,687 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Funciones llamadas desde un fragmento de código Python.
+
+Cada archivo se analiza con ast una sola vez mientras no cambie su
+(mtime, tamaño): del análisis se guardan sus llamadas (línea y nombre
+llamado), sus importaciones y las clases base de sus clases. Los nombres
+llamados se resuelven contra el índice de símbolos, solo dentro del proyecto:
+- nombre(...): definición del propio archivo (incluidas las funciones
+  anidadas del ámbito), nombre importado de otro archivo del proyecto o, si no,
+  la única definición de nivel superior con ese nombre en el proyecto;
+- self.metodo(...) / cls.metodo(...): método de la clase que contiene la
+  llamada o de sus clases base del proyecto;
+- modulo.funcion(...) / Clase.metodo(...): definición del módulo o de la
+  clase importados;
+- objeto.metodo(...): método de la clase del proyecto indicada por la
+  anotación de tipo del objeto o por la llamada que lo creó (x = Clase(...));
+  si no se conoce, el único método con ese nombre de una clase cuyo nombre
+  coincide con el del objeto (tokenizer -> BPETokenizer). Los nombres de
+  métodos de str, bytes, dict, list y set no se resuelven así, porque el
+  objeto suele ser de esos tipos.
+Las llamadas a una clase se resuelven a su __init__ (o a la clase entera si
+no lo define). Las resoluciones se guardan hasta que el índice de símbolos o
+algún archivo analizado cambian.
+"""
+
+import os
+import ast
+import bisect
+import threading
+
+# Extensiones de los archivos que se analizan
+PYTHON_EXTENSIONS = {'.py'}
+
+# Métodos de los tipos integrados más comunes: objeto.get(...) sobre un
+# objeto de tipo desconocido suele ser un dict, no una clase del proyecto
+BUILTIN_METHOD_NAMES = frozenset(name for builtin in (str, bytes, dict, list, set)
+                                 for name in dir(builtin) if not name.startswith('_'))
+
+# Longitud mínima del nombre de un objeto para emparejarlo con una clase
+MIN_RECEIVER_LENGTH = 3
+
+def _dotted_name(node):
+    """
+    Obtiene el nombre con puntos de una expresión (a, a.b, a.b.c).
+    
+    Returns:
+        str: Nombre con puntos o None si la expresión no es un nombre
+    """
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return '.'.join(reversed(parts))
+
+def _type_name(node):
+    """
+    Obtiene el nombre de la clase de una anotación de tipo.
+    
+    Acepta Clase, modulo.Clase, "Clase", Optional[Clase] y Clase | None.
+    
+    Returns:
+        str: Nombre con puntos o None si la anotación no es una clase
+    """
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        try:
+            node = ast.parse(node.value, mode='eval').body
+        except SyntaxError:
+            return None
+    if isinstance(node, ast.Subscript) and _dotted_name(node.value) in ('Optional', 'typing.Optional'):
+        node = node.slice
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+        if isinstance(node.right, ast.Constant) and node.right.value is None:
+            node = node.left
+        elif isinstance(node.left, ast.Constant) and node.left.value is None:
+            node = node.right
+    return _dotted_name(node)
+
+class _FileCalls:
+    """Resultado del análisis de un archivo Python."""
+    
+    __slots__ = ('lines', 'call_lines', 'calls', 'imports', 'bases', 'hints')
+    
+    def __init__(self, source):
+        """
+        Analiza un archivo.
+        
+        Args:
+            source (str): Código fuente
+        
+        Raises:
+            SyntaxError: Si el código no se puede analizar
+        """
+        tree = ast.parse(source)
+        self.lines = source.split('\n')
+        # Importaciones {nombre local: (módulo, nivel, nombre importado o None)}
+        self.imports = {}
+        # Clases base {nombre cualificado de la clase: [nombres con puntos]}
+        self.bases = {}
+        # Tipos conocidos {ámbito: {variable o self.atributo: nombre con puntos}};
+        # los de self.atributo se guardan en el ámbito de la clase
+        self.hints = {}
+        calls = []
+        
+        def add_hint(target, type_name, qualname, class_qualname):
+            if not type_name:
+                return
+            if isinstance(target, ast.Name):
+                self.hints.setdefault(qualname, {})[target.id] = type_name
+            elif (isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name)
+                  and target.value.id == 'self' and class_qualname):
+                self.hints.setdefault(class_qualname, {})[f"self.{target.attr}"] = type_name
+        
+        def visit(node, qualname, class_qualname):
+            for child in ast.iter_child_nodes(node):
+                child_qualname = qualname
+                child_class = class_qualname
+                if isinstance(child, ast.AnnAssign):
+                    add_hint(child.target, _type_name(child.annotation), qualname, class_qualname)
+                elif (isinstance(child, ast.Assign) and len(child.targets) == 1
+                      and isinstance(child.value, ast.Call)):
+                    add_hint(child.targets[0], _dotted_name(child.value.func), qualname, class_qualname)
+                
+                if isinstance(child, ast.Call):
+                    callee = self._callee(child.func)
+                    if callee is not None:
+                        calls.append((child.lineno, callee))
+                elif isinstance(child, ast.Import):
+                    for alias in child.names:
+                        if alias.asname:
+                            self.imports[alias.asname] = (alias.name, 0, None)
+                        else:
+                            # "import a.b" enlaza "a"; el resto se resuelve desde la llamada
+                            head = alias.name.split('.')[0]
+                            self.imports[head] = (head, 0, None)
+                elif isinstance(child, ast.ImportFrom):
+                    for alias in child.names:
+                        if alias.name != '*':
+                            self.imports[alias.asname or alias.name] = (child.module or "", child.level or 0, alias.name)
+                elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    child_qualname = f"{qualname}.{child.name}" if qualname else child.name
+                    if isinstance(child, ast.ClassDef):
+                        self.bases[child_qualname] = [name for name in map(_dotted_name, child.bases) if name]
+                        child_class = child_qualname
+                    else:
+                        arguments = child.args
+                        for argument in arguments.posonlyargs + arguments.args + arguments.kwonlyargs:
+                            if argument.annotation is not None:
+                                add_hint(ast.Name(id=argument.arg), _type_name(argument.annotation),
+                                         child_qualname, None)
+                        if child_class != qualname:
+                            # Las funciones anidadas no son métodos de la clase
+                            child_class = None
+                visit(child, child_qualname, child_class)
+        
+        visit(tree, "", None)
+        calls.sort(key=lambda call: call[0])
+        self.call_lines = [line for line, _ in calls]
+        self.calls = [callee for _, callee in calls]
+    
+    @staticmethod
+    def _callee(func):
+        """
+        Describe la expresión llamada.
+        
+        Returns:
+            tuple: (base con puntos o None, nombre) para a.b.nombre(...) o
+                (None, nombre) para nombre(...); None si no tiene nombre
+        """
+        if isinstance(func, ast.Name):
+            return (None, func.id)
+        if isinstance(func, ast.Attribute):
+            return (_dotted_name(func.value) or '', func.attr)
+        return None
+
+def _file_state(file_path):
+    """
+    Obtiene el estado de un archivo para detectar cambios.
+    
+    Returns:
+        tuple: (mtime_ns, tamaño) o None si no existe
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+class CallGraph:
+    """Resuelve las funciones llamadas desde el código Python de un proyecto."""
+    
+    # Tamaño máximo de archivo que se analiza (bytes)
+    MAX_FILE_SIZE = 4 * 1024 * 1024
+    
+    # Clases base que se recorren como máximo al buscar un método heredado
+    MAX_BASE_DEPTH = 5
+    
+    def __init__(self, symbol_index, import_graph):
+        """
+        Inicializa el grafo de llamadas.
+        
+        Args:
+            symbol_index (SymbolIndex): Índice de símbolos del proyecto
+            import_graph (ImportGraph): Grafo de importaciones (para resolver módulos)
+        """
+        self.symbol_index = symbol_index
+        self.import_graph = import_graph
+        # Análisis por archivo {ruta: ((mtime_ns, tamaño), _FileCalls o None)}
+        self._files = {}
+        # Resoluciones {(ruta, ámbito, (base, nombre)): (Symbol o None, estados)},
+        # con el estado de cada archivo leído al resolver {ruta: (mtime_ns, tamaño)}:
+        # la del archivo de la llamada y las de los módulos y clases que se siguieron
+        self._resolved = {}
+        # Archivos leídos durante la resolución en curso {ruta: estado}
+        self._reads = None
+        # Símbolos por archivo {ruta: {nombre cualificado: Symbol}} y por nombre
+        self._qualnames = {}
+        self._by_name = None
+        # Lista de símbolos con la que se calcularon las cachés anteriores
+        self._symbols = None
+        self._lock = threading.RLock()
+    
+    def _check_symbols(self):
+        """Descarta las resoluciones si el índice de símbolos se ha actualizado."""
+        if self._symbols is not self.symbol_index.symbols:
+            self._symbols = self.symbol_index.symbols
+            self._resolved = {}
+            self._qualnames = {}
+            self._by_name = None
+    
+    def _get_file(self, file_path):
+        """
+        Obtiene el análisis de un archivo Python, reutilizándolo si no ha cambiado.
+        
+        Args:
+            file_path (str): Ruta del archivo
+        
+        Returns:
+            _FileCalls: Análisis del archivo o None si no se puede analizar
+        """
+        if os.path.splitext(file_path)[1].lower() not in PYTHON_EXTENSIONS:
+            return None
+        state = _file_state(file_path)
+        if self._reads is not None:
+            self._reads[file_path] = state
+        if state is None:
+            return None
+        cached = self._files.get(file_path)
+        if cached is not None and cached[0] == state:
+            return cached[1]
+        
+        info = None
+        if state[1] <= self.MAX_FILE_SIZE:
+            try:
+                with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                    info = _FileCalls(f.read())
+            except (OSError, SyntaxError, ValueError):
+                info = None
+        self._files[file_path] = (state, info)
+        return info
+    
+    def _file_symbols(self, file_path):
+        """
+        Obtiene los símbolos de un archivo por nombre cualificado.
+        
+        Returns:
+            dict: {nombre cualificado: Symbol}
+        """
+        symbols = self._qualnames.get(file_path)
+        if symbols is None:
+            symbols = {}
+            for symbol in self.symbol_index.get_file_symbols(file_path):
+                symbols.setdefault(symbol.qualname, symbol)
+            self._qualnames[file_path] = symbols
+        return symbols
+    
+    def _symbols_named(self, name):
+        """
+        Obtiene los símbolos Python del proyecto con un nombre.
+        
+        Returns:
+            list: Símbolos con ese nombre
+        """
+        if self._by_name is None:
+            by_name = {}
+            for symbol in self._symbols or []:
+                if os.path.splitext(symbol.file_path)[1].lower() in PYTHON_EXTENSIONS:
+                    by_name.setdefault(symbol.name, []).append(symbol)
+            self._by_name = by_name
+        return self._by_name.get(name, [])
+    
+    def get_symbol_text(self, symbol):
+        """
+        Obtiene el código de un símbolo.
+        
+        Args:
+            symbol (Symbol): Símbolo del índice
+        
+        Returns:
+            str: Líneas del símbolo (vacío si no se puede leer)
+        """
+        with self._lock:
+            info = self._get_file(symbol.file_path)
+        if info is None:
+            return ""
+        return '\n'.join(info.lines[symbol.start_line - 1:symbol.end_line])
+    
+    def _callable_symbol(self, symbol):
+        """Sustituye una clase por su __init__, si lo define."""
+        if symbol is not None and symbol.kind == 'class':
+            init = self._file_symbols(symbol.file_path).get(f"{symbol.qualname}.__init__")
+            if init is not None:
+                return init
+        return symbol
+    
+    def _resolve_module(self, file_path, module, level):
+        """Busca el archivo del proyecto de un módulo importado."""
+        if self.import_graph is None:
+            return None
+        return self.import_graph.resolve_python_module(file_path, module, level)
+    
+    def _module_attribute(self, module_path, name, depth=0):
+        """
+        Busca una definición de nivel superior de un módulo.
+        
+        Si el módulo solo la importa (p. ej. un __init__.py que reexporta
+        nombres de sus submódulos), se sigue esa importación.
+        
+        Args:
+            module_path (str): Archivo del módulo
+            name (str): Nombre buscado
+            depth (int): Importaciones seguidas hasta ahora
+        
+        Returns:
+            Symbol: Definición encontrada o None
+        """
+        symbol = self._file_symbols(module_path).get(name)
+        if symbol is not None or depth >= self.MAX_BASE_DEPTH:
+            return symbol
+        info = self._get_file(module_path)
+        if info is None or name not in info.imports:
+            return None
+        module, level, imported = info.imports[name]
+        if imported is None:
+            return None
+        target = self._resolve_module(module_path, module, level)
+        if target is None or target == module_path:
+            return None
+        return self._module_attribute(target, imported, depth + 1)
+    
+    def _resolve_dotted(self, file_path, info, scope, dotted):
+        """
+        Resuelve un nombre con puntos a un módulo o a una definición.
+        
+        Args:
+            file_path (str): Archivo donde aparece el nombre
+            info (_FileCalls): Análisis de ese archivo
+            scope (str): Nombre cualificado del ámbito donde aparece ('' en el módulo)
+            dotted (str): Nombre con puntos (a, a.b...)
+        
+        Returns:
+            tuple: ('module', ruta) o ('symbol', Symbol), o None si no es del proyecto
+        """
+        parts = dotted.split('.')
+        head = parts[0]
+        
+        if head in info.imports:
+            module, level, imported = info.imports[head]
+            if imported is None:
+                # "import a.b": se toma el módulo más largo que exista
+                for end in range(len(parts), 0, -1):
+                    target = self._resolve_module(file_path, '.'.join([module] + parts[1:end]), level)
+                    if target is not None:
+                        return self._resolve_attributes(('module', target), parts[end:])
+                return None
+            
+            # "from m import x": x puede ser un submódulo o un nombre de m
+            submodule = self._resolve_module(file_path, f"{module}.{imported}" if module else imported, level)
+            if submodule is not None:
+                return self._resolve_attributes(('module', submodule), parts[1:])
+            target = self._resolve_module(file_path, module, level)
+            if target is None:
+                return None
+            symbol = self._module_attribute(target, imported)
+            if symbol is None:
+                return None
+            return self._resolve_attributes(('symbol', symbol), parts[1:])
+        
+        # Definición del propio archivo visible desde el ámbito (de dentro afuera)
+        symbols = self._file_symbols(file_path)
+        prefix = scope
+        while True:
+            symbol = symbols.get(f"{prefix}.{head}" if prefix else head)
+            container = symbols.get(prefix)
+            if symbol is not None and (container is None or container.kind != 'class'):
+                return self._resolve_attributes(('symbol', symbol), parts[1:])
+            if not prefix:
+                break
+            prefix = prefix.rpartition('.')[0]
+        return None
+    
+    def _resolve_attributes(self, target, attributes):
+        """
+        Sigue los atributos de un módulo o de una clase (a.b.c).
+        
+        Returns:
+            tuple: ('module', ruta) o ('symbol', Symbol), o None
+        """
+        for attribute in attributes:
+            if target is None:
+                return None
+            kind, value = target
+            if kind == 'module':
+                # Solo los paquetes (__init__.py) tienen submódulos
+                if os.path.basename(value) == '__init__.py':
+                    submodule = self._resolve_module(value, attribute, 1)
+                else:
+                    submodule = None
+                if submodule is not None:
+                    target = ('module', submodule)
+                else:
+                    symbol = self._module_attribute(value, attribute)
+                    target = ('symbol', symbol) if symbol is not None else None
+            else:
+                target = self._class_member(value, attribute)
+                target = ('symbol', target) if target is not None else None
+        return target
+    
+    def _class_member(self, class_symbol, name, depth=0):
+        """
+        Busca un método de una clase o, si no lo define, de sus clases base del proyecto.
+        
+        Args:
+            class_symbol (Symbol): Clase
+            name (str): Nombre del método
+            depth (int): Clases base recorridas hasta ahora
+        
+        Returns:
+            Symbol: Método encontrado o None
+        """
+        if class_symbol.kind != 'class':
+            return None
+        member = self._file_symbols(class_symbol.file_path).get(f"{class_symbol.qualname}.{name}")
+        if member is not None or depth >= self.MAX_BASE_DEPTH:
+            return member
+        
+        info = self._get_file(class_symbol.file_path)
+        if info is None:
+            return None
+        scope = class_symbol.qualname.rpartition('.')[0]
+        for base in info.bases.get(class_symbol.qualname, []):
+            resolved = self._resolve_dotted(class_symbol.file_path, info, scope, base)
+            if resolved is not None and resolved[0] == 'symbol' and resolved[1] is not class_symbol:
+                member = self._class_member(resolved[1], name, depth + 1)
+                if member is not None:
+                    return member
+        return None
+    
+    def _unique(self, name, kinds):
+        """Devuelve la única definición del proyecto con un nombre y tipo, si no hay otra."""
+        candidates = [symbol for symbol in self._symbols_named(name) if symbol.kind in kinds]
+        if len(candidates) == 1:
+            return candidates[0]
+        return None
+    
+    def resolve(self, file_path, scope, callee):
+        """
+        Resuelve un nombre llamado a su definición en el proyecto.
+        
+        Args:
+            file_path (str): Archivo donde está la llamada
+            scope (str): Nombre cualificado de la definición que contiene la
+                llamada ('' en el nivel del módulo)
+            callee (tuple): (base con puntos o None, nombre), como en _FileCalls
+        
+        Returns:
+            Symbol: Definición llamada o None si no es del proyecto
+        """
+        with self._lock:
+            self._check_symbols()
+            key = (file_path, scope, callee)
+            cached = self._resolved.get(key)
+            if cached is not None and all(_file_state(path) == state for path, state in cached[1].items()):
+                return cached[0]
+            
+            # Registrar los archivos leídos: si cambia cualquiera de ellos (p. ej.
+            # el módulo importado donde estaba la definición), se vuelve a resolver
+            self._reads = {}
+            try:
+                symbol = None
+                info = self._get_file(file_path)
+                if info is not None:
+                    symbol = self._resolve_uncached(file_path, info, scope, callee)
+                symbol = self._callable_symbol(symbol)
+            finally:
+                states, self._reads = self._reads, None
+            self._resolved[key] = (symbol, states)
+            return symbol
+    
+    def _resolve_uncached(self, file_path, info, scope, callee):
+        base, name = callee
+        if base is None:
+            resolved = self._resolve_dotted(file_path, info, scope, name)
+            if resolved is not None:
+                return resolved[1] if resolved[0] == 'symbol' else None
+            if name in info.imports:
+                # Importado de fuera del proyecto
+                return None
+            # Única función o clase de nivel superior con ese nombre
+            symbol = self._unique(name, ('function', 'class'))
+            return symbol if symbol is not None and symbol.qualname == name else None
+        
+        if base in ('self', 'cls'):
+            # Clase más interna que contiene la llamada
+            symbols = self._file_symbols(file_path)
+            prefix = scope
+            while prefix:
+                container = symbols.get(prefix)
+                if container is not None and container.kind == 'class':
+                    return self._class_member(container, name)
+                prefix = prefix.rpartition('.')[0]
+            return None
+        
+        if base:
+            resolved = self._resolve_dotted(file_path, info, scope, base)
+            if resolved is not None:
+                target = self._resolve_attributes(resolved, [name])
+                return target[1] if target is not None and target[0] == 'symbol' else None
+            if base.split('.')[0] in info.imports:
+                # Módulo u objeto de fuera del proyecto
+                return None
+        
+        if name.startswith('__') and name.endswith('__'):
+            return None
+        
+        # Método de un objeto cuyo tipo se conoce por una anotación o por la
+        # llamada que lo creó
+        class_symbol = self._hinted_class(file_path, info, scope, base)
+        if class_symbol is not None:
+            return self._class_member(class_symbol, name)
+        
+        # Tipo desconocido: solo un método inequívoco de una clase cuyo
+        # nombre coincide con el del objeto
+        if name in BUILTIN_METHOD_NAMES:
+            return None
+        receiver = base.rpartition('.')[2].replace('_', '').lower()
+        if len(receiver) < MIN_RECEIVER_LENGTH:
+            return None
+        candidates = []
+        for symbol in self._symbols_named(name):
+            class_name = symbol.qualname.rpartition('.')[0].rpartition('.')[2].lower()
+            if symbol.kind == 'method' and (class_name.endswith(receiver) or receiver.endswith(class_name)):
+                candidates.append(symbol)
+        return candidates[0] if len(candidates) == 1 else None
+    
+    def _hinted_class(self, file_path, info, scope, base):
+        """
+        Busca la clase del proyecto de una variable o de un atributo de self.
+        
+        Args:
+            file_path (str): Archivo donde está la llamada
+            info (_FileCalls): Análisis de ese archivo
+            scope (str): Nombre cualificado del ámbito de la llamada
+            base (str): Objeto llamado (variable o self.atributo)
+        
+        Returns:
+            Symbol: Clase del proyecto o None si no se conoce
+        """
+        symbols = self._file_symbols(file_path)
+        is_attribute = base.startswith('self.') and base.count('.') == 1
+        if '.' in base and not is_attribute:
+            return None
+        
+        prefix = scope
+        while True:
+            container = symbols.get(prefix)
+            is_class = container is not None and container.kind == 'class'
+            # Las variables no se ven desde los métodos; los atributos, solo en la clase
+            if is_class == is_attribute:
+                type_name = info.hints.get(prefix, {}).get(base)
+                if type_name is not None:
+                    resolved = self._resolve_dotted(file_path, info, prefix, type_name)
+                    if resolved is not None and resolved[0] == 'symbol' and resolved[1].kind == 'class':
+                        return resolved[1]
+                    return None
+                if is_attribute:
+                    return None
+            if not prefix:
+                return None
+            prefix = prefix.rpartition('.')[0]
+    
+    def _scope_at(self, file_path, line):
+        """Nombre cualificado de la definición más interna que contiene una línea."""
+        symbol = self.symbol_index.find_enclosing(file_path, line)
+        return symbol.qualname if symbol is not None else ""
+    
+    def callees(self, file_path, first_line, last_line):
+        """
+        Obtiene las definiciones llamadas directamente desde un rango de líneas.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            first_line (int): Primera línea (desde 1)
+            last_line (int): Última línea (incluida)
+        
+        Returns:
+            list: Símbolos llamados, sin repetir, en orden de aparición
+        """
+        with self._lock:
+            info = self._get_file(file_path)
+            if info is None:
+                return []
+            
+            result = []
+            seen = set()
+            scopes = {}
+            start = bisect.bisect_left(info.call_lines, first_line)
+            end = bisect.bisect_right(info.call_lines, last_line)
+            for line, callee in zip(info.call_lines[start:end], info.calls[start:end]):
+                if line not in scopes:
+                    scopes[line] = self._scope_at(file_path, line)
+                symbol = self.resolve(file_path, scopes[line], callee)
+                if symbol is not None and id(symbol) not in seen:
+                    seen.add(id(symbol))
+                    result.append(symbol)
+            return result
+    
+    def expand(self, file_path, first_line, last_line, max_depth=1, max_tokens=None, token_cost=None,
+               cancel_event=None):
+        """
+        Obtiene las definiciones llamadas desde un rango de líneas y, de forma
+        transitiva, las llamadas desde ellas.
+        
+        Se recorre por niveles (en anchura), de modo que con un presupuesto se
+        prefieren las llamadas más directas. Una definición que no cabe en el
+        presupuesto se omite junto con las que solo se alcanzan a través de ella.
+        Las definiciones que contienen el propio rango (p. ej. la función de
+        la selección, en llamadas recursivas) no se incluyen.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            first_line (int): Primera línea (desde 1)
+            last_line (int): Última línea (incluida)
+            max_depth (int, optional): Profundidad máxima (None = sin límite)
+            max_tokens (int, optional): Tokens máximos del conjunto de definiciones
+            token_cost (callable, optional): Función (Symbol) -> tokens de la definición
+            cancel_event (threading.Event, optional): Señal para interrumpir
+        
+        Returns:
+            list: Tuplas (Symbol, profundidad) en orden de descubrimiento
+        """
+        result = []
+        seen = set()
+        used_tokens = 0
+        frontier = [(file_path, first_line, last_line)]
+        depth = 0
+        
+        while frontier and (max_depth is None or depth < max_depth):
+            depth += 1
+            next_frontier = []
+            for path, first, last in frontier:
+                if cancel_event is not None and cancel_event.is_set():
+                    return result
+                for symbol in self.callees(path, first, last):
+                    key = (symbol.file_path, symbol.qualname)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    if (symbol.file_path == file_path and symbol.start_line <= first_line
+                            and symbol.end_line >= last_line):
+                        continue
+                    
+                    if max_tokens is not None and token_cost is not None:
+                        cost = token_cost(symbol)
+                        if used_tokens + cost > max_tokens:
+                            continue
+                        used_tokens += cost
+                    
+                    result.append((symbol, depth))
+                    next_frontier.append((symbol.file_path, symbol.start_line, symbol.end_line))
+            frontier = next_frontier
+        
+        return result
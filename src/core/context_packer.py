@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Empaquetado del contexto dentro de un presupuesto de tokens.
+
+Cada archivo del contexto puede incluirse con varias representaciones (completo,
+esquema, solo el inicio, excluido...) de distinto coste en tokens y distinto valor. Elegir
+una representación por archivo maximizando el valor total sin superar el
+presupuesto es un problema de mochila de elección múltiple; aquí se resuelve con
+el algoritmo voraz clásico sobre la envolvente convexa de cada archivo, que es
+O(n log n) y da resultados muy cercanos al óptimo.
+"""
+
+class ContextPacker:
+    """Elige la representación de cada archivo para ajustarse a un presupuesto."""
+    
+    # Fracción del valor de un archivo que conserva cada representación
+    FIDELITY = {
+        'full': 1.0,
+        'outline': 0.6,
+        'head': 0.35,
+        'excluded': 0.0
+    }
+    
+    # Peso de cada prioridad de usuario
+    PRIORITY_WEIGHTS = {
+        'alta': 4.0,
+        'normal': 1.0,
+        'baja': 0.25
+    }
+    
+    def build_item(self, key, options, priority='normal', recency=1.0, relevance=None):
+        """
+        Crea la descripción de un archivo para el empaquetado.
+        
+        Args:
+            key: Identificador del archivo (normalmente su ruta)
+            options (dict): {representación: tokens} disponibles
+            priority (str): Prioridad del usuario (clave de PRIORITY_WEIGHTS)
+            recency (float): Factor de recencia entre 0 y 1 (1 = añadido el último)
+            relevance (float, optional): Puntuación de relevancia entre 0 y 1
+        
+        Returns:
+            dict: Elemento con 'key', 'weight' y 'options' [(representación, tokens, valor)]
+        """
+        weight = self.PRIORITY_WEIGHTS.get(priority, 1.0) * (0.5 + 0.5 * recency)
+        if relevance is not None:
+            weight *= 0.5 + relevance
+        
+        item_options = [(mode, tokens, weight * self.FIDELITY.get(mode, 0.5))
+                        for mode, tokens in options.items()]
+        if 'excluded' not in options:
+            item_options.append(('excluded', 0, 0.0))
+        
+        return {'key': key, 'weight': weight, 'options': item_options}
+    
+    def _convex_hull(self, options):
+        """
+        Obtiene la envolvente convexa superior de las opciones de un elemento.
+        
+        Args:
+            options (list): Tuplas (representación, tokens, valor)
+        
+        Returns:
+            list: Opciones de la envolvente, de menor a mayor coste; el valor
+                marginal por token de cada paso es decreciente
+        """
+        # Por cada coste, quedarse con la opción de más valor
+        best_by_cost = {}
+        for option in options:
+            current = best_by_cost.get(option[1])
+            if current is None or option[2] > current[2]:
+                best_by_cost[option[1]] = option
+        
+        hull = []
+        for option in sorted(best_by_cost.values(), key=lambda o: o[1]):
+            # Descartar opciones dominadas (más caras y no más valiosas)
+            if hull and option[2] <= hull[-1][2]:
+                continue
+            
+            # Quitar puntos que quedan por debajo de la envolvente
+            while len(hull) >= 2:
+                (_, t1, v1), (_, t2, v2) = hull[-2], hull[-1]
+                if (v2 - v1) * (option[1] - t1) <= (option[2] - v1) * (t2 - t1):
+                    hull.pop()
+                else:
+                    break
+            hull.append(option)
+        return hull
+    
+    def _pack_greedy(self, items, budget):
+        """
+        Aplica el algoritmo voraz sobre las envolventes convexas.
+        
+        Args:
+            items (list): Elementos creados con build_item()
+            budget (int): Presupuesto de tokens
+        
+        Returns:
+            list: Opción (representación, tokens, valor) elegida para cada elemento
+        """
+        hulls = []
+        remaining = budget
+        levels = []
+        steps = []
+        
+        for index, item in enumerate(items):
+            hull = self._convex_hull(item['options'])
+            hulls.append(hull)
+            levels.append(0)
+            # La opción más barata se incluye siempre (normalmente "excluido", coste 0)
+            remaining -= hull[0][1]
+            
+            for step in range(1, len(hull)):
+                delta_tokens = hull[step][1] - hull[step - 1][1]
+                delta_value = hull[step][2] - hull[step - 1][2]
+                steps.append((delta_value / delta_tokens, index, step, delta_tokens))
+        
+        # Aplicar las mejoras de mayor valor por token primero; si una mejora no
+        # cabe, las siguientes del mismo elemento tampoco se aplican
+        steps.sort(key=lambda s: (-s[0], s[2]))
+        frozen = set()
+        for _, index, step, delta_tokens in steps:
+            if index in frozen or levels[index] != step - 1:
+                continue
+            if delta_tokens <= remaining:
+                levels[index] = step
+                remaining -= delta_tokens
+            else:
+                frozen.add(index)
+        
+        chosen = [hull[level] for hull, level in zip(hulls, levels)]
+        
+        # Aprovechar el presupuesto sobrante con opciones fuera de la envolvente
+        for index in sorted(frozen, key=lambda i: -items[i]['weight']):
+            current = chosen[index]
+            for option in items[index]['options']:
+                if option[2] > chosen[index][2] and option[1] - current[1] <= remaining:
+                    chosen[index] = option
+            remaining -= chosen[index][1] - current[1]
+        
+        return chosen
+    
+    def pack(self, items, budget):
+        """
+        Elige una representación por elemento sin superar el presupuesto.
+        
+        El algoritmo voraz puede quedarse lejos del óptimo cuando un único
+        elemento valioso no cabe tras los más eficientes; por eso también se
+        prueba a fijar primero la opción individual de más valor que cabe y se
+        devuelve la mejor de las dos soluciones.
+        
+        Args:
+            items (list): Elementos creados con build_item()
+            budget (int): Presupuesto de tokens
+        
+        Returns:
+            dict: {'plan': {clave: representación}, 'tokens': tokens usados,
+                'value': valor total}
+        """
+        chosen = self._pack_greedy(items, budget)
+        value = sum(option[2] for option in chosen)
+        
+        # Mejor opción individual que cabe en el presupuesto
+        best_index, best_option = None, None
+        for index, item in enumerate(items):
+            for option in item['options']:
+                if option[1] <= budget and (best_option is None or option[2] > best_option[2]):
+                    best_index, best_option = index, option
+        
+        if best_option is not None and chosen[best_index] != best_option:
+            rest = items[:best_index] + items[best_index + 1:]
+            alternative = self._pack_greedy(rest, budget - best_option[1])
+            alternative.insert(best_index, best_option)
+            alternative_value = sum(option[2] for option in alternative)
+            if alternative_value > value:
+                chosen, value = alternative, alternative_value
+        
+        plan = {item['key']: option[0] for item, option in zip(items, chosen)}
+        used = sum(option[1] for option in chosen)
+        return {'plan': plan, 'tokens': used, 'value': value}
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Eliminación de bloques de líneas repetidos en el contexto exportado.
+
+Las cabeceras de licencia, el código generado o las copias de dependencias
+aparecen una y otra vez cuando se incluyen muchos archivos. Este módulo busca
+bloques de líneas consecutivas que ya aparecieron antes en el contexto y los
+sustituye por una referencia breve a la primera aparición.
+
+Cada línea se reduce a un entero y se calcula un hash rodante (polinómico,
+módulo un primo de Mersenne) sobre ventanas de min_lines líneas. Cada ventana
+se busca en un diccionario de ventanas ya vistas y, si coincide, la
+coincidencia se comprueba y se extiende línea a línea. Todo el proceso es
+lineal en el tamaño total del contexto.
+"""
+
+# Módulo y base del hash rodante
+_MODULUS = (1 << 61) - 1
+_BASE = 1000003
+
+class BlockDeduplicator:
+    """Sustituye los bloques de líneas repetidos por referencias a su primera aparición."""
+    
+    def __init__(self, min_lines=6, min_chars=200):
+        """
+        Inicializa el deduplicador.
+        
+        Args:
+            min_lines (int): Mínimo de líneas de un bloque repetido
+            min_chars (int): Mínimo de caracteres no blancos de un bloque repetido
+        """
+        self.min_lines = max(1, min_lines)
+        self.min_chars = min_chars
+        self.reference_format = "[... {count} líneas idénticas a {label}, líneas {start}-{end} ...]"
+        # Si no se conoce la línea del archivo (texto minimizado o esquema), se
+        # cita la posición dentro del texto exportado
+        self.relative_reference_format = ("[... {count} líneas idénticas a {label}, "
+                                          "líneas {start}-{end} de su texto exportado ...]")
+    
+    def _line_keys(self, lines):
+        """
+        Obtiene el valor que representa a cada línea en el hash rodante.
+        
+        Args:
+            lines (list): Líneas del documento
+        
+        Returns:
+            tuple: (claves de cada línea, caracteres no blancos de cada línea)
+        """
+        keys = []
+        weights = []
+        for line in lines:
+            stripped = line.strip()
+            keys.append(hash(line.rstrip()) % _MODULUS)
+            weights.append(len(stripped))
+        return keys, weights
+    
+    def deduplicate(self, documents):
+        """
+        Elimina los bloques repetidos de una lista de documentos.
+        
+        Los documentos se procesan en orden; la primera aparición de cada
+        bloque se conserva y las siguientes se sustituyen por una referencia.
+        
+        Args:
+            documents (list): Tuplas (etiqueta, texto, primera línea) en el orden
+                de exportación; la primera línea (desde 1) sirve para citar el
+                bloque original con la numeración del archivo (None si las
+                líneas del texto no son las del archivo)
+        
+        Returns:
+            tuple: (textos resultantes, estadísticas {'blocks', 'lines', 'chars'})
+        """
+        window = self.min_lines
+        # Peso de la primera línea de la ventana al desplazarla: BASE^(window-1)
+        high_power = pow(_BASE, window - 1, _MODULUS)
+        
+        all_lines = []
+        all_keys = []
+        all_weights = []
+        replaced = []
+        for _, text, _ in documents:
+            lines = text.split('\n')
+            keys, weights = self._line_keys(lines)
+            all_lines.append(lines)
+            all_keys.append(keys)
+            all_weights.append(weights)
+            replaced.append([False] * len(lines))
+        
+        # Primera aparición de cada ventana {hash: (documento, línea)}
+        seen = {}
+        results = []
+        stats = {'blocks': 0, 'lines': 0, 'chars': 0}
+        
+        for doc_index, (label, text, first_line) in enumerate(documents):
+            lines = all_lines[doc_index]
+            keys = all_keys[doc_index]
+            weights = all_weights[doc_index]
+            count = len(lines)
+            # Bloques sustituidos en este documento [(inicio, longitud, referencia)]
+            blocks = []
+            
+            index = 0
+            window_hash = None
+            # Tras una coincidencia demasiado pequeña no se vuelve a comprobar
+            # dentro de ella (sus sufijos tampoco llegan al mínimo); así el
+            # coste sigue siendo lineal con muchas líneas cortas repetidas
+            check_from = 0
+            while index + window <= count:
+                if window_hash is None:
+                    window_hash = 0
+                    for key in keys[index:index + window]:
+                        window_hash = (window_hash * _BASE + key) % _MODULUS
+                
+                match = None
+                if index >= check_from:
+                    match = self._match(seen.get(window_hash), doc_index, index, all_lines, replaced)
+                if match is not None:
+                    source_doc, source_line, length = match
+                    if sum(weights[index:index + length]) < self.min_chars:
+                        check_from = index + length - window + 1
+                    else:
+                        blocks.append((index, length, source_doc, source_line))
+                        for offset in range(length):
+                            replaced[doc_index][index + offset] = True
+                        stats['blocks'] += 1
+                        stats['lines'] += length
+                        stats['chars'] += sum(len(line) + 1 for line in lines[index:index + length])
+                        
+                        # Continuar tras el bloque sustituido con una ventana nueva
+                        index += length
+                        window_hash = None
+                        continue
+                
+                if window_hash not in seen:
+                    seen[window_hash] = (doc_index, index)
+                
+                # Desplazar la ventana una línea
+                if index + window < count:
+                    window_hash = ((window_hash - keys[index] * high_power) * _BASE + keys[index + window]) % _MODULUS
+                index += 1
+            
+            results.append(self._render(lines, blocks, documents))
+        
+        return results, stats
+    
+    def _match(self, candidate, doc_index, index, all_lines, replaced):
+        """
+        Comprueba una ventana candidata y extiende la coincidencia.
+        
+        Args:
+            candidate (tuple): (documento, línea) de la ventana ya vista o None
+            doc_index (int): Documento actual
+            index (int): Línea actual
+            all_lines (list): Líneas de todos los documentos
+            replaced (list): Líneas ya sustituidas de cada documento
+        
+        Returns:
+            tuple: (documento, línea, longitud) de la coincidencia o None
+        """
+        if candidate is None:
+            return None
+        source_doc, source_line = candidate
+        source = all_lines[source_doc]
+        source_replaced = replaced[source_doc]
+        lines = all_lines[doc_index]
+        
+        # En el mismo documento, el original debe terminar antes del bloque actual
+        limit = len(source) - source_line
+        if source_doc == doc_index:
+            limit = min(limit, index - source_line)
+        limit = min(limit, len(lines) - index)
+        
+        length = 0
+        while (length < limit and not source_replaced[source_line + length]
+               and source[source_line + length].rstrip() == lines[index + length].rstrip()):
+            length += 1
+        
+        if length < self.min_lines:
+            return None
+        return source_doc, source_line, length
+    
+    def _render(self, lines, blocks, documents):
+        """
+        Construye el texto de un documento con los bloques sustituidos.
+        
+        Args:
+            lines (list): Líneas del documento
+            blocks (list): Bloques (inicio, longitud, documento original, línea original)
+            documents (list): Documentos de entrada (para las etiquetas)
+        
+        Returns:
+            str: Texto resultante
+        """
+        if not blocks:
+            return '\n'.join(lines)
+        
+        output = []
+        position = 0
+        for start, length, source_doc, source_line in blocks:
+            output.extend(lines[position:start])
+            label, _, first_line = documents[source_doc]
+            if first_line is None:
+                reference_format = self.relative_reference_format
+                first = 1 + source_line
+            else:
+                reference_format = self.reference_format
+                first = first_line + source_line
+            indent = lines[start][:len(lines[start]) - len(lines[start].lstrip())]
+            output.append(indent + reference_format.format(
+                count=length, label=label, start=first, end=first + length - 1))
+            position = start + length
+        output.extend(lines[position:])
+        return '\n'.join(output)
@@ -136,6 +136,32 @@ class FileManager:
         
         return result
     
+    def iter_code_files(self, directory):
+        """
+        Recorre un directorio y genera las rutas de los archivos de código.
+        
+        Aplica los mismos filtros que scan_directory() (carpetas ignoradas y
+        extensiones de código), pero sin construir el árbol, de modo que sirve
+        para procesar proyectos grandes a medida que se recorren.
+        
+        Args:
+            directory (str): Ruta del directorio a recorrer
+        
+        Yields:
+            str: Ruta de cada archivo de código
+        """
+        directory = os.path.normpath(directory)
+        
+        for root, dirs, files in os.walk(directory):
+            # Podar las carpetas ignoradas y mantener el orden alfabético
+            dirs[:] = sorted(d for d in dirs if d not in self.ignore_files)
+            
+            for entry in sorted(files):
+                if entry in self.ignore_files:
+                    continue
+                if os.path.splitext(entry)[1].lower() in self.code_extensions:
+                    yield os.path.join(root, entry)
+    
     def is_text_file(self, file_path):
         """
         Determina si un archivo es un archivo de texto que puede ser mostrado.
@@ -179,6 +205,36 @@ class FileManager:
         except Exception as e:
             return f"Error al leer archivo: {str(e)}"
 
+    def get_file_hash(self, file_path):
+        """
+        Obtiene el resumen BLAKE2b del contenido de un archivo.
+        
+        Usa el servicio de resúmenes compartido, que no vuelve a leer los
+        archivos que no han cambiado.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            
+        Returns:
+            str: Resumen en hexadecimal o None si no se pudo leer
+        """
+        from src.core.hashing import get_content_hasher
+        return get_content_hasher().get_digest(file_path)
+    
+    def get_file_hashes(self, file_paths, cancel_event=None):
+        """
+        Obtiene los resúmenes de varios archivos (en paralelo si son muchos).
+        
+        Args:
+            file_paths: Iterable de rutas de archivo
+            cancel_event (threading.Event, optional): Evento para cancelar
+            
+        Returns:
+            dict: {ruta: resumen o None si no se pudo leer}
+        """
+        from src.core.hashing import get_content_hasher
+        return get_content_hasher().hash_files(file_paths, cancel_event)
+
     def get_file_type(self, file_path):
         """
         Determina el tipo/lenguaje de un archivo basado en su extensión.
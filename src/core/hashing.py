@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servicio de resúmenes (hashes) del contenido de los archivos del proyecto.
+
+Calcula resúmenes BLAKE2b de los archivos leyéndolos por bloques, de modo que
+los archivos grandes no se cargan enteros en memoria. Cuando hay muchos
+archivos pendientes el trabajo se reparte entre varios procesos (el cálculo
+del resumen es intensivo en CPU y los hilos no lo paralelizan en CPython);
+con pocos archivos se calculan en el propio proceso, porque arrancar los
+procesos costaría más que el cálculo.
+
+Los resúmenes se guardan en la carpeta de caché del usuario junto al estado
+del archivo (fecha de modificación y tamaño): mientras el archivo no cambie,
+su resumen se devuelve sin volver a leerlo.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.utils.file_utils import CACHE_DIR, ensure_directory_exists
+
+# Tamaño de los bloques de lectura (bytes)
+CHUNK_SIZE = 1024 * 1024
+# Tamaño del resumen (bytes)
+DIGEST_SIZE = 16
+
+def hash_file(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Calcula el resumen BLAKE2b de un archivo leyéndolo por bloques.
+    
+    Args:
+        file_path (str): Ruta del archivo
+        chunk_size (int): Tamaño de los bloques de lectura
+    
+    Returns:
+        str: Resumen en hexadecimal o None si no se pudo leer
+    """
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    try:
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+def _hash_batch(file_paths):
+    """
+    Calcula los resúmenes de un lote de archivos (se ejecuta en un proceso de trabajo).
+    
+    Args:
+        file_paths (list): Rutas de archivo
+    
+    Returns:
+        list: Resúmenes en el mismo orden (None si no se pudo leer)
+    """
+    return [hash_file(file_path) for file_path in file_paths]
+
+def _file_state(file_path):
+    """
+    Obtiene el estado (mtime_ns, tamaño) de un archivo.
+    
+    Returns:
+        tuple: (mtime_ns, tamaño) o None si no existe
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+class ContentHasher:
+    """Calcula y guarda en caché los resúmenes del contenido de los archivos."""
+    
+    # Versión del formato del archivo de caché
+    FORMAT_VERSION = 1
+    
+    # Por debajo de estos umbrales no compensa repartir el trabajo entre procesos
+    MIN_PARALLEL_FILES = 32
+    MIN_PARALLEL_BYTES = 16 * 1024 * 1024
+    
+    # Bytes aproximados de cada lote enviado a un proceso de trabajo
+    BATCH_BYTES = 8 * 1024 * 1024
+    BATCH_FILES = 256
+    
+    # Máximo de resúmenes guardados (se descartan los más antiguos)
+    MAX_ENTRIES = 200000
+    
+    def __init__(self, cache_file=None, max_workers=None):
+        """
+        Inicializa el servicio.
+        
+        Args:
+            cache_file (str, optional): Ruta del archivo de caché (por defecto,
+                "hashes.json" en la carpeta de caché del usuario)
+            max_workers (int, optional): Número de procesos de trabajo
+        """
+        self.cache_file = cache_file or os.path.join(CACHE_DIR, "hashes.json")
+        self.max_workers = max_workers or max(1, min(8, os.cpu_count() or 1))
+        # Resúmenes conocidos {ruta: (mtime_ns, tamaño, resumen)}
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+    
+    def load(self):
+        """
+        Carga los resúmenes guardados.
+        
+        Returns:
+            bool: True si se cargó una caché válida
+        """
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == self.FORMAT_VERSION:
+                    with self._lock:
+                        self.entries = {path: tuple(entry) for path, entry in data.get('files', {}).items()}
+                    return True
+        except Exception as e:
+            print(f"Error al cargar la caché de resúmenes: {str(e)}")
+        return False
+    
+    def save(self):
+        """
+        Guarda los resúmenes en la caché si hay cambios.
+        
+        Returns:
+            bool: True si se guardó correctamente (o no había cambios)
+        """
+        with self._lock:
+            if not self._dirty:
+                return True
+            # Descartar los más antiguos (el diccionario conserva el orden de inserción)
+            excess = len(self.entries) - self.MAX_ENTRIES
+            if excess > 0:
+                for path in list(self.entries)[:excess]:
+                    del self.entries[path]
+            data = {
+                'version': self.FORMAT_VERSION,
+                'files': {path: list(entry) for path, entry in self.entries.items()}
+            }
+            self._dirty = False
+        
+        try:
+            ensure_directory_exists(os.path.dirname(self.cache_file))
+            # Escribir en un archivo temporal (uno por hilo) y reemplazar, para
+            # no dejar la caché a medias si se interrumpe
+            temp_file = f"{self.cache_file}.{threading.get_ident()}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_file, self.cache_file)
+            return True
+        except Exception as e:
+            print(f"Error al guardar la caché de resúmenes: {str(e)}")
+            return False
+    
+    def _lookup(self, file_path, state):
+        """
+        Busca el resumen guardado de un archivo.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            state (tuple): Estado actual (mtime_ns, tamaño)
+        
+        Returns:
+            str: Resumen guardado si el archivo no ha cambiado, o None
+        """
+        entry = self.entries.get(file_path)
+        if entry is not None and (entry[0], entry[1]) == state:
+            return entry[2]
+        return None
+    
+    def _store(self, file_path, state, digest):
+        """
+        Guarda el resumen de un archivo con el estado que tenía antes de leerlo.
+        
+        Si el archivo cambia mientras se lee, su nuevo estado no coincidirá con
+        el guardado y el resumen se volverá a calcular la próxima vez.
+        """
+        with self._lock:
+            self.entries.pop(file_path, None)
+            self.entries[file_path] = (state[0], state[1], digest)
+            self._dirty = True
+    
+    def get_digest(self, file_path):
+        """
+        Obtiene el resumen del contenido de un archivo.
+        
+        Args:
+            file_path (str): Ruta del archivo
+        
+        Returns:
+            str: Resumen en hexadecimal o None si no se pudo leer
+        """
+        state = _file_state(file_path)
+        if state is None:
+            return None
+        digest = self._lookup(file_path, state)
+        if digest is None:
+            digest = hash_file(file_path)
+            if digest is not None:
+                self._store(file_path, state, digest)
+        return digest
+    
+    def hash_files(self, file_paths, cancel_event=None, parallel=True):
+        """
+        Obtiene los resúmenes de varios archivos.
+        
+        Los archivos sin cambios se resuelven con la caché; el resto se calcula
+        en varios procesos si son suficientes para compensar su arranque. Los
+        resúmenes nuevos se guardan al terminar.
+        
+        Args:
+            file_paths: Iterable de rutas de archivo
+            cancel_event (threading.Event, optional): Evento para cancelar
+            parallel (bool): Permitir repartir el cálculo entre procesos
+        
+        Returns:
+            dict: {ruta: resumen o None si no se pudo leer}; si se cancela,
+                solo contiene los archivos ya resueltos
+        """
+        result = {}
+        # Archivos pendientes [(ruta, estado)]
+        pending = []
+        pending_bytes = 0
+        for file_path in file_paths:
+            state = _file_state(file_path)
+            if state is None:
+                result[file_path] = None
+                continue
+            digest = self._lookup(file_path, state)
+            if digest is not None:
+                result[file_path] = digest
+            else:
+                pending.append((file_path, state))
+                pending_bytes += state[1]
+        
+        if pending:
+            if (parallel and self.max_workers > 1 and len(pending) >= self.MIN_PARALLEL_FILES
+                    and pending_bytes >= self.MIN_PARALLEL_BYTES):
+                remaining = self._hash_parallel(pending, result, cancel_event)
+            else:
+                remaining = pending
+            # Cálculo en el propio proceso (pocos archivos o procesos no disponibles)
+            for file_path, state in remaining:
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                self._finish(file_path, state, hash_file(file_path), result)
+            self.save()
+        
+        return result
+    
+    def _finish(self, file_path, state, digest, result):
+        result[file_path] = digest
+        if digest is not None:
+            self._store(file_path, state, digest)
+    
+    def _batches(self, pending):
+        """
+        Agrupa los archivos pendientes en lotes de tamaño parecido.
+        
+        Args:
+            pending (list): Archivos pendientes [(ruta, estado)]
+        
+        Yields:
+            list: Lotes de archivos pendientes
+        """
+        batch = []
+        batch_bytes = 0
+        for item in pending:
+            batch.append(item)
+            batch_bytes += item[1][1]
+            if batch_bytes >= self.BATCH_BYTES or len(batch) >= self.BATCH_FILES:
+                yield batch
+                batch = []
+                batch_bytes = 0
+        if batch:
+            yield batch
+    
+    def _hash_parallel(self, pending, result, cancel_event):
+        """
+        Calcula los resúmenes repartiendo lotes de archivos entre varios procesos.
+        
+        Args:
+            pending (list): Archivos pendientes [(ruta, estado)]
+            result (dict): Resúmenes obtenidos (se amplía)
+            cancel_event (threading.Event): Evento para cancelar o None
+        
+        Returns:
+            list: Archivos que no se pudieron calcular en los procesos (p. ej. si
+                el sistema no permite crearlos), para calcularlos en este proceso
+        """
+        remaining = {}
+        try:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {}
+                for batch in self._batches(pending):
+                    future = executor.submit(_hash_batch, [file_path for file_path, _ in batch])
+                    futures[future] = batch
+                    for file_path, state in batch:
+                        remaining[file_path] = state
+                
+                for future in as_completed(futures):
+                    if cancel_event is not None and cancel_event.is_set():
+                        for other in futures:
+                            other.cancel()
+                        return []
+                    batch = futures[future]
+                    for (file_path, state), digest in zip(batch, future.result()):
+                        self._finish(file_path, state, digest, result)
+                        del remaining[file_path]
+        except Exception as e:
+            print(f"Error al calcular resúmenes en paralelo: {str(e)}")
+        return list(remaining.items())
+
+# Servicio compartido por toda la aplicación (se crea al usarlo por primera vez)
+_shared_hasher = None
+_shared_lock = threading.Lock()
+
+def get_content_hasher():
+    """
+    Obtiene el servicio de resúmenes compartido, con la caché ya cargada.
+    
+    Returns:
+        ContentHasher: Servicio compartido
+    """
+    global _shared_hasher
+    with _shared_lock:
+        if _shared_hasher is None:
+            _shared_hasher = ContentHasher()
+            _shared_hasher.load()
+        return _shared_hasher
@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Grafo de importaciones entre los archivos del proyecto.
+
+Las importaciones de Python se obtienen analizando con ast cada sentencia
+import (un ejemplo de código dentro de un docstring puede dar algún falso
+positivo, a cambio de no analizar el archivo entero) y las de
+JavaScript/TypeScript (import, export ... from, require(), import()) con
+expresiones regulares. Solo se resuelven las que apuntan a archivos dentro de
+la carpeta del proyecto; las de la biblioteca estándar o de paquetes instalados
+se ignoran.
+
+Las dependencias de cada archivo se guardan junto a su (mtime, tamaño) y se
+persisten en la carpeta de caché, de modo que expandir las dependencias de un
+archivo ya analizado no vuelve a leerlo. Los archivos nuevos de cada nivel se
+analizan en paralelo.
+"""
+
+import os
+import re
+import ast
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.file_utils import get_project_cache_file
+
+# Extensiones analizadas con cada método
+PYTHON_EXTENSIONS = {'.py'}
+JS_EXTENSIONS = {'.js', '.jsx', '.ts', '.tsx', '.mjs', '.cjs', '.vue'}
+
+# Extensiones que se prueban al resolver una importación JS/TS sin extensión
+JS_RESOLVE_EXTENSIONS = ['.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs', '.vue', '.json']
+
+_JS_IMPORT_RE = re.compile(
+    r'''(?:\bimport\s+(?:type\s+)?(?:[\w$*{}\s,]+?\s+from\s+)?'''
+    r'''|\bexport\s+(?:type\s+)?[\w$*{}\s,]+?\s+from\s+'''
+    r'''|\brequire\s*\(\s*'''
+    r'''|\bimport\s*\(\s*)'''
+    r'''['"]([^'"\n]+)['"]'''
+)
+
+_PY_IMPORT_LINE_RE = re.compile(r'^[ \t]*(?:from[ \t]+\.*[\w.]*[ \t]+import\b|import[ \t]+\w)', re.MULTILINE)
+
+def _python_import_statements(source):
+    """
+    Extrae el texto de las sentencias import de un archivo Python.
+    
+    Solo se localizan las líneas que empiezan por import/from (con su
+    continuación entre paréntesis o con barra invertida), lo que evita
+    analizar el archivo completo.
+    
+    Args:
+        source (str): Código fuente
+    
+    Yields:
+        str: Cada sentencia, sin la indentación
+    """
+    for match in _PY_IMPORT_LINE_RE.finditer(source):
+        start = match.start()
+        end = source.find('\n', start)
+        if end == -1:
+            end = len(source)
+        
+        # Importaciones entre paréntesis que ocupan varias líneas
+        parenthesis = source.find('(', start, end)
+        if parenthesis != -1 and source.find(')', parenthesis, end) == -1:
+            closing = source.find(')', parenthesis)
+            if closing != -1:
+                end = source.find('\n', closing)
+                if end == -1:
+                    end = len(source)
+        
+        # Continuaciones con barra invertida
+        while source[start:end].rstrip().endswith('\\') and end < len(source):
+            next_end = source.find('\n', end + 1)
+            end = len(source) if next_end == -1 else next_end
+        
+        yield source[start:end].strip()
+
+def parse_python_imports(source):
+    """
+    Obtiene las importaciones de un archivo Python.
+    
+    Cada sentencia import se analiza con ast por separado; así el coste no
+    depende del tamaño del archivo sino del número de importaciones.
+    
+    Args:
+        source (str): Código fuente
+    
+    Returns:
+        list: Tuplas (módulo, nivel, nombres importados); el nivel es 0 para
+            importaciones absolutas y el número de puntos en las relativas
+    """
+    imports = []
+    for statement in _python_import_statements(source):
+        try:
+            tree = ast.parse(statement)
+        except (SyntaxError, ValueError):
+            # Sentencias seguidas de otro código en la misma línea
+            try:
+                tree = ast.parse(statement.split(';')[0])
+            except (SyntaxError, ValueError):
+                continue
+        
+        for node in tree.body:
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    imports.append((alias.name, 0, []))
+            elif isinstance(node, ast.ImportFrom):
+                names = [alias.name for alias in node.names if alias.name != '*']
+                imports.append((node.module or "", node.level or 0, names))
+    return imports
+
+def parse_js_imports(source):
+    """
+    Obtiene los módulos importados por un archivo JavaScript/TypeScript.
+    
+    Args:
+        source (str): Código fuente
+    
+    Returns:
+        list: Especificadores de módulo ('./utils', 'react'...)
+    """
+    return _JS_IMPORT_RE.findall(source)
+
+class ImportGraph:
+    """Dependencias locales de los archivos de un proyecto."""
+    
+    # Versión del formato del archivo de caché
+    FORMAT_VERSION = 1
+    
+    # Tamaño máximo de archivo que se analiza (bytes)
+    MAX_FILE_SIZE = 4 * 1024 * 1024
+    
+    def __init__(self, root, cache_file=None, max_workers=None):
+        """
+        Inicializa el grafo de un proyecto.
+        
+        Args:
+            root (str): Carpeta raíz del proyecto
+            cache_file (str, optional): Ruta del archivo de caché (por defecto,
+                uno propio del proyecto en la carpeta de caché)
+            max_workers (int, optional): Hilos para analizar archivos en paralelo
+        """
+        self.root = os.path.normpath(root)
+        self.cache_file = cache_file or get_project_cache_file(self.root, "imports.json")
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 2) + 2)
+        # Dependencias por archivo {ruta: ((mtime_ns, tamaño), [rutas])}
+        self.files = {}
+        self._dirty = False
+    
+    def load(self):
+        """
+        Carga la caché guardada.
+        
+        Returns:
+            bool: True si se cargó una caché válida
+        """
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == self.FORMAT_VERSION and data.get('root') == self.root:
+                    self.files = {path: ((mtime_ns, size), dependencies)
+                                  for path, (mtime_ns, size, dependencies) in data.get('files', {}).items()}
+                    return True
+        except Exception as e:
+            print(f"Error al cargar el grafo de importaciones: {str(e)}")
+        return False
+    
+    def save(self):
+        """
+        Guarda la caché si ha cambiado.
+        
+        Returns:
+            bool: True si se guardó (o no había cambios)
+        """
+        if not self._dirty:
+            return True
+        try:
+            data = {
+                'version': self.FORMAT_VERSION,
+                'root': self.root,
+                'files': {path: [state[0], state[1], dependencies]
+                          for path, (state, dependencies) in self.files.items()}
+            }
+            temp_file = f"{self.cache_file}.{threading.get_ident()}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_file, self.cache_file)
+            self._dirty = False
+            return True
+        except Exception as e:
+            print(f"Error al guardar el grafo de importaciones: {str(e)}")
+            return False
+    
+    def _in_project(self, path):
+        """Indica si una ruta está dentro de la carpeta del proyecto."""
+        try:
+            return os.path.commonpath([self.root, path]) == self.root
+        except ValueError:
+            return False
+    
+    def _python_search_roots(self, file_path):
+        """
+        Obtiene las carpetas desde las que se resuelven las importaciones absolutas.
+        
+        Son la carpeta que contiene el paquete de nivel superior del archivo
+        (sube mientras haya __init__.py; cubre la estructura src/), la raíz
+        del proyecto y la carpeta del propio archivo.
+        
+        Args:
+            file_path (str): Ruta del archivo que importa
+        
+        Returns:
+            list: Carpetas en orden de prioridad
+        """
+        directory = os.path.dirname(file_path)
+        package_root = directory
+        while os.path.isfile(os.path.join(package_root, '__init__.py')) and self._in_project(os.path.dirname(package_root)):
+            package_root = os.path.dirname(package_root)
+        
+        roots = []
+        for candidate in (package_root, self.root, directory):
+            if candidate not in roots:
+                roots.append(candidate)
+        return roots
+    
+    def _resolve_python_module(self, base_dir, module):
+        """
+        Busca el archivo de un módulo a partir de una carpeta.
+        
+        Args:
+            base_dir (str): Carpeta desde la que se resuelve
+            module (str): Nombre del módulo con puntos ('' para la propia carpeta)
+        
+        Returns:
+            str: Ruta del archivo (.py o __init__.py), o None
+        """
+        path = os.path.join(base_dir, *module.split('.')) if module else base_dir
+        if module and os.path.isfile(path + '.py'):
+            return path + '.py'
+        init_file = os.path.join(path, '__init__.py')
+        if os.path.isfile(init_file):
+            return init_file
+        return None
+    
+    def resolve_python_module(self, file_path, module, level=0):
+        """
+        Busca el archivo del proyecto de un módulo importado desde un archivo Python.
+        
+        Args:
+            file_path (str): Ruta del archivo que importa
+            module (str): Nombre del módulo con puntos
+            level (int): Número de puntos de una importación relativa (0 si es absoluta)
+        
+        Returns:
+            str: Ruta del archivo (.py o __init__.py), o None si no es del proyecto
+        """
+        if level:
+            base_dir = os.path.dirname(file_path)
+            for _ in range(level - 1):
+                base_dir = os.path.dirname(base_dir)
+            base_dirs = [base_dir]
+        else:
+            base_dirs = self._python_search_roots(file_path)
+        
+        for base_dir in base_dirs:
+            target = self._resolve_python_module(base_dir, module)
+            if target and self._in_project(target):
+                return target
+        return None
+    
+    def _resolve_python(self, file_path, imports):
+        """
+        Resuelve las importaciones de un archivo Python a archivos del proyecto.
+        
+        Args:
+            file_path (str): Ruta del archivo que importa
+            imports (list): Resultado de parse_python_imports()
+        
+        Returns:
+            list: Rutas de los archivos importados
+        """
+        resolved = []
+        search_roots = None
+        for module, level, names in imports:
+            if level:
+                # Importación relativa: cada punto adicional sube una carpeta
+                base_dirs = [os.path.dirname(file_path)]
+                for _ in range(level - 1):
+                    base_dirs[0] = os.path.dirname(base_dirs[0])
+            else:
+                if search_roots is None:
+                    search_roots = self._python_search_roots(file_path)
+                base_dirs = search_roots
+            
+            for base_dir in base_dirs:
+                target = self._resolve_python_module(base_dir, module)
+                # "from paquete import modulo": los nombres pueden ser submódulos
+                submodules = [self._resolve_python_module(base_dir, f"{module}.{name}" if module else name)
+                              for name in names]
+                submodules = [path for path in submodules if path]
+                
+                if submodules:
+                    resolved.extend(submodules)
+                    # El __init__ del paquete solo cuenta si aporta otros nombres
+                    if target and len(submodules) < len(names):
+                        resolved.append(target)
+                    break
+                if target:
+                    resolved.append(target)
+                    break
+        return resolved
+    
+    def _resolve_js(self, file_path, specifiers):
+        """
+        Resuelve las importaciones relativas de un archivo JS/TS a archivos del proyecto.
+        
+        Args:
+            file_path (str): Ruta del archivo que importa
+            specifiers (list): Resultado de parse_js_imports()
+        
+        Returns:
+            list: Rutas de los archivos importados
+        """
+        resolved = []
+        directory = os.path.dirname(file_path)
+        for specifier in specifiers:
+            if specifier.startswith('.'):
+                base = os.path.normpath(os.path.join(directory, specifier))
+            elif specifier.startswith('/'):
+                base = os.path.normpath(os.path.join(self.root, specifier.lstrip('/')))
+            else:
+                # Paquetes de node_modules u otros módulos externos
+                continue
+            
+            candidates = [base] + [base + ext for ext in JS_RESOLVE_EXTENSIONS]
+            candidates += [os.path.join(base, 'index' + ext) for ext in JS_RESOLVE_EXTENSIONS]
+            for candidate in candidates:
+                if os.path.isfile(candidate):
+                    resolved.append(candidate)
+                    break
+        return resolved
+    
+    def _analyze(self, file_path):
+        """
+        Lee un archivo y obtiene sus dependencias (se ejecuta en los hilos de trabajo).
+        
+        Args:
+            file_path (str): Ruta del archivo
+        
+        Returns:
+            tuple: ((mtime_ns, tamaño), [rutas]) o None si no se puede leer
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        state = (stat.st_mtime_ns, stat.st_size)
+        
+        extension = os.path.splitext(file_path)[1].lower()
+        if stat.st_size > self.MAX_FILE_SIZE or extension not in PYTHON_EXTENSIONS | JS_EXTENSIONS:
+            return state, []
+        
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                source = f.read()
+        except OSError:
+            return None
+        
+        if extension in PYTHON_EXTENSIONS:
+            dependencies = self._resolve_python(file_path, parse_python_imports(source))
+        else:
+            dependencies = self._resolve_js(file_path, parse_js_imports(source))
+        
+        # Quitar duplicados, el propio archivo y lo que queda fuera del proyecto
+        unique = []
+        for dependency in dependencies:
+            dependency = os.path.normpath(dependency)
+            if dependency != file_path and dependency not in unique and self._in_project(dependency):
+                unique.append(dependency)
+        return state, unique
+    
+    def _is_current(self, file_path):
+        """Indica si las dependencias en caché de un archivo siguen siendo válidas."""
+        cached = self.files.get(file_path)
+        if cached is None:
+            return False
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        return cached[0] == (stat.st_mtime_ns, stat.st_size)
+    
+    def get_dependencies_many(self, file_paths):
+        """
+        Obtiene las dependencias de varios archivos, analizando en paralelo los que no están en caché.
+        
+        Args:
+            file_paths (list): Rutas de los archivos
+        
+        Returns:
+            dict: {ruta: [rutas de las dependencias]}
+        """
+        pending = [path for path in file_paths if not self._is_current(path)]
+        if len(pending) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(self._analyze, pending))
+        else:
+            results = [self._analyze(path) for path in pending]
+        
+        for path, result in zip(pending, results):
+            if result is not None:
+                self.files[path] = result
+                self._dirty = True
+        
+        return {path: list(self.files[path][1]) if path in self.files else [] for path in file_paths}
+    
+    def get_dependencies(self, file_path):
+        """
+        Obtiene las dependencias directas de un archivo.
+        
+        Args:
+            file_path (str): Ruta del archivo
+        
+        Returns:
+            list: Rutas de los archivos que importa
+        """
+        return self.get_dependencies_many([file_path])[file_path]
+    
+    def expand(self, file_paths, max_depth=2, max_tokens=None, token_cost=None, cancel_event=None,
+               exclude=None):
+        """
+        Obtiene la clausura transitiva de dependencias de unos archivos.
+        
+        Se recorre por niveles (en anchura), de modo que con un presupuesto se
+        prefieren las dependencias más directas. Una dependencia que no cabe en
+        el presupuesto se omite junto con las que solo se alcanzan a través de ella.
+        Las dependencias excluidas (p. ej. las que ya están en el contexto) se
+        recorren pero no se incluyen ni cuentan en el presupuesto.
+        
+        Args:
+            file_paths (list): Archivos de partida (no se incluyen en el resultado)
+            max_depth (int, optional): Profundidad máxima (None = sin límite)
+            max_tokens (int, optional): Tokens máximos del conjunto de dependencias
+            token_cost (callable, optional): Función (ruta) -> tokens del archivo
+            cancel_event (threading.Event, optional): Señal para interrumpir
+            exclude (iterable, optional): Rutas que no se deben incluir
+        
+        Returns:
+            list: Tuplas (ruta, profundidad, tokens) en orden de descubrimiento;
+                los tokens son None si no se indica token_cost
+        """
+        file_paths = [os.path.normpath(path) for path in file_paths]
+        excluded = {os.path.normpath(path) for path in exclude or ()}
+        seen = set(file_paths)
+        result = []
+        used_tokens = 0
+        frontier = file_paths
+        depth = 0
+        
+        while frontier and (max_depth is None or depth < max_depth):
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            depth += 1
+            dependencies = self.get_dependencies_many(frontier)
+            next_frontier = []
+            for path in frontier:
+                for dependency in dependencies.get(path, []):
+                    if dependency in seen:
+                        continue
+                    seen.add(dependency)
+                    if dependency in excluded:
+                        next_frontier.append(dependency)
+                        continue
+                    
+                    cost = token_cost(dependency) if token_cost is not None else None
+                    if max_tokens is not None and cost is not None:
+                        if used_tokens + cost > max_tokens:
+                            continue
+                        used_tokens += cost
+                    
+                    result.append((dependency, depth, cost))
+                    next_frontier.append(dependency)
+            frontier = next_frontier
+        
+        return result
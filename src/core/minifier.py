@@ -0,0 +1,666 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Minimización del código al exportar el contexto para ahorrar tokens.
+
+Quita comentarios (y, opcionalmente, docstrings), elimina las líneas en blanco
+y puede convertir la indentación a tabuladores. Los comentarios se localizan
+con analizadores léxicos reales (tokenize para Python y un lexer sencillo de
+cadenas y comentarios para los lenguajes tipo C y similares), de modo que el
+contenido de las cadenas nunca se modifica: las líneas que empiezan dentro de
+una cadena de varias líneas se conservan intactas. El lexer genérico reconoce
+también los literales que pueden contener "//", "/*" o "#" sin ser comentarios:
+cadenas en bruto de C++ y Rust, expresiones regulares /.../ de JavaScript,
+Ruby y Perl (solo donde no puede haber una división), literales con
+delimitador de Ruby y Perl (%q(...), qw{...}, s/a/b/), documentos "here"
+(<<EOF) de shell, Ruby y Perl y bloques literales (| y >) de YAML, cuyas
+líneas (incluidas las vacías y las que empiezan por "#") son parte del valor.
+
+Los resultados se guardan en caché por hash de contenido y opciones.
+"""
+
+import io
+import os
+import re
+import ast
+import math
+import bisect
+import hashlib
+import tokenize
+
+from src.core.file_manager import FileManager
+
+# Cadenas de los lenguajes tipo C (incluidas las de triple comilla de Java,
+# Kotlin o Swift, las plantillas de JavaScript y las cadenas en bruto de C++ y
+# Rust, que pueden ocupar varias líneas)
+_C_STRINGS = (r'\b(?:u8|[uUL])?R"(?P<delim>[^()\\\s"]{0,16})\(.*?\)(?P=delim)"|'
+              r'\bb?r(?P<hashes>#*)".*?"(?P=hashes)|'
+              r'"""(?:\\.|[^\\])*?"""|@"(?:[^"]|"")*"|"(?:\\.|[^"\\\n])*"|'
+              r"'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`")
+_C_COMMENTS = r'//[^\n]*|/\*.*?\*/'
+# Comentarios con # (solo al principio de línea o tras un espacio, para no
+# confundirlos con $#, ${#var}, s#a#b#...)
+_HASH_COMMENTS = r'(?:(?<=\s)|(?<![^\n]))#[^\n]*'
+
+_HASH_STRINGS = (r'"""(?:\\.|[^\\])*?"""|' + r"'''(?:\\.|[^\\])*?'''|" + r'"(?:\\.|[^"\\\n])*"|' +
+                 r"'(?:\\.|[^'\\\n])*'")
+
+# Cadenas de YAML (pueden ocupar varias líneas); solo al empezar un valor, para
+# no confundir un apóstrofo de un texto sin comillas con una cadena
+_YAML_STRINGS = (r'(?:(?<=[\s\[{,:])|(?<![^\n]))(?:"(?:\\.|[^"\\])*"|' + r"'(?:''|[^'])*')")
+
+_LEXER_PATTERNS = {
+    'c': (_C_STRINGS, _C_COMMENTS),
+    'js': (_C_STRINGS, _C_COMMENTS),
+    'php': (_C_STRINGS, _C_COMMENTS + r'|(?:(?<=\s)|(?<![^\n]))#(?!\[)[^\n]*'),
+    'css': (r'"(?:\\.|[^"\\\n])*"|' + r"'(?:\\.|[^'\\\n])*'", r'/\*.*?\*/'),
+    'hash': (_HASH_STRINGS, _HASH_COMMENTS),
+    'shell': (_HASH_STRINGS, _HASH_COMMENTS),
+    'ruby': (_HASH_STRINGS, _HASH_COMMENTS),
+    'perl': (_HASH_STRINGS, _HASH_COMMENTS),
+    'yaml': (_YAML_STRINGS, _HASH_COMMENTS),
+    'sql': (r"'(?:''|[^'])*'|" + r'"(?:""|[^"])*"', r'--[^\n]*|/\*.*?\*/'),
+    'markup': (None, r'<!--.*?-->'),
+}
+
+# Expresiones regulares /.../ (se aceptan solo donde no puede haber una división)
+_REGEX_LITERAL = r'/(?![*/])(?:\\.|\[(?:\\.|[^\]\\\n])*\]|[^/\\\n\[])+/[A-Za-z]*'
+# Literales con delimitador: %q(...) de Ruby y q{...}, qw/.../ o s/a/b/ de Perl
+# (el patrón termina justo antes del delimitador de apertura)
+_RUBY_QUOTES = r'%[qQwWiIrsx]?(?=[^\w\s=])'
+_PERL_QUOTES = r'(?<![-$@%&\w>.])(?:qq|qw|qr|q|m|s|tr|y)[ \t]*(?=[^\w\s#,;=>)$@%])'
+# Documentos "here"; el cuerpo va desde la línea siguiente hasta la etiqueta
+_HEREDOC = r'(?<!<)<<(?P<hdmode>[-~]?)(?P<hdquote>["\'`]?)(?P<tag>[A-Za-z_]\w*)(?P=hdquote)'
+_SHELL_HEREDOC = r'(?<!<)<<(?P<hdmode>-?)[ \t]*(?P<hdquote>["\']?)\\?(?P<tag>[A-Za-z_]\w*)(?P=hdquote)'
+# Indicador de bloque literal de YAML (key: |, - >-, |2+...) al final de su línea;
+# el cuerpo son las líneas siguientes más indentadas que la del indicador
+_YAML_BLOCK = r'(?:(?<=[:\-]\s)|(?<![^\n]))[|>][-+]?[1-9]?[-+]?(?=[ \t]*(?:#[^\n]*)?(?:\n|$))'
+
+# Literales adicionales de cada lexer {lexer: {grupo: patrón}}
+_LEXER_LITERALS = {
+    'js': {'regex': _REGEX_LITERAL},
+    'shell': {'heredoc': _SHELL_HEREDOC},
+    'ruby': {'regex': _REGEX_LITERAL, 'quote': _RUBY_QUOTES, 'heredoc': _HEREDOC},
+    'perl': {'regex': _REGEX_LITERAL, 'quote': _PERL_QUOTES, 'heredoc': _HEREDOC},
+    'yaml': {'block': _YAML_BLOCK},
+}
+
+# Caracteres y palabras tras los que "/" empieza una expresión regular (y no una división)
+_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+_REGEX_KEYWORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw',
+                   'case', 'do', 'else', 'yield', 'await', 'if', 'unless', 'when', 'and', 'or',
+                   'not', 'split', 'grep', 'map', 'join', 'push', 'unshift'}
+_IDENTIFIER_END = re.compile(r'[\w$]+$')
+
+# Delimitadores que se emparejan (y se anidan) en los literales con delimitador
+_BRACKETS = {'(': ')', '[': ']', '{': '}', '<': '>'}
+
+# Lexer de cada lenguaje (por nombre en FileManager); los que no aparecen no se minimizan
+LANGUAGE_LEXERS = {
+    'JavaScript': 'js',
+    'TypeScript': 'js',
+    'Vue': 'js',
+    'Java': 'c',
+    'C#': 'c',
+    'Kotlin': 'c',
+    'Swift': 'c',
+    'Go': 'c',
+    'Rust': 'c',
+    'C': 'c',
+    'C++': 'c',
+    'C/C++ Header': 'c',
+    'Objective-C': 'c',
+    'PHP': 'php',
+    'CSS': 'css',
+    'Shell': 'shell',
+    'Perl': 'perl',
+    'Ruby': 'ruby',
+    'YAML': 'yaml',
+    'Python': 'hash',
+    'SQL': 'sql',
+    'HTML': 'markup',
+    'XML': 'markup',
+}
+
+# Lenguajes en los que la indentación es significativa (no se convierte con el lexer genérico)
+_INDENT_SENSITIVE = {'Python', 'YAML'}
+
+_COMPILED_LEXERS = {}
+
+def _get_lexer(name):
+    """
+    Obtiene la expresión regular compilada de un lexer.
+    
+    Args:
+        name (str): Nombre del lexer
+    
+    Returns:
+        re.Pattern: Patrón con los grupos 'string' y 'comment' y los de los
+            literales adicionales del lexer ('regex', 'quote', 'heredoc', 'block')
+    """
+    lexer = _COMPILED_LEXERS.get(name)
+    if lexer is None:
+        strings, comments = _LEXER_PATTERNS[name]
+        alternatives = [f"(?P<string>{strings})"] if strings else []
+        for group, literal in _LEXER_LITERALS.get(name, {}).items():
+            alternatives.append(f"(?P<{group}>{literal})")
+        alternatives.append(f"(?P<comment>{comments})")
+        pattern = "|".join(alternatives)
+        lexer = re.compile(pattern, re.DOTALL)
+        _COMPILED_LEXERS[name] = lexer
+    return lexer
+
+def _apply_edits(source, edits, protected):
+    """
+    Aplica reemplazos a un texto y traslada los rangos protegidos.
+    
+    Args:
+        source (str): Texto original
+        edits (list): Tuplas (inicio, fin, reemplazo) ordenadas y sin solaparse
+        protected (list): Rangos (inicio, fin) ordenados que no se modifican
+    
+    Returns:
+        tuple: (texto resultante, rangos protegidos en el texto resultante)
+    """
+    pieces = []
+    shifted = []
+    position = 0
+    delta = 0
+    edit_index = 0
+    for start, end in protected:
+        # Aplicar los reemplazos anteriores a este rango protegido
+        while edit_index < len(edits) and edits[edit_index][0] < start:
+            edit_start, edit_end, replacement = edits[edit_index]
+            pieces.append(source[position:edit_start])
+            pieces.append(replacement)
+            delta += len(replacement) - (edit_end - edit_start)
+            position = edit_end
+            edit_index += 1
+        shifted.append((start + delta, end + delta))
+    for edit_start, edit_end, replacement in edits[edit_index:]:
+        pieces.append(source[position:edit_start])
+        pieces.append(replacement)
+        position = edit_end
+    pieces.append(source[position:])
+    return ''.join(pieces), shifted
+
+def _indent_unit(widths):
+    """
+    Calcula la unidad de indentación a partir de los anchos encontrados.
+    
+    Args:
+        widths (iterable): Anchos de indentación (en espacios)
+    
+    Returns:
+        int: Unidad de indentación o 0 si no se puede convertir con seguridad
+    """
+    unit = 0
+    for width in widths:
+        unit = math.gcd(unit, width)
+    return unit if unit >= 2 else 0
+
+def _clean_lines(text, protected, indent_tabs, indent_unit=None):
+    """
+    Elimina espacios finales y líneas en blanco y convierte la indentación.
+    
+    Las líneas que empiezan dentro de un rango protegido (cadenas de varias
+    líneas) se conservan tal cual.
+    
+    Args:
+        text (str): Texto ya sin comentarios
+        protected (list): Rangos (inicio, fin) ordenados de cadenas de varias líneas
+        indent_tabs (bool): Convertir la indentación a tabuladores
+        indent_unit (int, optional): Espacios por nivel; si no se indica se
+            deduce de las propias líneas
+    
+    Returns:
+        str: Texto limpio
+    """
+    starts = [start for start, _ in protected]
+    lines = []
+    offset = 0
+    for line in text.split('\n'):
+        line_start = offset
+        offset += len(line) + 1
+        
+        index = bisect.bisect_left(starts, line_start) - 1
+        if index >= 0 and protected[index][0] < line_start < protected[index][1]:
+            lines.append((line, True))
+            continue
+        
+        line = line.rstrip()
+        if line:
+            lines.append((line, False))
+    
+    if indent_tabs:
+        if indent_unit is None:
+            indent_unit = _indent_unit(len(line) - len(line.lstrip(' '))
+                                       for line, is_protected in lines if not is_protected)
+        if indent_unit:
+            converted = []
+            for line, is_protected in lines:
+                if not is_protected and line.startswith(' '):
+                    width = len(line) - len(line.lstrip(' '))
+                    line = '\t' * (width // indent_unit) + ' ' * (width % indent_unit) + line[width:]
+                converted.append((line, is_protected))
+            lines = converted
+    
+    return '\n'.join(line for line, _ in lines)
+
+def _regex_allowed(source, start):
+    """
+    Indica si una "/" puede empezar una expresión regular (y no ser una división).
+    
+    Args:
+        source (str): Código fuente
+        start (int): Posición de la "/"
+    
+    Returns:
+        bool: True si lo anterior es un operador, un separador, una palabra
+            clave o el principio del texto
+    """
+    index = start - 1
+    while index >= 0 and source[index].isspace():
+        index -= 1
+    if index < 0 or source[index] in _REGEX_PRECEDERS:
+        return True
+    word = _IDENTIFIER_END.search(source, 0, index + 1)
+    return word is not None and word.group() in _REGEX_KEYWORDS
+
+def _delimited_end(source, start):
+    """
+    Busca el final de un literal con delimitador (con escapes y anidamiento).
+    
+    Args:
+        source (str): Código fuente
+        start (int): Posición del delimitador de apertura
+    
+    Returns:
+        int: Posición tras el delimitador de cierre o None si no se cierra
+    """
+    opening = source[start]
+    closing = _BRACKETS.get(opening, opening)
+    depth = 1
+    index = start + 1
+    while index < len(source):
+        char = source[index]
+        if char == '\\':
+            index += 2
+            continue
+        if char == closing:
+            depth -= 1
+            if depth == 0:
+                return index + 1
+        elif char == opening:
+            depth += 1
+        index += 1
+    return None
+
+def _quote_end(source, match):
+    """
+    Busca el final de un literal con delimitador de Ruby o Perl.
+    
+    Args:
+        source (str): Código fuente
+        match (re.Match): Coincidencia del prefijo (%q, qw, s...)
+    
+    Returns:
+        int: Posición tras el literal o None si no lo es o no se cierra
+    """
+    prefix = match.group('quote').strip()
+    if prefix == '%' and not _regex_allowed(source, match.start()):
+        return None  # Operador de módulo
+    start = match.end()
+    if start >= len(source):
+        return None
+    end = _delimited_end(source, start)
+    if end is not None and prefix in ('s', 'tr', 'y'):
+        # Dos partes: s/a/b/ comparte el delimitador central; s{a}{b} abre otro
+        if source[start] in _BRACKETS:
+            second = end
+            while second < len(source) and source[second].isspace():
+                second += 1
+            if second >= len(source) or source[second].isalnum():
+                return None
+            end = _delimited_end(source, second)
+        else:
+            end = _delimited_end(source, end - 1)
+    return end
+
+def _heredoc_end(source, match, body_start):
+    """
+    Busca el final del cuerpo de un documento "here".
+    
+    Args:
+        source (str): Código fuente
+        match (re.Match): Coincidencia de la apertura (<<EOF)
+        body_start (int): Posición donde empieza el cuerpo
+    
+    Returns:
+        int: Posición del final de la línea de la etiqueta o None si no aparece
+    """
+    tag = match.group('tag')
+    indented = bool(match.group('hdmode'))
+    position = body_start
+    while position <= len(source):
+        line_end = source.find('\n', position)
+        if line_end == -1:
+            line_end = len(source)
+        line = source[position:line_end].rstrip('\r')
+        if (line.strip() if indented else line) == tag:
+            return line_end
+        position = line_end + 1
+    return None
+
+def _block_scalar_end(source, match, body_start):
+    """
+    Busca el final del cuerpo de un bloque literal de YAML.
+    
+    El cuerpo son las líneas vacías y las más indentadas que la línea del
+    indicador; las líneas vacías finales solo forman parte de él con "+".
+    
+    Args:
+        source (str): Texto YAML
+        match (re.Match): Coincidencia del indicador (| o >)
+        body_start (int): Posición donde empieza el cuerpo
+    
+    Returns:
+        int: Posición del final de la última línea del cuerpo o None si no tiene
+    """
+    line_start = source.rfind('\n', 0, match.start()) + 1
+    line = source[line_start:match.start()]
+    indent = len(line) - len(line.lstrip(' '))
+    keep_blank = '+' in match.group('block')
+    body_end = None
+    position = body_start
+    while position <= len(source):
+        line_end = source.find('\n', position)
+        if line_end == -1:
+            line_end = len(source)
+        line = source[position:line_end].rstrip('\r')
+        if line.strip():
+            if len(line) - len(line.lstrip(' ')) <= indent:
+                break
+            body_end = line_end
+        elif keep_blank and body_end is not None:
+            # Incluir el salto de línea: una línea vacía empieza donde termina
+            body_end = line_end + 1
+        position = line_end + 1
+    return body_end
+
+def lex_comments(source, lexer_name):
+    """
+    Localiza los comentarios y las cadenas de varias líneas de un texto.
+    
+    Las coincidencias se buscan de izquierda a derecha; las que resultan no
+    ser literales (una "/" de división, un "%" de módulo, un "<<" sin
+    etiqueta de cierre) se descartan y la búsqueda sigue en el carácter
+    siguiente. Los cuerpos de los documentos "here" y de los bloques
+    literales de YAML se saltan al llegar al final de la línea que los abre.
+    
+    Args:
+        source (str): Código fuente
+        lexer_name (str): Nombre del lexer (clave de _LEXER_PATTERNS)
+    
+    Returns:
+        tuple: (comentarios [(inicio, fin)], literales de varias líneas [(inicio, fin)])
+    """
+    lexer = _get_lexer(lexer_name)
+    comments = []
+    protected = []
+    position = 0
+    # Final de la línea con documentos "here" (o un bloque de YAML) abiertos y
+    # final de su último cuerpo
+    heredoc_line_end = None
+    heredoc_end = None
+    while True:
+        match = lexer.search(source, position)
+        if heredoc_line_end is not None and (match is None or match.start() > heredoc_line_end):
+            protected.append((heredoc_line_end, heredoc_end))
+            position = heredoc_end
+            heredoc_line_end = None
+            continue
+        if match is None:
+            break
+        
+        start, end = match.span()
+        group = match.lastgroup
+        if group == 'regex':
+            if not _regex_allowed(source, start):
+                position = start + 1
+                continue
+        elif group == 'quote':
+            end = _quote_end(source, match)
+            if end is None:
+                position = start + 1
+                continue
+        elif group == 'heredoc':
+            line_end = source.find('\n', end)
+            body_end = None
+            if line_end != -1:
+                body_start = heredoc_end + 1 if heredoc_line_end == line_end else line_end + 1
+                body_end = _heredoc_end(source, match, body_start)
+            if body_end is None:
+                position = start + 2
+                continue
+            heredoc_line_end, heredoc_end = line_end, body_end
+            position = end
+            continue
+        elif group == 'block':
+            line_end = source.find('\n', end)
+            body_end = _block_scalar_end(source, match, line_end + 1) if line_end != -1 else None
+            if body_end is not None:
+                heredoc_line_end, heredoc_end = line_end, body_end
+            position = end
+            continue
+        
+        if group == 'comment':
+            comments.append((start, end))
+        elif '\n' in source[start:end]:
+            protected.append((start, end))
+        position = end
+    return comments, protected
+
+def minify_with_lexer(source, lexer_name, indent_tabs=False):
+    """
+    Minimiza un texto con el lexer genérico de cadenas y comentarios.
+    
+    Args:
+        source (str): Código fuente
+        lexer_name (str): Nombre del lexer (clave de _LEXER_PATTERNS)
+        indent_tabs (bool): Convertir la indentación a tabuladores
+    
+    Returns:
+        str: Código minimizado
+    """
+    comments, protected = lex_comments(source, lexer_name)
+    edits = []
+    for start, end in comments:
+        if lexer_name in ('hash', 'shell', 'ruby', 'perl') and start == 0 and source.startswith('#!'):
+            continue  # Conservar el shebang
+        # Un comentario entre dos símbolos se sustituye por un espacio
+        separated = (start > 0 and not source[start - 1].isspace() and
+                     end < len(source) and not source[end].isspace())
+        edits.append((start, end, ' ' if separated else ''))
+    
+    text, protected = _apply_edits(source, edits, protected)
+    return _clean_lines(text, protected, indent_tabs)
+
+def _python_docstring_edits(source, line_starts, lines):
+    """
+    Localiza los docstrings de un módulo Python.
+    
+    Args:
+        source (str): Código fuente
+        line_starts (list): Desplazamiento de inicio de cada línea
+        lines (list): Líneas del archivo
+    
+    Returns:
+        list: Tuplas (inicio, fin, reemplazo); vacía si el código no se puede analizar
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError, RecursionError):
+        return []
+    
+    def offset(line, byte_column):
+        # ast da las columnas en bytes UTF-8
+        text = lines[line - 1].encode('utf-8')[:byte_column].decode('utf-8', errors='replace')
+        return line_starts[line - 1] + len(text)
+    
+    edits = []
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        if not node.body:
+            continue
+        first = node.body[0]
+        if not (isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant)
+                and isinstance(first.value.value, str)):
+            continue
+        
+        start = offset(first.lineno, first.col_offset)
+        end = offset(first.end_lineno, first.end_col_offset)
+        # Solo si no hay más código en la misma línea ("x"; y = 1)
+        rest = source[end:line_starts[first.end_lineno]] if first.end_lineno < len(line_starts) else source[end:]
+        if rest.strip() and not rest.strip().startswith('#'):
+            continue
+        # Un cuerpo que solo tiene el docstring necesita una sentencia
+        replacement = '...' if len(node.body) == 1 and not isinstance(node, ast.Module) else ''
+        edits.append((start, end, replacement))
+    return edits
+
+def minify_python(source, strip_docstrings=True, indent_tabs=False):
+    """
+    Minimiza código Python con el módulo tokenize.
+    
+    Args:
+        source (str): Código fuente
+        strip_docstrings (bool): Quitar también los docstrings
+        indent_tabs (bool): Convertir la indentación a tabuladores
+    
+    Returns:
+        str: Código minimizado
+    
+    Raises:
+        tokenize.TokenError, SyntaxError: Si el código no se puede tokenizar
+            (p. ej. un fragmento con paréntesis sin cerrar)
+    """
+    lines = source.split('\n')
+    line_starts = []
+    offset = 0
+    for line in lines:
+        line_starts.append(offset)
+        offset += len(line) + 1
+    
+    def position(point):
+        return line_starts[point[0] - 1] + point[1]
+    
+    fstring_start = getattr(tokenize, 'FSTRING_START', None)
+    fstring_end = getattr(tokenize, 'FSTRING_END', None)
+    
+    edits = []
+    protected = []
+    indent_widths = []
+    open_fstrings = []
+    for token in tokenize.generate_tokens(io.StringIO(source).readline):
+        if token.type == tokenize.COMMENT:
+            edits.append((position(token.start), position(token.end), ''))
+        elif token.type == tokenize.STRING:
+            if token.start[0] != token.end[0]:
+                protected.append((position(token.start), position(token.end)))
+        elif token.type == tokenize.INDENT:
+            if token.string.strip(' '):
+                indent_widths = None  # Indentación con tabuladores: no convertir
+            elif indent_widths is not None:
+                indent_widths.append(len(token.string))
+        elif fstring_start is not None and token.type == fstring_start:
+            open_fstrings.append(token.start)
+        elif fstring_end is not None and token.type == fstring_end and open_fstrings:
+            start = open_fstrings.pop()
+            if start[0] != token.end[0] and not open_fstrings:
+                protected.append((position(start), position(token.end)))
+    
+    if strip_docstrings:
+        docstrings = _python_docstring_edits(source, line_starts, lines)
+        if docstrings:
+            protected = [(start, end) for start, end in protected
+                         if not any(doc_start <= start and end <= doc_end
+                                    for doc_start, doc_end, _ in docstrings)]
+            edits.extend(docstrings)
+    
+    edits.sort()
+    protected.sort()
+    text, protected = _apply_edits(source, edits, protected)
+    
+    indent_unit = _indent_unit(indent_widths) if indent_widths else 0
+    return _clean_lines(text, protected, indent_tabs and bool(indent_unit), indent_unit)
+
+class Minifier:
+    """Minimiza el contenido de los archivos y guarda los resultados en caché."""
+    
+    def __init__(self, max_cache_entries=2000):
+        """
+        Inicializa el minimizador.
+        
+        Args:
+            max_cache_entries (int): Número máximo de resultados en caché
+        """
+        self.languages = FileManager().code_extensions
+        self.strip_docstrings = True
+        self.indent_tabs = False
+        # Caché {(hash, lenguaje, docstrings, tabuladores): texto minimizado}
+        self._cache = {}
+        self.max_cache_entries = max_cache_entries
+    
+    def configure(self, strip_docstrings=True, indent_tabs=False):
+        """
+        Cambia las opciones de minimización.
+        
+        Args:
+            strip_docstrings (bool): Quitar también los docstrings de Python
+            indent_tabs (bool): Convertir la indentación a tabuladores
+        """
+        self.strip_docstrings = strip_docstrings
+        self.indent_tabs = indent_tabs
+    
+    def minify(self, content, file_path):
+        """
+        Minimiza el contenido de un archivo según su lenguaje.
+        
+        Args:
+            content (str): Contenido (archivo completo o fragmento)
+            file_path (str): Ruta del archivo (para deducir el lenguaje)
+        
+        Returns:
+            str: Contenido minimizado (el original si el lenguaje no se soporta)
+        """
+        language = self.languages.get(os.path.splitext(file_path)[1].lower())
+        lexer_name = LANGUAGE_LEXERS.get(language)
+        if lexer_name is None:
+            return content
+        
+        digest = hashlib.blake2b(content.encode('utf-8', errors='replace'), digest_size=16).digest()
+        key = (digest, language, self.strip_docstrings, self.indent_tabs)
+        result = self._cache.get(key)
+        if result is not None:
+            return result
+        
+        indent_tabs = self.indent_tabs and language not in _INDENT_SENSITIVE
+        try:
+            if language == 'Python':
+                try:
+                    result = minify_python(content, self.strip_docstrings, self.indent_tabs)
+                except (tokenize.TokenError, SyntaxError):
+                    # Fragmento que no se puede tokenizar: usar el lexer genérico
+                    result = minify_with_lexer(content, lexer_name)
+            else:
+                result = minify_with_lexer(content, lexer_name, indent_tabs)
+        except Exception as e:
+            print(f"Error al minimizar {file_path}: {str(e)}")
+            result = content
+        
+        if len(self._cache) >= self.max_cache_entries:
+            self._cache.clear()
+        self._cache[key] = result
+        return result
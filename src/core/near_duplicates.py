@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detección de archivos casi duplicados del proyecto con MinHash y LSH.
+
+Cada archivo se reduce a su conjunto de "shingles" (secuencias de tres
+palabras consecutivas) y de ese conjunto se obtiene una firma MinHash de
+NUM_PERM valores, cuya proporción de posiciones iguales entre dos archivos
+estima la similitud de Jaccard de sus contenidos. La firma se calcula con
+"one permutation hashing" (un único hash por shingle repartido en NUM_PERM
+cubetas, con densificación de las cubetas vacías), que es lineal en el tamaño
+del archivo.
+
+Las firmas se guardan en el índice de escaneo, así que solo se recalculan
+para los archivos modificados. Para agrupar los archivos se usa LSH: la firma
+se divide en bandas y los archivos que coinciden en alguna banda son
+candidatos; solo los candidatos cuya similitud estimada supera el umbral se
+unen en el mismo grupo.
+"""
+
+import re
+import hashlib
+
+# Número de valores de cada firma
+NUM_PERM = 64
+# Bandas LSH (NUM_PERM / BANDS filas por banda)
+BANDS = 16
+# Palabras por shingle
+SHINGLE_SIZE = 3
+# Bytes que se leen de cada archivo como máximo
+MAX_READ_BYTES = 1024 * 1024
+# Mínimo de shingles distintos para calcular la firma (archivos muy cortos no se agrupan)
+MIN_SHINGLES = 8
+
+# Nombre del dato en el índice de escaneo
+SCAN_INDEX_KEY = 'minhash'
+
+_WORD_RE = re.compile(r'\w+')
+_EMPTY = (1 << 64) - 1
+_MASK32 = 0xffffffff
+
+def compute_signature(text, num_perm=NUM_PERM):
+    """
+    Calcula la firma MinHash de un texto.
+    
+    Args:
+        text (str): Contenido del archivo
+        num_perm (int): Número de valores de la firma
+    
+    Returns:
+        list: Firma (enteros de 32 bits) o None si el texto tiene muy pocos shingles
+    """
+    words = _WORD_RE.findall(text.lower())
+    shingles = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(max(0, len(words) - SHINGLE_SIZE + 1))}
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    
+    # Un único hash por shingle: los bits bajos eligen la cubeta y el resto es el valor
+    mins = [_EMPTY] * num_perm
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+        bucket = value % num_perm
+        value //= num_perm
+        if value < mins[bucket]:
+            mins[bucket] = value
+    
+    # Densificación: las cubetas vacías toman el valor de la siguiente no vacía
+    # (desplazado según la distancia para no crear coincidencias artificiales)
+    for index in range(num_perm):
+        if mins[index] == _EMPTY:
+            for distance in range(1, num_perm):
+                value = mins[(index + distance) % num_perm]
+                if value != _EMPTY:
+                    mins[index] = value + distance * 0x9e3779b97f4a7c15
+                    break
+    
+    return [value & _MASK32 for value in mins]
+
+def signature_to_hex(signature):
+    """Convierte una firma en una cadena hexadecimal compacta."""
+    return ''.join(f"{value:08x}" for value in signature)
+
+def signature_from_hex(text):
+    """Convierte una cadena hexadecimal en una firma."""
+    return [int(text[i:i + 8], 16) for i in range(0, len(text), 8)]
+
+def estimate_similarity(first, second):
+    """
+    Estima la similitud de Jaccard de dos archivos a partir de sus firmas.
+    
+    Args:
+        first (list): Firma del primer archivo
+        second (list): Firma del segundo archivo
+    
+    Returns:
+        float: Proporción de valores iguales (entre 0 y 1)
+    """
+    if not first or len(first) != len(second):
+        return 0.0
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+def update_signatures(scan_index, cancel_event=None):
+    """
+    Calcula las firmas de los archivos del índice de escaneo que no la tienen.
+    
+    Args:
+        scan_index (ScanIndex): Índice de escaneo ya actualizado
+        cancel_event (threading.Event, optional): Evento para cancelar
+    
+    Returns:
+        int: Número de firmas calculadas
+    """
+    computed = 0
+    for file_path in list(scan_index.entries):
+        if cancel_event is not None and cancel_event.is_set():
+            break
+        if scan_index.get_extra(file_path, SCAN_INDEX_KEY) is not None:
+            continue
+        try:
+            with open(file_path, 'rb') as f:
+                data = f.read(MAX_READ_BYTES)
+        except OSError:
+            continue
+        if b'\0' in data[:8192]:
+            signature = None
+        else:
+            signature = compute_signature(data.decode('utf-8', errors='replace'))
+        # Los archivos sin firma se marcan con "" para no volver a leerlos
+        scan_index.set_extra(file_path, SCAN_INDEX_KEY, signature_to_hex(signature) if signature else "")
+        computed += 1
+    return computed
+
+class NearDuplicateIndex:
+    """Grupos de archivos casi duplicados del proyecto."""
+    
+    def __init__(self, threshold=0.8, bands=BANDS):
+        """
+        Inicializa el índice.
+        
+        Args:
+            threshold (float): Similitud estimada mínima para agrupar dos archivos
+            bands (int): Número de bandas LSH
+        """
+        self.threshold = threshold
+        self.bands = bands
+        # Grupo de cada archivo {ruta: lista de rutas del grupo}
+        self.clusters = {}
+    
+    def build(self, signatures):
+        """
+        Agrupa los archivos a partir de sus firmas.
+        
+        Cada cubeta LSH se compara solo con su primer archivo, de modo que el
+        coste es lineal en el número de archivos aunque haya cubetas enormes;
+        la unión de grupos (union-find) recupera la transitividad.
+        
+        Args:
+            signatures (dict): {ruta: firma}
+        
+        Returns:
+            list: Grupos (listas de rutas, de más de un archivo)
+        """
+        parent = {path: path for path in signatures}
+        
+        def find(path):
+            while parent[path] != path:
+                parent[path] = parent[parent[path]]
+                path = parent[path]
+            return path
+        
+        buckets = {}
+        for path, signature in signatures.items():
+            rows = len(signature) // self.bands
+            for band in range(self.bands):
+                key = (band, tuple(signature[band * rows:(band + 1) * rows]))
+                anchor = buckets.setdefault(key, path)
+                if anchor == path:
+                    continue
+                root_path, root_anchor = find(path), find(anchor)
+                if root_path == root_anchor:
+                    continue
+                if estimate_similarity(signature, signatures[anchor]) >= self.threshold:
+                    parent[root_path] = root_anchor
+        
+        groups = {}
+        for path in signatures:
+            groups.setdefault(find(path), []).append(path)
+        
+        self.clusters = {}
+        result = []
+        for members in groups.values():
+            if len(members) > 1:
+                members.sort()
+                result.append(members)
+                for path in members:
+                    self.clusters[path] = members
+        return result
+    
+    def build_from_scan_index(self, scan_index):
+        """
+        Agrupa los archivos usando las firmas guardadas en el índice de escaneo.
+        
+        Args:
+            scan_index (ScanIndex): Índice de escaneo con las firmas calculadas
+        
+        Returns:
+            list: Grupos (listas de rutas, de más de un archivo)
+        """
+        signatures = {}
+        for file_path in scan_index.entries:
+            value = scan_index.get_extra(file_path, SCAN_INDEX_KEY)
+            if value:
+                signatures[file_path] = signature_from_hex(value)
+        return self.build(signatures)
+    
+    def get_cluster(self, file_path):
+        """
+        Obtiene el grupo de archivos casi duplicados de un archivo.
+        
+        Args:
+            file_path (str): Ruta del archivo
+        
+        Returns:
+            list: Rutas del grupo (incluido el propio archivo) o lista vacía
+        """
+        return self.clusters.get(file_path, [])
+    
+    def get_clusters(self):
+        """
+        Obtiene todos los grupos.
+        
+        Returns:
+            list: Grupos (listas de rutas)
+        """
+        seen = set()
+        result = []
+        for members in self.clusters.values():
+            if id(members) not in seen:
+                seen.add(id(members))
+                result.append(members)
+        return result
+    
+    def pick_representatives(self, file_paths):
+        """
+        Filtra una lista de archivos dejando uno solo por grupo.
+        
+        El representante de cada grupo es el de ruta más corta (normalmente el
+        original frente a copias más anidadas).
+        
+        Args:
+            file_paths (list): Rutas de archivo
+        
+        Returns:
+            list: Rutas filtradas, en el orden original
+        """
+        chosen = {}
+        for file_path in file_paths:
+            members = self.clusters.get(file_path)
+            if members is None:
+                continue
+            key = id(members)
+            current = chosen.get(key)
+            if current is None or (len(file_path), file_path) < (len(current), current):
+                chosen[key] = file_path
+        
+        representatives = set(chosen.values())
+        return [file_path for file_path in file_paths
+                if file_path not in self.clusters or file_path in representatives]
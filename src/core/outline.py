@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Representación de un archivo como esquema: solo su superficie pública.
+
+El esquema conserva las importaciones, las firmas de clases y funciones, la
+primera línea de cada docstring y las constantes, y omite los cuerpos. Sirve
+para dar al LLM la API de un módulo grande por una fracción de sus tokens.
+
+Los archivos Python se analizan con el módulo ast; para el resto de lenguajes
+se reutiliza el escáner de expresiones regulares del índice de símbolos. Los
+esquemas se guardan en caché por hash de contenido, así que recalcular los
+tokens del contexto no vuelve a analizar los archivos sin cambios.
+"""
+
+import io
+import os
+import re
+import ast
+import hashlib
+import tokenize
+
+from src.core.file_manager import FileManager
+from src.core.symbol_index import LANGUAGE_SCANNERS, extract_regex_symbols
+
+# Marcador que sustituye a los cuerpos omitidos en el esquema de Python
+PYTHON_BODY_PLACEHOLDER = "..."
+
+# Nombres de constantes (MAYÚSCULAS, con al menos una letra)
+_CONSTANT_NAME_RE = re.compile(r'^_*[A-Z][A-Z0-9_]*$')
+
+# Líneas de importación de los lenguajes sin analizador propio
+_IMPORT_LINE_RE = re.compile(
+    r'^\s*(?:import\b|from\s+\S+\s+import\b|export\s+(?:\*|\{[^}]*\})\s+from\b|#\s*include\b|'
+    r'#\s*import\b|using\s+[\w.]+\s*;|package\b|use\s+[\w:\\]+|require(?:_once)?\b|'
+    r'(?:const|let|var)\s+[\w{}\s,]+=\s*require\s*\(|include(?:_once)?\b|source\s)'
+)
+
+# Constantes de los lenguajes sin analizador propio
+_CONSTANT_LINE_RE = re.compile(
+    r'^\s*(?:#\s*define\s+\w+|(?:export\s+)?const\s+_*[A-Z][A-Z0-9_]*\s*[=:]|'
+    r'(?:(?:public|private|protected|internal)\s+)?(?:static\s+)?(?:final|const)\s+[\w<>\[\], ]*?\b_*[A-Z][A-Z0-9_]*\s*=(?!=)|'
+    r'_*[A-Z][A-Z0-9_]*\s*=(?!=))'
+)
+
+# Comienzo de un comentario de documentación (/** ... */, ///, ##)
+_DOC_COMMENT_RE = re.compile(r'^\s*(?:/\*\*|///|//!|##|#)')
+
+# Máximo de líneas de firma que se conservan (firmas partidas en varias líneas)
+MAX_SIGNATURE_LINES = 8
+
+def _first_docstring_line(node):
+    """
+    Obtiene la primera línea no vacía del docstring de un nodo.
+    
+    Args:
+        node (ast.AST): Módulo, clase o función
+    
+    Returns:
+        str: Primera línea del docstring o None si no tiene
+    """
+    docstring = ast.get_docstring(node, clean=True)
+    if not docstring:
+        return None
+    for line in docstring.split('\n'):
+        if line.strip():
+            return line.strip()
+    return None
+
+def _indent_of_line(line):
+    return line[:len(line) - len(line.lstrip())]
+
+def _segment(lines, first, last):
+    """
+    Obtiene las líneas de código entre dos números de línea (desde 1, incluidos).
+    """
+    return [line.rstrip() for line in lines[first - 1:last]]
+
+def _format_docstring(indent, text):
+    text = text.replace('"""', "'''")
+    return f'{indent}"""{text}"""'
+
+def _header_colon(node, lines):
+    """
+    Busca los dos puntos que cierran la cabecera de una clase o función.
+    
+    La cabecera puede ocupar varias líneas y el cuerpo empezar en la misma
+    línea que los dos puntos, así que se recorren los tokens contando paréntesis.
+    
+    Args:
+        node (ast.AST): Nodo ClassDef, FunctionDef o AsyncFunctionDef
+        lines (list): Líneas del archivo
+    
+    Returns:
+        tuple: (línea desde 1, columna) de los dos puntos o None si no se encuentran
+    """
+    first_line = lines[node.lineno - 1]
+    offset = len(first_line) - len(first_line.lstrip())
+    header = [first_line[offset:]] + lines[node.lineno:node.body[0].lineno]
+    depth = 0
+    try:
+        for token in tokenize.generate_tokens(io.StringIO('\n'.join(header)).readline):
+            if token.type != tokenize.OP:
+                continue
+            if token.string in ('(', '[', '{'):
+                depth += 1
+            elif token.string in (')', ']', '}'):
+                depth -= 1
+            elif token.string == ':' and depth == 0:
+                row, column = token.start
+                return node.lineno + row - 1, column + (offset if row == 1 else 0)
+    except (tokenize.TokenError, SyntaxError):
+        pass
+    return None
+
+def _python_definition_outline(node, lines, output):
+    """
+    Añade al esquema la firma de una clase o función y su contenido resumido.
+    
+    Args:
+        node (ast.AST): Nodo ClassDef, FunctionDef o AsyncFunctionDef
+        lines (list): Líneas del archivo
+        output (list): Líneas del esquema (se amplía)
+    """
+    start = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+    first_statement = node.body[0]
+    
+    # La firma termina en los dos puntos de la cabecera; lo que les sigue en
+    # la misma línea ("def f(): pass") o en las siguientes es el cuerpo
+    colon = _header_colon(node, lines)
+    if colon is not None:
+        signature_end = colon[0]
+    elif first_statement.lineno > node.lineno:
+        signature_end = first_statement.lineno - 1
+    else:
+        signature_end = node.lineno
+    last_line = min(signature_end, start + MAX_SIGNATURE_LINES - 1)
+    signature = _segment(lines, start, last_line)
+    if colon is not None and last_line == signature_end:
+        signature[-1] = signature[-1][:colon[1] + 1]
+    # Quitar comentarios y líneas en blanco entre la firma y el cuerpo
+    while signature and (not signature[-1].strip() or signature[-1].lstrip().startswith('#')):
+        signature.pop()
+    output.extend(signature)
+    
+    body_indent = _indent_of_line(lines[first_statement.lineno - 1]) if first_statement.lineno > signature_end else None
+    if body_indent is None or len(body_indent) <= len(_indent_of_line(lines[node.lineno - 1])):
+        body_indent = _indent_of_line(lines[node.lineno - 1]) + "    "
+    
+    body_lines = len(output)
+    docstring = _first_docstring_line(node)
+    if docstring:
+        output.append(_format_docstring(body_indent, docstring))
+    
+    if isinstance(node, ast.ClassDef):
+        _python_body_outline(node.body, lines, output)
+    
+    if len(output) == body_lines:
+        output.append(body_indent + PYTHON_BODY_PLACEHOLDER)
+    elif not isinstance(node, ast.ClassDef) and not docstring:
+        output.append(body_indent + PYTHON_BODY_PLACEHOLDER)
+
+def _is_constant_assignment(node):
+    """
+    Comprueba si una asignación define una constante (nombre en MAYÚSCULAS o __all__).
+    """
+    if isinstance(node, ast.Assign):
+        targets = node.targets
+    elif isinstance(node, ast.AnnAssign):
+        targets = [node.target]
+    else:
+        return False
+    for target in targets:
+        if isinstance(target, ast.Name) and (_CONSTANT_NAME_RE.match(target.id) or target.id == '__all__'):
+            return True
+    return False
+
+def _python_body_outline(body, lines, output):
+    """
+    Añade al esquema los elementos relevantes de un bloque (módulo o clase).
+    
+    Args:
+        body (list): Sentencias del bloque
+        lines (list): Líneas del archivo
+        output (list): Líneas del esquema (se amplía)
+    """
+    for node in body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            output.extend(_segment(lines, node.lineno, node.end_lineno))
+        elif isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            _python_definition_outline(node, lines, output)
+        elif _is_constant_assignment(node):
+            segment = _segment(lines, node.lineno, node.end_lineno)
+            if len(segment) > MAX_SIGNATURE_LINES:
+                # Valores muy largos (tablas, diccionarios...): solo el inicio
+                segment = segment[:MAX_SIGNATURE_LINES - 1] + [_indent_of_line(segment[0]) + "    ..."]
+            output.extend(segment)
+
+def extract_python_outline(source):
+    """
+    Genera el esquema de un archivo Python con el módulo ast.
+    
+    Args:
+        source (str): Código fuente
+    
+    Returns:
+        str: Esquema del archivo
+    
+    Raises:
+        SyntaxError: Si el código no se puede analizar
+    """
+    tree = ast.parse(source)
+    lines = source.split('\n')
+    output = []
+    
+    docstring = _first_docstring_line(tree)
+    if docstring:
+        output.append(_format_docstring("", docstring))
+    
+    _python_body_outline(tree.body, lines, output)
+    return '\n'.join(output)
+
+def _doc_comment_line(lines, index):
+    """
+    Busca el comentario de documentación que precede a una línea.
+    
+    Args:
+        lines (list): Líneas del archivo
+        index (int): Índice (desde 0) de la línea de la definición
+    
+    Returns:
+        int: Índice de la primera línea con texto del comentario o None
+    """
+    first = index
+    while first > 0 and index - first < 50:
+        previous = lines[first - 1]
+        if not (_DOC_COMMENT_RE.match(previous) or previous.lstrip().startswith('*')):
+            break
+        first -= 1
+    for comment_index in range(first, index):
+        text = lines[comment_index].strip().lstrip('/*#!').strip()
+        if text and not text.startswith('@'):
+            return comment_index
+    return None
+
+def _signature_lines(lines, index):
+    """
+    Obtiene las líneas de una firma que puede ocupar varias líneas.
+    
+    Args:
+        lines (list): Líneas del archivo
+        index (int): Índice (desde 0) de la primera línea de la definición
+    
+    Returns:
+        list: Índices de las líneas de la firma
+    """
+    depth = 0
+    result = []
+    for offset in range(MAX_SIGNATURE_LINES):
+        current = index + offset
+        if current >= len(lines):
+            break
+        line = lines[current]
+        result.append(current)
+        depth += line.count('(') - line.count(')')
+        if depth <= 0 and ('{' in line or line.rstrip().endswith((':', ';', ')')) or offset == 0 and depth == 0):
+            break
+    return result
+
+def extract_regex_outline(source, language):
+    """
+    Genera el esquema aproximado de un archivo con expresiones regulares.
+    
+    Args:
+        source (str): Código fuente
+        language (str): Nombre del lenguaje (según FileManager)
+    
+    Returns:
+        str: Esquema del archivo o None si el lenguaje no tiene escáner
+    """
+    symbols = extract_regex_symbols(source, None, language)
+    if not symbols and language not in ('C', 'C++', 'C/C++ Header', 'Shell', 'SQL'):
+        return None
+    lines = source.split('\n')
+    
+    # Líneas que se conservan: importaciones, constantes y firmas
+    keep = {}
+    for index, line in enumerate(lines):
+        if _IMPORT_LINE_RE.match(line) or _CONSTANT_LINE_RE.match(line):
+            keep[index] = line.rstrip()
+    for symbol in symbols:
+        index = symbol.start_line - 1
+        comment_index = _doc_comment_line(lines, index)
+        if comment_index is not None:
+            keep[comment_index] = lines[comment_index].rstrip()
+        for signature_index in _signature_lines(lines, index):
+            keep[signature_index] = lines[signature_index].rstrip()
+    
+    return '\n'.join(keep[index] for index in sorted(keep))
+
+class OutlineBuilder:
+    """Genera los esquemas de los archivos y los guarda en caché por contenido."""
+    
+    def __init__(self, max_cache_entries=2000):
+        """
+        Inicializa el generador.
+        
+        Args:
+            max_cache_entries (int): Número máximo de esquemas en caché
+        """
+        self.languages = FileManager().code_extensions
+        # Caché de esquemas {(hash, lenguaje): esquema o None}
+        self._cache = {}
+        self.max_cache_entries = max_cache_entries
+    
+    def get_language(self, file_path):
+        """
+        Obtiene el lenguaje de un archivo según su extensión.
+        
+        Args:
+            file_path (str): Ruta del archivo
+        
+        Returns:
+            str: Nombre del lenguaje (según FileManager) o None
+        """
+        return self.languages.get(os.path.splitext(file_path)[1].lower())
+    
+    def supports(self, file_path):
+        """
+        Indica si se puede generar el esquema de un archivo.
+        
+        Args:
+            file_path (str): Ruta del archivo
+        
+        Returns:
+            bool: True si su lenguaje tiene analizador o escáner
+        """
+        return self.get_language(file_path) in LANGUAGE_SCANNERS
+    
+    def get_outline(self, content, file_path):
+        """
+        Obtiene el esquema de un archivo.
+        
+        Args:
+            content (str): Contenido completo del archivo
+            file_path (str): Ruta del archivo (para deducir el lenguaje)
+        
+        Returns:
+            str: Esquema del archivo o None si no se puede generar
+        """
+        language = self.get_language(file_path)
+        digest = hashlib.blake2b(content.encode('utf-8', errors='replace'), digest_size=16).digest()
+        key = (digest, language)
+        if key in self._cache:
+            return self._cache[key]
+        
+        outline = None
+        try:
+            if language == 'Python':
+                try:
+                    outline = extract_python_outline(content)
+                except (SyntaxError, ValueError, RecursionError):
+                    # Código con errores de sintaxis: usar el escáner aproximado
+                    outline = extract_regex_outline(content, language)
+            elif language is not None:
+                outline = extract_regex_outline(content, language)
+        except Exception as e:
+            print(f"Error al generar el esquema de {file_path}: {str(e)}")
+        
+        if len(self._cache) >= self.max_cache_entries:
+            self._cache.clear()
+        self._cache[key] = outline
+        return outline
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice persistente del contenido del proyecto (SQLite FTS5).
+
+Cada proyecto tiene su propia base de datos en la carpeta de caché con los
+metadatos de cada archivo (mtime, tamaño y resumen BLAKE2b del contenido) y el
+texto completo en una tabla FTS5. La actualización es incremental: solo se leen
+los archivos cuyo mtime o tamaño ha cambiado según el índice de escaneo, y de
+ellos solo se reindexan los que han cambiado de contenido.
+
+Las consultas usan el tokenizador "trigram" de FTS5 (SQLite 3.34+), que permite
+buscar subcadenas arbitrarias; con versiones anteriores se usa LIKE sobre la
+tabla, que sigue evitando leer los archivos del disco. En ambos casos la base de
+datos solo selecciona los archivos candidatos: las coincidencias exactas (con
+su línea y columna) se calculan después con la misma expresión regular que el
+resto de búsquedas.
+"""
+
+import os
+import sqlite3
+import hashlib
+
+from src.core.search_index import SelectionSearchIndex, find_all, with_lines
+from src.utils.file_utils import get_project_cache_file
+
+class ProjectIndex:
+    """Índice de texto completo de los archivos de un proyecto."""
+    
+    # Versión del esquema de la base de datos
+    SCHEMA_VERSION = 1
+    
+    # Tamaño máximo de archivo que se indexa (bytes)
+    MAX_FILE_SIZE = 8 * 1024 * 1024
+    
+    # Bytes iniciales que se examinan para detectar archivos binarios
+    BINARY_SAMPLE = 8192
+    
+    def __init__(self, root, db_path=None):
+        """
+        Inicializa el índice de un proyecto (la base de datos se abre al usarla).
+        
+        Args:
+            root (str): Carpeta raíz del proyecto
+            db_path (str, optional): Ruta de la base de datos (por defecto, una
+                propia del proyecto en la carpeta de caché)
+        """
+        self.root = os.path.normpath(root)
+        self.db_path = db_path or get_project_cache_file(self.root, "index.sqlite")
+        self.connection = None
+        self.use_trigram = False
+        self._compiler = SelectionSearchIndex()
+    
+    @staticmethod
+    def is_available():
+        """
+        Indica si el SQLite de esta instalación incluye FTS5.
+        
+        Returns:
+            bool: True si se puede crear una tabla FTS5
+        """
+        try:
+            connection = sqlite3.connect(":memory:")
+            try:
+                connection.execute("CREATE VIRTUAL TABLE probe USING fts5(content)")
+                return True
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            return False
+    
+    def open(self):
+        """
+        Abre (creándola si hace falta) la base de datos del proyecto.
+        
+        La conexión solo puede usarse desde el hilo que la abre.
+        
+        Raises:
+            sqlite3.Error: Si no se puede abrir o SQLite no incluye FTS5
+        """
+        if self.connection is not None:
+            return
+        
+        connection = sqlite3.connect(self.db_path)
+        try:
+            # WAL: las búsquedas pueden leer mientras la aplicación actualiza el
+            # índice en segundo plano
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            version = self._get_meta(connection, 'schema_version')
+            root = self._get_meta(connection, 'root')
+            if version is not None and (int(version) != self.SCHEMA_VERSION or root != self.root):
+                # Esquema antiguo o base de datos de otro proyecto: empezar de cero
+                connection.execute("DROP TABLE IF EXISTS files")
+                connection.execute("DROP TABLE IF EXISTS contents")
+                connection.execute("DELETE FROM meta")
+            
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, "
+                "mtime_ns INTEGER, size INTEGER, digest TEXT)"
+            )
+            
+            tokenizer = self._get_meta(connection, 'tokenizer')
+            if tokenizer is None:
+                tokenizer = 'trigram'
+                try:
+                    connection.execute("CREATE VIRTUAL TABLE contents USING fts5(content, tokenize='trigram')")
+                except sqlite3.OperationalError:
+                    # SQLite anterior a 3.34: sin tokenizador de trigramas
+                    tokenizer = 'unicode61'
+                    connection.execute("CREATE VIRTUAL TABLE contents USING fts5(content)")
+                self._set_meta(connection, 'tokenizer', tokenizer)
+                self._set_meta(connection, 'schema_version', str(self.SCHEMA_VERSION))
+                self._set_meta(connection, 'root', self.root)
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        
+        self.connection = connection
+        self.use_trigram = tokenizer == 'trigram'
+    
+    def close(self):
+        """Cierra la base de datos."""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+    
+    def _get_meta(self, connection, key):
+        row = connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def _set_meta(self, connection, key, value):
+        connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+    
+    def update(self, entries):
+        """
+        Actualiza el índice con el estado actual de los archivos.
+        
+        Args:
+            entries (dict): {ruta: (mtime_ns, tamaño)}, normalmente ScanIndex.entries
+        
+        Returns:
+            dict: Número de archivos 'indexed', 'unchanged' (mismo contenido con
+                otro mtime), 'skipped' (binarios o demasiado grandes) y 'removed'
+        """
+        self.open()
+        stats = {'indexed': 0, 'unchanged': 0, 'skipped': 0, 'removed': 0}
+        stored = {path: (file_id, mtime_ns, size, digest)
+                  for file_id, path, mtime_ns, size, digest
+                  in self.connection.execute("SELECT id, path, mtime_ns, size, digest FROM files")}
+        
+        with self.connection:
+            for path, (file_id, _, _, _) in stored.items():
+                if path not in entries:
+                    self.connection.execute("DELETE FROM contents WHERE rowid = ?", (file_id,))
+                    self.connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+                    stats['removed'] += 1
+            
+            for path, (mtime_ns, size) in entries.items():
+                previous = stored.get(path)
+                if previous is not None and previous[1] == mtime_ns and previous[2] == size:
+                    continue
+                self._index_file(path, mtime_ns, size, previous, stats)
+        
+        return stats
+    
+    def _index_file(self, path, mtime_ns, size, previous, stats):
+        """
+        Indexa (o reindexa) un archivo nuevo o modificado.
+        
+        Args:
+            path (str): Ruta del archivo
+            mtime_ns (int): Fecha de modificación
+            size (int): Tamaño en bytes
+            previous (tuple): Fila anterior (id, mtime_ns, tamaño, resumen) o None
+            stats (dict): Contadores de la actualización
+        """
+        data = None
+        if size <= self.MAX_FILE_SIZE:
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                data = None
+        if data is not None and b'\0' in data[:self.BINARY_SAMPLE]:
+            data = None
+        
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest() if data is not None else None
+        
+        if previous is None:
+            cursor = self.connection.execute(
+                "INSERT INTO files (path, mtime_ns, size, digest) VALUES (?, ?, ?, ?)",
+                (path, mtime_ns, size, digest)
+            )
+            file_id = cursor.lastrowid
+        else:
+            file_id = previous[0]
+            self.connection.execute(
+                "UPDATE files SET mtime_ns = ?, size = ?, digest = ? WHERE id = ?",
+                (mtime_ns, size, digest, file_id)
+            )
+            if digest is not None and digest == previous[3]:
+                # Solo ha cambiado el mtime: el contenido indexado sigue siendo válido
+                stats['unchanged'] += 1
+                return
+            self.connection.execute("DELETE FROM contents WHERE rowid = ?", (file_id,))
+        
+        if data is None:
+            # Los binarios y archivos grandes se registran sin contenido, para
+            # no volver a leerlos mientras no cambien
+            stats['skipped'] += 1
+            return
+        
+        self.connection.execute(
+            "INSERT INTO contents (rowid, content) VALUES (?, ?)",
+            (file_id, data.decode('utf-8', errors='replace'))
+        )
+        stats['indexed'] += 1
+    
+    def _candidate_rows(self, literals):
+        """
+        Obtiene los archivos que pueden contener una coincidencia.
+        
+        Args:
+            literals (list): Fragmentos (en minúsculas) que toda coincidencia contiene
+        
+        Returns:
+            sqlite3.Cursor: Filas (ruta, contenido) ordenadas por ruta
+        """
+        base = "SELECT files.path, contents.content FROM contents JOIN files ON files.id = contents.rowid"
+        literals = [literal for literal in literals if literal]
+        
+        if self.use_trigram:
+            # Con trigramas FTS5 busca subcadenas, pero solo de 3 caracteres o más
+            terms = ['"' + literal.replace('"', '""') + '"' for literal in literals if len(literal) >= 3]
+            if terms:
+                return self.connection.execute(
+                    base + " WHERE contents MATCH ? ORDER BY files.path", (" AND ".join(terms),)
+                )
+        
+        # LIKE solo ignora mayúsculas en ASCII; los demás literales no filtran
+        terms = [literal for literal in literals if literal.isascii()]
+        if terms:
+            condition = " AND ".join("contents.content LIKE ? ESCAPE '\\'" for _ in terms)
+            patterns = ['%' + literal.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+                        for literal in terms]
+            return self.connection.execute(base + " WHERE " + condition + " ORDER BY files.path", patterns)
+        
+        return self.connection.execute(base + " ORDER BY files.path")
+    
+    def search(self, query, use_regex=False, whole_word=False, match_case=False, max_matches_per_file=200):
+        """
+        Busca una consulta en el contenido indexado.
+        
+        Es un generador: produce las coincidencias de cada archivo a medida que
+        se obtienen de la base de datos.
+        
+        Args:
+            query (str): Texto o expresión regular a buscar
+            use_regex (bool): Interpretar la consulta como expresión regular
+            whole_word (bool): Solo coincidencias de palabra completa
+            match_case (bool): Distinguir mayúsculas de minúsculas
+            max_matches_per_file (int): Máximo de coincidencias por archivo
+        
+        Yields:
+            list: SearchMatch de cada archivo con coincidencias, por orden de ruta
+        
+        Raises:
+            re.error: Si la expresión regular no es válida
+        """
+        pattern, literals = self._compiler.compile_query(query, use_regex, whole_word, match_case)
+        self.open()
+        
+        # Búsqueda literal simple: str.find sobre la copia en minúsculas
+        plain_query = query.lower() if not use_regex and not whole_word and not match_case else None
+        
+        for path, content in self._candidate_rows(literals):
+            lower = content.lower() if plain_query else None
+            if lower is not None and len(lower) == len(content):
+                spans = find_all(lower, plain_query)
+            else:
+                spans = ((m.start(), m.end()) for m in pattern.finditer(content) if m.end() > m.start())
+            
+            matches = []
+            for match in with_lines(path, None, content, spans):
+                matches.append(match)
+                if len(matches) >= max_matches_per_file:
+                    break
+            if matches:
+                yield matches
+    
+    def get_file_count(self):
+        """
+        Obtiene el número de archivos con contenido indexado.
+        
+        Returns:
+            int: Número de archivos
+        """
+        self.open()
+        return self.connection.execute("SELECT COUNT(*) FROM contents").fetchone()[0]
+
+def refresh_project_index(root, entries):
+    """
+    Actualiza el índice persistente de un proyecto y lo cierra.
+    
+    Args:
+        root (str): Carpeta raíz del proyecto
+        entries (dict): {ruta: (mtime_ns, tamaño)}, normalmente ScanIndex.entries
+    
+    Returns:
+        dict: Estadísticas de la actualización (ver ProjectIndex.update)
+    """
+    index = ProjectIndex(root)
+    try:
+        return index.update(entries)
+    finally:
+        index.close()
+
+def update_project_index(root, file_manager=None):
+    """
+    Escanea un proyecto y actualiza su índice persistente.
+    
+    Args:
+        root (str): Carpeta raíz del proyecto
+        file_manager (FileManager, optional): Gestor con los filtros de archivos
+    
+    Returns:
+        tuple: (ProjectIndex abierto, estadísticas de la actualización)
+    """
+    from src.core.file_manager import FileManager
+    from src.core.scan_index import ScanIndex
+    
+    file_manager = file_manager or FileManager()
+    scan_index = ScanIndex(root)
+    scan_index.load()
+    scan_index.refresh(file_manager.iter_code_files(root))
+    
+    index = ProjectIndex(root)
+    stats = index.update(scan_index.entries)
+    scan_index.save()
+    return index, stats
+
+if __name__ == "__main__":
+    import sys
+    import time
+    
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if not args:
+        print("Uso: python -m src.core.project_index PROYECTO [CONSULTA] [--regex] [--palabra] [--mayusculas]")
+        sys.exit(1)
+    
+    start = time.perf_counter()
+    project_index, update_stats = update_project_index(args[0])
+    print(f"Índice actualizado en {time.perf_counter() - start:.2f} s: {update_stats}")
+    
+    if len(args) > 1:
+        start = time.perf_counter()
+        total = 0
+        for file_matches in project_index.search(args[1], '--regex' in sys.argv, '--palabra' in sys.argv,
+                                                 '--mayusculas' in sys.argv):
+            for match in file_matches:
+                print(f"{os.path.relpath(match.file_path, project_index.root)}:{match.line}: {match.line_text.strip()}")
+            total += len(file_matches)
+        print(f"{total} resultados en {(time.perf_counter() - start) * 1000:.1f} ms")
+    project_index.close()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Búsqueda de contenido en todo el proyecto.
+
+Los archivos se reparten entre un grupo de hilos de trabajo y las coincidencias
+se dejan en una cola a medida que aparecen, para que la interfaz las muestre sin
+esperar a que termine la búsqueda. Antes de decodificar un archivo y aplicar la
+expresión regular se descartan los binarios (bytes nulos al principio) y los que
+no contienen los literales que toda coincidencia necesita, una comprobación
+sobre los bytes mucho más barata que la regex.
+
+Opcionalmente la búsqueda puede resolverse con el índice persistente del
+proyecto (ProjectIndex), que evita volver a leer los archivos. La aplicación lo
+mantiene al día en segundo plano; la búsqueda solo lo consulta.
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from src.core.search_index import SelectionSearchIndex, find_all, with_lines
+
+class ProjectSearch:
+    """Busca una consulta en los archivos de un proyecto en segundo plano."""
+    
+    # Bytes iniciales que se examinan para detectar archivos binarios
+    BINARY_SAMPLE = 8192
+    
+    # Tamaño máximo de archivo que se examina (bytes)
+    MAX_FILE_SIZE = 8 * 1024 * 1024
+    
+    # Límites de resultados (por archivo y en total)
+    MAX_MATCHES_PER_FILE = 200
+    MAX_RESULTS = 10000
+    
+    # Marca que se deja en la cola al terminar la búsqueda
+    DONE = None
+    
+    def __init__(self, max_workers=None):
+        """
+        Inicializa el buscador.
+        
+        Args:
+            max_workers (int, optional): Número de hilos de trabajo
+        """
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 2) + 2)
+        self.results = queue.Queue()
+        self.files_scanned = 0
+        self.files_matched = 0
+        self.match_count = 0
+        self.truncated = False
+        self._compiler = SelectionSearchIndex()
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+    
+    def start(self, files, query, use_regex=False, whole_word=False, match_case=False, index_root=None):
+        """
+        Inicia una búsqueda; si había otra en curso, la cancela.
+        
+        Args:
+            files: Iterable de rutas de archivo (se consume en segundo plano)
+            query (str): Texto o expresión regular a buscar
+            use_regex (bool): Interpretar la consulta como expresión regular
+            whole_word (bool): Solo coincidencias de palabra completa
+            match_case (bool): Distinguir mayúsculas de minúsculas
+            index_root (str, optional): Carpeta del proyecto; si se indica, se
+                consulta su índice persistente en lugar de leer los archivos
+                (solo se construye, con los archivos indicados, si aún no existe)
+        
+        Raises:
+            re.error: Si la expresión regular no es válida
+        """
+        pattern, literals = self._compiler.compile_query(query, use_regex, whole_word, match_case)
+        
+        self.cancel()
+        self.results = queue.Queue()
+        self.files_scanned = 0
+        self.files_matched = 0
+        self.match_count = 0
+        self.truncated = False
+        self._cancel_event = threading.Event()
+        
+        # Literales para el filtro previo sobre los bytes (en minúsculas). Los
+        # no ASCII se omiten: bytes.lower() solo convierte caracteres ASCII
+        needles = [literal.encode('utf-8') for literal in literals if literal and literal.isascii()]
+        
+        # Búsqueda literal simple: str.find sobre la copia en minúsculas
+        plain_query = query.lower() if not use_regex and not whole_word and not match_case else None
+        
+        search = {
+            'pattern': pattern,
+            'needles': needles,
+            'plain_query': plain_query,
+            'query': (query, use_regex, whole_word, match_case)
+        }
+        if index_root:
+            target, args = self._run_indexed, (index_root, files, search, self.results, self._cancel_event)
+        else:
+            target, args = self._run, (files, search, self.results, self._cancel_event)
+        self._thread = threading.Thread(target=target, args=args, daemon=True)
+        self._thread.start()
+    
+    def cancel(self):
+        """Cancela la búsqueda en curso (los resultados ya encontrados se conservan)."""
+        self._cancel_event.set()
+    
+    def is_running(self):
+        """
+        Indica si hay una búsqueda en curso.
+        
+        Returns:
+            bool: True si la búsqueda no ha terminado
+        """
+        return self._thread is not None and self._thread.is_alive()
+    
+    def get_results(self, max_items=500):
+        """
+        Recoge las coincidencias disponibles sin bloquear.
+        
+        Args:
+            max_items (int): Número máximo de coincidencias a recoger
+        
+        Returns:
+            tuple: (lista de SearchMatch, True si la búsqueda ha terminado)
+        """
+        matches = []
+        finished = False
+        while len(matches) < max_items:
+            try:
+                item = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if item is self.DONE:
+                finished = True
+                break
+            matches.extend(item)
+        return matches, finished
+    
+    def _run(self, files, search, results, cancel_event):
+        """
+        Reparte los archivos entre los hilos de trabajo (hilo coordinador).
+        
+        Se mantiene un número limitado de tareas pendientes para que recorrer
+        un árbol enorme no llene la memoria de tareas en espera.
+        
+        Args:
+            files: Iterable de rutas de archivo
+            search (dict): Patrón compilado, literales y consulta simple
+            results (queue.Queue): Cola donde se dejan las coincidencias
+            cancel_event (threading.Event): Señal de cancelación
+        """
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                pending = set()
+                for file_path in files:
+                    if cancel_event.is_set():
+                        break
+                    if len(pending) >= self.max_workers * 4:
+                        _, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    pending.add(executor.submit(self._search_file, file_path, search, results, cancel_event))
+                wait(pending)
+        except Exception as e:
+            print(f"Error en la búsqueda del proyecto: {str(e)}")
+        finally:
+            results.put(self.DONE)
+    
+    def _run_indexed(self, root, files, search, results, cancel_event):
+        """
+        Consulta el índice persistente del proyecto (hilo coordinador).
+        
+        El índice se actualiza aparte, en segundo plano; aquí solo se construye
+        si todavía está vacío.
+        
+        Args:
+            root (str): Carpeta raíz del proyecto
+            files: Iterable de rutas de archivo (para construir el índice)
+            search (dict): Patrón compilado, literales y consulta simple
+            results (queue.Queue): Cola donde se dejan las coincidencias
+            cancel_event (threading.Event): Señal de cancelación
+        """
+        # La conexión SQLite debe crearse en el hilo que la usa
+        from src.core.project_index import ProjectIndex
+        from src.core.scan_index import ScanIndex
+        
+        index = ProjectIndex(root)
+        try:
+            if index.get_file_count() == 0:
+                scan_index = ScanIndex(root)
+                scan_index.refresh(files)
+                index.update(scan_index.entries)
+            
+            with self._lock:
+                self.files_scanned = index.get_file_count()
+            
+            for matches in index.search(*search['query'], max_matches_per_file=self.MAX_MATCHES_PER_FILE):
+                if cancel_event.is_set() or not self._add_results(matches, results, cancel_event):
+                    break
+        except Exception as e:
+            print(f"Error en la búsqueda con el índice del proyecto: {str(e)}")
+        finally:
+            index.close()
+            results.put(self.DONE)
+    
+    def _add_results(self, matches, results, cancel_event):
+        """
+        Deja en la cola las coincidencias de un archivo respetando el límite total.
+        
+        Args:
+            matches (list): Coincidencias de un archivo
+            results (queue.Queue): Cola donde se dejan las coincidencias
+            cancel_event (threading.Event): Señal de cancelación
+        
+        Returns:
+            bool: False si se ha alcanzado el límite de resultados
+        """
+        with self._lock:
+            if self.match_count >= self.MAX_RESULTS:
+                return False
+            matches = matches[:self.MAX_RESULTS - self.match_count]
+            self.match_count += len(matches)
+            self.files_matched += 1
+            if self.match_count >= self.MAX_RESULTS:
+                self.truncated = True
+                cancel_event.set()
+        
+        results.put(matches)
+        return not self.truncated
+    
+    def _search_file(self, file_path, search, results, cancel_event):
+        """
+        Busca en un archivo y deja sus coincidencias en la cola (hilo de trabajo).
+        
+        Args:
+            file_path (str): Ruta del archivo
+            search (dict): Patrón compilado, literales y consulta simple
+            results (queue.Queue): Cola donde se dejan las coincidencias
+            cancel_event (threading.Event): Señal de cancelación
+        """
+        if cancel_event.is_set():
+            return
+        
+        try:
+            if os.path.getsize(file_path) > self.MAX_FILE_SIZE:
+                return
+            with open(file_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return
+        
+        with self._lock:
+            self.files_scanned += 1
+        
+        # Omitir archivos binarios
+        if b'\0' in data[:self.BINARY_SAMPLE]:
+            return
+        
+        # Filtro previo: todos los literales requeridos deben aparecer
+        if search['needles']:
+            lowered = data.lower()
+            if not all(needle in lowered for needle in search['needles']):
+                return
+        
+        content = data.decode('utf-8', errors='replace')
+        plain_query = search['plain_query']
+        lower = content.lower() if plain_query else None
+        if lower is not None and len(lower) == len(content):
+            spans = find_all(lower, plain_query)
+        else:
+            spans = ((m.start(), m.end()) for m in search['pattern'].finditer(content) if m.end() > m.start())
+        
+        matches = []
+        for match in with_lines(file_path, None, content, spans):
+            matches.append(match)
+            if len(matches) >= self.MAX_MATCHES_PER_FILE or cancel_event.is_set():
+                break
+        if matches:
+            self._add_results(matches, results, cancel_event)
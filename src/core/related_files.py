@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Archivos relacionados: similitud coseno entre vectores TF-IDF de los archivos.
+
+Cada archivo del proyecto es una fila de una matriz dispersa en formato CSR
+(indptr, índices de término y frecuencias) cuyas columnas son los términos
+del índice de relevancia (identificadores divididos por camelCase y
+snake_case). La matriz se construye a partir de las listas de ese índice, sin
+volver a leer los archivos, y después se actualiza con sus cambios: las filas
+de los archivos modificados se descartan y se añaden filas nuevas al final,
+y cuando hay demasiadas descartadas se compacta.
+
+Los pesos TF-IDF (frecuencia logarítmica por IDF, normalizados por fila) se
+calculan una vez tras cada actualización. Con NumPy la similitud con los
+archivos seleccionados se obtiene de forma vectorizada sobre todos los
+elementos de la matriz (un producto por un vector disperso); sin NumPy se
+recorren listas por columna de los términos de la consulta.
+"""
+
+import math
+import threading
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class RelatedFilesIndex:
+    """Matriz TF-IDF de los archivos de un proyecto para buscar archivos parecidos."""
+    
+    # Proporción de filas descartadas a partir de la que se compacta la matriz
+    COMPACT_RATIO = 0.25
+    
+    # Términos que se muestran como explicación de cada resultado
+    SHARED_TERMS = 3
+    
+    def __init__(self):
+        """Inicializa una matriz vacía."""
+        # Columnas {término: índice} y términos por índice
+        self.vocabulary = {}
+        self.terms = []
+        # Filas: ruta de cada fila, fila vigente de cada ruta y filas vigentes
+        self.row_paths = []
+        self.path_rows = {}
+        self.alive = bytearray()
+        # Matriz CSR con la frecuencia logarítmica (1 + log tf)
+        self.indptr = array('q', [0])
+        self.indices = array('i')
+        self.values = array('f')
+        # Pesos TF-IDF normalizados (se calculan en prepare())
+        self._weights = None
+        self._row_index = None
+        self._columns = None
+        self._lock = threading.Lock()
+    
+    def is_empty(self):
+        """
+        Indica si la matriz no tiene ningún archivo.
+        
+        Returns:
+            bool: True si no hay filas vigentes
+        """
+        return not self.path_rows
+    
+    def _column(self, term):
+        column = self.vocabulary.get(term)
+        if column is None:
+            column = self.vocabulary[term] = len(self.terms)
+            self.terms.append(term)
+        return column
+    
+    def _append_row(self, path, counts):
+        """
+        Añade la fila de un archivo al final de la matriz.
+        
+        Args:
+            path (str): Ruta del archivo
+            counts (dict): {término: frecuencia}
+        """
+        entries = sorted((self._column(term), 1.0 + math.log(freq)) for term, freq in counts.items() if freq > 0)
+        self.indices.extend(column for column, _ in entries)
+        self.values.extend(value for _, value in entries)
+        self.indptr.append(len(self.indices))
+        self.path_rows[path] = len(self.row_paths)
+        self.row_paths.append(path)
+        self.alive.append(1)
+    
+    def build(self, relevance_index, cancel_event=None):
+        """
+        Construye la matriz completa a partir de las listas del índice de relevancia.
+        
+        Args:
+            relevance_index (RelevanceIndex): Índice de relevancia ya actualizado
+            cancel_event (threading.Event, optional): Señal para interrumpir
+        
+        Returns:
+            bool: True si se completó
+        """
+        # Reunir las entradas por archivo (las listas están por término)
+        rows = {}
+        for term, ids, freqs in relevance_index.iter_postings():
+            if cancel_event is not None and cancel_event.is_set():
+                return False
+            for doc_id, freq in zip(ids, freqs):
+                counts = rows.get(doc_id)
+                if counts is None:
+                    counts = rows[doc_id] = {}
+                counts[term] = freq
+        
+        paths = {doc_id: path for doc_id, (path, _) in list(relevance_index.documents.items())}
+        fresh = RelatedFilesIndex()
+        for doc_id, counts in rows.items():
+            path = paths.get(doc_id)
+            if path is not None:
+                fresh._append_row(path, counts)
+        fresh.prepare()
+        
+        with self._lock:
+            self.__dict__.update({key: value for key, value in fresh.__dict__.items() if key != '_lock'})
+        return True
+    
+    def apply_changes(self, removed, added):
+        """
+        Actualiza la matriz con los archivos cambiados.
+        
+        Args:
+            removed (list): Rutas de los archivos eliminados o modificados
+            added (list): Tuplas (ruta, {término: frecuencia}) de los archivos
+                nuevos o modificados
+        """
+        if not removed and not added:
+            return
+        with self._lock:
+            for path in list(removed) + [path for path, _ in added]:
+                row = self.path_rows.pop(path, None)
+                if row is not None:
+                    self.alive[row] = 0
+            for path, counts in added:
+                self._append_row(path, counts)
+            
+            dead = len(self.row_paths) - len(self.path_rows)
+            if dead > len(self.row_paths) * self.COMPACT_RATIO:
+                self._compact()
+            self._prepare_locked()
+    
+    def sync(self, relevance_index, cancel_event=None):
+        """
+        Pone la matriz al día con el índice de relevancia tras su actualización.
+        
+        Si el índice conserva los cambios de su última actualización solo se
+        aplican esos; si no (o si la matriz está vacía), se reconstruye.
+        
+        Args:
+            relevance_index (RelevanceIndex): Índice de relevancia recién actualizado
+            cancel_event (threading.Event, optional): Señal para interrumpir
+        
+        Returns:
+            bool: True si la matriz quedó al día
+        """
+        changes = relevance_index.last_changes
+        if self.is_empty() or changes is None:
+            return self.build(relevance_index, cancel_event)
+        self.apply_changes(changes['removed'], changes['added'])
+        return True
+    
+    def _compact(self):
+        """Elimina las filas descartadas (con el bloqueo adquirido)."""
+        indptr = array('q', [0])
+        indices = array('i')
+        values = array('f')
+        row_paths = []
+        for row, path in enumerate(self.row_paths):
+            if not self.alive[row]:
+                continue
+            start, end = self.indptr[row], self.indptr[row + 1]
+            indices.extend(self.indices[start:end])
+            values.extend(self.values[start:end])
+            indptr.append(len(indices))
+            row_paths.append(path)
+        self.indptr, self.indices, self.values, self.row_paths = indptr, indices, values, row_paths
+        self.path_rows = {path: row for row, path in enumerate(row_paths)}
+        self.alive = bytearray([1]) * len(row_paths)
+    
+    def prepare(self):
+        """Calcula los pesos TF-IDF normalizados de la matriz actual."""
+        with self._lock:
+            self._prepare_locked()
+    
+    def _prepare_locked(self):
+        rows = len(self.row_paths)
+        live = len(self.path_rows)
+        if np is not None:
+            indptr = np.frombuffer(self.indptr, dtype=np.int64)
+            indices = np.frombuffer(self.indices, dtype=np.int32)
+            values = np.frombuffer(self.values, dtype=np.float32)
+            alive = np.frombuffer(bytes(self.alive), dtype=np.uint8).astype(bool)
+            row_index = np.repeat(np.arange(rows, dtype=np.int32), np.diff(indptr))
+            
+            # IDF suavizado con los archivos vigentes
+            live_entries = alive[row_index]
+            frequency = np.bincount(indices[live_entries], minlength=len(self.terms))
+            idf = np.log((1.0 + live) / (1.0 + frequency)) + 1.0
+            weights = values * idf[indices].astype(np.float32)
+            norms = np.sqrt(np.bincount(row_index, weights.astype(np.float64) ** 2, minlength=rows))
+            norms[norms == 0] = 1.0
+            weights /= norms[row_index].astype(np.float32)
+            weights[~live_entries] = 0.0
+            
+            self._weights = weights
+            self._row_index = row_index
+            self._columns = None
+            return
+        
+        frequency = [0] * len(self.terms)
+        for row in range(rows):
+            if self.alive[row]:
+                for column in self.indices[self.indptr[row]:self.indptr[row + 1]]:
+                    frequency[column] += 1
+        idf = [math.log((1.0 + live) / (1.0 + df)) + 1.0 for df in frequency]
+        weights = array('f', bytes(4 * len(self.values)))
+        # Listas por columna {columna: [(fila, peso)]} para recorrer solo los términos de la consulta
+        columns = {}
+        for row in range(rows):
+            if not self.alive[row]:
+                continue
+            start, end = self.indptr[row], self.indptr[row + 1]
+            row_weights = [self.values[i] * idf[self.indices[i]] for i in range(start, end)]
+            norm = math.sqrt(sum(weight * weight for weight in row_weights)) or 1.0
+            for offset, weight in enumerate(row_weights):
+                weights[start + offset] = weight / norm
+                columns.setdefault(self.indices[start + offset], []).append((row, weight / norm))
+        self._weights = weights
+        self._row_index = None
+        self._columns = columns
+    
+    def _row_vector(self, row):
+        """
+        Obtiene la fila ponderada de un archivo.
+        
+        Returns:
+            dict: {columna: peso}
+        """
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return {self.indices[i]: float(self._weights[i]) for i in range(start, end)}
+    
+    def related(self, file_paths, limit=10):
+        """
+        Busca los archivos más parecidos a unos archivos dados.
+        
+        Los archivos de partida se combinan sumando sus vectores normalizados,
+        de modo que los resultados se parecen al conjunto.
+        
+        Args:
+            file_paths (list): Rutas de los archivos de partida
+            limit (int): Número máximo de resultados
+        
+        Returns:
+            list: Tuplas (ruta, similitud coseno, términos compartidos) de mayor
+                a menor similitud; vacía si ninguno de los archivos está en la matriz
+        """
+        with self._lock:
+            if self._weights is None:
+                return []
+            source_rows = [self.path_rows[path] for path in file_paths if path in self.path_rows]
+            if not source_rows:
+                return []
+            
+            query = {}
+            for row in source_rows:
+                for column, weight in self._row_vector(row).items():
+                    query[column] = query.get(column, 0.0) + weight
+            query_norm = math.sqrt(sum(weight * weight for weight in query.values())) or 1.0
+            
+            if np is not None:
+                dense = np.zeros(len(self.terms), dtype=np.float32)
+                dense[list(query)] = list(query.values())
+                indices = np.frombuffer(self.indices, dtype=np.int32)
+                scores = np.bincount(self._row_index, self._weights * dense[indices],
+                                     minlength=len(self.row_paths)) / query_norm
+                scores[source_rows] = 0.0
+                count = min(limit, len(scores))
+                top = np.argpartition(-scores, count - 1)[:count] if count else []
+                best = sorted(((float(scores[row]), int(row)) for row in top), reverse=True)
+            else:
+                scores = {}
+                for column, query_weight in query.items():
+                    for row, weight in self._columns.get(column, ()):
+                        scores[row] = scores.get(row, 0.0) + query_weight * weight
+                for row in source_rows:
+                    scores.pop(row, None)
+                best = sorted(((score / query_norm, row) for row, score in scores.items()), reverse=True)[:limit]
+            
+            results = []
+            for score, row in best:
+                if score <= 0 or not self.alive[row]:
+                    continue
+                vector = self._row_vector(row)
+                shared = sorted((column for column in vector if column in query),
+                                key=lambda column: -vector[column] * query[column])
+                results.append((self.row_paths[row], score, [self.terms[column] for column in shared[:self.SHARED_TERMS]]))
+            return results
@@ -0,0 +1,631 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice de relevancia del proyecto (BM25) para sugerir archivos.
+
+Cada archivo se reduce a sus términos: las palabras e identificadores de su
+contenido, divididos por camelCase y snake_case ("getUserName" aporta "get",
+"user", "name" y "getusername"), más los componentes de su ruta, que cuentan
+varias veces porque el nombre de un archivo suele describir su contenido. Con
+ellos se mantiene un índice invertido (término -> archivos y frecuencias) y
+las consultas (la instrucción actual o una descripción de la tarea) se puntúan
+con BM25.
+
+El índice se guarda en una base de datos SQLite propia del proyecto, en la
+carpeta de caché junto al índice de escaneo. Las listas de cada término se
+guardan como arrays binarios y la consulta solo lee las de sus términos, así
+que no hace falta cargar el índice completo. Las consultas usan su propia
+conexión (en modo WAL) y no esperan a que termine una actualización en curso. La actualización es incremental:
+los archivos modificados reciben un identificador nuevo y sus entradas
+antiguas se descartan al consultar, hasta que una compactación las elimina.
+"""
+
+import os
+import re
+import math
+import heapq
+import sqlite3
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
+
+from src.utils.file_utils import get_project_cache_file
+
+# Palabras sin valor para la búsqueda (español e inglés)
+STOPWORDS = frozenset("""
+a al algo como con de del el en es esta este esto la las lo los mas más me mi no o para pero por
+que se si sin sobre su sus también te tu un una uno unos y ya
+an and are as at be but by do for from has have if in into is it its of on or so than that the
+their then there these this to was were will with you your
+""".split())
+
+# Palabras del contenido (identificadores incluidos)
+_WORD_RE = re.compile(r'\w+')
+# Partes de un identificador en camelCase (ASCII); el resto se toma entero
+_CAMEL_RE = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+')
+
+@lru_cache(maxsize=200000)
+def _word_terms(word):
+    """
+    Obtiene los términos de una palabra o identificador (snake_case y camelCase).
+    
+    Args:
+        word (str): Palabra o identificador
+    
+    Returns:
+        tuple: Términos en minúsculas; si tiene varias partes, el identificador
+            completo también es un término (para las coincidencias exactas)
+    """
+    parts = []
+    for piece in word.split('_'):
+        if not piece:
+            continue
+        if piece.isascii():
+            parts.extend(part.lower() for part in _CAMEL_RE.findall(piece))
+        else:
+            parts.append(piece.lower())
+    parts = [part for part in parts if len(part) > 1 and not part.isdigit()]
+    terms = [''.join(parts)] if len(parts) > 1 else []
+    terms.extend(part for part in parts if part not in STOPWORDS)
+    return tuple(terms)
+
+def tokenize(text):
+    """
+    Obtiene los términos de un texto.
+    
+    Args:
+        text (str): Contenido o consulta
+    
+    Returns:
+        list: Términos (con repeticiones)
+    """
+    return [term for word in _WORD_RE.findall(text) for term in _word_terms(word)]
+
+def count_terms(text, weight=1, counts=None):
+    """
+    Cuenta los términos de un texto.
+    
+    Cada palabra distinta se divide una sola vez, aunque se repita mucho.
+    
+    Args:
+        text (str): Contenido
+        weight (int): Cuánto cuenta cada aparición
+        counts (dict, optional): Recuento que se amplía
+    
+    Returns:
+        dict: {término: frecuencia}
+    """
+    if counts is None:
+        counts = {}
+    for word, occurrences in Counter(_WORD_RE.findall(text)).items():
+        for term in _word_terms(word):
+            counts[term] = counts.get(term, 0) + occurrences * weight
+    return counts
+
+class RelevanceIndex:
+    """Índice BM25 de los archivos de un proyecto, actualizado de forma incremental."""
+    
+    # Versión del esquema de la base de datos
+    SCHEMA_VERSION = 1
+    
+    # Tamaño máximo de archivo que se indexa (bytes)
+    MAX_FILE_SIZE = 1024 * 1024
+    
+    # Bytes iniciales que se examinan para detectar archivos binarios
+    BINARY_SAMPLE = 8192
+    
+    # Veces que cuenta cada término de la ruta del archivo
+    PATH_WEIGHT = 3
+    
+    # Parámetros de BM25
+    K1 = 1.2
+    B = 0.75
+    
+    # Proporción de entradas descartadas a partir de la que se compacta el índice
+    COMPACT_RATIO = 0.25
+    
+    # Máximo de archivos cambiados cuyos términos se conservan en last_changes
+    MAX_TRACKED_CHANGES = 2000
+    
+    def __init__(self, root, db_path=None):
+        """
+        Inicializa el índice de un proyecto (la base de datos se abre al usarla).
+        
+        Args:
+            root (str): Carpeta raíz del proyecto
+            db_path (str, optional): Ruta de la base de datos (por defecto, una
+                propia del proyecto en la carpeta de caché)
+        """
+        self.root = os.path.normpath(root)
+        self.db_path = db_path or get_project_cache_file(self.root, "relevance.sqlite")
+        self.connection = None
+        # Archivos vigentes {id: (ruta, longitud)} y longitud total
+        self.documents = {}
+        self.total_length = 0
+        # Entradas de las listas: todas y las de archivos ya descartados
+        self.total_postings = 0
+        self.stale_postings = 0
+        # Cambios de la última actualización, para los índices que dependen de
+        # este: {'removed': [ruta], 'added': [(ruta, {término: frecuencia})]}, o
+        # None si cambiaron demasiados archivos (hay que reconstruirlos)
+        self.last_changes = {'removed': [], 'added': []}
+        # Denominador de BM25 de cada archivo (caché de las consultas), junto
+        # al diccionario de archivos con el que se calculó: (documents, {id: valor})
+        self._norms = None
+        # La conexión de escritura la usan las actualizaciones (un hilo cada vez)
+        self._lock = threading.Lock()
+        # Conexión de las consultas, que pueden llegar desde varios hilos
+        self._reader = None
+        self._read_lock = threading.Lock()
+        self._closed = False
+    
+    def open(self):
+        """
+        Abre (creándola si hace falta) la base de datos y carga la tabla de archivos.
+        
+        Raises:
+            sqlite3.Error: Si no se puede abrir la base de datos o el índice
+                ya se cerró
+        """
+        # Sin esperar al bloqueo: una actualización en curso lo mantiene
+        if self.connection is not None:
+            return
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("El índice de relevancia está cerrado")
+            if self.connection is not None:
+                return
+            
+            connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            reader = None
+            try:
+                # WAL: las consultas leen la última versión guardada mientras
+                # una actualización escribe
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+                version = self._get_meta(connection, 'schema_version')
+                root = self._get_meta(connection, 'root')
+                if version is not None and (int(version) != self.SCHEMA_VERSION or root != self.root):
+                    # Esquema antiguo o base de datos de otro proyecto: empezar de cero
+                    connection.execute("DROP TABLE IF EXISTS documents")
+                    connection.execute("DROP TABLE IF EXISTS terms")
+                    connection.execute("DELETE FROM meta")
+                
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS documents ("
+                    "id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, "
+                    "mtime_ns INTEGER, size INTEGER, length INTEGER, unique_terms INTEGER)"
+                )
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS terms (term TEXT PRIMARY KEY, ids BLOB, freqs BLOB)"
+                )
+                self._set_meta(connection, 'schema_version', str(self.SCHEMA_VERSION))
+                self._set_meta(connection, 'root', self.root)
+                connection.commit()
+                
+                documents = {}
+                total_length = 0
+                for doc_id, path, length in connection.execute("SELECT id, path, length FROM documents"):
+                    documents[doc_id] = (path, length)
+                    total_length += length
+                reader = sqlite3.connect(self.db_path, check_same_thread=False)
+            except Exception:
+                connection.close()
+                raise
+            
+            self._reader = reader
+            self.connection = connection
+            self.documents = documents
+            self._norms = None
+            self.total_length = total_length
+            self.total_postings = int(self._get_meta(connection, 'total_postings') or 0)
+            self.stale_postings = int(self._get_meta(connection, 'stale_postings') or 0)
+    
+    def close(self):
+        """
+        Cierra la base de datos; el índice ya no se puede volver a abrir.
+        
+        Espera a que termine la escritura en curso, si la hay.
+        """
+        self._closed = True
+        with self._read_lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+        with self._lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+    
+    def _read_postings(self, term):
+        """
+        Lee la lista de un término con la conexión de las consultas.
+        
+        Args:
+            term (str): Término
+        
+        Returns:
+            tuple: (ids, frecuencias) como arrays binarios o None si no aparece
+        """
+        with self._read_lock:
+            if self._reader is None:
+                raise sqlite3.ProgrammingError("El índice de relevancia está cerrado")
+            return self._reader.execute("SELECT ids, freqs FROM terms WHERE term = ?", (term,)).fetchone()
+    
+    def _get_meta(self, connection, key):
+        row = connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def _set_meta(self, connection, key, value):
+        connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+    
+    def _read_terms(self, path):
+        """
+        Lee un archivo y cuenta sus términos (contenido y ruta).
+        
+        Args:
+            path (str): Ruta del archivo
+        
+        Returns:
+            dict: {término: frecuencia}
+        """
+        try:
+            relative = os.path.relpath(path, self.root)
+        except ValueError:
+            relative = path
+        counts = count_terms(os.path.splitext(relative)[0], self.PATH_WEIGHT)
+        
+        try:
+            if os.path.getsize(path) > self.MAX_FILE_SIZE:
+                return counts
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return counts
+        if b'\0' in data[:self.BINARY_SAMPLE]:
+            return counts
+        
+        return count_terms(data.decode('utf-8', errors='replace'), counts=counts)
+    
+    def update(self, entries, cancel_event=None):
+        """
+        Actualiza el índice con el estado actual de los archivos.
+        
+        Solo se leen los archivos nuevos o cuyo (mtime, tamaño) ha cambiado. Si
+        se cancela, los cambios no se guardan.
+        
+        Args:
+            entries (dict): {ruta: (mtime_ns, tamaño)}, normalmente ScanIndex.entries
+            cancel_event (threading.Event, optional): Señal para interrumpir la actualización
+        
+        Returns:
+            int: Número de archivos indexados
+        """
+        self.open()
+        with self._lock:
+            stored = {path: (doc_id, mtime_ns, size, unique_terms) for doc_id, path, mtime_ns, size, unique_terms
+                      in self.connection.execute("SELECT id, path, mtime_ns, size, unique_terms FROM documents")}
+            next_id = int(self._get_meta(self.connection, 'next_id') or 1)
+        
+        removed = [(doc_id, unique_terms) for path, (doc_id, _, _, unique_terms) in stored.items()
+                   if path not in entries]
+        changed = []
+        for path, state in entries.items():
+            previous = stored.get(path)
+            if previous is None or (previous[1], previous[2]) != tuple(state):
+                changed.append((path, state))
+                if previous is not None:
+                    removed.append((previous[0], previous[3]))
+        self.last_changes = {'removed': [], 'added': []}
+        if not removed and not changed:
+            return 0
+        track = len(changed) <= self.MAX_TRACKED_CHANGES
+        tracked = []
+        
+        # Contar los términos de los archivos cambiados (sin bloquear las consultas);
+        # los identificadores nunca se reutilizan, para que las entradas
+        # descartadas no se atribuyan a otro archivo
+        new_documents = []
+        postings = {}
+        for path, state in changed:
+            if cancel_event is not None and cancel_event.is_set():
+                return 0
+            counts = self._read_terms(path)
+            if track:
+                tracked.append((path, counts))
+            doc_id = next_id
+            next_id += 1
+            new_documents.append((doc_id, path, state, sum(counts.values()), len(counts)))
+            for term, freq in counts.items():
+                entry = postings.get(term)
+                if entry is None:
+                    entry = postings[term] = (array('i'), array('i'))
+                entry[0].append(doc_id)
+                entry[1].append(freq)
+        
+        with self._lock:
+            # Las consultas siguen usando los archivos anteriores hasta que se
+            # guardan los cambios
+            documents = dict(self.documents)
+            total_length = self.total_length
+            with self.connection:
+                # Los archivos modificados o eliminados dejan de ser vigentes; sus
+                # entradas en las listas se ignoran hasta la próxima compactación
+                removed_paths = []
+                for doc_id, unique_terms in removed:
+                    self.connection.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+                    path, length = documents.pop(doc_id, (None, 0))
+                    if path is not None:
+                        removed_paths.append(path)
+                    total_length -= length
+                    self.stale_postings += unique_terms
+                
+                for doc_id, path, state, length, unique_terms in new_documents:
+                    self.connection.execute(
+                        "INSERT INTO documents (id, path, mtime_ns, size, length, unique_terms) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (doc_id, path, state[0], state[1], length, unique_terms)
+                    )
+                    documents[doc_id] = (path, length)
+                    total_length += length
+                    self.total_postings += unique_terms
+                
+                for term, (ids, freqs) in postings.items():
+                    row = self.connection.execute("SELECT ids, freqs FROM terms WHERE term = ?", (term,)).fetchone()
+                    if row is not None:
+                        ids = _from_blob(row[0]) + ids
+                        freqs = _from_blob(row[1]) + freqs
+                    self.connection.execute(
+                        "INSERT OR REPLACE INTO terms (term, ids, freqs) VALUES (?, ?, ?)",
+                        (term, ids.tobytes(), freqs.tobytes())
+                    )
+                self._set_meta(self.connection, 'next_id', str(next_id))
+                self._save_counters()
+            
+            self.documents = documents
+            self.total_length = total_length
+            self.last_changes = {'removed': removed_paths, 'added': tracked} if track else None
+        
+        if self.stale_postings > self.total_postings * self.COMPACT_RATIO:
+            self.compact(cancel_event)
+        return len(new_documents)
+    
+    def iter_postings(self):
+        """
+        Recorre las listas de todos los términos (solo las entradas vigentes).
+        
+        Yields:
+            tuple: (término, ids de los archivos, frecuencias); los ids son
+                claves de self.documents
+        """
+        self.open()
+        with self._lock:
+            rows = self.connection.execute("SELECT term, ids, freqs FROM terms").fetchall()
+            documents = self.documents
+            stale = self.stale_postings > 0
+        for term, ids_blob, freqs_blob in rows:
+            ids = _from_blob(ids_blob)
+            freqs = _from_blob(freqs_blob)
+            if stale:
+                keep = [i for i, doc_id in enumerate(ids) if doc_id in documents]
+                if len(keep) != len(ids):
+                    ids = array('i', (ids[i] for i in keep))
+                    freqs = array('i', (freqs[i] for i in keep))
+            if ids:
+                yield term, ids, freqs
+    
+    def get_term_files(self, terms):
+        """
+        Obtiene los archivos vigentes que contienen cada término.
+        
+        Args:
+            terms (iterable): Términos (en minúsculas, como los de tokenize)
+        
+        Returns:
+            dict: {término: [rutas]}; los términos que no aparecen no tienen entrada
+        """
+        self.open()
+        result = {}
+        documents = self.documents
+        for term in set(terms):
+            row = self._read_postings(term)
+            if row is None:
+                continue
+            paths = [documents[doc_id][0] for doc_id in _from_blob(row[0]) if doc_id in documents]
+            if paths:
+                result[term] = paths
+        return result
+    
+    def _save_counters(self):
+        self._set_meta(self.connection, 'total_postings', str(self.total_postings))
+        self._set_meta(self.connection, 'stale_postings', str(self.stale_postings))
+    
+    def compact(self, cancel_event=None):
+        """
+        Elimina de las listas las entradas de los archivos ya descartados.
+        
+        Args:
+            cancel_event (threading.Event, optional): Señal para interrumpir
+        
+        Returns:
+            bool: True si se completó (si se interrumpe no se guarda nada)
+        """
+        self.open()
+        try:
+            with self._lock, self.connection:
+                live_ids = set(self.documents)
+                total = 0
+                rows = self.connection.execute("SELECT term, ids, freqs FROM terms").fetchall()
+                for term, ids_blob, freqs_blob in rows:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise _Cancelled()
+                    ids = _from_blob(ids_blob)
+                    keep = [i for i, doc_id in enumerate(ids) if doc_id in live_ids]
+                    total += len(keep)
+                    if len(keep) == len(ids):
+                        continue
+                    if not keep:
+                        self.connection.execute("DELETE FROM terms WHERE term = ?", (term,))
+                        continue
+                    freqs = _from_blob(freqs_blob)
+                    self.connection.execute(
+                        "UPDATE terms SET ids = ?, freqs = ? WHERE term = ?",
+                        (array('i', (ids[i] for i in keep)).tobytes(),
+                         array('i', (freqs[i] for i in keep)).tobytes(), term)
+                    )
+                self.total_postings = total
+                self.stale_postings = 0
+                self._save_counters()
+        except _Cancelled:
+            return False
+        return True
+    
+    def _score(self, query, top=None):
+        """
+        Puntúa con BM25 los archivos que contienen algún término de la consulta.
+        
+        Los términos se procesan de más raro a más común. Si solo interesan los
+        mejores resultados, se aplica la poda "MaxScore": cuando lo máximo que
+        pueden aportar los términos restantes ya no alcanza la puntuación del
+        último de los mejores, ningún archivo nuevo puede entrar entre ellos y
+        esos términos solo se buscan (por bisección) en los candidatos que aún
+        pueden hacerlo. El resultado de los mejores es el mismo que sin poda.
+        
+        Args:
+            query (str): Instrucción o descripción de la tarea
+            top (int, optional): Número de mejores resultados que interesan (si
+                no se indica, se puntúan todos los archivos)
+        
+        Returns:
+            tuple: ({id: puntuación}, {término: ids ordenados de sus archivos})
+        """
+        self.open()
+        terms = set(tokenize(query))
+        scores = {}
+        postings = {}
+        if not terms or not self.documents:
+            return scores, postings
+        
+        # Los archivos vigentes se leen una vez: una actualización los sustituye
+        # por un diccionario nuevo al terminar
+        documents = self.documents
+        count = len(documents)
+        average_length = self.total_length / count or 1.0
+        k1 = self.K1
+        norm = k1 * (1 - self.B)
+        scale = k1 * self.B / average_length
+        
+        weighted = []
+        for term in terms:
+            row = self._read_postings(term)
+            if row is None:
+                continue
+            ids = _from_blob(row[0])
+            postings[term] = ids
+            # Frecuencia de documento aproximada (incluye entradas descartadas)
+            frequency = min(len(ids), count)
+            idf = math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            weighted.append((idf, term, ids, _from_blob(row[1])))
+        weighted.sort(reverse=True)
+        
+        # Denominador de BM25 sin la frecuencia, por archivo vigente (se
+        # recalcula solo cuando cambian los archivos)
+        cached = self._norms
+        if cached is not None and cached[0] is documents:
+            norms = cached[1]
+        else:
+            norms = {doc_id: norm + scale * length for doc_id, (_, length) in documents.items()}
+            self._norms = (documents, norms)
+        # Máximo que pueden aportar los términos desde cada posición
+        remaining = [0.0] * (len(weighted) + 1)
+        for index in range(len(weighted) - 1, -1, -1):
+            remaining[index] = remaining[index + 1] + weighted[index][0] * (k1 + 1)
+        
+        for index, (idf, _, ids, freqs) in enumerate(weighted):
+            if top is not None and len(scores) >= top:
+                threshold = heapq.nlargest(top, scores.values())[-1]
+                if remaining[index] < threshold:
+                    candidates = [doc_id for doc_id, score in scores.items()
+                                  if score + remaining[index] >= threshold]
+                    for idf, _, ids, freqs in weighted[index:]:
+                        size = len(ids)
+                        for doc_id in candidates:
+                            position = bisect_left(ids, doc_id)
+                            if position < size and ids[position] == doc_id:
+                                freq = freqs[position]
+                                scores[doc_id] += idf * freq * (k1 + 1) / (freq + norms[doc_id])
+                    break
+            
+            factor = idf * (k1 + 1)
+            for doc_id, freq in zip(ids, freqs):
+                doc_norm = norms.get(doc_id)
+                if doc_norm is not None:
+                    scores[doc_id] = scores.get(doc_id, 0.0) + factor * freq / (freq + doc_norm)
+        return scores, postings
+    
+    def search(self, query, limit=20, exclude=None):
+        """
+        Busca los archivos más relevantes para una consulta.
+        
+        Args:
+            query (str): Instrucción o descripción de la tarea
+            limit (int): Número máximo de resultados
+            exclude (set, optional): Rutas que no deben aparecer (p. ej. las ya
+                incluidas en el contexto)
+        
+        Returns:
+            list: Tuplas (ruta, puntuación, términos coincidentes) de mayor a
+                menor puntuación
+        """
+        exclude = exclude or set()
+        scores, postings = self._score(query, limit + len(exclude))
+        results = []
+        for doc_id, score in heapq.nlargest(limit + len(exclude), scores.items(), key=lambda item: item[1]):
+            document = self.documents.get(doc_id)
+            if document is None or document[0] in exclude:
+                continue
+            matched = [term for term, ids in sorted(postings.items()) if _contains(ids, doc_id)]
+            results.append((document[0], score, matched))
+            if len(results) >= limit:
+                break
+        return results
+    
+    def get_relevance(self, query, file_paths):
+        """
+        Obtiene la relevancia de unos archivos para una consulta, normalizada
+        entre 0 y 1 (1 para el más relevante de ellos).
+        
+        Args:
+            query (str): Instrucción o descripción de la tarea
+            file_paths (list): Rutas de archivo
+        
+        Returns:
+            dict: {ruta: relevancia}; vacío si la consulta no coincide con ninguno
+        """
+        wanted = set(file_paths)
+        scores, _ = self._score(query)
+        found = {}
+        for doc_id, score in scores.items():
+            document = self.documents.get(doc_id)
+            if document is not None and document[0] in wanted:
+                found[document[0]] = score
+        if not found:
+            return {}
+        top = max(found.values())
+        return {path: found.get(path, 0.0) / top for path in file_paths}
+
+def _contains(ids, doc_id):
+    """Indica si una lista ordenada de identificadores contiene uno dado."""
+    position = bisect_left(ids, doc_id)
+    return position < len(ids) and ids[position] == doc_id
+
+def _from_blob(blob):
+    """Convierte una lista guardada en la base de datos en un array de enteros."""
+    values = array('i')
+    values.frombytes(blob)
+    return values
+
+class _Cancelled(Exception):
+    """Interrumpe una compactación (la transacción se deshace)."""
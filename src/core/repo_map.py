@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mapa del repositorio para la cabecera del contexto.
+
+El mapa es un árbol de carpetas comprimido (las carpetas con una sola
+subcarpeta se juntan en una línea) en el que cada archivo lleva sus símbolos
+más importantes. La importancia de un símbolo es su número de referencias: los
+archivos del proyecto, aparte del suyo, que mencionan su nombre. Se obtienen
+de las listas del índice de relevancia, donde el nombre completo de cada
+identificador es un término, sin volver a leer los archivos.
+
+Las entradas (símbolos y archivos) se ordenan de más a menos referencias y el
+mapa incluye tantas como quepan en el presupuesto de tokens, que se busca por
+bisección sobre su número. Las carpetas indican cuántos archivos suyos quedaron
+fuera.
+
+El mapa se actualiza de forma incremental: los símbolos de cada archivo se
+guardan junto a su (mtime, tamaño) y las referencias se ajustan con los
+cambios de la última actualización del índice de relevancia. El texto
+generado se guarda en caché hasta el siguiente cambio.
+"""
+
+import os
+import threading
+
+from src.core.relevance_index import _word_terms
+
+def reference_term(name):
+    """
+    Obtiene el término del índice de relevancia que corresponde a un nombre.
+    
+    Args:
+        name (str): Nombre de un símbolo
+    
+    Returns:
+        str: Término (el identificador completo en minúsculas) o None si el
+            nombre no genera ninguno
+    """
+    terms = _word_terms(name)
+    return terms[0] if terms else None
+
+class RepoMap:
+    """Mapa de carpetas y símbolos de un proyecto ajustado a un presupuesto de tokens."""
+    
+    # Máximo de entradas en caché del texto generado (por presupuesto)
+    MAX_RENDER_CACHE = 8
+    
+    def __init__(self, root):
+        """
+        Inicializa un mapa vacío.
+        
+        Args:
+            root (str): Carpeta raíz del proyecto
+        """
+        self.root = os.path.normpath(root)
+        # Rutas relativas de todos los archivos del proyecto, ordenadas
+        self.paths = []
+        # Símbolos del mapa por archivo {ruta: (estado, [(nombre cualificado, término, línea)])}
+        self._file_symbols = {}
+        # Archivos que mencionan cada término de símbolo {término: set(rutas)}
+        self._term_files = {}
+        # Términos de símbolo presentes en cada archivo {ruta: set(términos)}
+        self._file_terms = {}
+        self._synced = False
+        # Versión del mapa (cambia con cada actualización que lo modifica)
+        self.version = 0
+        # Entradas ordenadas por importancia y caché del texto {presupuesto: texto}
+        self._entries = None
+        self._rendered = {}
+        self._lock = threading.Lock()
+    
+    def is_empty(self):
+        """
+        Indica si el mapa no tiene ningún archivo.
+        
+        Returns:
+            bool: True si no hay archivos
+        """
+        return not self.paths
+    
+    def sync(self, entries, symbol_index, relevance_index=None, cancel_event=None):
+        """
+        Pone el mapa al día con los índices tras su actualización.
+        
+        Args:
+            entries (dict): {ruta: (mtime_ns, tamaño)}, normalmente ScanIndex.entries
+            symbol_index (SymbolIndex): Índice de símbolos ya actualizado
+            relevance_index (RelevanceIndex, optional): Índice de relevancia recién
+                actualizado (sin él, ningún símbolo tiene referencias)
+            cancel_event (threading.Event, optional): Señal para interrumpir
+        
+        Returns:
+            bool: True si el mapa quedó al día
+        """
+        changed = False
+        
+        # Símbolos de cada archivo (solo se recalculan los de archivos modificados)
+        file_symbols = {}
+        for path, (state, symbols) in list(symbol_index.files.items()):
+            if path not in entries:
+                continue
+            cached = self._file_symbols.get(path)
+            if cached is not None and cached[0] == state:
+                file_symbols[path] = cached
+                continue
+            file_symbols[path] = (state, self._select_symbols(symbols))
+            changed = True
+        if cancel_event is not None and cancel_event.is_set():
+            return False
+        changed = changed or len(file_symbols) != len(self._file_symbols)
+        
+        paths = sorted(self._relative_path(path) for path in entries)
+        changed = changed or paths != self.paths
+        
+        wanted = {term for _, rows in file_symbols.values() for _, term, _ in rows}
+        term_files = self._term_files
+        file_terms = self._file_terms
+        if relevance_index is not None:
+            changes = relevance_index.last_changes
+            if not self._synced or changes is None:
+                term_files, file_terms = {}, {}
+            elif changes['removed'] or changes['added']:
+                # Quitar las menciones de los archivos cambiados y añadir las nuevas
+                for path in list(changes['removed']) + [path for path, _ in changes['added']]:
+                    for term in file_terms.pop(path, ()):
+                        if term in term_files:
+                            term_files[term].discard(path)
+                for path, counts in changes['added']:
+                    found = {term for term in counts if term in term_files}
+                    for term in found:
+                        term_files[term].add(path)
+                    if found:
+                        file_terms[path] = found
+                changed = True
+            
+            # Consultar los archivos que mencionan los términos de símbolos nuevos
+            missing = wanted - term_files.keys()
+            if missing:
+                found = relevance_index.get_term_files(missing)
+                for term in missing:
+                    files = set(found.get(term, ()))
+                    term_files[term] = files
+                    for path in files:
+                        file_terms.setdefault(path, set()).add(term)
+                changed = True
+            if cancel_event is not None and cancel_event.is_set():
+                return False
+            
+            for term in term_files.keys() - wanted:
+                del term_files[term]
+        
+        with self._lock:
+            self._file_symbols = file_symbols
+            self._term_files = term_files
+            self._file_terms = file_terms
+            self.paths = paths
+            self._synced = relevance_index is not None
+            if changed:
+                self.version += 1
+                self._entries = None
+                self._rendered = {}
+        return True
+    
+    def _select_symbols(self, symbols):
+        """
+        Elige los símbolos de un archivo que pueden aparecer en el mapa.
+        
+        Solo entran las definiciones de primer nivel y los métodos de sus
+        clases, y ninguno privado (con "_" inicial en alguna parte del nombre).
+        
+        Args:
+            symbols (list): Símbolos del archivo
+        
+        Returns:
+            list: Tuplas (nombre cualificado, término, línea inicial)
+        """
+        rows = []
+        for symbol in symbols:
+            parts = symbol.qualname.split('.')
+            if len(parts) > 2 or (len(parts) == 2 and symbol.kind != 'method'):
+                continue
+            if any(part.startswith('_') for part in parts):
+                continue
+            term = reference_term(symbol.name)
+            if term:
+                rows.append((symbol.qualname, term, symbol.start_line))
+        return rows
+    
+    def _relative_path(self, path):
+        try:
+            return os.path.relpath(path, self.root).replace(os.sep, '/')
+        except ValueError:
+            return path.replace(os.sep, '/')
+    
+    def get_references(self, file_path, term):
+        """
+        Cuenta los archivos, aparte de uno, que mencionan un término.
+        
+        Args:
+            file_path (str): Archivo que define el símbolo
+            term (str): Término del símbolo
+        
+        Returns:
+            int: Número de archivos que lo mencionan
+        """
+        files = self._term_files.get(term)
+        if not files:
+            return 0
+        return len(files) - (1 if file_path in files else 0)
+    
+    def _get_entries(self):
+        """
+        Ordena las entradas del mapa por importancia (con el bloqueo adquirido).
+        
+        Primero van los símbolos con referencias, de más a menos (los métodos,
+        como mucho con las de su clase); después los archivos sin ninguno de
+        ellos, de los menos a los más anidados; y al final los símbolos sin
+        referencias.
+        
+        Returns:
+            list: Tuplas (ruta relativa, (nombre cualificado, línea) o None)
+        """
+        if self._entries is not None:
+            return self._entries
+        
+        referenced = []
+        unreferenced = []
+        for path, (_, rows) in self._file_symbols.items():
+            relative = self._relative_path(path)
+            counts = {qualname: self.get_references(path, term) for qualname, term, _ in rows}
+            for qualname, term, line in rows:
+                # Un método no cuenta más que su clase (los nombres genéricos
+                # como "save" aparecen en muchos archivos que no la usan)
+                head, _, member = qualname.partition('.')
+                references = counts[qualname]
+                if member and head in counts:
+                    references = min(references, counts[head])
+                if references:
+                    referenced.append((-references, relative, line, qualname))
+                else:
+                    unreferenced.append((relative, line, qualname))
+        referenced.sort()
+        unreferenced.sort()
+        
+        shown = {relative for _, relative, _, _ in referenced}
+        files = sorted((path for path in self.paths if path not in shown), key=lambda path: (path.count('/'), path))
+        
+        entries = [(relative, (qualname, line)) for _, relative, line, qualname in referenced]
+        entries.extend((path, None) for path in files)
+        entries.extend((relative, (qualname, line)) for relative, line, qualname in unreferenced)
+        self._entries = entries
+        return entries
+    
+    def invalidate(self):
+        """
+        Descarta los textos generados (p. ej. al cambiar el método de conteo
+        de tokens, que cambia cuántas entradas caben en cada presupuesto).
+        """
+        with self._lock:
+            # Cambiar la versión evita guardar un texto que se esté generando
+            self.version += 1
+            self._rendered = {}
+    
+    def render(self, max_tokens, token_cost):
+        """
+        Genera el mapa con tantas entradas como quepan en un presupuesto.
+        
+        Args:
+            max_tokens (int): Máximo de tokens del mapa
+            token_cost (callable): Función (texto) -> tokens
+        
+        Returns:
+            str: Mapa del repositorio (vacío si no cabe ninguna entrada)
+        """
+        with self._lock:
+            cached = self._rendered.get(max_tokens)
+            if cached is not None:
+                return cached
+            version = self.version
+            entries = self._get_entries()
+            paths = self.paths
+        
+        # Cada entrada ocupa al menos un token, así que no caben más que el presupuesto
+        low, high = 0, min(len(entries), max(0, max_tokens))
+        best = ""
+        while low < high:
+            middle = (low + high + 1) // 2
+            text = _render_tree(entries[:middle], paths)
+            if token_cost(text) <= max_tokens:
+                low, best = middle, text
+            else:
+                high = middle - 1
+        
+        with self._lock:
+            if self.version == version:
+                if len(self._rendered) >= self.MAX_RENDER_CACHE:
+                    self._rendered.clear()
+                self._rendered[max_tokens] = best
+        return best
+
+def _render_tree(entries, paths):
+    """
+    Escribe el árbol comprimido de unas entradas del mapa.
+    
+    Args:
+        entries (list): Tuplas (ruta relativa, (nombre cualificado, línea) o None)
+        paths (list): Rutas relativas de todos los archivos del proyecto
+    
+    Returns:
+        str: Árbol con una línea por carpeta y por archivo
+    """
+    # Símbolos por archivo y árbol de carpetas {nombre: subárbol}; los archivos
+    # se guardan en la clave None de su carpeta
+    file_symbols = {}
+    for path, symbol in entries:
+        symbols = file_symbols.setdefault(path, [])
+        if symbol is not None:
+            symbols.append(symbol)
+    tree = {}
+    for path in file_symbols:
+        node = tree
+        parts = path.split('/')
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node.setdefault(None, []).append(parts[-1])
+    
+    # Archivos por carpeta (en todo su subárbol) para contar los omitidos
+    totals = {}
+    for path in paths:
+        parts = path.split('/')
+        for depth in range(len(parts)):
+            prefix = '/'.join(parts[:depth])
+            totals[prefix] = totals.get(prefix, 0) + 1
+    
+    lines = []
+    
+    def write(node, prefix, indent):
+        for name in sorted(name for name in node if name is not None):
+            # Juntar las carpetas que solo contienen una subcarpeta (también en
+            # el proyecto, para que la cuenta de omitidos sea la de todas ellas)
+            child = node[name]
+            label = name
+            while None not in child and len(child) == 1:
+                subfolder = next(iter(child))
+                if totals.get(f"{prefix}{label}/{subfolder}", 0) != totals.get(f"{prefix}{label}", 0):
+                    break
+                label += f"/{subfolder}"
+                child = child[subfolder]
+            omitted = totals.get(f"{prefix}{label}", 0) - _count_files(child)
+            lines.append(f"{indent}{label}/" + (f" (+{omitted} archivos)" if omitted > 0 else ""))
+            write(child, f"{prefix}{label}/", indent + "  ")
+        for file_name in sorted(node.get(None, ())):
+            names = _format_symbols(file_symbols[f"{prefix}{file_name}"])
+            lines.append(f"{indent}{file_name}" + (f": {names}" if names else ""))
+    
+    write(tree, "", "")
+    if not lines:
+        return ""
+    
+    # Archivos no mostrados de la raíz y de las carpetas que no aparecen (los
+    # de las carpetas mostradas ya se indican en ellas)
+    root_files = sum(1 for path in paths if '/' not in path)
+    omitted_files = root_files - len(tree.get(None, ()))
+    hidden_folders = {path.split('/')[0] for path in paths if '/' in path} - tree.keys()
+    hidden_files = sum(totals[folder] for folder in hidden_folders)
+    omitted = []
+    if omitted_files > 0:
+        omitted.append(f"+{omitted_files} archivos en la raíz")
+    if hidden_folders:
+        folders = "1 carpeta no mostrada" if len(hidden_folders) == 1 else f"{len(hidden_folders)} carpetas no mostradas"
+        omitted.append(f"+{hidden_files} archivos en {folders}")
+    if omitted:
+        lines.append(f"({', '.join(omitted)})")
+    return "\n".join(lines)
+
+def _format_symbols(symbols):
+    """
+    Escribe los símbolos de un archivo agrupando los métodos bajo su clase.
+    
+    Args:
+        symbols (list): Tuplas (nombre cualificado, línea)
+    
+    Returns:
+        str: Nombres en orden de aparición, p. ej. "Clase(metodo, otro), funcion"
+    """
+    # Miembros de cada definición de primer nivel {nombre: [métodos]}, en orden
+    groups = {}
+    for qualname, _ in sorted(symbols, key=lambda symbol: symbol[1]):
+        head, _, member = qualname.partition('.')
+        members = groups.setdefault(head, [])
+        if member:
+            members.append(member)
+    return ", ".join(f"{head}({', '.join(members)})" if members else head for head, members in groups.items())
+
+def _count_files(node):
+    """Cuenta los archivos de un subárbol del mapa."""
+    return len(node.get(None, ())) + sum(_count_files(child) for name, child in node.items() if name is not None)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice de escaneo del proyecto: fecha de modificación y tamaño de cada archivo.
+
+Guarda en la carpeta de caché el último estado visto de cada archivo de código
+del proyecto, de modo que al volver a escanear se sabe qué archivos se han
+añadido, modificado o eliminado sin leer su contenido. Los índices que dependen
+del contenido (búsqueda, símbolos...) solo tienen que procesar esos cambios.
+
+También puede guardar datos derivados del contenido de cada archivo (p. ej. su
+firma MinHash); se descartan automáticamente cuando el archivo cambia.
+"""
+
+import os
+import json
+import threading
+
+from src.utils.file_utils import get_project_cache_file
+
+class ScanIndex:
+    """Estado (mtime, tamaño) de los archivos de un proyecto."""
+    
+    # Versión del formato del archivo de caché
+    FORMAT_VERSION = 1
+    
+    def __init__(self, root, cache_file=None):
+        """
+        Inicializa el índice de un proyecto.
+        
+        Args:
+            root (str): Carpeta raíz del proyecto
+            cache_file (str, optional): Ruta del archivo de caché (por defecto,
+                uno propio del proyecto en la carpeta de caché)
+        """
+        self.root = os.path.normpath(root)
+        self.cache_file = cache_file or get_project_cache_file(self.root, "scan.json")
+        # Estado de cada archivo {ruta: (mtime_ns, tamaño)}
+        self.entries = {}
+        # Datos derivados del contenido de cada archivo {ruta: {nombre: valor}}
+        self.extras = {}
+    
+    def load(self):
+        """
+        Carga el último estado guardado.
+        
+        Returns:
+            bool: True si se cargó un estado válido
+        """
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == self.FORMAT_VERSION and data.get('root') == self.root:
+                    self.entries = {path: tuple(state) for path, state in data.get('files', {}).items()}
+                    self.extras = {path: values for path, values in data.get('extras', {}).items()
+                                   if path in self.entries}
+                    return True
+        except Exception as e:
+            print(f"Error al cargar el índice de escaneo: {str(e)}")
+        return False
+    
+    def save(self):
+        """
+        Guarda el estado actual en la caché.
+        
+        Returns:
+            bool: True si se guardó correctamente
+        """
+        try:
+            data = {
+                'version': self.FORMAT_VERSION,
+                'root': self.root,
+                'files': {path: list(state) for path, state in self.entries.items()},
+                'extras': self.extras
+            }
+            # Escribir en un archivo temporal (uno por hilo) y reemplazar, para
+            # no dejar la caché a medias si se interrumpe
+            temp_file = f"{self.cache_file}.{threading.get_ident()}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_file, self.cache_file)
+            return True
+        except Exception as e:
+            print(f"Error al guardar el índice de escaneo: {str(e)}")
+            return False
+    
+    def refresh(self, files):
+        """
+        Actualiza el estado con los archivos actuales del proyecto.
+        
+        Args:
+            files: Iterable de rutas de archivo (p. ej. FileManager.iter_code_files)
+        
+        Returns:
+            dict: Rutas 'added', 'modified' y 'removed' respecto al estado anterior
+        """
+        previous = self.entries
+        current = {}
+        added = []
+        modified = []
+        
+        for file_path in files:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            state = (stat.st_mtime_ns, stat.st_size)
+            current[file_path] = state
+            
+            old_state = previous.get(file_path)
+            if old_state is None:
+                added.append(file_path)
+            elif old_state != state:
+                modified.append(file_path)
+        
+        removed = [file_path for file_path in previous if file_path not in current]
+        self.entries = current
+        for file_path in modified + removed:
+            self.extras.pop(file_path, None)
+        return {'added': added, 'modified': modified, 'removed': removed}
+    
+    def get_state(self, file_path):
+        """
+        Obtiene el último estado conocido de un archivo.
+        
+        Args:
+            file_path (str): Ruta del archivo
+        
+        Returns:
+            tuple: (mtime_ns, tamaño) o None si no está en el índice
+        """
+        return self.entries.get(file_path)
+    
+    def get_extra(self, file_path, name, default=None):
+        """
+        Obtiene un dato derivado del contenido de un archivo.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            name (str): Nombre del dato
+            default: Valor a devolver si no existe
+        
+        Returns:
+            Valor guardado (válido para el estado actual del archivo) o el valor por defecto
+        """
+        return self.extras.get(file_path, {}).get(name, default)
+    
+    def set_extra(self, file_path, name, value):
+        """
+        Guarda un dato derivado del contenido de un archivo.
+        
+        Args:
+            file_path (str): Ruta del archivo (debe estar en el índice)
+            name (str): Nombre del dato
+            value: Valor serializable en JSON
+        """
+        if file_path in self.entries:
+            self.extras.setdefault(file_path, {})[name] = value
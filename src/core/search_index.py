@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice de búsqueda sobre el contenido del contexto.
+
+Cada selección se indexa una sola vez: se guarda una copia en minúsculas y el
+conjunto de sus trigramas (de bytes UTF-8). Las listas invertidas
+{trigrama: selecciones} se materializan la primera vez que una consulta usa ese
+trigrama y después se mantienen al añadir o quitar selecciones. Antes de cada
+búsqueda el índice se sincroniza con las selecciones actuales (solo se indexan
+las nuevas y se descartan las que ya no existen), y los trigramas de la consulta
+descartan sin recorrerlas las selecciones que no pueden contenerla.
+"""
+
+import re
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_TRIGRAM_RE = re.compile(rb'(?=(...))', re.DOTALL)
+
+def extract_trigrams(text):
+    """
+    Obtiene el conjunto de trigramas de bytes de un texto.
+    
+    Con NumPy cada trigrama se codifica como entero de 24 bits; sin NumPy se
+    usan objetos bytes. Ambas representaciones son coherentes dentro de un
+    mismo proceso, ya que documentos y consultas pasan por esta función.
+    
+    Args:
+        text (str): Texto (ya en minúsculas)
+    
+    Returns:
+        set: Trigramas del texto
+    """
+    data = text.encode('utf-8', errors='replace')
+    if len(data) < 3:
+        return set()
+    
+    if np is not None:
+        values = np.frombuffer(data, dtype=np.uint8).astype(np.uint32)
+        codes = (values[:-2] << 16) | (values[1:-1] << 8) | values[2:]
+        return set(np.unique(codes).tolist())
+    
+    return set(_TRIGRAM_RE.findall(data))
+
+def find_all(text, query):
+    """
+    Genera las posiciones de todas las ocurrencias de un literal.
+    
+    Args:
+        text (str): Texto donde buscar
+        query (str): Literal a buscar
+    
+    Yields:
+        tuple: (inicio, fin) de cada ocurrencia
+    """
+    length = len(query)
+    position = text.find(query)
+    while position != -1:
+        yield position, position + length
+        position = text.find(query, position + length)
+
+def with_lines(file_path, index, content, spans):
+    """
+    Añade número de línea, columna y texto de la línea a cada ocurrencia.
+    
+    Los saltos de línea se cuentan solo entre una coincidencia y la
+    siguiente, así que el coste es lineal en el tamaño de la selección.
+    
+    Args:
+        file_path (str): Ruta del archivo
+        index (int): Índice de la selección
+        content (str): Texto de la selección
+        spans: Iterable de (inicio, fin) en orden creciente
+    
+    Yields:
+        SearchMatch: Coincidencia con su posición
+    """
+    line = 1
+    line_start = 0
+    last = 0
+    for start, end in spans:
+        newlines = content.count('\n', last, start)
+        if newlines:
+            line += newlines
+            line_start = content.rfind('\n', 0, start) + 1
+        last = start
+        
+        line_end = content.find('\n', start)
+        if line_end == -1:
+            line_end = len(content)
+        yield SearchMatch(file_path, index, start, end, line, start - line_start,
+                          content[line_start:line_end])
+
+class _IndexedDocument:
+    """Selección indexada (contenido original y copia en minúsculas)."""
+    
+    __slots__ = ('doc_id', 'content', 'lower', 'trigrams', 'generation')
+    
+    def __init__(self, doc_id, content):
+        self.doc_id = doc_id
+        self.content = content
+        self.lower = content.lower()
+        # La conversión a minúsculas puede cambiar la longitud en algunos
+        # caracteres Unicode; en ese caso se busca sobre el original
+        if len(self.lower) != len(content):
+            self.lower = None
+        self.trigrams = set()
+        self.generation = 0
+
+class SearchMatch:
+    """Una ocurrencia encontrada en una selección."""
+    
+    __slots__ = ('file_path', 'selection_index', 'start', 'end', 'line', 'column', 'line_text')
+    
+    def __init__(self, file_path, selection_index, start, end, line, column, line_text):
+        self.file_path = file_path
+        self.selection_index = selection_index
+        self.start = start
+        self.end = end
+        self.line = line
+        self.column = column
+        self.line_text = line_text
+
+class SelectionSearchIndex:
+    """Índice de trigramas sobre las selecciones del contexto."""
+    
+    # Número máximo de listas invertidas materializadas
+    MAX_POSTINGS = 4096
+    
+    # Caracteres que, sin escapar, hacen que un tramo de regex deje de ser literal
+    _REGEX_SPECIAL = set('.^$*+?{}[]|()\\')
+    
+    def __init__(self):
+        """Inicializa el índice vacío."""
+        # Documentos por clave (ruta, contenido)
+        self.documents = {}
+        # Listas invertidas materializadas {trigrama: set(doc_id)}
+        self.postings = {}
+        self._next_id = 0
+        self._generation = 0
+    
+    def _index_document(self, key, content):
+        """
+        Indexa una selección nueva.
+        
+        Args:
+            key (tuple): Clave (ruta, contenido)
+            content (str): Texto de la selección
+        
+        Returns:
+            _IndexedDocument: Documento indexado
+        """
+        document = _IndexedDocument(self._next_id, content)
+        self._next_id += 1
+        
+        document.trigrams = extract_trigrams(document.lower if document.lower is not None else content.lower())
+        
+        # Mantener al día las listas invertidas ya materializadas
+        trigrams = document.trigrams
+        for trigram, doc_ids in self.postings.items():
+            if trigram in trigrams:
+                doc_ids.add(document.doc_id)
+        
+        self.documents[key] = document
+        return document
+    
+    def _remove_document(self, key):
+        """
+        Elimina una selección del índice.
+        
+        Args:
+            key (tuple): Clave (ruta, contenido)
+        """
+        document = self.documents.pop(key)
+        for doc_ids in self.postings.values():
+            doc_ids.discard(document.doc_id)
+    
+    def sync(self, selections):
+        """
+        Sincroniza el índice con las selecciones actuales.
+        
+        Args:
+            selections (dict): {file_path: [(contenido, es_archivo_completo), ...]}
+        
+        Returns:
+            list: Tuplas (file_path, índice_de_selección, documento) en orden
+        """
+        self._generation += 1
+        ordered = []
+        for file_path, file_selections in selections.items():
+            for index, (content, _) in enumerate(file_selections):
+                key = (file_path, content)
+                document = self.documents.get(key)
+                if document is None:
+                    document = self._index_document(key, content)
+                document.generation = self._generation
+                ordered.append((file_path, index, document))
+        
+        stale = [key for key, document in self.documents.items() if document.generation != self._generation]
+        for key in stale:
+            self._remove_document(key)
+        
+        return ordered
+    
+    def _candidate_ids(self, literals):
+        """
+        Obtiene los documentos que contienen todos los trigramas de los literales.
+        
+        Args:
+            literals (list): Fragmentos (en minúsculas) que toda coincidencia contiene
+        
+        Returns:
+            set: Ids de documento candidatos, o None si no se puede filtrar
+        """
+        trigrams = set()
+        for literal in literals:
+            trigrams.update(extract_trigrams(literal))
+        if not trigrams:
+            return None
+        
+        # Intersecar empezando por la lista más corta
+        candidates = None
+        for doc_ids in sorted((self._get_postings(trigram) for trigram in trigrams), key=len):
+            if not doc_ids:
+                return set()
+            candidates = set(doc_ids) if candidates is None else candidates & doc_ids
+            if not candidates:
+                break
+        return candidates
+    
+    def _get_postings(self, trigram):
+        """
+        Obtiene (materializándola si hace falta) la lista invertida de un trigrama.
+        
+        Args:
+            trigram: Trigrama (según extract_trigrams)
+        
+        Returns:
+            set: Ids de los documentos que contienen el trigrama
+        """
+        doc_ids = self.postings.get(trigram)
+        if doc_ids is None:
+            if len(self.postings) >= self.MAX_POSTINGS:
+                self.postings.clear()
+            doc_ids = {document.doc_id for document in self.documents.values() if trigram in document.trigrams}
+            self.postings[trigram] = doc_ids
+        return doc_ids
+    
+    def _required_literals(self, pattern):
+        """
+        Extrae fragmentos literales que toda coincidencia de una regex contiene.
+        
+        Es conservador: si la expresión tiene alternativas o grupos, no extrae nada.
+        
+        Args:
+            pattern (str): Expresión regular
+        
+        Returns:
+            list: Fragmentos literales en minúsculas
+        """
+        if '|' in pattern or '(' in pattern:
+            return []
+        
+        literals = []
+        current = []
+        i = 0
+        while i < len(pattern):
+            char = pattern[i]
+            if char == '\\' and i + 1 < len(pattern):
+                escaped = pattern[i + 1]
+                if escaped.isalnum():
+                    # \d, \w, \b... no son literales
+                    literals.append(''.join(current))
+                    current = []
+                else:
+                    current.append(escaped)
+                i += 2
+            elif char == '[':
+                literals.append(''.join(current))
+                current = []
+                end = pattern.find(']', i + 2)
+                i = len(pattern) if end == -1 else end + 1
+            elif char in '*?{':
+                # El carácter anterior es opcional o repetible
+                if current:
+                    current.pop()
+                literals.append(''.join(current))
+                current = []
+                if char == '{':
+                    end = pattern.find('}', i)
+                    i = len(pattern) if end == -1 else end + 1
+                else:
+                    i += 1
+            elif char in self._REGEX_SPECIAL:
+                literals.append(''.join(current))
+                current = []
+                i += 1
+            else:
+                current.append(char)
+                i += 1
+        literals.append(''.join(current))
+        
+        return [literal.lower() for literal in literals if len(literal) >= 3]
+    
+    def compile_query(self, query, use_regex=False, whole_word=False, match_case=False):
+        """
+        Compila una consulta.
+        
+        Args:
+            query (str): Texto o expresión regular a buscar
+            use_regex (bool): Interpretar la consulta como expresión regular
+            whole_word (bool): Solo coincidencias de palabra completa
+            match_case (bool): Distinguir mayúsculas de minúsculas
+        
+        Returns:
+            tuple: (patrón compilado, literales requeridos)
+        
+        Raises:
+            re.error: Si la expresión regular no es válida
+        """
+        if use_regex:
+            expression = query
+            literals = self._required_literals(query)
+        else:
+            expression = re.escape(query)
+            literals = [query.lower()]
+        
+        if whole_word:
+            expression = r'\b(?:' + expression + r')\b'
+        
+        flags = re.MULTILINE if match_case else re.MULTILINE | re.IGNORECASE
+        return re.compile(expression, flags), literals
+    
+    def search(self, selections, query, use_regex=False, whole_word=False, match_case=False):
+        """
+        Busca todas las ocurrencias de una consulta en las selecciones.
+        
+        Es un generador: las coincidencias se producen a medida que se
+        encuentran, de modo que la interfaz puede paginarlas sin esperar al final.
+        
+        Args:
+            selections (dict): {file_path: [(contenido, es_archivo_completo), ...]}
+            query (str): Texto o expresión regular a buscar
+            use_regex (bool): Interpretar la consulta como expresión regular
+            whole_word (bool): Solo coincidencias de palabra completa
+            match_case (bool): Distinguir mayúsculas de minúsculas
+        
+        Yields:
+            SearchMatch: Cada ocurrencia, en el orden del contexto
+        
+        Raises:
+            re.error: Si la expresión regular no es válida
+        """
+        pattern, literals = self.compile_query(query, use_regex, whole_word, match_case)
+        ordered = self.sync(selections)
+        candidates = self._candidate_ids(literals)
+        
+        # Búsqueda literal simple: str.find sobre la copia en minúsculas
+        plain = not use_regex and not whole_word and not match_case and query
+        plain_query = query.lower() if plain else None
+        
+        for file_path, index, document in ordered:
+            if candidates is not None and document.doc_id not in candidates:
+                continue
+            
+            if plain and document.lower is not None:
+                spans = find_all(document.lower, plain_query)
+            else:
+                spans = ((m.start(), m.end()) for m in pattern.finditer(document.content) if m.end() > m.start())
+            
+            yield from with_lines(file_path, index, document.content, spans)
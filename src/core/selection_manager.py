@@ -7,11 +7,27 @@ Encapsula la lógica para gestionar selecciones de archivos y fragmentos de cód
 
 import os
 import json
+import hashlib
+from array import array
+from itertools import accumulate
+from collections import OrderedDict
+
+from src.core.token_counter import TokenCounter
+from src.core.context_packer import ContextPacker
+from src.core.search_index import SelectionSearchIndex
+from src.core.outline import OutlineBuilder
+from src.core.minifier import Minifier
+from src.core.deduplicator import BlockDeduplicator
+from src.core.hashing import get_content_hasher
+from src.core.structure import StructureBuilder
+
+# Tipos de región que cuentan como bloque al ampliar una selección
+BLOCK_KINDS = {'block', 'function', 'class'}
 
 class SelectionManager:
     """Clase que gestiona las selecciones de código y archivos para el contexto."""
     
-    def __init__(self, instruction_manager=None):
+    def __init__(self, instruction_manager=None, token_counter=None):
         """Inicializa el gestor de selecciones."""
         # Diccionario para almacenar selecciones {file_path: [(content, is_whole_file), ...]}
         self.selections = {}  
@@ -21,12 +37,67 @@ class SelectionManager:
         self.observers = []
         # Gestor de instrucciones extra
         self.instruction_manager = instruction_manager
+        # Servicio de conteo de tokens (aproximado o BPE exacto)
+        self.token_counter = token_counter or TokenCounter()
+        # Caché de tokens por contenido {(hash, lenguaje): tokens}
+        self._token_cache = {}
+        self.max_token_cache_entries = 100000
+        # Tokens por archivo {file_path: tokens} y total del contexto, que se
+        # actualizan solo para el archivo modificado en cada operación
+        self.file_tokens = {}
+        self.total_tokens = 0
+        # Coste de cada representación de cada archivo {file_path: {'full': n, 'head': m}}
+        self.file_token_options = {}
+        # Archivos cuyo coste como esquema aún no se ha calculado (se calcula
+        # solo al ajustar al presupuesto, porque requiere analizar el archivo)
+        self._pending_outline_costs = set()
+        
+        # Representación de cada archivo elegida al ajustar al presupuesto
+        # {file_path: 'head' | 'outline' | 'excluded'}; los archivos sin entrada
+        # van completos (o como esquema si el usuario lo eligió)
+        self.file_modes = {}
+        # Archivos que el usuario incluyó solo como esquema (firmas y docstrings)
+        self.outline_files = set()
+        # Generador de esquemas (con caché por contenido)
+        self.outline_builder = OutlineBuilder()
+        # Minimización del código al exportar (quitar comentarios y líneas en blanco)
+        self.minifier = Minifier()
+        self.minify_enabled = False
+        # Sustitución de bloques repetidos entre archivos al exportar
+        self.deduplicator = BlockDeduplicator()
+        self.dedup_enabled = False
+        # Archivos que cambiaron desde que se guardaron las selecciones cargadas
+        self.changed_files = []
+        # Prioridad del usuario por archivo {file_path: 'alta' | 'baja'} ('normal' por defecto)
+        self.file_priorities = {}
+        # Orden en que se añadió cada archivo (para valorar la recencia)
+        self.added_order = {}
+        self._add_counter = 0
+        # Líneas que se conservan en la representación "solo el inicio"
+        self.head_lines = 40
+        # Índice de búsqueda (se sincroniza con las selecciones al buscar)
+        self.search_index = SelectionSearchIndex()
+        # Estructura de los archivos (para ampliar selecciones al bloque que las contiene)
+        self.structure_builder = StructureBuilder()
+        # Tablas de inicio de línea por archivo (LRU)
+        # {ruta: ((mtime_ns, tamaño), contenido, desplazamientos)}
+        self._line_tables = OrderedDict()
+        self.max_line_tables = 256
+        # Mapa del repositorio en la cabecera del contexto (lo asigna la
+        # aplicación al abrir una carpeta) y su presupuesto de tokens
+        self.repo_map = None
+        self.repo_map_enabled = False
+        self.repo_map_tokens = 1000
         
         # Formatos para mostrar los elementos del contexto
         self.file_header_format = "--- {filename} ---"
         self.selection_header_format = "Selección {index}:"
+        self.selection_lines_header_format = "Selección {index} (líneas {first}-{last}):"
         self.whole_file_text = "Archivo completo incluido"
+        self.outline_text = "Esquema del archivo (solo firmas)"
         self.instruction_header_format = "### INSTRUCCIÓN EXTRA: {name} ###"
+        self.repo_map_header = "### MAPA DEL REPOSITORIO ###"
+        self.head_omitted_format = "[... {count} líneas omitidas para ajustarse al presupuesto]"
     
     def add_observer(self, observer):
         """Añade un observador para notificar cambios en las selecciones."""
@@ -76,10 +147,14 @@ class SelectionManager:
                 self.selections[file_path] = []
                 self.selection_ranges[file_path] = []
             
-            # Añadir la selección y su rango
+            # Añadir la selección y su rango (None si no se conoce, para que
+            # los rangos sigan alineados con las selecciones)
             self.selections[file_path].append((selection, is_whole_file))
-            if selection_range and not is_whole_file:
-                self.selection_ranges[file_path].append(selection_range)
+            if not is_whole_file:
+                self.selection_ranges[file_path].append(selection_range or None)
+            
+            self._touch_file(file_path)
+            self._update_file_tokens(file_path)
             
             # Notificar a los observadores
             self.notify_observers()
@@ -90,13 +165,15 @@ class SelectionManager:
             traceback.print_exc()
             return False
     
-    def add_whole_file(self, file_path, content):
+    def add_whole_file(self, file_path, content, notify=True):
         """
         Añade un archivo completo al contexto.
         
         Args:
             file_path (str): Ruta del archivo
             content (str): Contenido del archivo
+            notify (bool): Si se notifica a los observadores (False al añadir
+                archivos en bloque)
             
         Returns:
             bool: True si se añadió correctamente
@@ -107,17 +184,256 @@ class SelectionManager:
         
         # Guardar el archivo completo
         self.selections[file_path] = [(content, True)]
+        self.outline_files.discard(file_path)
+        self._touch_file(file_path)
+        self._update_file_tokens(file_path)
         
         # Notificar a los observadores
-        self.notify_observers()
+        if notify:
+            self.notify_observers()
+        return True
+    
+    def add_outline_file(self, file_path, content, notify=True):
+        """
+        Añade un archivo al contexto representado solo por su esquema.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            content (str): Contenido completo del archivo
+            notify (bool): Si se notifica a los observadores
+            
+        Returns:
+            bool: True si se añadió, False si no se puede generar su esquema
+        """
+        if self.outline_builder.get_outline(content, file_path) is None:
+            return False
+        
+        if file_path in self.selection_ranges:
+            self.selection_ranges[file_path] = []
+        
+        # Se guarda el contenido completo; el esquema se genera al exportar
+        self.selections[file_path] = [(content, True)]
+        self.outline_files.add(file_path)
+        self._touch_file(file_path)
+        self._update_file_tokens(file_path)
+        
+        if notify:
+            self.notify_observers()
         return True
     
-    def add_multiple_files(self, file_paths):
+    def is_outline_file(self, file_path):
+        """
+        Comprueba si un archivo está incluido solo como esquema.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            
+        Returns:
+            bool: True si el archivo se incluye como esquema
+        """
+        return file_path in self.outline_files
+    
+    def add_line_window(self, file_path, content, line, radius):
+        """
+        Añade al contexto las líneas que rodean a una línea del archivo.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            content (str): Contenido completo del archivo
+            line (int): Línea central (desde 1)
+            radius (int): Número de líneas a incluir antes y después
+        
+        Returns:
+            bool: True si se añadió, False si ya estaba incluida
+        """
+        return self.add_line_range(file_path, content, line - radius, line + radius)
+    
+    def _get_line_table(self, file_path):
+        """
+        Obtiene el contenido de un archivo y el desplazamiento de inicio de cada línea.
+        
+        La tabla se guarda en caché mientras el archivo no cambie, de modo que
+        extraer cualquier rango de líneas es un corte del contenido.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            
+        Returns:
+            tuple: (contenido, array de desplazamientos con uno más que líneas
+                tiene el archivo) o None si no se puede leer
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        state = (stat.st_mtime_ns, stat.st_size)
+        cached = self._line_tables.get(file_path)
+        if cached is not None and cached[0] == state:
+            self._line_tables.move_to_end(file_path)
+            return cached[1], cached[2]
+        
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                content = f.read()
+        except OSError:
+            return None
+        # Inicio de cada línea y, al final, la longitud del contenido más uno
+        offsets = array('q', [0])
+        offsets.extend(accumulate(len(line) + 1 for line in content.split('\n')))
+        
+        self._line_tables[file_path] = (state, content, offsets)
+        while len(self._line_tables) > self.max_line_tables:
+            self._line_tables.popitem(last=False)
+        return content, offsets
+    
+    def get_selection_lines(self, file_path, index):
+        """
+        Obtiene las líneas del archivo que ocupa una selección.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            index (int): Índice de la selección
+            
+        Returns:
+            tuple: (primera línea, última línea) o None si es el archivo
+                completo o su rango no se conoce
+        """
+        file_selections = self.selections.get(file_path, [])
+        ranges = self.selection_ranges.get(file_path, [])
+        if index >= len(file_selections) or file_selections[index][1] or index >= len(ranges) or not ranges[index]:
+            return None
+        try:
+            first = int(str(ranges[index][0]).split('.')[0])
+            last, last_column = map(int, str(ranges[index][1]).split('.'))
+        except ValueError:
+            return None
+        # Una selección que termina al principio de una línea no la incluye
+        if last_column == 0 and last > first:
+            last -= 1
+        return first, last
+    
+    def get_all_selection_lines(self):
+        """
+        Obtiene las líneas que ocupa cada selección del contexto.
+        
+        Returns:
+            dict: {ruta: [(primera línea, última línea) o None por selección]}
+        """
+        return {file_path: [self.get_selection_lines(file_path, i) for i in range(len(file_selections))]
+                for file_path, file_selections in self.selections.items()}
+    
+    def expand_selections(self, radius=0, to_block=False, file_paths=None):
+        """
+        Convierte las selecciones de líneas en ventanas de contexto más amplias.
+        
+        Cada selección se amplía al bloque (función, clase o sentencia
+        compuesta) que la contiene, si se pide, y después en radius líneas
+        antes y después. Las ventanas de un mismo archivo que se solapan o
+        son contiguas se funden en una. Los archivos incluidos completos y
+        las selecciones sin rango conocido no cambian.
+        
+        Args:
+            radius (int): Líneas que se añaden antes y después de cada selección
+            to_block (bool): Ampliar antes al bloque que contiene cada selección
+            file_paths (list, optional): Archivos a los que aplicarlo (por
+                defecto, todos los del contexto)
+            
+        Returns:
+            tuple: (archivos modificados, ventanas resultantes)
+        """
+        radius = max(0, radius)
+        changed_files = 0
+        window_count = 0
+        for file_path in list(self.selections if file_paths is None else file_paths):
+            file_selections = self.selections.get(file_path)
+            if not file_selections or self.is_whole_file_in_context(file_path):
+                continue
+            
+            intervals = []
+            unranged = []
+            for i, selection in enumerate(file_selections):
+                lines = self.get_selection_lines(file_path, i)
+                if lines is None:
+                    unranged.append(selection)
+                else:
+                    intervals.append(lines)
+            if not intervals:
+                continue
+            table = self._get_line_table(file_path)
+            if table is None:
+                continue
+            content, offsets = table
+            line_count = len(offsets) - 1
+            
+            structure = self.structure_builder.get_structure(file_path) if to_block else None
+            windows = []
+            for first, last in intervals:
+                if structure is not None:
+                    region = structure.enclosing(first, last, BLOCK_KINDS)
+                    if region is not None:
+                        first, last = region.start_line, region.end_line
+                windows.append((max(1, first - radius), min(line_count, last + radius)))
+            
+            # Fundir las ventanas solapadas o contiguas
+            windows.sort()
+            merged = [list(windows[0])]
+            for first, last in windows[1:]:
+                if first <= merged[-1][1] + 1:
+                    merged[-1][1] = max(merged[-1][1], last)
+                else:
+                    merged.append([first, last])
+            
+            new_selections = []
+            new_ranges = []
+            for first, last in merged:
+                end = offsets[last] - 1
+                new_selections.append((content[offsets[first - 1]:end], False))
+                new_ranges.append((f"{first}.0", f"{last}.{end - offsets[last - 1]}"))
+            for selection in unranged:
+                new_selections.append(selection)
+                new_ranges.append(None)
+            
+            self.selections[file_path] = new_selections
+            self.selection_ranges[file_path] = new_ranges
+            self._touch_file(file_path)
+            self._update_file_tokens(file_path)
+            changed_files += 1
+            window_count += len(merged)
+        
+        if changed_files:
+            self.notify_observers()
+        return changed_files, window_count
+    
+    def add_line_range(self, file_path, content, first, last):
+        """
+        Añade al contexto un rango de líneas completas de un archivo.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            content (str): Contenido completo del archivo
+            first (int): Primera línea (desde 1)
+            last (int): Última línea (incluida)
+        
+        Returns:
+            bool: True si se añadió, False si ya estaba incluido
+        """
+        lines = content.split('\n')
+        first = max(1, first)
+        last = min(len(lines), last)
+        if first > last:
+            return False
+        
+        text = '\n'.join(lines[first - 1:last])
+        selection_range = (f"{first}.0", f"{last}.{len(lines[last - 1])}")
+        return self.add_selection(file_path, text, selection_range)
+    
+    def add_multiple_files(self, file_paths, outline=False):
         """
         Añade múltiples archivos completos al contexto.
         
         Args:
             file_paths (list): Lista de rutas de archivos
+            outline (bool): Incluirlos solo como esquema
             
         Returns:
             tuple: (número de archivos añadidos, número de errores)
@@ -131,7 +447,11 @@ class SelectionManager:
                     with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
                         content = f.read()
                     
-                    self.add_whole_file(file_path, content)
+                    if not outline:
+                        self.add_whole_file(file_path, content, notify=False)
+                    elif not self.add_outline_file(file_path, content, notify=False):
+                        error_count += 1
+                        continue
                     success_count += 1
                 else:
                     error_count += 1
@@ -157,6 +477,9 @@ class SelectionManager:
         if file_path in self.selection_ranges:
             del self.selection_ranges[file_path]
         
+        self._forget_file(file_path)
+        self._update_file_tokens(file_path)
+        
         # Notificar a los observadores
         self.notify_observers()
     
@@ -180,6 +503,9 @@ class SelectionManager:
                 del self.selections[file_path]
                 if file_path in self.selection_ranges:
                     del self.selection_ranges[file_path]
+                self._forget_file(file_path)
+            
+            self._update_file_tokens(file_path)
             
             # Notificar a los observadores
             self.notify_observers()
@@ -188,6 +514,14 @@ class SelectionManager:
         """Elimina todas las selecciones."""
         self.selections = {}
         self.selection_ranges = {}
+        self.file_tokens = {}
+        self.file_token_options = {}
+        self._pending_outline_costs = set()
+        self.total_tokens = 0
+        self.file_modes = {}
+        self.file_priorities = {}
+        self.added_order = {}
+        self.outline_files = set()
         
         # Notificar a los observadores
         self.notify_observers()
@@ -299,12 +633,24 @@ class SelectionManager:
                 result.append("")  # Línea en blanco para separar
                 result.append("")  # Línea en blanco adicional
         
+        # Añadir el mapa del repositorio si está activado
+        repo_map_text = self.get_repo_map_text()
+        if repo_map_text:
+            result.append(self.repo_map_header)
+            result.append(repo_map_text)
+            result.append("")
+            result.append("")
+        
         # Verificar si hay selecciones
         if not self.selections:
             return "\n".join(result) if result else ""
         
-        # Añadir selecciones
-        for file_path, file_selections in self.selections.items():
+        # Texto exportado de cada selección (minimizado y sin bloques repetidos)
+        export_texts, _ = self._get_export_texts()
+        
+        # Añadir selecciones (con la representación elegida para cada archivo)
+        for file_path in self.selections:
+            file_selections = self.get_effective_selections(file_path)
             if file_selections:
                 file_name = os.path.basename(file_path)
                 
@@ -318,51 +664,564 @@ class SelectionManager:
                 for i, (selection, is_whole_file) in enumerate(file_selections):
                     if is_whole_file:
                         has_whole_file = True
-                        result.append(self.whole_file_text)
-                        result.append(selection)
+                        if self.get_file_mode(file_path) == 'outline':
+                            result.append(self.outline_text)
+                        else:
+                            result.append(self.whole_file_text)
+                        result.append(export_texts[(file_path, i)])
                         result.append("")  # Línea en blanco para separar
                         break  # Si hay un archivo completo, solo mostramos ese
                 
                 # Si no hay archivo completo, mostrar selecciones individuales
                 if not has_whole_file:
                     for i, (selection, _) in enumerate(file_selections):
-                        section_header = self.selection_header_format.replace("{index}", str(i+1))
+                        lines = self.get_selection_lines(file_path, i)
+                        if lines:
+                            section_header = (self.selection_lines_header_format.replace("{index}", str(i+1))
+                                              .replace("{first}", str(lines[0])).replace("{last}", str(lines[1])))
+                        else:
+                            section_header = self.selection_header_format.replace("{index}", str(i+1))
                         result.append(section_header)
-                        result.append(selection)
+                        result.append(export_texts[(file_path, i)])
                         result.append("")  # Línea en blanco para separar
                 
                 result.append("")  # Línea en blanco adicional entre archivos
         
         return "\n".join(result)
     
+    def set_minify_options(self, enabled, strip_docstrings=True, indent_tabs=False):
+        """
+        Configura la minimización del código al exportar el contexto.
+        
+        Args:
+            enabled (bool): Minimizar el código exportado
+            strip_docstrings (bool): Quitar también los docstrings de Python
+            indent_tabs (bool): Convertir la indentación a tabuladores
+        """
+        self.minify_enabled = enabled
+        self.minifier.configure(strip_docstrings=strip_docstrings, indent_tabs=indent_tabs)
+    
+    def _export_text(self, file_path, content):
+        """
+        Obtiene el texto que se exporta para una selección.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            content (str): Contenido de la selección
+            
+        Returns:
+            str: Contenido minimizado si la opción está activa
+        """
+        if self.minify_enabled:
+            return self.minifier.minify(content, file_path)
+        return content
+    
+    def set_dedup_options(self, enabled, min_lines=6):
+        """
+        Configura la sustitución de bloques repetidos al exportar el contexto.
+        
+        Args:
+            enabled (bool): Sustituir los bloques repetidos por referencias
+            min_lines (int): Mínimo de líneas de un bloque repetido
+        """
+        self.dedup_enabled = enabled
+        self.deduplicator.min_lines = max(1, min_lines)
+    
+    def set_repo_map_options(self, enabled, max_tokens=1000):
+        """
+        Configura el mapa del repositorio en la cabecera del contexto.
+        
+        Args:
+            enabled (bool): Incluir el mapa al exportar el contexto
+            max_tokens (int): Máximo de tokens del mapa
+        """
+        self.repo_map_enabled = enabled
+        self.repo_map_tokens = max(0, max_tokens)
+    
+    def get_repo_map_text(self):
+        """
+        Obtiene el mapa del repositorio ajustado a su presupuesto.
+        
+        Returns:
+            str: Mapa (vacío si está desactivado o aún no se ha generado)
+        """
+        if not self.repo_map_enabled or self.repo_map is None or self.repo_map.is_empty():
+            return ""
+        try:
+            return self.repo_map.render(self.repo_map_tokens, self.count_tokens)
+        except Exception as e:
+            print(f"Error al generar el mapa del repositorio: {str(e)}")
+            return ""
+    
+    def _get_export_texts(self):
+        """
+        Obtiene el texto que se exporta de cada selección del contexto.
+        
+        Aplica la representación de cada archivo, la minimización y, si está
+        activada, la sustitución de bloques repetidos (en el orden de exportación).
+        
+        Returns:
+            tuple: ({(file_path, índice): texto}, estadísticas de la
+                deduplicación o None si no está activada)
+        """
+        keys = []
+        documents = []
+        for file_path in self.selections:
+            file_selections = self.get_effective_selections(file_path)
+            file_name = os.path.basename(file_path)
+            whole_index = next((i for i, (_, is_whole_file) in enumerate(file_selections) if is_whole_file), None)
+            
+            for i, (selection, _) in enumerate(file_selections):
+                if whole_index is not None and i != whole_index:
+                    continue
+                label = file_name if whole_index is not None else f"{file_name} (selección {i + 1})"
+                text = self._export_text(file_path, selection)
+                
+                # Primera línea del archivo, para que las referencias citen su
+                # numeración (None si las líneas exportadas no son las del archivo)
+                if whole_index is not None:
+                    first_line = None if self.get_file_mode(file_path) == 'outline' else 1
+                else:
+                    lines = self.get_selection_lines(file_path, i)
+                    first_line = lines[0] if lines else None
+                if text != selection:
+                    # Minimizado: se han quitado líneas
+                    first_line = None
+                
+                keys.append((file_path, i))
+                documents.append((label, text, first_line))
+        
+        if not self.dedup_enabled:
+            return {key: text for key, (_, text, _) in zip(keys, documents)}, None
+        
+        texts, dedup_stats = self.deduplicator.deduplicate(documents)
+        
+        # Ahorro en bytes y tokens (solo de los documentos modificados)
+        dedup_stats['bytes'] = 0
+        dedup_stats['tokens'] = 0
+        for (file_path, _), (_, original, _), text in zip(keys, documents, texts):
+            if text != original:
+                language = os.path.splitext(file_path)[1].lower()
+                dedup_stats['bytes'] += len(original.encode('utf-8')) - len(text.encode('utf-8'))
+                dedup_stats['tokens'] += self.count_tokens(original, language) - self.count_tokens(text, language)
+        
+        return dict(zip(keys, texts)), dedup_stats
+    
+    def get_dedup_stats(self):
+        """
+        Calcula cuánto ahorra la sustitución de bloques repetidos en el contexto actual.
+        
+        Returns:
+            dict: {'blocks', 'lines', 'chars', 'bytes', 'tokens'} o None si no
+                está activada
+        """
+        return self._get_export_texts()[1]
+    
+    def get_minified_tokens(self):
+        """
+        Cuenta los tokens de las selecciones tal y como se exportan minimizadas.
+        
+        Returns:
+            int: Número de tokens de las selecciones tras la minimización
+        """
+        tokens = 0
+        for file_path in self.selections:
+            language = os.path.splitext(file_path)[1].lower()
+            for content, _ in self.get_effective_selections(file_path):
+                tokens += self.count_tokens(self.minifier.minify(content, file_path), language)
+        return tokens
+    
     def search_in_selections(self, search_text):
         """
-        Busca texto en todas las selecciones.
+        Busca texto en todas las selecciones (sin distinguir mayúsculas).
         
         Args:
             search_text (str): Texto a buscar
             
         Returns:
-            dict: Diccionario con los resultados de la búsqueda
+            dict: {file_path: [(índice, selección, inicio, fin), ...]} con todas
+                las ocurrencias
         """
         results = {}
+        for match in self.iter_search(search_text):
+            selection = self.selections[match.file_path][match.selection_index][0]
+            results.setdefault(match.file_path, []).append(
+                (match.selection_index, selection, match.start, match.end))
+        return results
+    
+    def iter_search(self, query, use_regex=False, whole_word=False, match_case=False):
+        """
+        Busca todas las ocurrencias de una consulta usando el índice de trigramas.
         
-        for file_path, file_selections in self.selections.items():
-            file_results = []
+        Args:
+            query (str): Texto o expresión regular a buscar
+            use_regex (bool): Interpretar la consulta como expresión regular
+            whole_word (bool): Solo coincidencias de palabra completa
+            match_case (bool): Distinguir mayúsculas de minúsculas
             
-            for i, (selection, is_whole_file) in enumerate(file_selections):
-                if search_text.lower() in selection.lower():
-                    # Encontrar la posición de la primera ocurrencia
-                    start_pos = selection.lower().find(search_text.lower())
-                    end_pos = start_pos + len(search_text)
-                    
-                    # Agregar a los resultados
-                    file_results.append((i, selection, start_pos, end_pos))
+        Yields:
+            SearchMatch: Cada ocurrencia; 'line' es la línea en el archivo
+                cuando se conoce la posición de la selección
             
-            if file_results:
-                results[file_path] = file_results
+        Raises:
+            re.error: Si la expresión regular no es válida
+        """
+        for match in self.search_index.search(self.selections, query, use_regex, whole_word, match_case):
+            match.line += self._selection_line_offset(match.file_path, match.selection_index)
+            yield match
+    
+    def _selection_line_offset(self, file_path, index):
+        """
+        Obtiene cuántas líneas del archivo preceden a una selección.
         
-        return results
+        Args:
+            file_path (str): Ruta del archivo
+            index (int): Índice de la selección
+            
+        Returns:
+            int: Desplazamiento de línea (0 si es el archivo completo o no se conoce)
+        """
+        file_selections = self.selections.get(file_path, [])
+        if index >= len(file_selections) or file_selections[index][1]:
+            return 0
+        ranges = self.selection_ranges.get(file_path, [])
+        if index < len(ranges) and ranges[index]:
+            try:
+                return int(str(ranges[index][0]).split('.')[0]) - 1
+            except ValueError:
+                pass
+        return 0
+    
+    def _touch_file(self, file_path):
+        """
+        Registra un cambio del usuario en un archivo: pasa a ser el más reciente
+        y vuelve a incluirse completo.
+        
+        Args:
+            file_path (str): Ruta del archivo
+        """
+        self._add_counter += 1
+        self.added_order[file_path] = self._add_counter
+        self.file_modes.pop(file_path, None)
+    
+    def _forget_file(self, file_path):
+        """
+        Elimina el estado de empaquetado de un archivo que sale del contexto.
+        
+        Args:
+            file_path (str): Ruta del archivo
+        """
+        self.file_modes.pop(file_path, None)
+        self.file_priorities.pop(file_path, None)
+        self.added_order.pop(file_path, None)
+        self.outline_files.discard(file_path)
+    
+    def _head_text(self, content):
+        """
+        Obtiene la representación "solo el inicio" de un archivo.
+        
+        Args:
+            content (str): Contenido completo del archivo
+            
+        Returns:
+            str: Primeras líneas y un aviso con las líneas omitidas
+        """
+        end = -1
+        for _ in range(self.head_lines):
+            end = content.find('\n', end + 1)
+            if end == -1:
+                return content
+        
+        omitted_lines = content.count('\n', end + 1) + 1
+        return content[:end + 1] + self.head_omitted_format.replace("{count}", str(omitted_lines))
+    
+    def _outline_text(self, file_path, content):
+        """
+        Obtiene la representación "esquema" de un archivo.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            content (str): Contenido completo del archivo
+            
+        Returns:
+            str: Esquema del archivo (el contenido completo si no se puede generar)
+        """
+        outline = self.outline_builder.get_outline(content, file_path)
+        return content if outline is None else outline
+    
+    def get_file_mode(self, file_path):
+        """
+        Obtiene la representación con la que se incluye un archivo.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            
+        Returns:
+            str: 'full', 'head', 'outline' o 'excluded'
+        """
+        mode = self.file_modes.get(file_path)
+        if mode is None:
+            mode = 'outline' if file_path in self.outline_files else 'full'
+        return mode
+    
+    def get_effective_selections(self, file_path):
+        """
+        Obtiene las selecciones de un archivo con su representación aplicada.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            
+        Returns:
+            list: Tuplas (contenido, es_archivo_completo); vacía si el archivo
+                está excluido
+        """
+        file_selections = self.selections.get(file_path, [])
+        mode = self.get_file_mode(file_path)
+        if mode == 'excluded':
+            return []
+        if mode == 'head':
+            return [(self._head_text(content), is_whole_file) if is_whole_file else (content, is_whole_file)
+                    for content, is_whole_file in file_selections]
+        if mode == 'outline':
+            return [(self._outline_text(file_path, content), is_whole_file) if is_whole_file
+                    else (content, is_whole_file)
+                    for content, is_whole_file in file_selections]
+        return file_selections
+    
+    def get_effective_context(self):
+        """
+        Obtiene todas las selecciones con la representación de cada archivo aplicada.
+        
+        Returns:
+            dict: Diccionario de selecciones por archivo (sin los excluidos)
+        """
+        result = {}
+        for file_path in self.selections:
+            file_selections = self.get_effective_selections(file_path)
+            if file_selections:
+                result[file_path] = file_selections
+        return result
+    
+    def set_priority(self, file_path, priority):
+        """
+        Establece la prioridad de un archivo para el ajuste al presupuesto.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            priority (str): 'alta', 'normal' o 'baja'
+        """
+        if priority == 'normal':
+            self.file_priorities.pop(file_path, None)
+        else:
+            self.file_priorities[file_path] = priority
+    
+    def get_priority(self, file_path):
+        """
+        Obtiene la prioridad de un archivo.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            
+        Returns:
+            str: 'alta', 'normal' o 'baja'
+        """
+        return self.file_priorities.get(file_path, 'normal')
+    
+    def pack_to_budget(self, budget, relevance=None):
+        """
+        Elige la representación de cada archivo para no superar el presupuesto.
+        
+        Usa los recuentos de tokens en caché, así que con miles de archivos
+        tarda milisegundos. Los archivos no se eliminan del contexto: se marcan
+        como completos, esquema, "solo el inicio" o excluidos, y reset_packing()
+        deshace el ajuste. Los archivos que el usuario incluyó como esquema solo
+        pueden quedarse como esquema o excluirse.
+        
+        Args:
+            budget (int): Presupuesto de tokens para todo el contexto
+            relevance (dict, optional): {file_path: puntuación entre 0 y 1}
+            
+        Returns:
+            dict: Resultado de ContextPacker.pack() más el recuento de cada
+                representación en 'counts'
+        """
+        packer = ContextPacker()
+        
+        # Descontar la instrucción extra y un coste fijo por encabezado de archivo
+        budget -= self.get_context_tokens() - self.total_tokens
+        header_tokens = 8
+        self._add_outline_costs()
+        
+        newest = max(self.added_order.values(), default=1)
+        items = []
+        for file_path, token_options in self.file_token_options.items():
+            options = {mode: tokens + header_tokens for mode, tokens in token_options.items()}
+            items.append(packer.build_item(
+                file_path, options,
+                priority=self.get_priority(file_path),
+                recency=self.added_order.get(file_path, 0) / newest,
+                relevance=relevance.get(file_path, 0.0) if relevance else None
+            ))
+        
+        result = packer.pack(items, max(0, budget))
+        
+        self.file_modes = {path: mode for path, mode in result['plan'].items()
+                           if mode != ('outline' if path in self.outline_files else 'full')}
+        self._apply_file_modes()
+        
+        result['counts'] = {}
+        for mode in result['plan'].values():
+            result['counts'][mode] = result['counts'].get(mode, 0) + 1
+        
+        self.notify_observers()
+        return result
+    
+    def reset_packing(self):
+        """Vuelve a incluir completos todos los archivos del contexto."""
+        if self.file_modes:
+            self.file_modes = {}
+            self._apply_file_modes()
+            self.notify_observers()
+    
+    def _apply_file_modes(self):
+        """Recalcula los tokens efectivos tras cambiar las representaciones."""
+        self.total_tokens = 0
+        for file_path, options in self.file_token_options.items():
+            mode = self.get_file_mode(file_path)
+            tokens = 0 if mode == 'excluded' else options.get(mode, max(options.values()))
+            self.file_tokens[file_path] = tokens
+            self.total_tokens += tokens
+    
+    def count_tokens(self, content, language=None):
+        """
+        Cuenta los tokens de un texto usando la caché por hash de contenido.
+        
+        Args:
+            content (str): Texto a contar
+            language (str, optional): Extensión del archivo de origen
+            
+        Returns:
+            int: Número de tokens
+        """
+        digest = hashlib.blake2b(content.encode('utf-8', errors='replace'), digest_size=16).digest()
+        key = (digest, language)
+        tokens = self._token_cache.get(key)
+        if tokens is None:
+            tokens = self.token_counter.count(content, language)
+            if len(self._token_cache) >= self.max_token_cache_entries:
+                self._token_cache.clear()
+            self._token_cache[key] = tokens
+        return tokens
+    
+    def _update_file_tokens(self, file_path):
+        """
+        Recalcula los tokens de un archivo y ajusta el total por diferencia.
+        
+        Args:
+            file_path (str): Ruta del archivo modificado
+        """
+        file_selections = self.selections.get(file_path, [])
+        self._pending_outline_costs.discard(file_path)
+        if not file_selections:
+            self.total_tokens -= self.file_tokens.pop(file_path, 0)
+            self.file_token_options.pop(file_path, None)
+            return
+        
+        # Coste de cada representación (se reutiliza al ajustar al presupuesto).
+        # El del esquema solo se calcula aquí si el archivo va como esquema
+        if file_path in self.outline_files:
+            options = {'outline': self._count_outline_tokens(file_path)}
+        else:
+            language = os.path.splitext(file_path)[1].lower()
+            full_tokens = sum(self.count_tokens(content, language) for content, _ in file_selections)
+            options = {'full': full_tokens}
+            if any(is_whole_file for _, is_whole_file in file_selections):
+                head_tokens = sum(self.count_tokens(self._head_text(content) if is_whole_file else content, language)
+                                  for content, is_whole_file in file_selections)
+                if head_tokens < full_tokens:
+                    options['head'] = head_tokens
+                self._pending_outline_costs.add(file_path)
+        self.file_token_options[file_path] = options
+        
+        mode = self.get_file_mode(file_path)
+        tokens = 0 if mode == 'excluded' else options.get(mode, max(options.values()))
+        
+        self.total_tokens += tokens - self.file_tokens.get(file_path, 0)
+        self.file_tokens[file_path] = tokens
+    
+    def _count_outline_tokens(self, file_path):
+        """
+        Cuenta los tokens de un archivo representado como esquema.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            
+        Returns:
+            int: Número de tokens
+        """
+        language = os.path.splitext(file_path)[1].lower()
+        return sum(
+            self.count_tokens(self._outline_text(file_path, content) if is_whole_file else content, language)
+            for content, is_whole_file in self.selections.get(file_path, []))
+    
+    def _add_outline_costs(self):
+        """Añade el coste como esquema de los archivos que aún no lo tienen."""
+        for file_path in self._pending_outline_costs:
+            options = self.file_token_options.get(file_path)
+            if options is None:
+                continue
+            outline_tokens = self._count_outline_tokens(file_path)
+            if outline_tokens < options['full']:
+                options['outline'] = outline_tokens
+        self._pending_outline_costs = set()
+    
+    def recount_tokens(self, clear_cache=False):
+        """
+        Recalcula los tokens de todo el contexto.
+        
+        Args:
+            clear_cache (bool): Si se descarta la caché (p. ej. al cambiar el
+                método de conteo)
+        """
+        if clear_cache:
+            self._token_cache.clear()
+        self.file_tokens = {}
+        self.file_token_options = {}
+        self._pending_outline_costs = set()
+        self.total_tokens = 0
+        for file_path in self.selections:
+            self._update_file_tokens(file_path)
+    
+    def get_context_tokens(self):
+        """
+        Obtiene los tokens del contexto completo (selecciones, instrucción extra
+        y mapa del repositorio).
+        
+        Returns:
+            int: Número de tokens
+        """
+        tokens = self.total_tokens
+        if self.instruction_manager and self.instruction_manager.get_current_instruction():
+            instruction_content = self.instruction_manager.get_current_instruction_content()
+            if instruction_content:
+                tokens += self.count_tokens(instruction_content)
+        repo_map_text = self.get_repo_map_text()
+        if repo_map_text:
+            tokens += self.count_tokens(repo_map_text)
+        return tokens
+    
+    def get_token_breakdown(self, limit=None):
+        """
+        Obtiene los tokens por archivo, de mayor a menor.
+        
+        Args:
+            limit (int, optional): Número máximo de archivos a devolver
+            
+        Returns:
+            list: Tuplas (file_path, tokens)
+        """
+        items = sorted(self.file_tokens.items(), key=lambda item: item[1], reverse=True)
+        return items[:limit] if limit else items
     
     def get_selection_stats(self):
         """
@@ -386,6 +1245,7 @@ class SelectionManager:
             
             stats['total_files'] += 1
             file_chars = 0
+            file_tokens = self.file_tokens.get(file_path, 0)
             has_whole_file = False
             
             for selection, is_whole_file in file_selections:
@@ -406,14 +1266,47 @@ class SelectionManager:
                 'path': file_path,
                 'size': file_chars,
                 'is_whole': has_whole_file,
-                'selections': len(file_selections)
+                'selections': len(file_selections),
+                'tokens': file_tokens,
+                'mode': self.get_file_mode(file_path)
             })
         
-        # Estimación aproximada de tokens (4 caracteres por token como regla general)
-        stats['approx_tokens'] = stats['total_chars'] // 4
+        stats['approx_tokens'] = self.total_tokens
+        if self.minify_enabled:
+            stats['minified_tokens'] = self.get_minified_tokens()
+        if self.dedup_enabled:
+            stats['dedup'] = self.get_dedup_stats()
+        stats['token_method'] = self.token_counter.get_method_label()
         
         return stats
     
+    def get_file_hash(self, file_path):
+        """
+        Obtiene el resumen del contenido actual de un archivo en disco.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            
+        Returns:
+            str: Resumen en hexadecimal o None si no se pudo leer
+        """
+        return get_content_hasher().get_digest(file_path)
+    
+    def get_file_hashes(self, file_paths=None):
+        """
+        Obtiene los resúmenes del contenido de varios archivos.
+        
+        Args:
+            file_paths (list, optional): Rutas de archivo (por defecto, los
+                archivos con selecciones)
+            
+        Returns:
+            dict: {ruta: resumen o None si no se pudo leer}
+        """
+        if file_paths is None:
+            file_paths = list(self.selections.keys())
+        return get_content_hasher().hash_files(file_paths)
+    
     def save_selections_to_file(self, file_path):
         """
         Guarda las selecciones en un archivo JSON.
@@ -426,6 +1319,8 @@ class SelectionManager:
         """
         try:
             data = {}
+            # Resumen de cada archivo, para detectar al cargar si ha cambiado
+            digests = self.get_file_hashes()
             
             # Preparar datos para guardado
             for path, selections in self.selections.items():
@@ -436,10 +1331,15 @@ class SelectionManager:
                         'content': selection,
                         'is_whole_file': is_whole_file
                     }
+                    if digests.get(path):
+                        selection_data['digest'] = digests[path]
+                    if is_whole_file and path in self.outline_files:
+                        selection_data['outline'] = True
                     
                     # Agregar rangos si existen
-                    if path in self.selection_ranges and i < len(self.selection_ranges[path]):
-                        start, end = self.selection_ranges[path][i]
+                    ranges = self.selection_ranges.get(path, [])
+                    if i < len(ranges) and ranges[i]:
+                        start, end = ranges[i]
                         selection_data['range'] = {
                             'start': start,
                             'end': end
@@ -473,6 +1373,14 @@ class SelectionManager:
             # Limpiar selecciones actuales
             self.selections = {}
             self.selection_ranges = {}
+            self.file_modes = {}
+            self.file_priorities = {}
+            self.added_order = {}
+            self.outline_files = set()
+            self.changed_files = []
+            
+            # Resúmenes actuales de los archivos guardados
+            digests = get_content_hasher().hash_files([path for path in data if os.path.exists(path)])
             
             # Cargar selecciones
             for path, selections in data.items():
@@ -481,12 +1389,18 @@ class SelectionManager:
                 
                 self.selections[path] = []
                 self.selection_ranges[path] = []
+                self._touch_file(path)
                 
                 for selection_data in selections:
                     content = selection_data['content']
                     is_whole_file = selection_data.get('is_whole_file', False)
                     
                     self.selections[path].append((content, is_whole_file))
+                    saved_digest = selection_data.get('digest')
+                    if saved_digest and saved_digest != digests.get(path) and path not in self.changed_files:
+                        self.changed_files.append(path)
+                    if is_whole_file and selection_data.get('outline'):
+                        self.outline_files.add(path)
                     
                     # Cargar rango si existe
                     if 'range' in selection_data:
@@ -495,6 +1409,8 @@ class SelectionManager:
                     else:
                         self.selection_ranges[path].append(None)
             
+            self.recount_tokens()
+            
             # Notificar a los observadores
             self.notify_observers()
             
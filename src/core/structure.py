@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Estructura de un archivo para la selección estructural del visor.
+
+La estructura es la lista de regiones (rangos de líneas completas) que se
+pueden seleccionar de una vez: clases, funciones, bloques y sentencias de
+varias líneas. Los archivos Python se analizan con ast, que da la línea final
+exacta de cada sentencia; en el resto de lenguajes las clases y funciones
+salen del escáner del índice de símbolos y los bloques de emparejar llaves,
+corchetes y paréntesis en una sola pasada (o de la indentación si el archivo
+no tiene bloques entre llaves).
+
+Las estructuras se guardan en caché por (ruta, mtime, tamaño), de modo que
+las órdenes de selección sobre un archivo ya analizado solo recorren la lista
+de regiones.
+"""
+
+import os
+import re
+import ast
+import bisect
+import threading
+from collections import OrderedDict
+
+from src.core.file_manager import FileManager
+from src.core.symbol_index import CONTAINER_KINDS, LANGUAGE_SCANNERS, extract_regex_symbols
+
+# Orden de preferencia de los tipos cuando dos regiones ocupan las mismas líneas
+_KIND_RANK = {'class': 0, 'function': 1, 'block': 2, 'statement': 3}
+
+# Sentencias de Python que contienen otras
+_PYTHON_BLOCKS = tuple(getattr(ast, name) for name in (
+    'If', 'For', 'AsyncFor', 'While', 'With', 'AsyncWith', 'Try', 'TryStar', 'Match'
+) if hasattr(ast, name))
+
+_STRING_RE = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|`[^`]*`')
+_CLOSING = {')': '(', ']': '[', '}': '{'}
+
+class Region:
+    """Un rango de líneas seleccionable de una vez."""
+    
+    __slots__ = ('start_line', 'end_line', 'kind', 'name')
+    
+    def __init__(self, start_line, end_line, kind, name=""):
+        self.start_line = start_line
+        self.end_line = end_line
+        self.kind = kind
+        self.name = name
+
+class FileStructure:
+    """Regiones de un archivo ordenadas para buscar las que contienen una selección."""
+    
+    def __init__(self, regions):
+        """
+        Inicializa la estructura.
+        
+        Args:
+            regions (list): Regiones del archivo en cualquier orden
+        """
+        # Quitar duplicados (mismas líneas) conservando el tipo más significativo
+        unique = {}
+        for region in sorted(regions, key=lambda region: _KIND_RANK.get(region.kind, 9)):
+            unique.setdefault((region.start_line, region.end_line), region)
+        self.regions = sorted(unique.values(), key=lambda region: (region.start_line, -region.end_line))
+        self._starts = [region.start_line for region in self.regions]
+    
+    def enclosing(self, first_line, last_line, kinds=None, strict=False):
+        """
+        Busca la región más pequeña que contiene un rango de líneas.
+        
+        Args:
+            first_line (int): Primera línea (desde 1)
+            last_line (int): Última línea (incluida)
+            kinds (set, optional): Tipos de región admitidos (por defecto, todos)
+            strict (bool): Exigir que la región sea mayor que el rango
+        
+        Returns:
+            Region: Región encontrada o None
+        """
+        best = None
+        for index in range(bisect.bisect_right(self._starts, first_line) - 1, -1, -1):
+            region = self.regions[index]
+            if region.end_line < last_line or (kinds is not None and region.kind not in kinds):
+                continue
+            if strict and region.start_line == first_line and region.end_line == last_line:
+                continue
+            if best is None or region.end_line - region.start_line < best.end_line - best.start_line:
+                best = region
+        return best
+    
+    def largest_inside(self, first_line, last_line, line):
+        """
+        Busca la mayor región estrictamente dentro de un rango que contiene una línea.
+        
+        Args:
+            first_line (int): Primera línea del rango
+            last_line (int): Última línea del rango
+            line (int): Línea que debe contener la región
+        
+        Returns:
+            Region: Región encontrada o None
+        """
+        best = None
+        start = bisect.bisect_left(self._starts, first_line)
+        end = bisect.bisect_right(self._starts, line)
+        for region in self.regions[start:end]:
+            if region.end_line < line or region.end_line > last_line:
+                continue
+            if region.start_line == first_line and region.end_line == last_line:
+                continue
+            if best is None or region.end_line - region.start_line > best.end_line - best.start_line:
+                best = region
+        return best
+
+def extract_python_regions(source):
+    """
+    Obtiene las regiones de un archivo Python con el módulo ast.
+    
+    Args:
+        source (str): Código fuente
+    
+    Returns:
+        list: Regiones (clases, funciones, bloques y sentencias de varias líneas)
+    
+    Raises:
+        SyntaxError: Si el código no se puede analizar
+    """
+    regions = []
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.ExceptHandler):
+            regions.append(Region(node.lineno, node.end_lineno, 'block'))
+            continue
+        if not isinstance(node, ast.stmt):
+            continue
+        
+        start, end = node.lineno, node.end_lineno or node.lineno
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            # La definición empieza en su primer decorador
+            start = min([start] + [decorator.lineno for decorator in node.decorator_list])
+            kind = 'class' if isinstance(node, ast.ClassDef) else 'function'
+            regions.append(Region(start, end, kind, node.name))
+        elif isinstance(node, _PYTHON_BLOCKS):
+            regions.append(Region(start, end, 'block'))
+        elif end > start:
+            regions.append(Region(start, end, 'statement'))
+    return regions
+
+def extract_bracket_regions(lines):
+    """
+    Obtiene los bloques entre llaves, corchetes o paréntesis que ocupan varias líneas.
+    
+    Ignora de forma aproximada cadenas y comentarios de línea. Si la llave
+    de apertura está sola en su línea, el bloque empieza en la línea anterior
+    (la cabecera, en el estilo de llaves en línea propia).
+    
+    Args:
+        lines (list): Líneas del archivo
+    
+    Returns:
+        list: Regiones de tipo 'block'
+    """
+    regions = []
+    # Aperturas pendientes [(carácter, índice de línea)]
+    stack = []
+    for index, line in enumerate(lines):
+        code = _STRING_RE.sub('""', line)
+        comment = code.find('//')
+        if comment != -1:
+            code = code[:comment]
+        for char in code:
+            if char in '([{':
+                stack.append((char, index))
+            elif char in _CLOSING:
+                if not stack or stack[-1][0] != _CLOSING[char]:
+                    continue
+                _, open_index = stack.pop()
+                if index > open_index:
+                    start = open_index
+                    if lines[open_index].strip() == '{':
+                        start = _previous_content(lines, open_index)
+                    regions.append(Region(start + 1, index + 1, 'block'))
+    return regions
+
+def _previous_content(lines, index):
+    """Índice de la última línea no vacía antes de una línea."""
+    for previous in range(index - 1, -1, -1):
+        if lines[previous].strip():
+            return previous
+    return index
+
+def extract_indent_regions(lines):
+    """
+    Obtiene los bloques delimitados por indentación en una sola pasada.
+    
+    Cada línea seguida de líneas más indentadas forma un bloque con ellas.
+    
+    Args:
+        lines (list): Líneas del archivo
+    
+    Returns:
+        list: Regiones de tipo 'block'
+    """
+    regions = []
+    # Líneas abiertas [(indentación, índice de línea)]
+    stack = []
+    last_content = None
+    for index, line in enumerate(lines):
+        stripped = line.strip()
+        if not stripped:
+            continue
+        indent = len(line) - len(line.lstrip())
+        while stack and stack[-1][0] >= indent:
+            _, open_index = stack.pop()
+            if last_content > open_index:
+                regions.append(Region(open_index + 1, last_content + 1, 'block'))
+        stack.append((indent, index))
+        last_content = index
+    for _, open_index in stack:
+        if last_content > open_index:
+            regions.append(Region(open_index + 1, last_content + 1, 'block'))
+    return regions
+
+def extract_regions(source, file_path, language):
+    """
+    Obtiene las regiones seleccionables de un archivo.
+    
+    Args:
+        source (str): Código fuente
+        file_path (str): Ruta del archivo
+        language (str): Nombre del lenguaje (según FileManager) o None
+    
+    Returns:
+        list: Regiones del archivo
+    """
+    if language == 'Python':
+        try:
+            return extract_python_regions(source)
+        except (SyntaxError, ValueError, RecursionError):
+            # Código con errores de sintaxis: usar la indentación
+            return extract_indent_regions(source.split('\n'))
+    
+    lines = source.split('\n')
+    regions = extract_bracket_regions(lines)
+    if not regions:
+        regions = extract_indent_regions(lines)
+    if language in LANGUAGE_SCANNERS:
+        for symbol in extract_regex_symbols(source, file_path, language):
+            if symbol.kind in CONTAINER_KINDS:
+                kind = 'class'
+            elif symbol.kind in ('function', 'method'):
+                kind = 'function'
+            else:
+                kind = 'block'
+            regions.append(Region(symbol.start_line, symbol.end_line, kind, symbol.name))
+    return regions
+
+class StructureBuilder:
+    """Obtiene la estructura de los archivos y la guarda en caché por (ruta, mtime, tamaño)."""
+    
+    # Tamaño máximo de archivo que se analiza (bytes)
+    MAX_FILE_SIZE = 8 * 1024 * 1024
+    
+    def __init__(self, max_cache_entries=32):
+        """
+        Inicializa el generador.
+        
+        Args:
+            max_cache_entries (int): Número máximo de estructuras en caché
+        """
+        self.languages = FileManager().code_extensions
+        self.max_cache_entries = max_cache_entries
+        # Caché LRU {(ruta, mtime_ns, tamaño): FileStructure o None}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_structure(self, file_path):
+        """
+        Obtiene la estructura de un archivo.
+        
+        Args:
+            file_path (str): Ruta del archivo
+        
+        Returns:
+            FileStructure: Estructura del archivo o None si no se puede leer
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        key = (os.path.normpath(file_path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        
+        structure = None
+        if stat.st_size <= self.MAX_FILE_SIZE:
+            try:
+                with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                    source = f.read()
+                language = self.languages.get(os.path.splitext(file_path)[1].lower())
+                structure = FileStructure(extract_regions(source, file_path, language))
+            except Exception as e:
+                print(f"Error al analizar la estructura de {file_path}: {str(e)}")
+        
+        with self._lock:
+            self._cache[key] = structure
+            while len(self._cache) > self.max_cache_entries:
+                self._cache.popitem(last=False)
+        return structure
@@ -0,0 +1,593 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice de símbolos (clases, funciones, métodos...) de los archivos del proyecto.
+
+Los archivos Python se analizan con el módulo ast, que da la línea inicial y
+final exactas de cada definición (incluidas las anidadas). Para el resto de
+lenguajes de FileManager.code_extensions se usa un escáner ligero de
+expresiones regulares por línea; el final de cada definición se busca
+emparejando llaves en los lenguajes que las usan y, en los demás, por
+indentación.
+
+Los símbolos de cada archivo se guardan junto a su (mtime, tamaño), así que al
+actualizar el índice solo se vuelven a analizar los archivos modificados. La
+caché se persiste en la carpeta de caché del proyecto.
+"""
+
+import os
+import re
+import ast
+import json
+
+from src.utils.file_utils import get_project_cache_file
+
+class Symbol:
+    """Una definición encontrada en un archivo."""
+    
+    __slots__ = ('name', 'qualname', 'kind', 'file_path', 'start_line', 'end_line')
+    
+    def __init__(self, name, qualname, kind, file_path, start_line, end_line):
+        self.name = name
+        self.qualname = qualname
+        self.kind = kind
+        self.file_path = file_path
+        self.start_line = start_line
+        self.end_line = end_line
+    
+    def to_list(self):
+        """
+        Convierte el símbolo en una lista serializable (sin la ruta).
+        
+        Returns:
+            list: [nombre, nombre cualificado, tipo, línea inicial, línea final]
+        """
+        return [self.name, self.qualname, self.kind, self.start_line, self.end_line]
+
+# Tipos de símbolo que pueden contener métodos
+CONTAINER_KINDS = {'class', 'interface', 'struct', 'enum', 'trait', 'impl', 'module', 'object'}
+
+def extract_python_symbols(source, file_path):
+    """
+    Extrae las definiciones de un archivo Python con el módulo ast.
+    
+    Args:
+        source (str): Código fuente
+        file_path (str): Ruta del archivo
+    
+    Returns:
+        list: Símbolos en orden de aparición
+    
+    Raises:
+        SyntaxError: Si el código no se puede analizar
+    """
+    tree = ast.parse(source, filename=file_path)
+    symbols = []
+    
+    def visit(node, parent_qualname, parent_kind):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                if isinstance(child, ast.ClassDef):
+                    kind = 'class'
+                elif parent_kind == 'class':
+                    kind = 'method'
+                else:
+                    kind = 'function'
+                
+                qualname = f"{parent_qualname}.{child.name}" if parent_qualname else child.name
+                # La definición empieza en su primer decorador
+                start = min([child.lineno] + [decorator.lineno for decorator in child.decorator_list])
+                end = getattr(child, 'end_lineno', None) or child.lineno
+                symbols.append(Symbol(child.name, qualname, kind, file_path, start, end))
+                visit(child, qualname, kind)
+            else:
+                # Definiciones dentro de if/try/with... pertenecen al mismo ámbito
+                visit(child, parent_qualname, parent_kind)
+    
+    visit(tree, "", None)
+    symbols.sort(key=lambda symbol: symbol.start_line)
+    return symbols
+
+# Patrones por lenguaje: (expresión con grupo 'name', tipo). Un grupo 'kind'
+# opcional sustituye al tipo fijo.
+_IDENT = r'[A-Za-z_$][\w$]*'
+_JS_PATTERNS = [
+    (r'^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*(?P<name>' + _IDENT + r')', 'function'),
+    (r'^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+(?P<name>' + _IDENT + r')', 'class'),
+    (r'^\s*(?:export\s+)?(?:declare\s+)?(?P<kind>interface|enum)\s+(?P<name>' + _IDENT + r')', None),
+    (r'^\s*(?:export\s+)?(?:const|let|var)\s+(?P<name>' + _IDENT + r')\s*=\s*(?:async\s+)?'
+     r'(?:function\b|\([^)]*\)\s*(?::[^=]+)?=>|' + _IDENT + r'\s*=>)', 'function'),
+    (r'^\s+(?:(?:static|async|public|private|protected|readonly|override|get|set)\s+)*'
+     r'(?P<name>' + _IDENT + r')\s*\([^)]*\)\s*(?::[^{]+)?\{', 'method'),
+]
+_JAVA_LIKE_PATTERNS = [
+    (r'^\s*(?:(?:public|private|protected|internal|static|final|abstract|sealed|partial|open|data|'
+     r'inner|enum|annotation)\s+)*(?P<kind>class|interface|enum|struct|record|object|protocol|extension)\s+'
+     r'(?P<name>[A-Za-z_]\w*)', None),
+    (r'^\s*(?:(?:public|private|protected|internal|static|override|open|suspend|inline|private\(set\)|'
+     r'mutating|final)\s+)*(?:fun|func)\s+(?:<[^>]*>\s*)?(?:[\w.]+\.)?(?P<name>[A-Za-z_]\w*)', 'function'),
+    (r'^\s*(?:(?:public|private|protected|internal|static|final|abstract|override|virtual|async|sealed|'
+     r'synchronized|extern|unsafe|partial|new|native)\s+)+[\w<>\[\],.?]+\s+(?P<name>[A-Za-z_]\w*)\s*\(', 'method'),
+]
+_GO_PATTERNS = [
+    (r'^func\s+(?:\([^)]*\)\s*)?(?P<name>[A-Za-z_]\w*)', 'function'),
+    (r'^type\s+(?P<name>[A-Za-z_]\w*)\s+(?P<kind>struct|interface)', None),
+]
+_RUST_PATTERNS = [
+    (r'^\s*(?:pub(?:\([^)]*\))?\s+)?(?:const\s+)?(?:async\s+)?(?:unsafe\s+)?(?:extern\s+"[^"]*"\s+)?'
+     r'fn\s+(?P<name>[A-Za-z_]\w*)', 'function'),
+    (r'^\s*(?:pub(?:\([^)]*\))?\s+)?(?P<kind>struct|enum|trait|mod)\s+(?P<name>[A-Za-z_]\w*)', None),
+    (r'^\s*(?:unsafe\s+)?(?P<kind>impl)(?:<[^>]*>)?\s+(?:[\w:<>, ]+\s+for\s+)?(?P<name>[A-Za-z_][\w:]*)', None),
+]
+_C_PATTERNS = [
+    (r'^(?:typedef\s+)?(?P<kind>struct|class|enum|union|namespace)\s+(?P<name>[A-Za-z_]\w*)\s*(?::[^{;]*)?\{?\s*$', None),
+    (r'^(?!(?:if|for|while|switch|return|else|do|case)\b)(?:[\w*&:<>,]+\s+)+\**&?'
+     r'(?P<name>[A-Za-z_~][\w:~]*)\s*\([^;]*$', 'function'),
+    (r'^[-+]\s*\([^)]*\)\s*(?P<name>[A-Za-z_]\w*)', 'method'),
+]
+_PHP_PATTERNS = [
+    (r'^\s*(?:(?:abstract|final|public|private|protected|static)\s+)*function\s+&?(?P<name>[A-Za-z_]\w*)', 'function'),
+    (r'^\s*(?:(?:abstract|final|readonly)\s+)*(?P<kind>class|interface|trait|enum)\s+(?P<name>[A-Za-z_]\w*)', None),
+]
+_RUBY_PATTERNS = [
+    (r'^\s*def\s+(?:self\.)?(?P<name>[A-Za-z_]\w*[?!=]?)', 'method'),
+    (r'^\s*(?P<kind>class|module)\s+(?P<name>[A-Z][\w:]*)', None),
+]
+_SHELL_PATTERNS = [
+    (r'^\s*function\s+(?P<name>[A-Za-z_][\w-]*)', 'function'),
+    (r'^\s*(?P<name>[A-Za-z_][\w-]*)\s*\(\)\s*\{?', 'function'),
+]
+_PERL_PATTERNS = [
+    (r'^\s*sub\s+(?P<name>[A-Za-z_]\w*)', 'function'),
+    (r'^\s*package\s+(?P<name>[\w:]+)', 'module'),
+]
+_SQL_PATTERNS = [
+    (r'(?i)^\s*create\s+(?:or\s+replace\s+)?(?P<kind>table|view|function|procedure|trigger|index)\s+'
+     r'(?:if\s+not\s+exists\s+)?(?P<name>[\w."`\[\]]+)', None),
+]
+_PYTHON_PATTERNS = [
+    (r'^\s*(?:async\s+)?def\s+(?P<name>[A-Za-z_]\w*)', 'function'),
+    (r'^\s*class\s+(?P<name>[A-Za-z_]\w*)', 'class'),
+]
+
+# Patrones y forma de delimitar los bloques de cada lenguaje (por nombre en FileManager)
+LANGUAGE_SCANNERS = {
+    'JavaScript': (_JS_PATTERNS, 'braces'),
+    'TypeScript': (_JS_PATTERNS, 'braces'),
+    'Vue': (_JS_PATTERNS, 'braces'),
+    'Java': (_JAVA_LIKE_PATTERNS, 'braces'),
+    'C#': (_JAVA_LIKE_PATTERNS, 'braces'),
+    'Kotlin': (_JAVA_LIKE_PATTERNS, 'braces'),
+    'Swift': (_JAVA_LIKE_PATTERNS, 'braces'),
+    'Go': (_GO_PATTERNS, 'braces'),
+    'Rust': (_RUST_PATTERNS, 'braces'),
+    'C': (_C_PATTERNS, 'braces'),
+    'C++': (_C_PATTERNS, 'braces'),
+    'C/C++ Header': (_C_PATTERNS, 'braces'),
+    'Objective-C': (_C_PATTERNS, 'braces'),
+    'PHP': (_PHP_PATTERNS, 'braces'),
+    'Perl': (_PERL_PATTERNS, 'braces'),
+    'Shell': (_SHELL_PATTERNS, 'braces'),
+    'Ruby': (_RUBY_PATTERNS, 'end'),
+    'SQL': (_SQL_PATTERNS, 'statement'),
+    'Python': (_PYTHON_PATTERNS, 'indent'),
+}
+
+_COMPILED_SCANNERS = {}
+
+# Palabras que los patrones de métodos pueden confundir con nombres
+_KEYWORDS = {'if', 'for', 'while', 'switch', 'catch', 'return', 'else', 'do', 'case', 'function',
+             'new', 'typeof', 'sizeof', 'with', 'elif', 'foreach', 'using', 'lock', 'fixed'}
+
+# Máximo de líneas que se recorren buscando el cierre de un bloque
+MAX_BLOCK_LINES = 20000
+
+def _get_scanner(language):
+    """
+    Obtiene los patrones compilados y el modo de bloque de un lenguaje.
+    
+    Args:
+        language (str): Nombre del lenguaje (según FileManager)
+    
+    Returns:
+        tuple: ([(regex, tipo)], modo) o None si el lenguaje no tiene escáner
+    """
+    scanner = _COMPILED_SCANNERS.get(language)
+    if scanner is None and language in LANGUAGE_SCANNERS:
+        patterns, block_mode = LANGUAGE_SCANNERS[language]
+        scanner = ([(re.compile(pattern), kind) for pattern, kind in patterns], block_mode)
+        _COMPILED_SCANNERS[language] = scanner
+    return scanner
+
+_STRING_RE = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|`[^`]*`')
+
+def _find_brace_end(lines, start_index):
+    """
+    Busca la línea que cierra el bloque entre llaves que empieza en una línea.
+    
+    Ignora de forma aproximada cadenas y comentarios de línea. Si antes de la
+    primera llave aparece un ';', la definición es una declaración sin cuerpo.
+    
+    Args:
+        lines (list): Líneas del archivo
+        start_index (int): Índice (desde 0) de la línea de la definición
+    
+    Returns:
+        int: Índice de la última línea del bloque
+    """
+    depth = 0
+    opened = False
+    last_index = min(len(lines), start_index + MAX_BLOCK_LINES)
+    for index in range(start_index, last_index):
+        line = _STRING_RE.sub('""', lines[index])
+        comment = line.find('//')
+        if comment != -1:
+            line = line[:comment]
+        for char in line:
+            if char == '{':
+                depth += 1
+                opened = True
+            elif char == '}':
+                depth -= 1
+                if opened and depth <= 0:
+                    return index
+            elif char == ';' and not opened:
+                return index
+        # Una definición sin llave en las primeras líneas no tiene cuerpo
+        if not opened and index - start_index >= 5:
+            return start_index
+    return start_index if not opened else last_index - 1
+
+def _indent_of(line):
+    return len(line) - len(line.lstrip())
+
+def _find_indent_end(lines, start_index, end_keyword=None):
+    """
+    Busca el final de un bloque delimitado por indentación (o por 'end').
+    
+    Args:
+        lines (list): Líneas del archivo
+        start_index (int): Índice (desde 0) de la línea de la definición
+        end_keyword (str, optional): Palabra que cierra el bloque al mismo nivel
+    
+    Returns:
+        int: Índice de la última línea del bloque
+    """
+    indent = _indent_of(lines[start_index])
+    last_content = start_index
+    last_index = min(len(lines), start_index + MAX_BLOCK_LINES)
+    for index in range(start_index + 1, last_index):
+        line = lines[index]
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if _indent_of(line) <= indent:
+            if end_keyword and stripped.split()[0] == end_keyword:
+                return index
+            # En Python los decoradores y paréntesis de cierre no terminan el bloque
+            if end_keyword is None and stripped[0] in ')]}':
+                last_content = index
+                continue
+            break
+        last_content = index
+    return last_content
+
+def _find_statement_end(lines, start_index):
+    """
+    Busca el ';' que cierra una sentencia (SQL).
+    
+    Args:
+        lines (list): Líneas del archivo
+        start_index (int): Índice (desde 0) de la línea de la definición
+    
+    Returns:
+        int: Índice de la última línea de la sentencia
+    """
+    last_index = min(len(lines), start_index + MAX_BLOCK_LINES)
+    for index in range(start_index, last_index):
+        if ';' in lines[index]:
+            return index
+    return last_index - 1
+
+def extract_regex_symbols(source, file_path, language):
+    """
+    Extrae las definiciones de un archivo con el escáner de expresiones regulares.
+    
+    Args:
+        source (str): Código fuente
+        file_path (str): Ruta del archivo
+        language (str): Nombre del lenguaje (según FileManager)
+    
+    Returns:
+        list: Símbolos en orden de aparición (vacía si el lenguaje no tiene escáner)
+    """
+    scanner = _get_scanner(language)
+    if scanner is None:
+        return []
+    patterns, block_mode = scanner
+    
+    lines = source.split('\n')
+    symbols = []
+    # Pila de definiciones abiertas para construir los nombres cualificados
+    stack = []
+    
+    for index, line in enumerate(lines):
+        if not line or line.isspace():
+            continue
+        
+        for pattern, kind in patterns:
+            match = pattern.match(line)
+            if not match:
+                continue
+            name = match.group('name')
+            if name in _KEYWORDS:
+                continue
+            if kind is None:
+                kind = match.group('kind').lower()
+            
+            if block_mode == 'braces':
+                end_index = _find_brace_end(lines, index)
+            elif block_mode == 'end':
+                end_index = _find_indent_end(lines, index, 'end')
+            elif block_mode == 'indent':
+                end_index = _find_indent_end(lines, index)
+            else:
+                end_index = _find_statement_end(lines, index)
+            
+            while stack and stack[-1].end_line < index + 1:
+                stack.pop()
+            parent = stack[-1] if stack else None
+            if parent is not None and kind == 'function' and parent.kind in CONTAINER_KINDS:
+                kind = 'method'
+            qualname = f"{parent.qualname}.{name}" if parent is not None else name
+            
+            symbol = Symbol(name, qualname, kind, file_path, index + 1, end_index + 1)
+            symbols.append(symbol)
+            if end_index > index:
+                stack.append(symbol)
+            break
+    
+    return symbols
+
+def extract_symbols(source, file_path, language):
+    """
+    Extrae las definiciones de un archivo con el método adecuado a su lenguaje.
+    
+    Args:
+        source (str): Código fuente
+        file_path (str): Ruta del archivo
+        language (str): Nombre del lenguaje (según FileManager)
+    
+    Returns:
+        list: Símbolos en orden de aparición
+    """
+    if language == 'Python':
+        try:
+            return extract_python_symbols(source, file_path)
+        except (SyntaxError, ValueError, RecursionError):
+            # Código con errores de sintaxis: usar el escáner aproximado
+            pass
+    return extract_regex_symbols(source, file_path, language)
+
+def _match_score(query, symbol):
+    """
+    Puntúa lo bien que un símbolo coincide con una consulta (menor es mejor).
+    
+    Args:
+        query (str): Consulta en minúsculas
+        symbol (Symbol): Símbolo candidato
+    
+    Returns:
+        int: Puntuación, o None si no coincide
+    """
+    name = symbol.name.lower()
+    if name == query:
+        return 0
+    if name.startswith(query):
+        return 1
+    qualname = symbol.qualname.lower()
+    if qualname == query or qualname.endswith('.' + query):
+        return 0
+    position = qualname.find(query)
+    if position != -1:
+        return 2 + (0 if position == 0 else 1)
+    
+    # Subsecuencia: los caracteres de la consulta aparecen en orden
+    gaps = 0
+    position = -1
+    for char in query:
+        found = qualname.find(char, position + 1)
+        if found == -1:
+            return None
+        gaps += found - position - 1
+        position = found
+    return 10 + gaps
+
+class SymbolIndex:
+    """Índice de símbolos de un proyecto, actualizado de forma incremental."""
+    
+    # Versión del formato del archivo de caché
+    FORMAT_VERSION = 1
+    
+    # Tamaño máximo de archivo que se analiza (bytes)
+    MAX_FILE_SIZE = 4 * 1024 * 1024
+    
+    def __init__(self, root, file_manager, cache_file=None):
+        """
+        Inicializa el índice de un proyecto.
+        
+        Args:
+            root (str): Carpeta raíz del proyecto
+            file_manager (FileManager): Gestor de archivos (para el lenguaje de cada archivo)
+            cache_file (str, optional): Ruta del archivo de caché (por defecto,
+                uno propio del proyecto en la carpeta de caché)
+        """
+        self.root = os.path.normpath(root)
+        self.file_manager = file_manager
+        self.cache_file = cache_file or get_project_cache_file(self.root, "symbols.json")
+        # Símbolos por archivo {ruta: ((mtime_ns, tamaño), [Symbol, ...])}
+        self.files = {}
+        # Lista plana de todos los símbolos (se reemplaza entera al actualizar)
+        self.symbols = []
+    
+    def load(self):
+        """
+        Carga la caché guardada.
+        
+        Returns:
+            bool: True si se cargó una caché válida
+        """
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == self.FORMAT_VERSION and data.get('root') == self.root:
+                    files = {}
+                    for path, (mtime_ns, size, items) in data.get('files', {}).items():
+                        files[path] = ((mtime_ns, size), [Symbol(item[0], item[1], item[2], path, item[3], item[4])
+                                                          for item in items])
+                    self.files = files
+                    self._rebuild_symbol_list()
+                    return True
+        except Exception as e:
+            print(f"Error al cargar el índice de símbolos: {str(e)}")
+        return False
+    
+    def save(self):
+        """
+        Guarda la caché.
+        
+        Returns:
+            bool: True si se guardó correctamente
+        """
+        try:
+            data = {
+                'version': self.FORMAT_VERSION,
+                'root': self.root,
+                'files': {path: [state[0], state[1], [symbol.to_list() for symbol in symbols]]
+                          for path, (state, symbols) in self.files.items()}
+            }
+            temp_file = self.cache_file + ".tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_file, self.cache_file)
+            return True
+        except Exception as e:
+            print(f"Error al guardar el índice de símbolos: {str(e)}")
+            return False
+    
+    def update(self, entries, cancel_event=None):
+        """
+        Actualiza el índice con el estado actual de los archivos.
+        
+        Solo se analizan los archivos nuevos o cuyo (mtime, tamaño) ha cambiado.
+        
+        Args:
+            entries (dict): {ruta: (mtime_ns, tamaño)}, normalmente ScanIndex.entries
+            cancel_event (threading.Event, optional): Señal para interrumpir la actualización
+        
+        Returns:
+            int: Número de archivos analizados
+        """
+        files = {}
+        parsed = 0
+        for path, state in entries.items():
+            if cancel_event is not None and cancel_event.is_set():
+                return parsed
+            
+            state = tuple(state)
+            cached = self.files.get(path)
+            if cached is not None and cached[0] == state:
+                files[path] = cached
+                continue
+            
+            files[path] = (state, self._parse_file(path, state[1]))
+            parsed += 1
+        
+        self.files = files
+        self._rebuild_symbol_list()
+        return parsed
+    
+    def _parse_file(self, path, size):
+        """
+        Extrae los símbolos de un archivo.
+        
+        Args:
+            path (str): Ruta del archivo
+            size (int): Tamaño en bytes
+        
+        Returns:
+            list: Símbolos del archivo (vacía si no se puede leer)
+        """
+        language = self.file_manager.get_file_type(path)
+        if size > self.MAX_FILE_SIZE or (language != 'Python' and _get_scanner(language) is None):
+            return []
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                source = f.read()
+        except OSError:
+            return []
+        try:
+            return extract_symbols(source, path, language)
+        except Exception as e:
+            print(f"Error al extraer símbolos de {path}: {str(e)}")
+            return []
+    
+    def _rebuild_symbol_list(self):
+        """Reconstruye la lista plana de símbolos."""
+        self.symbols = [symbol for _, symbols in self.files.values() for symbol in symbols]
+    
+    def get_file_symbols(self, file_path):
+        """
+        Obtiene los símbolos de un archivo.
+        
+        Args:
+            file_path (str): Ruta del archivo
+        
+        Returns:
+            list: Símbolos del archivo en orden de aparición
+        """
+        cached = self.files.get(file_path)
+        return list(cached[1]) if cached else []
+    
+    def find_enclosing(self, file_path, line):
+        """
+        Busca la definición más interna que contiene una línea.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            line (int): Número de línea (desde 1)
+        
+        Returns:
+            Symbol: Símbolo que contiene la línea, o None
+        """
+        best = None
+        for symbol in self.get_file_symbols(file_path):
+            if symbol.start_line <= line <= symbol.end_line:
+                if best is None or symbol.end_line - symbol.start_line <= best.end_line - best.start_line:
+                    best = symbol
+        return best
+    
+    def search(self, query, limit=100):
+        """
+        Busca símbolos por nombre (coincidencia exacta, prefijo, subcadena o subsecuencia).
+        
+        Args:
+            query (str): Nombre o parte del nombre (admite "Clase.metodo")
+            limit (int): Número máximo de resultados
+        
+        Returns:
+            list: Símbolos ordenados por relevancia
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+        
+        scored = []
+        for symbol in self.symbols:
+            score = _match_score(query, symbol)
+            if score is not None:
+                scored.append((score, len(symbol.qualname), symbol.qualname, symbol))
+        
+        scored.sort(key=lambda item: item[:3])
+        return [item[3] for item in scored[:limit]]
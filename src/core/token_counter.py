@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servicio de conteo de tokens del Selector de Contexto.
+Elige el método de estimación según la configuración ("token_method").
+"""
+
+import os
+
+from src.core.tokenizers.bpe_tokenizer import load_bpe_tokenizer
+from src.core.tokenizers.calibrated_estimator import CalibratedEstimator
+
+class TokenCounter:
+    """Cuenta tokens con el método configurado por el usuario."""
+    
+    # Valores de "token_method" en app_settings.json
+    METHOD_SIMPLE = "Simple (caracteres/4)"
+    METHOD_CALIBRATED = "Calibrado (rápido)"
+    METHOD_BPE = "Avanzado"
+    
+    METHODS = [METHOD_SIMPLE, METHOD_CALIBRATED, METHOD_BPE]
+    
+    # Directorio por defecto donde buscar vocabularios BPE locales
+    DEFAULT_VOCAB_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "config", "tokenizers")
+    
+    def __init__(self, method=METHOD_SIMPLE, vocab_path=None):
+        """
+        Inicializa el contador de tokens.
+        
+        Args:
+            method (str): Método de conteo (uno de METHODS)
+            vocab_path (str, optional): Vocabulario BPE (archivo o directorio)
+        """
+        self.method = method
+        self.vocab_path = vocab_path
+        self.last_error = None
+        self._bpe = None
+        self._bpe_loaded = False
+        self._estimator = None
+    
+    def configure(self, method=None, vocab_path=None):
+        """
+        Cambia el método de conteo o el vocabulario BPE.
+        
+        Args:
+            method (str, optional): Nuevo método de conteo
+            vocab_path (str, optional): Nuevo vocabulario BPE
+            
+        Returns:
+            bool: True si ha cambiado la configuración (los recuentos previos
+                dejan de ser válidos)
+        """
+        changed = False
+        if method is not None and method != self.method:
+            self.method = method
+            changed = True
+        if vocab_path is not None and vocab_path != self.vocab_path:
+            self.vocab_path = vocab_path
+            # Forzar la recarga del vocabulario en el siguiente uso
+            self._bpe = None
+            self._bpe_loaded = False
+            changed = True
+        return changed
+    
+    def _get_bpe(self):
+        """
+        Carga (una sola vez) el tokenizador BPE configurado.
+        
+        Returns:
+            BPETokenizer: Tokenizador o None si no hay vocabulario disponible
+        """
+        if not self._bpe_loaded:
+            self._bpe_loaded = True
+            try:
+                self._bpe = load_bpe_tokenizer(self.vocab_path or self.DEFAULT_VOCAB_DIR)
+                self.last_error = None
+            except Exception as e:
+                self._bpe = None
+                self.last_error = str(e)
+                print(f"No se pudo cargar el vocabulario BPE: {str(e)}")
+        return self._bpe
+    
+    def _get_estimator(self):
+        """
+        Carga (una sola vez) el estimador calibrado.
+        
+        Returns:
+            CalibratedEstimator: Estimador con la calibración guardada o la predeterminada
+        """
+        if self._estimator is None:
+            self._estimator = CalibratedEstimator.load()
+        return self._estimator
+    
+    def is_exact(self):
+        """
+        Indica si el método activo cuenta tokens de forma exacta.
+        
+        Returns:
+            bool: True si se usa el tokenizador BPE
+        """
+        return self.method.startswith(self.METHOD_BPE) and self._get_bpe() is not None
+    
+    def get_method_label(self):
+        """
+        Obtiene una descripción corta del método efectivo (para la interfaz).
+        
+        Returns:
+            str: Descripción del método
+        """
+        if self.is_exact():
+            return "exactos (BPE)"
+        if self.method == self.METHOD_CALIBRATED:
+            return "estimados"
+        return "aproximados"
+    
+    def count(self, text, language=None):
+        """
+        Cuenta los tokens de un texto.
+        
+        Args:
+            text (str): Texto a contar
+            language (str, optional): Lenguaje del texto (extensión)
+        
+        Returns:
+            int: Número de tokens
+        """
+        if not text:
+            return 0
+        
+        if self.method.startswith(self.METHOD_BPE):
+            bpe = self._get_bpe()
+            if bpe is not None:
+                return bpe.count_tokens(text)
+        elif self.method == self.METHOD_CALIBRATED:
+            return self._get_estimator().estimate(text, language)
+        
+        # Estimación aproximada (4 caracteres por token como regla general)
+        return len(text) // 4
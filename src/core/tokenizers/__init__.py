@@ -0,0 +1,3 @@
+"""
+Tokenizadores locales para contar tokens sin conexión.
+"""
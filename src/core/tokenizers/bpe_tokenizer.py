@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tokenizador BPE a nivel de byte que funciona sin conexión.
+
+Carga vocabularios locales en formato tiktoken (una línea "token_base64 rango"
+por token) o en formato GPT-2 (vocab.json + merges.txt) y cuenta tokens de
+forma exacta para los modelos que usan ese vocabulario.
+"""
+
+import os
+import json
+import base64
+import re
+
+try:
+    # El módulo 'regex' admite clases Unicode (\p{L}); si no está instalado se
+    # usan equivalentes aproximados con 're'
+    import regex as _regex
+except ImportError:
+    _regex = None
+
+# Patrones de pre-tokenización (división del texto en fragmentos antes del BPE)
+GPT2_PATTERN = r"""'s|'t|'re|'ve|'m|'ll|'d| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+"""
+CL100K_PATTERN = r"""(?i:'s|'t|'re|'ve|'m|'ll|'d)|[^\r\n\p{L}\p{N}]?\p{L}+|\p{N}{1,3}| ?[^\s\p{L}\p{N}]+[\r\n]*|\s*[\r\n]+|\s+(?!\S)|\s+"""
+
+# Equivalentes para 're': \p{L} ~ [^\W\d_], \p{N} ~ \d
+_RE_EQUIVALENTS = [
+    (r"[^\r\n\p{L}\p{N}]?", r"(?:[^\r\n\w]|_)?"),
+    (r"[^\s\p{L}\p{N}]+", r"(?:[^\s\w]|_)+"),
+    (r"\p{L}", r"[^\W\d_]"),
+    (r"\p{N}", r"\d"),
+]
+
+PATTERNS = {
+    'gpt2': GPT2_PATTERN,
+    'cl100k': CL100K_PATTERN,
+}
+
+def compile_pattern(pattern):
+    """
+    Compila un patrón de pre-tokenización con el mejor motor disponible.
+    
+    Args:
+        pattern (str): Patrón con clases Unicode (\\p{L}, \\p{N})
+    
+    Returns:
+        Patrón compilado
+    """
+    if _regex is not None:
+        return _regex.compile(pattern)
+    
+    for unicode_class, equivalent in _RE_EQUIVALENTS:
+        pattern = pattern.replace(unicode_class, equivalent)
+    return re.compile(pattern)
+
+def _bytes_to_unicode():
+    """
+    Tabla de GPT-2 que asigna a cada byte un carácter Unicode imprimible.
+    
+    Returns:
+        dict: {byte: carácter}
+    """
+    printable = (list(range(ord("!"), ord("~") + 1)) + list(range(ord("¡"), ord("¬") + 1))
+                 + list(range(ord("®"), ord("ÿ") + 1)))
+    chars = printable[:]
+    extra = 0
+    for byte in range(256):
+        if byte not in printable:
+            printable.append(byte)
+            chars.append(256 + extra)
+            extra += 1
+    return dict(zip(printable, (chr(c) for c in chars)))
+
+class BPETokenizer:
+    """Tokenizador BPE a nivel de byte con caché de fragmentos."""
+    
+    # Rango que indica "no hay fusión posible"
+    _NO_MERGE = float('inf')
+    
+    def __init__(self, ranks, pattern=CL100K_PATTERN, token_ids=None, cache_size=100000):
+        """
+        Inicializa el tokenizador.
+        
+        Args:
+            ranks (dict): {bytes_del_token: rango}; un rango menor se fusiona antes
+            pattern (str): Patrón de pre-tokenización
+            token_ids (dict, optional): {bytes_del_token: id} si los ids no
+                coinciden con los rangos (formato GPT-2)
+            cache_size (int): Número máximo de fragmentos memorizados
+        """
+        self.ranks = ranks
+        self.token_ids = token_ids if token_ids is not None else ranks
+        self.pattern = compile_pattern(pattern)
+        self.cache_size = cache_size
+        self._cache = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+    
+    @classmethod
+    def from_tiktoken_file(cls, file_path, pattern=None):
+        """
+        Crea un tokenizador a partir de un archivo .tiktoken.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            pattern (str, optional): Patrón; por defecto se deduce del nombre
+        
+        Returns:
+            BPETokenizer: Tokenizador cargado
+        """
+        ranks = {}
+        with open(file_path, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                token, rank = line.split()
+                ranks[base64.b64decode(token)] = int(rank)
+        
+        if pattern is None:
+            name = os.path.basename(file_path).lower()
+            pattern = GPT2_PATTERN if ('gpt2' in name or 'r50k' in name or 'p50k' in name) else CL100K_PATTERN
+        
+        return cls(ranks, pattern)
+    
+    @classmethod
+    def from_gpt2_files(cls, vocab_path, merges_path, pattern=GPT2_PATTERN):
+        """
+        Crea un tokenizador a partir de vocab.json y merges.txt (formato GPT-2).
+        
+        Args:
+            vocab_path (str): Ruta de vocab.json
+            merges_path (str): Ruta de merges.txt
+            pattern (str): Patrón de pre-tokenización
+        
+        Returns:
+            BPETokenizer: Tokenizador cargado
+        """
+        byte_decoder = {char: byte for byte, char in _bytes_to_unicode().items()}
+        
+        def to_bytes(token):
+            return bytes(byte_decoder[char] for char in token)
+        
+        with open(vocab_path, 'r', encoding='utf-8') as f:
+            vocab = json.load(f)
+        token_ids = {}
+        for token, token_id in vocab.items():
+            try:
+                token_ids[to_bytes(token)] = token_id
+            except KeyError:
+                continue  # Tokens especiales fuera de la tabla de bytes
+        
+        # Los bytes sueltos van primero; después, cada fusión en su orden
+        ranks = {bytes([byte]): byte for byte in range(256)}
+        with open(merges_path, 'r', encoding='utf-8') as f:
+            merge_index = 0
+            for line in f:
+                if line.startswith('#version') or not line.strip():
+                    continue
+                first, second = line.split()
+                ranks[to_bytes(first) + to_bytes(second)] = 256 + merge_index
+                merge_index += 1
+        
+        return cls(ranks, pattern, token_ids=token_ids)
+    
+    def _byte_pair_merge(self, piece):
+        """
+        Fusiona los bytes de un fragmento según los rangos del vocabulario.
+        
+        Mantiene una lista con el rango de cada par adyacente y, tras cada
+        fusión, solo recalcula los dos pares vecinos.
+        
+        Args:
+            piece (bytes): Fragmento a tokenizar
+        
+        Returns:
+            list: Lista de tokens (bytes)
+        """
+        ranks = self.ranks
+        no_merge = self._NO_MERGE
+        bounds = list(range(len(piece) + 1))
+        
+        def pair_rank(i):
+            if i + 2 < len(bounds):
+                return ranks.get(piece[bounds[i]:bounds[i + 2]], no_merge)
+            return no_merge
+        
+        pair_ranks = [pair_rank(i) for i in range(len(bounds) - 1)]
+        
+        while len(pair_ranks) > 1:
+            min_rank = min(pair_ranks)
+            if min_rank == no_merge:
+                break
+            
+            i = pair_ranks.index(min_rank)
+            # Fusionar las partes i e i+1 eliminando la frontera entre ambas
+            del bounds[i + 1]
+            del pair_ranks[i + 1]
+            pair_ranks[i] = pair_rank(i)
+            if i > 0:
+                pair_ranks[i - 1] = pair_rank(i - 1)
+        
+        return [piece[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+    
+    def _encode_piece(self, piece):
+        """
+        Tokeniza un fragmento usando la caché.
+        
+        Args:
+            piece (str): Fragmento producido por la pre-tokenización
+        
+        Returns:
+            tuple: Ids de los tokens del fragmento
+        """
+        cached = self._cache.get(piece)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+        
+        self.cache_misses += 1
+        data = piece.encode('utf-8')
+        token_id = self.token_ids.get(data)
+        if token_id is not None:
+            ids = (token_id,)
+        else:
+            token_ids = self.token_ids
+            ids = tuple(token_ids.get(part, -1) for part in self._byte_pair_merge(data))
+        
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[piece] = ids
+        return ids
+    
+    def encode(self, text):
+        """
+        Convierte un texto en su lista de ids de token.
+        
+        Args:
+            text (str): Texto a tokenizar
+        
+        Returns:
+            list: Ids de los tokens
+        """
+        ids = []
+        for piece in self.pattern.findall(text):
+            ids.extend(self._encode_piece(piece))
+        return ids
+    
+    def count_tokens(self, text):
+        """
+        Cuenta los tokens de un texto sin construir la lista de ids.
+        
+        Args:
+            text (str): Texto a tokenizar
+        
+        Returns:
+            int: Número de tokens
+        """
+        encode_piece = self._encode_piece
+        return sum(len(encode_piece(piece)) for piece in self.pattern.findall(text))
+
+def find_vocab_file(directory):
+    """
+    Busca un vocabulario BPE en un directorio.
+    
+    Args:
+        directory (str): Directorio donde buscar
+    
+    Returns:
+        str: Ruta del primer .tiktoken o de vocab.json, o None si no hay ninguno
+    """
+    if not os.path.isdir(directory):
+        return None
+    
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.tiktoken'):
+            return os.path.join(directory, name)
+    
+    vocab_path = os.path.join(directory, 'vocab.json')
+    if os.path.exists(vocab_path) and os.path.exists(os.path.join(directory, 'merges.txt')):
+        return vocab_path
+    
+    return None
+
+def load_bpe_tokenizer(path):
+    """
+    Carga un tokenizador BPE desde un archivo o directorio local.
+    
+    Args:
+        path (str): Archivo .tiktoken, vocab.json (con merges.txt al lado) o
+            directorio que contenga alguno de ellos
+    
+    Returns:
+        BPETokenizer: Tokenizador cargado
+    
+    Raises:
+        FileNotFoundError: Si no se encuentra ningún vocabulario
+    """
+    if os.path.isdir(path):
+        found = find_vocab_file(path)
+        if not found:
+            raise FileNotFoundError(f"No hay ningún vocabulario BPE en {path}")
+        path = found
+    
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No existe el vocabulario BPE {path}")
+    
+    if os.path.basename(path) == 'vocab.json':
+        merges_path = os.path.join(os.path.dirname(path), 'merges.txt')
+        return BPETokenizer.from_gpt2_files(path, merges_path)
+    
+    return BPETokenizer.from_tiktoken_file(path)
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Estimador rápido de tokens calibrado contra un tokenizador BPE exacto.
+
+Cuenta clases de caracteres sobre los bytes UTF-8 del texto (rachas de
+identificadores, rachas de espacios, saltos de línea, puntuación, dígitos y
+bytes no ASCII) y combina esos recuentos con coeficientes por lenguaje
+ajustados por mínimos cuadrados. Usa NumPy si está instalado; si no, recurre
+a bytes.translate/bytes.count, que también se ejecutan en C.
+
+Uso para recalibrar contra un vocabulario local:
+    python -m src.core.tokenizers.calibrated_estimator VOCAB DIRECTORIO
+"""
+
+import os
+import json
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Clases de byte
+LETTER, DIGIT, SPACE, NEWLINE, PUNCT, NON_ASCII = range(6)
+CLASS_CODES = b"LDSNPU"
+
+# Nombres de las características en el orden de los coeficientes
+FEATURES = [
+    'letter_runs',    # Rachas de letras/_ (aprox. número de palabras)
+    'letter_bytes',   # Bytes de letras (las palabras largas se dividen)
+    'digit_bytes',    # Dígitos (se agrupan de 1 a 3 por token)
+    'space_runs',     # Rachas de espacios/tabuladores
+    'space_bytes',    # Espacios/tabuladores (la indentación cuesta tokens)
+    'newline_bytes',  # Saltos de línea
+    'punct_bytes',    # Puntuación y símbolos ASCII
+    'non_ascii_bytes' # Bytes de caracteres no ASCII
+]
+
+# Agrupación de extensiones por familia de lenguaje
+LANGUAGE_GROUPS = {
+    '.py': 'python', '.pyw': 'python',
+    '.js': 'javascript', '.jsx': 'javascript', '.ts': 'javascript', '.tsx': 'javascript',
+    '.java': 'c_like', '.c': 'c_like', '.h': 'c_like', '.cpp': 'c_like', '.hpp': 'c_like',
+    '.cs': 'c_like', '.go': 'c_like', '.rs': 'c_like', '.php': 'c_like',
+    '.html': 'markup', '.htm': 'markup', '.xml': 'markup', '.json': 'markup',
+    '.css': 'css', '.scss': 'css',
+    '.md': 'prose', '.txt': 'prose', '.rst': 'prose',
+}
+
+# Coeficientes por defecto, en el orden de FEATURES (ajustados con el vocabulario
+# de GPT-2 sobre unas 10.000 muestras de código y texto); se sustituyen por los
+# de calibration.json si existe
+DEFAULT_COEFFICIENTS = {
+    'default':    [0.000, 0.395, 1.307, 0.000, 0.637, 0.000, 0.207, 0.911],
+    'python':     [0.000, 0.099, 0.489, 0.000, 0.974, 2.103, 0.677, 0.418],
+    'javascript': [0.000, 0.155, 0.419, 0.000, 0.824, 0.000, 0.974, 0.670],
+    'c_like':     [0.000, 0.405, 1.179, 0.000, 0.603, 0.000, 0.406, 0.000],
+    'markup':     [0.000, 0.448, 1.346, 0.000, 0.462, 2.426, 0.000, 0.925],
+    'css':        [1.384, 0.115, 1.153, 0.000, 0.000, 2.179, 0.178, 0.000],
+    'prose':      [0.074, 0.126, 0.526, 0.000, 0.485, 0.925, 1.027, 0.297],
+}
+
+# Archivo de calibración generado con calibrate_directory()
+CALIBRATION_FILE = os.path.join(os.path.dirname(__file__), "..", "..", "..",
+                                "config", "tokenizers", "calibration.json")
+
+# Tamaño de bloque para no crear arrays temporales enormes con NumPy
+CHUNK_BYTES = 4 * 1024 * 1024
+
+def _byte_classes():
+    """
+    Construye la clase de cada uno de los 256 valores de byte.
+    
+    Returns:
+        list: Clase (LETTER, DIGIT...) de cada byte
+    """
+    classes = []
+    for byte in range(256):
+        char = chr(byte)
+        if byte >= 0x80:
+            classes.append(NON_ASCII)
+        elif char.isalpha() or char == '_':
+            classes.append(LETTER)
+        elif char.isdigit():
+            classes.append(DIGIT)
+        elif char in ' \t\f\v':
+            classes.append(SPACE)
+        elif char in '\r\n':
+            classes.append(NEWLINE)
+        else:
+            classes.append(PUNCT)
+    return classes
+
+_CLASSES = _byte_classes()
+_TRANSLATE_TABLE = bytes(CLASS_CODES[c] for c in _CLASSES)
+
+# Tablas que dejan solo una clase (el resto pasa a ser espacio) para contar
+# sus rachas con bytes.split() cuando NumPy no está disponible
+_RUN_TABLES = {
+    cls: bytes(ord('x') if c == cls else ord(' ') for c in _CLASSES)
+    for cls in (LETTER, SPACE)
+}
+
+def _class_stats_numpy(data):
+    """
+    Cuenta bytes y rachas por clase con NumPy.
+    
+    Args:
+        data (bytes): Texto codificado en UTF-8
+    
+    Returns:
+        tuple: (bytes_por_clase, rachas_por_clase), listas de 6 enteros
+    """
+    counts = [0] * 6
+    runs = [0] * 6
+    previous = None
+    
+    classes_all = np.frombuffer(data.translate(_TRANSLATE_TABLE), dtype=np.uint8)
+    for start in range(0, len(classes_all), CHUNK_BYTES):
+        classes = classes_all[start:start + CHUNK_BYTES]
+        for cls, code in enumerate(CLASS_CODES):
+            mask = classes == code
+            counts[cls] += int(np.count_nonzero(mask))
+            if cls not in _RUN_TABLES:
+                continue
+            
+            # Cada racha aporta dos cambios de valor, contando los extremos
+            changes = int(np.count_nonzero(mask[1:] != mask[:-1]))
+            runs[cls] += (changes + int(mask[0]) + int(mask[-1])) // 2
+            if mask[0] and previous == code:
+                runs[cls] -= 1  # La racha continúa desde el bloque anterior
+        previous = classes[-1]
+    
+    return counts, runs
+
+def _class_stats_python(data):
+    """
+    Cuenta bytes y rachas por clase sin NumPy.
+    
+    Args:
+        data (bytes): Texto codificado en UTF-8
+    
+    Returns:
+        tuple: (bytes_por_clase, rachas_por_clase), listas de 6 enteros
+    """
+    classes = data.translate(_TRANSLATE_TABLE)
+    counts = [classes.count(code) for code in (b"L", b"D", b"S", b"N", b"P", b"U")]
+    
+    runs = [0] * 6
+    for cls, table in _RUN_TABLES.items():
+        runs[cls] = len(data.translate(table).split())
+    return counts, runs
+
+def extract_features(text):
+    """
+    Calcula el vector de características de un texto.
+    
+    Args:
+        text (str): Texto a analizar
+    
+    Returns:
+        list: Valores en el orden de FEATURES
+    """
+    data = text.encode('utf-8', errors='replace')
+    if not data:
+        return [0] * len(FEATURES)
+    
+    if np is not None:
+        counts, runs = _class_stats_numpy(data)
+    else:
+        counts, runs = _class_stats_python(data)
+    
+    return [
+        runs[LETTER], counts[LETTER], counts[DIGIT],
+        runs[SPACE], counts[SPACE], counts[NEWLINE],
+        counts[PUNCT], counts[NON_ASCII]
+    ]
+
+def language_group(language):
+    """
+    Obtiene la familia de coeficientes de un lenguaje.
+    
+    Args:
+        language (str): Extensión del archivo (con punto) o nombre de familia
+    
+    Returns:
+        str: Nombre de la familia ('default' si no se conoce)
+    """
+    if not language:
+        return 'default'
+    language = language.lower()
+    if language in DEFAULT_COEFFICIENTS:
+        return language
+    return LANGUAGE_GROUPS.get(language, 'default')
+
+def _solve_least_squares(rows, targets, iterations=2000):
+    """
+    Ajusta coeficientes no negativos por mínimos cuadrados.
+    
+    Resuelve las ecuaciones normales por descenso de coordenadas proyectado:
+    con coeficientes negativos el ajuste puede ser algo mejor con los datos de
+    calibración, pero da estimaciones absurdas con textos distintos.
+    
+    Args:
+        rows (list): Vectores de características
+        targets (list): Número exacto de tokens de cada vector
+        iterations (int): Número máximo de pasadas
+    
+    Returns:
+        list: Coeficientes ajustados
+    """
+    size = len(rows[0])
+    if np is not None:
+        matrix = np.array(rows, dtype=float)
+        gram = (matrix.T @ matrix).tolist()
+        vector = (matrix.T @ np.array(targets, dtype=float)).tolist()
+    else:
+        gram = [[sum(row[i] * row[j] for row in rows) for j in range(size)] for i in range(size)]
+        vector = [sum(row[i] * target for row, target in zip(rows, targets)) for i in range(size)]
+    
+    solution = [0.0] * size
+    for _ in range(iterations):
+        largest_change = 0.0
+        for i in range(size):
+            if gram[i][i] <= 0:
+                continue
+            residual = vector[i] - sum(gram[i][j] * solution[j] for j in range(size) if j != i)
+            value = max(0.0, residual / gram[i][i])
+            largest_change = max(largest_change, abs(value - solution[i]))
+            solution[i] = value
+        if largest_change < 1e-9:
+            break
+    return solution
+
+def calibrate(samples, count_tokens):
+    """
+    Ajusta coeficientes por familia de lenguaje contra un contador exacto.
+    
+    Args:
+        samples (list): Tuplas (lenguaje, texto)
+        count_tokens (callable): Función que devuelve el número exacto de tokens
+    
+    Returns:
+        dict: {familia: coeficientes}
+    """
+    grouped = {}
+    for language, text in samples:
+        if not text:
+            continue
+        features = extract_features(text)
+        tokens = count_tokens(text)
+        for group in {language_group(language), 'default'}:
+            grouped.setdefault(group, ([], []))
+            grouped[group][0].append(features)
+            grouped[group][1].append(tokens)
+    
+    coefficients = {}
+    for group, (rows, targets) in grouped.items():
+        # Con pocas muestras el ajuste no es fiable
+        if len(rows) >= len(FEATURES) * 2:
+            coefficients[group] = _solve_least_squares(rows, targets)
+    return coefficients
+
+class CalibratedEstimator:
+    """Estimador de tokens por clases de caracteres y coeficientes por lenguaje."""
+    
+    def __init__(self, coefficients=None):
+        """
+        Inicializa el estimador.
+        
+        Args:
+            coefficients (dict, optional): {familia: coeficientes}; se combinan
+                con los coeficientes por defecto
+        """
+        self.coefficients = {group: list(values) for group, values in DEFAULT_COEFFICIENTS.items()}
+        if coefficients:
+            self.coefficients.update(coefficients)
+    
+    @classmethod
+    def load(cls, file_path=CALIBRATION_FILE):
+        """
+        Crea un estimador con la calibración guardada, si existe.
+        
+        Args:
+            file_path (str): Ruta del archivo de calibración
+        
+        Returns:
+            CalibratedEstimator: Estimador (con los coeficientes por defecto si
+                no hay calibración válida)
+        """
+        try:
+            if os.path.exists(file_path):
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                coefficients = {group: values for group, values in data.get('coefficients', {}).items()
+                                if len(values) == len(FEATURES)}
+                return cls(coefficients)
+        except Exception as e:
+            print(f"Error al cargar la calibración de tokens: {str(e)}")
+        return cls()
+    
+    def save(self, file_path=CALIBRATION_FILE, vocab_name=None):
+        """
+        Guarda los coeficientes en un archivo JSON.
+        
+        Args:
+            file_path (str): Ruta del archivo de calibración
+            vocab_name (str, optional): Vocabulario usado para calibrar
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'vocab': vocab_name,
+                'features': FEATURES,
+                'coefficients': self.coefficients
+            }, f, indent=2)
+    
+    def estimate(self, text, language=None):
+        """
+        Estima el número de tokens de un texto.
+        
+        Args:
+            text (str): Texto a estimar
+            language (str, optional): Extensión del archivo o familia de lenguaje
+        
+        Returns:
+            int: Número estimado de tokens
+        """
+        if not text:
+            return 0
+        coefficients = self.coefficients.get(language_group(language), self.coefficients['default'])
+        total = sum(c * f for c, f in zip(coefficients, extract_features(text)))
+        return max(1, int(round(total)))
+
+def calibrate_directory(vocab_path, directory, output=CALIBRATION_FILE, max_file_bytes=512 * 1024):
+    """
+    Calibra el estimador con los archivos de un directorio y guarda el resultado.
+    
+    Cada archivo se divide en fragmentos de unas 50 líneas para tener
+    suficientes muestras por lenguaje.
+    
+    Args:
+        vocab_path (str): Vocabulario BPE (archivo o directorio)
+        directory (str): Directorio con archivos de ejemplo
+        output (str): Ruta del archivo de calibración
+        max_file_bytes (int): Tamaño máximo de archivo a considerar
+    
+    Returns:
+        CalibratedEstimator: Estimador calibrado
+    """
+    from src.core.tokenizers.bpe_tokenizer import load_bpe_tokenizer
+    
+    tokenizer = load_bpe_tokenizer(vocab_path)
+    samples = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = [d for d in dirs if not d.startswith('.') and d != '__pycache__']
+        for name in files:
+            extension = os.path.splitext(name)[1].lower()
+            path = os.path.join(root, name)
+            if extension not in LANGUAGE_GROUPS or os.path.getsize(path) > max_file_bytes:
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    lines = f.readlines()
+            except (UnicodeDecodeError, OSError):
+                continue
+            for start in range(0, len(lines), 50):
+                samples.append((extension, ''.join(lines[start:start + 50])))
+    
+    estimator = CalibratedEstimator(calibrate(samples, tokenizer.count_tokens))
+    estimator.save(output, os.path.basename(vocab_path))
+    return estimator
+
+if __name__ == "__main__":
+    import sys
+    
+    if len(sys.argv) < 3:
+        print("Uso: python -m src.core.tokenizers.calibrated_estimator VOCAB DIRECTORIO [SALIDA]")
+        sys.exit(1)
+    
+    result = calibrate_directory(sys.argv[1], sys.argv[2], *sys.argv[3:4])
+    for group, values in sorted(result.coefficients.items()):
+        print(group, [round(value, 4) for value in values])
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Diálogo para añadir al contexto las funciones llamadas desde una selección.
+"""
+import os
+import tkinter as tk
+from tkinter import ttk
+
+from src.utils.background import run_in_background
+
+def show_callees_dialog(parent, call_graph, file_path, first_line, last_line, root_folder, token_cost=None,
+                        remaining_tokens=None, on_confirm=None, default_depth=1):
+    """
+    Muestra las definiciones llamadas desde un rango de líneas y permite añadirlas al contexto.
+    
+    La lista se recalcula en segundo plano al cambiar la profundidad o el
+    límite de tokens.
+    
+    Args:
+        parent: Ventana padre
+        call_graph (CallGraph): Grafo de llamadas del proyecto
+        file_path (str): Archivo de la selección
+        first_line (int): Primera línea de la selección (desde 1)
+        last_line (int): Última línea de la selección
+        root_folder (str): Carpeta raíz del proyecto (para mostrar rutas relativas)
+        token_cost (callable, optional): Función (Symbol) -> tokens de la definición
+        remaining_tokens (int, optional): Tokens libres en el presupuesto del contexto
+        on_confirm (callable, optional): Función (lista de símbolos) llamada al aceptar
+        default_depth (int): Profundidad inicial
+    """
+    dialog = tk.Toplevel(parent)
+    dialog.title("Añadir funciones llamadas")
+    dialog.geometry("650x450")
+    dialog.transient(parent)
+    
+    state = {'task': None, 'callees': []}
+    
+    options_frame = ttk.Frame(dialog, padding=(10, 10, 10, 5))
+    options_frame.pack(fill=tk.X)
+    
+    ttk.Label(options_frame, text="Profundidad:").pack(side=tk.LEFT)
+    depth_var = tk.IntVar(value=default_depth)
+    depth_spinbox = ttk.Spinbox(options_frame, from_=1, to=10, width=4, textvariable=depth_var)
+    depth_spinbox.pack(side=tk.LEFT, padx=(5, 15))
+    
+    budget_var = tk.BooleanVar(value=False)
+    budget_text = "Limitar al presupuesto restante"
+    if remaining_tokens is not None:
+        budget_text += f" ({max(0, remaining_tokens):,} tokens)"
+    budget_check = ttk.Checkbutton(options_frame, text=budget_text, variable=budget_var)
+    budget_check.pack(side=tk.LEFT)
+    if remaining_tokens is None or token_cost is None:
+        budget_check.config(state=tk.DISABLED)
+    
+    tree_frame = ttk.Frame(dialog, padding=(10, 0, 10, 0))
+    tree_frame.pack(fill=tk.BOTH, expand=True)
+    
+    tree = ttk.Treeview(tree_frame, columns=("symbol", "file", "depth", "tokens"), show="headings")
+    tree.heading("symbol", text="Definición")
+    tree.heading("file", text="Archivo")
+    tree.heading("depth", text="Nivel")
+    tree.heading("tokens", text="Tokens")
+    tree.column("symbol", width=220)
+    tree.column("file", width=210)
+    tree.column("depth", width=60, anchor=tk.E, stretch=tk.NO)
+    tree.column("tokens", width=90, anchor=tk.E, stretch=tk.NO)
+    
+    tree_scroll = ttk.Scrollbar(tree_frame, command=tree.yview)
+    tree_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+    tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    tree.configure(yscrollcommand=tree_scroll.set)
+    
+    bottom_frame = ttk.Frame(dialog, padding=(10, 5, 10, 10))
+    bottom_frame.pack(fill=tk.X)
+    
+    status_label = ttk.Label(bottom_frame, text="")
+    status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+    
+    add_button = ttk.Button(bottom_frame, text="Añadir", state=tk.DISABLED)
+    add_button.pack(side=tk.RIGHT)
+    ttk.Button(bottom_frame, text="Cancelar", command=lambda: close()).pack(side=tk.RIGHT, padx=(0, 5))
+    
+    def relative_path(path):
+        try:
+            return os.path.relpath(path, root_folder)
+        except ValueError:
+            return path
+    
+    def show_result(result):
+        state['task'] = None
+        state['callees'] = result
+        tree.delete(*tree.get_children())
+        
+        total = 0
+        for symbol, depth, tokens in result:
+            location = f"{relative_path(symbol.file_path)}:{symbol.start_line}"
+            tree.insert("", "end", values=(symbol.qualname, location, depth,
+                                           "" if tokens is None else f"{tokens:,}"))
+            total += tokens or 0
+        
+        text = f"{len(result)} definiciones llamadas"
+        if token_cost is not None:
+            text += f", {total:,} tokens"
+        status_label.config(text=text)
+        add_button.config(state=tk.NORMAL if result else tk.DISABLED)
+    
+    def show_error(error):
+        state['task'] = None
+        status_label.config(text=f"Error al analizar las llamadas: {str(error)}")
+    
+    def refresh(*args):
+        try:
+            depth = max(1, int(depth_var.get()))
+        except (tk.TclError, ValueError):
+            return
+        max_tokens = remaining_tokens if budget_var.get() else None
+        
+        if state['task'] is not None:
+            state['task'].cancel()
+        add_button.config(state=tk.DISABLED)
+        status_label.config(text="Analizando llamadas...")
+        
+        def compute(cancel_event):
+            found = call_graph.expand(file_path, first_line, last_line, depth, max_tokens, token_cost, cancel_event)
+            return [(symbol, level, token_cost(symbol) if token_cost else None) for symbol, level in found]
+        
+        state['task'] = run_in_background(dialog, compute, show_result, show_error)
+    
+    def confirm():
+        symbols = [symbol for symbol, _, _ in state['callees']]
+        close()
+        if on_confirm:
+            on_confirm(symbols)
+    
+    def close():
+        if state['task'] is not None:
+            state['task'].cancel()
+        dialog.destroy()
+    
+    add_button.config(command=confirm)
+    depth_var.trace_add("write", refresh)
+    budget_var.trace_add("write", refresh)
+    dialog.protocol("WM_DELETE_WINDOW", close)
+    
+    refresh()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Diálogo para añadir archivos junto con sus dependencias locales.
+"""
+import os
+import tkinter as tk
+from tkinter import ttk
+
+from src.utils.background import run_in_background
+
+def show_dependencies_dialog(parent, import_graph, file_paths, root_folder, token_cost=None,
+                             remaining_tokens=None, on_confirm=None, default_depth=2, in_context=None):
+    """
+    Muestra las dependencias de unos archivos y permite añadirlas al contexto.
+    
+    La lista se recalcula en segundo plano al cambiar la profundidad o el
+    límite de tokens. Con límite, los archivos de partida que aún no están en
+    el contexto se descuentan del presupuesto antes de buscar dependencias, y
+    las dependencias que ya están en el contexto no se vuelven a añadir.
+    
+    Args:
+        parent: Ventana padre
+        import_graph (ImportGraph): Grafo de importaciones del proyecto
+        file_paths (list): Archivos de partida
+        root_folder (str): Carpeta raíz del proyecto (para mostrar rutas relativas)
+        token_cost (callable, optional): Función (ruta) -> tokens del archivo
+        remaining_tokens (int, optional): Tokens libres en el presupuesto del contexto
+        on_confirm (callable, optional): Función (lista de rutas) llamada al aceptar;
+            recibe los archivos de partida seguidos de sus dependencias
+        default_depth (int): Profundidad inicial
+        in_context (iterable, optional): Rutas de los archivos que ya están en el contexto
+    """
+    in_context = {os.path.normpath(path) for path in in_context or ()}
+    dialog = tk.Toplevel(parent)
+    dialog.title("Añadir con dependencias")
+    dialog.geometry("650x450")
+    dialog.transient(parent)
+    
+    state = {'task': None, 'dependencies': []}
+    
+    options_frame = ttk.Frame(dialog, padding=(10, 10, 10, 5))
+    options_frame.pack(fill=tk.X)
+    
+    ttk.Label(options_frame, text="Profundidad:").pack(side=tk.LEFT)
+    depth_var = tk.IntVar(value=default_depth)
+    depth_spinbox = ttk.Spinbox(options_frame, from_=1, to=20, width=4, textvariable=depth_var)
+    depth_spinbox.pack(side=tk.LEFT, padx=(5, 15))
+    
+    budget_var = tk.BooleanVar(value=False)
+    budget_text = "Limitar al presupuesto restante"
+    if remaining_tokens is not None:
+        budget_text += f" ({max(0, remaining_tokens):,} tokens)"
+    budget_check = ttk.Checkbutton(options_frame, text=budget_text, variable=budget_var)
+    budget_check.pack(side=tk.LEFT)
+    if remaining_tokens is None or token_cost is None:
+        budget_check.config(state=tk.DISABLED)
+    
+    tree_frame = ttk.Frame(dialog, padding=(10, 0, 10, 0))
+    tree_frame.pack(fill=tk.BOTH, expand=True)
+    
+    tree = ttk.Treeview(tree_frame, columns=("file", "depth", "tokens"), show="headings")
+    tree.heading("file", text="Archivo")
+    tree.heading("depth", text="Nivel")
+    tree.heading("tokens", text="Tokens")
+    tree.column("file", width=430)
+    tree.column("depth", width=60, anchor=tk.E, stretch=tk.NO)
+    tree.column("tokens", width=90, anchor=tk.E, stretch=tk.NO)
+    
+    tree_scroll = ttk.Scrollbar(tree_frame, command=tree.yview)
+    tree_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+    tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    tree.configure(yscrollcommand=tree_scroll.set)
+    
+    bottom_frame = ttk.Frame(dialog, padding=(10, 5, 10, 10))
+    bottom_frame.pack(fill=tk.X)
+    
+    status_label = ttk.Label(bottom_frame, text="")
+    status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+    
+    add_button = ttk.Button(bottom_frame, text="Añadir", state=tk.DISABLED)
+    add_button.pack(side=tk.RIGHT)
+    ttk.Button(bottom_frame, text="Cancelar", command=lambda: close()).pack(side=tk.RIGHT, padx=(0, 5))
+    
+    def relative_path(file_path):
+        try:
+            return os.path.relpath(file_path, root_folder)
+        except ValueError:
+            return file_path
+    
+    def show_result(result):
+        state['task'] = None
+        state['dependencies'] = result
+        tree.delete(*tree.get_children())
+        
+        total = 0
+        for path, depth, tokens in result:
+            tree.insert("", "end", values=(relative_path(path), depth, "" if tokens is None else f"{tokens:,}"))
+            total += tokens or 0
+        
+        text = f"{len(result)} dependencias"
+        if token_cost is not None:
+            text += f", {total:,} tokens"
+        status_label.config(text=text)
+        add_button.config(state=tk.NORMAL)
+    
+    def show_error(error):
+        state['task'] = None
+        status_label.config(text=f"Error al analizar las dependencias: {str(error)}")
+    
+    def refresh(*args):
+        try:
+            depth = max(1, int(depth_var.get()))
+        except (tk.TclError, ValueError):
+            return
+        max_tokens = remaining_tokens if budget_var.get() else None
+        
+        if state['task'] is not None:
+            state['task'].cancel()
+        add_button.config(state=tk.DISABLED)
+        status_label.config(text="Analizando importaciones...")
+        
+        def compute(cancel_event):
+            budget = max_tokens
+            if budget is not None:
+                for path in file_paths:
+                    if os.path.normpath(path) not in in_context:
+                        budget -= token_cost(path)
+                budget = max(0, budget)
+            found = import_graph.expand(file_paths, depth, budget, token_cost, cancel_event, in_context)
+            import_graph.save()
+            return found
+        
+        state['task'] = run_in_background(dialog, compute, show_result, show_error)
+    
+    def confirm():
+        paths = list(file_paths) + [path for path, _, _ in state['dependencies']]
+        close()
+        if on_confirm:
+            on_confirm(paths)
+    
+    def close():
+        if state['task'] is not None:
+            state['task'].cancel()
+        dialog.destroy()
+    
+    add_button.config(command=confirm)
+    depth_var.trace_add("write", refresh)
+    budget_var.trace_add("write", refresh)
+    dialog.protocol("WM_DELETE_WINDOW", close)
+    
+    refresh()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Diálogo para buscar en todos los archivos del proyecto.
+"""
+import os
+import re
+import tkinter as tk
+from tkinter import ttk
+
+from src.core.project_search import ProjectSearch
+from src.core.project_index import ProjectIndex
+from src.utils.app_settings import get_app_setting
+
+# Intervalo (ms) con el que se recogen los resultados de la búsqueda
+POLL_INTERVAL = 50
+
+# Resultados que se añaden a la lista en cada recogida
+BATCH_SIZE = 300
+
+def show_project_search_dialog(parent, file_manager, root_folder, on_open_match=None,
+                               on_add_file=None, on_add_lines=None, initial_query="", on_index_search=None):
+    """
+    Muestra una ventana de búsqueda en el proyecto con resultados en directo.
+    
+    La búsqueda se ejecuta en segundo plano y los resultados se añaden a la
+    lista a medida que llegan. Cada resultado se puede abrir, añadir como
+    archivo completo o añadir junto con las líneas que lo rodean.
+    
+    Args:
+        parent: Ventana padre
+        file_manager: Gestor de archivos (para recorrer el proyecto)
+        root_folder (str): Carpeta raíz del proyecto
+        on_open_match (callable, optional): Función (ruta, línea) para abrir un resultado
+        on_add_file (callable, optional): Función (ruta) para añadir el archivo al contexto
+        on_add_lines (callable, optional): Función (ruta, línea, radio) para añadir las
+            líneas alrededor de un resultado
+        initial_query (str): Texto inicial de la búsqueda
+        on_index_search (callable, optional): Función sin argumentos llamada al
+            buscar con el índice persistente (para mantenerlo al día)
+    """
+    search_window = tk.Toplevel(parent)
+    search_window.title("Buscar en el proyecto")
+    search_window.geometry("800x500")
+    search_window.transient(parent)
+    
+    searcher = ProjectSearch()
+    state = {'matches': {}, 'count': 0, 'poll_id': None}
+    
+    # Barra de búsqueda
+    query_frame = ttk.Frame(search_window, padding=(10, 10, 10, 5))
+    query_frame.pack(fill=tk.X)
+    
+    query_var = tk.StringVar(value=initial_query)
+    query_entry = ttk.Entry(query_frame, textvariable=query_var)
+    query_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+    
+    search_button = ttk.Button(query_frame, text="Buscar")
+    search_button.pack(side=tk.LEFT, padx=(5, 0))
+    
+    stop_button = ttk.Button(query_frame, text="Detener", state=tk.DISABLED)
+    stop_button.pack(side=tk.LEFT, padx=(5, 0))
+    
+    options_frame = ttk.Frame(search_window, padding=(10, 0, 10, 5))
+    options_frame.pack(fill=tk.X)
+    
+    regex_var = tk.BooleanVar(value=False)
+    whole_word_var = tk.BooleanVar(value=False)
+    match_case_var = tk.BooleanVar(value=False)
+    ttk.Checkbutton(options_frame, text="Expresión regular", variable=regex_var).pack(side=tk.LEFT)
+    ttk.Checkbutton(options_frame, text="Palabra completa", variable=whole_word_var).pack(side=tk.LEFT, padx=10)
+    ttk.Checkbutton(options_frame, text="Distinguir mayúsculas", variable=match_case_var).pack(side=tk.LEFT)
+    
+    # Índice persistente (SQLite FTS5), si esta instalación lo admite
+    index_available = ProjectIndex.is_available()
+    use_index_var = tk.BooleanVar(value=index_available and bool(get_app_setting('advanced', 'project_index', False)))
+    ttk.Checkbutton(
+        options_frame,
+        text="Usar índice persistente",
+        variable=use_index_var,
+        state=tk.NORMAL if index_available else tk.DISABLED
+    ).pack(side=tk.LEFT, padx=10)
+    
+    # Lista de resultados
+    tree_frame = ttk.Frame(search_window, padding=(10, 0, 10, 0))
+    tree_frame.pack(fill=tk.BOTH, expand=True)
+    
+    tree = ttk.Treeview(tree_frame, columns=("file", "line", "text"), show="headings")
+    tree.heading("file", text="Archivo")
+    tree.heading("line", text="Línea")
+    tree.heading("text", text="Texto")
+    tree.column("file", width=220, stretch=tk.NO)
+    tree.column("line", width=60, anchor=tk.E, stretch=tk.NO)
+    tree.column("text", width=480)
+    
+    tree_scroll = ttk.Scrollbar(tree_frame, command=tree.yview)
+    tree_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+    tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    tree.configure(yscrollcommand=tree_scroll.set)
+    
+    # Acciones sobre el resultado seleccionado
+    actions_frame = ttk.Frame(search_window, padding=(10, 5, 10, 0))
+    actions_frame.pack(fill=tk.X)
+    
+    add_file_button = ttk.Button(actions_frame, text="Añadir archivo")
+    add_file_button.pack(side=tk.LEFT)
+    
+    add_lines_button = ttk.Button(actions_frame, text="Añadir ±N líneas")
+    add_lines_button.pack(side=tk.LEFT, padx=(5, 0))
+    
+    ttk.Label(actions_frame, text="N:").pack(side=tk.LEFT, padx=(10, 2))
+    radius_var = tk.IntVar(value=20)
+    ttk.Spinbox(actions_frame, from_=0, to=1000, width=6, textvariable=radius_var).pack(side=tk.LEFT)
+    
+    status_label = ttk.Label(search_window, text="", padding=(10, 5, 10, 10))
+    status_label.pack(fill=tk.X)
+    
+    def relative_path(file_path):
+        try:
+            return os.path.relpath(file_path, root_folder)
+        except ValueError:
+            return file_path
+    
+    def update_status(running):
+        text = f"{state['count']} resultados en {searcher.files_matched} archivos " \
+               f"({searcher.files_scanned} examinados)"
+        if running:
+            text += "; buscando..."
+        elif searcher.truncated:
+            text += f"; se muestran los primeros {searcher.MAX_RESULTS}"
+        status_label.config(text=text)
+    
+    def poll_results():
+        """Añade a la lista los resultados que han llegado desde la última vez."""
+        state['poll_id'] = None
+        matches, finished = searcher.get_results(BATCH_SIZE)
+        for match in matches:
+            # Mostrar la línea recortada alrededor de la coincidencia
+            text = match.line_text
+            if len(text) > 200:
+                start = max(0, match.column - 80)
+                text = ("…" if start else "") + text[start:start + 200] + "…"
+            
+            item_id = tree.insert("", "end", values=(relative_path(match.file_path), match.line, text.strip()))
+            state['matches'][item_id] = match
+            state['count'] += 1
+        
+        update_status(not finished)
+        if finished:
+            stop_button.config(state=tk.DISABLED)
+        else:
+            state['poll_id'] = search_window.after(POLL_INTERVAL, poll_results)
+    
+    def stop_polling():
+        if state['poll_id'] is not None:
+            search_window.after_cancel(state['poll_id'])
+            state['poll_id'] = None
+    
+    def run_search(event=None):
+        query = query_var.get()
+        stop_polling()
+        searcher.cancel()
+        tree.delete(*tree.get_children())
+        state['matches'] = {}
+        state['count'] = 0
+        if not query:
+            status_label.config(text="")
+            return
+        
+        if use_index_var.get() and on_index_search:
+            on_index_search()
+        try:
+            searcher.start(file_manager.iter_code_files(root_folder), query, regex_var.get(),
+                           whole_word_var.get(), match_case_var.get(),
+                           index_root=root_folder if use_index_var.get() else None)
+        except re.error as e:
+            status_label.config(text=f"Expresión regular no válida: {str(e)}")
+            return
+        
+        stop_button.config(state=tk.NORMAL)
+        poll_results()
+    
+    def stop_search():
+        searcher.cancel()
+    
+    def get_selected_match():
+        selected = tree.selection()
+        if selected:
+            return state['matches'].get(selected[0])
+        return None
+    
+    def open_selected(event=None):
+        match = get_selected_match()
+        if match and on_open_match:
+            on_open_match(match.file_path, match.line)
+    
+    def add_selected_file():
+        match = get_selected_match()
+        if match and on_add_file:
+            on_add_file(match.file_path)
+    
+    def add_selected_lines():
+        match = get_selected_match()
+        if not match or not on_add_lines:
+            return
+        try:
+            radius = max(0, int(radius_var.get()))
+        except (tk.TclError, ValueError):
+            radius = 20
+        on_add_lines(match.file_path, match.line, radius)
+    
+    def on_close():
+        stop_polling()
+        searcher.cancel()
+        search_window.destroy()
+    
+    search_button.config(command=run_search)
+    stop_button.config(command=stop_search)
+    add_file_button.config(command=add_selected_file)
+    add_lines_button.config(command=add_selected_lines)
+    query_entry.bind("<Return>", run_search)
+    tree.bind("<Double-1>", open_selected)
+    tree.bind("<Return>", open_selected)
+    search_window.protocol("WM_DELETE_WINDOW", on_close)
+    
+    query_entry.focus_set()
+    if initial_query:
+        run_search()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Diálogo de apertura rápida de símbolos (Ctrl+P).
+"""
+import os
+import tkinter as tk
+from tkinter import ttk
+
+# Número máximo de símbolos mostrados
+MAX_RESULTS = 100
+
+# Espera (ms) tras cada pulsación antes de buscar
+SEARCH_DELAY = 80
+
+def show_quick_open_dialog(parent, symbol_index, root_folder, on_add_symbol=None, on_open_symbol=None,
+                           is_indexing=None):
+    """
+    Muestra una caja de búsqueda de símbolos del proyecto.
+    
+    Enter añade el símbolo seleccionado al contexto; Ctrl+Enter o doble clic
+    lo abren en el visor.
+    
+    Args:
+        parent: Ventana padre
+        symbol_index (SymbolIndex): Índice de símbolos del proyecto
+        root_folder (str): Carpeta raíz del proyecto (para mostrar rutas relativas)
+        on_add_symbol (callable, optional): Función (símbolo) para añadirlo al contexto
+        on_open_symbol (callable, optional): Función (símbolo) para abrirlo en el visor
+        is_indexing (callable, optional): Función que indica si el índice se está construyendo
+    """
+    dialog = tk.Toplevel(parent)
+    dialog.title("Ir a símbolo")
+    dialog.geometry("700x400")
+    dialog.transient(parent)
+    
+    state = {'symbols': {}, 'search_id': None}
+    
+    query_var = tk.StringVar()
+    query_entry = ttk.Entry(dialog, textvariable=query_var)
+    query_entry.pack(fill=tk.X, padx=10, pady=(10, 5))
+    
+    tree_frame = ttk.Frame(dialog, padding=(10, 0, 10, 0))
+    tree_frame.pack(fill=tk.BOTH, expand=True)
+    
+    tree = ttk.Treeview(tree_frame, columns=("symbol", "kind", "location"), show="headings", selectmode="browse")
+    tree.heading("symbol", text="Símbolo")
+    tree.heading("kind", text="Tipo")
+    tree.heading("location", text="Ubicación")
+    tree.column("symbol", width=280)
+    tree.column("kind", width=80, stretch=tk.NO)
+    tree.column("location", width=300)
+    
+    tree_scroll = ttk.Scrollbar(tree_frame, command=tree.yview)
+    tree_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+    tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    tree.configure(yscrollcommand=tree_scroll.set)
+    
+    bottom_frame = ttk.Frame(dialog, padding=(10, 5, 10, 10))
+    bottom_frame.pack(fill=tk.X)
+    
+    status_label = ttk.Label(bottom_frame, text="")
+    status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+    
+    add_button = ttk.Button(bottom_frame, text="Añadir al contexto")
+    add_button.pack(side=tk.RIGHT)
+    open_button = ttk.Button(bottom_frame, text="Abrir")
+    open_button.pack(side=tk.RIGHT, padx=(0, 5))
+    
+    def relative_path(file_path):
+        try:
+            return os.path.relpath(file_path, root_folder)
+        except ValueError:
+            return file_path
+    
+    def update_status():
+        text = f"{len(symbol_index.symbols)} símbolos"
+        if is_indexing and is_indexing():
+            text += " (indexando...)"
+        status_label.config(text=text)
+    
+    def run_search():
+        state['search_id'] = None
+        tree.delete(*tree.get_children())
+        state['symbols'] = {}
+        
+        for symbol in symbol_index.search(query_var.get(), MAX_RESULTS):
+            location = f"{relative_path(symbol.file_path)}:{symbol.start_line}-{symbol.end_line}"
+            item_id = tree.insert("", "end", values=(symbol.qualname, symbol.kind, location))
+            state['symbols'][item_id] = symbol
+        
+        children = tree.get_children()
+        if children:
+            tree.selection_set(children[0])
+            tree.see(children[0])
+        update_status()
+    
+    def schedule_search(*args):
+        if state['search_id'] is not None:
+            dialog.after_cancel(state['search_id'])
+        state['search_id'] = dialog.after(SEARCH_DELAY, run_search)
+    
+    def refresh_while_indexing():
+        """Repite la búsqueda mientras el índice se construye."""
+        if not dialog.winfo_exists():
+            return
+        if is_indexing and is_indexing():
+            dialog.after(500, refresh_while_indexing)
+        run_search()
+    
+    def get_selected_symbol():
+        selected = tree.selection()
+        if selected:
+            return state['symbols'].get(selected[0])
+        return None
+    
+    def move_selection(offset):
+        children = tree.get_children()
+        if not children:
+            return "break"
+        selected = tree.selection()
+        index = children.index(selected[0]) if selected else -1
+        index = max(0, min(len(children) - 1, index + offset))
+        tree.selection_set(children[index])
+        tree.see(children[index])
+        return "break"
+    
+    def add_selected(event=None):
+        symbol = get_selected_symbol()
+        if symbol and on_add_symbol:
+            dialog.destroy()
+            on_add_symbol(symbol)
+        return "break"
+    
+    def open_selected(event=None):
+        symbol = get_selected_symbol()
+        if symbol and on_open_symbol:
+            dialog.destroy()
+            on_open_symbol(symbol)
+        return "break"
+    
+    query_var.trace_add("write", schedule_search)
+    query_entry.bind("<Return>", add_selected)
+    query_entry.bind("<Control-Return>", open_selected)
+    query_entry.bind("<Down>", lambda event: move_selection(1))
+    query_entry.bind("<Up>", lambda event: move_selection(-1))
+    tree.bind("<Return>", add_selected)
+    tree.bind("<Double-1>", open_selected)
+    add_button.config(command=add_selected)
+    open_button.config(command=open_selected)
+    dialog.bind("<Escape>", lambda event: dialog.destroy())
+    
+    query_entry.focus_set()
+    refresh_while_indexing()
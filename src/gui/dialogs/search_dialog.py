@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Diálogo para buscar en las selecciones del contexto.
+"""
+import os
+import re
+import tkinter as tk
+from tkinter import ttk
+
+# Resultados que se añaden a la lista en cada página
+PAGE_SIZE = 200
+
+def show_search_dialog(parent, selection_manager, on_open_match=None, initial_query=""):
+    """
+    Muestra una ventana de búsqueda con resultados paginados.
+    
+    Los resultados se obtienen de un generador y solo se añaden a la lista
+    cuando el usuario se acerca al final, así que buscar algo muy común no
+    bloquea la interfaz.
+    
+    Args:
+        parent: Ventana padre
+        selection_manager: Gestor de selecciones en el que buscar
+        on_open_match (callable, optional): Función (ruta, línea) para abrir un resultado
+        initial_query (str): Texto inicial de la búsqueda
+    """
+    search_window = tk.Toplevel(parent)
+    search_window.title("Buscar en las selecciones")
+    search_window.geometry("700x450")
+    search_window.transient(parent)
+    
+    # Estado de la búsqueda en curso
+    state = {'iterator': None, 'count': 0, 'matches': {}}
+    
+    # Barra de búsqueda
+    query_frame = ttk.Frame(search_window, padding=(10, 10, 10, 5))
+    query_frame.pack(fill=tk.X)
+    
+    query_var = tk.StringVar(value=initial_query)
+    query_entry = ttk.Entry(query_frame, textvariable=query_var)
+    query_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+    
+    search_button = ttk.Button(query_frame, text="Buscar")
+    search_button.pack(side=tk.LEFT, padx=(5, 0))
+    
+    options_frame = ttk.Frame(search_window, padding=(10, 0, 10, 5))
+    options_frame.pack(fill=tk.X)
+    
+    regex_var = tk.BooleanVar(value=False)
+    whole_word_var = tk.BooleanVar(value=False)
+    match_case_var = tk.BooleanVar(value=False)
+    ttk.Checkbutton(options_frame, text="Expresión regular", variable=regex_var).pack(side=tk.LEFT)
+    ttk.Checkbutton(options_frame, text="Palabra completa", variable=whole_word_var).pack(side=tk.LEFT, padx=10)
+    ttk.Checkbutton(options_frame, text="Distinguir mayúsculas", variable=match_case_var).pack(side=tk.LEFT)
+    
+    # Lista de resultados
+    tree_frame = ttk.Frame(search_window, padding=(10, 0, 10, 0))
+    tree_frame.pack(fill=tk.BOTH, expand=True)
+    
+    tree = ttk.Treeview(tree_frame, columns=("file", "line", "text"), show="headings")
+    tree.heading("file", text="Archivo")
+    tree.heading("line", text="Línea")
+    tree.heading("text", text="Texto")
+    tree.column("file", width=150, stretch=tk.NO)
+    tree.column("line", width=60, anchor=tk.E, stretch=tk.NO)
+    tree.column("text", width=450)
+    
+    tree_scroll = ttk.Scrollbar(tree_frame, command=tree.yview)
+    tree_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+    tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    
+    status_label = ttk.Label(search_window, text="", padding=(10, 5, 10, 10))
+    status_label.pack(fill=tk.X)
+    
+    def update_status():
+        suffix = "" if state['iterator'] is None else " (desplácese para ver más)"
+        status_label.config(text=f"{state['count']} resultados{suffix}")
+    
+    def load_page():
+        """Añade la siguiente página de resultados a la lista."""
+        iterator = state['iterator']
+        if iterator is None:
+            return
+        
+        for _ in range(PAGE_SIZE):
+            match = next(iterator, None)
+            if match is None:
+                state['iterator'] = None
+                break
+            
+            # Mostrar la línea recortada alrededor de la coincidencia
+            text = match.line_text
+            if len(text) > 200:
+                start = max(0, match.column - 80)
+                text = ("…" if start else "") + text[start:start + 200] + "…"
+            
+            item_id = tree.insert("", "end", values=(os.path.basename(match.file_path), match.line, text.strip()))
+            state['matches'][item_id] = match
+            state['count'] += 1
+        
+        update_status()
+    
+    def on_scroll(first, last):
+        tree_scroll.set(first, last)
+        # Cargar la siguiente página al acercarse al final de la lista
+        if state['iterator'] is not None and float(last) > 0.9:
+            search_window.after_idle(load_page)
+    
+    tree.configure(yscrollcommand=on_scroll)
+    
+    def run_search(event=None):
+        query = query_var.get()
+        tree.delete(*tree.get_children())
+        state['matches'] = {}
+        state['count'] = 0
+        state['iterator'] = None
+        if not query:
+            update_status()
+            return
+        
+        try:
+            # Compilar primero para informar de errores en la expresión regular
+            selection_manager.search_index.compile_query(query, regex_var.get(), whole_word_var.get(),
+                                                         match_case_var.get())
+        except re.error as e:
+            status_label.config(text=f"Expresión regular no válida: {str(e)}")
+            return
+        
+        state['iterator'] = selection_manager.iter_search(query, regex_var.get(), whole_word_var.get(),
+                                                          match_case_var.get())
+        load_page()
+    
+    def open_selected(event=None):
+        selected = tree.selection()
+        if selected and on_open_match:
+            match = state['matches'].get(selected[0])
+            if match:
+                on_open_match(match.file_path, match.line)
+    
+    search_button.config(command=run_search)
+    query_entry.bind("<Return>", run_search)
+    tree.bind("<Double-1>", open_selected)
+    tree.bind("<Return>", open_selected)
+    
+    query_entry.focus_set()
+    if initial_query:
+        run_search()
@@ -6,7 +6,7 @@ Diálogo de configuración para la aplicación.
 import os
 import json
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, filedialog
 
 from src.utils.file_utils import ensure_directory_exists
 
@@ -20,7 +20,7 @@ def open_settings_dialog(parent):
     # Crear ventana de diálogo
     settings_window = tk.Toplevel(parent)
     settings_window.title("Configuración")
-    settings_window.geometry("500x500")
+    settings_window.geometry("500x790")
     settings_window.resizable(True, True)
     settings_window.transient(parent)  # Hacer la ventana modal
     settings_window.grab_set()
@@ -101,6 +101,46 @@ def open_settings_dialog(parent):
     whole_file_entry.grid(row=2, column=1, sticky=tk.W, padx=10, pady=10)
     whole_file_entry.insert(0, "Archivo completo incluido")
     
+    # Minimización del código al exportar
+    minify_var = tk.BooleanVar(value=False)
+    minify_check = ttk.Checkbutton(format_frame, text="Minimizar el código al exportar (sin comentarios ni líneas en blanco)",
+                                   variable=minify_var)
+    minify_check.grid(row=3, column=0, columnspan=2, sticky=tk.W, padx=10, pady=(10, 0))
+    
+    minify_docstrings_var = tk.BooleanVar(value=True)
+    minify_docstrings_check = ttk.Checkbutton(format_frame, text="Quitar también los docstrings",
+                                              variable=minify_docstrings_var)
+    minify_docstrings_check.grid(row=4, column=0, columnspan=2, sticky=tk.W, padx=30, pady=(5, 0))
+    
+    minify_tabs_var = tk.BooleanVar(value=False)
+    minify_tabs_check = ttk.Checkbutton(format_frame, text="Convertir la indentación a tabuladores",
+                                        variable=minify_tabs_var)
+    minify_tabs_check.grid(row=5, column=0, columnspan=2, sticky=tk.W, padx=30, pady=(5, 10))
+    
+    # Sustitución de bloques repetidos entre archivos al exportar
+    dedup_var = tk.BooleanVar(value=False)
+    dedup_check = ttk.Checkbutton(format_frame, text="Sustituir bloques repetidos por referencias",
+                                  variable=dedup_var)
+    dedup_check.grid(row=6, column=0, columnspan=2, sticky=tk.W, padx=10, pady=(10, 0))
+    
+    ttk.Label(format_frame, text="Mínimo de líneas por bloque:").grid(
+        row=7, column=0, sticky=tk.W, padx=30, pady=10)
+    dedup_lines_spinbox = ttk.Spinbox(format_frame, from_=2, to=200)
+    dedup_lines_spinbox.grid(row=7, column=1, sticky=tk.W, padx=10, pady=10)
+    dedup_lines_spinbox.insert(0, "6")
+    
+    # Mapa del repositorio en la cabecera del contexto
+    repo_map_var = tk.BooleanVar(value=False)
+    repo_map_check = ttk.Checkbutton(format_frame, text="Incluir un mapa del repositorio (carpetas y símbolos principales)",
+                                     variable=repo_map_var)
+    repo_map_check.grid(row=8, column=0, columnspan=2, sticky=tk.W, padx=10, pady=(10, 0))
+    
+    ttk.Label(format_frame, text="Máximo de tokens del mapa:").grid(
+        row=9, column=0, sticky=tk.W, padx=30, pady=10)
+    repo_map_tokens_spinbox = ttk.Spinbox(format_frame, from_=100, to=20000, increment=100)
+    repo_map_tokens_spinbox.grid(row=9, column=1, sticky=tk.W, padx=10, pady=10)
+    repo_map_tokens_spinbox.insert(0, "1000")
+    
     # === Pestaña avanzada ===
     advanced_frame = ttk.Frame(notebook)
     notebook.add(advanced_frame, text="Avanzado")
@@ -128,10 +168,76 @@ def open_settings_dialog(parent):
     ttk.Label(advanced_frame, text="Método de estimación de tokens:").grid(
         row=3, column=0, sticky=tk.W, padx=10, pady=10)
     token_method_combobox = ttk.Combobox(advanced_frame, 
-                                        values=["Simple (caracteres/4)", "Avanzado"])
+                                        values=["Simple (caracteres/4)", "Calibrado (rápido)", "Avanzado"])
     token_method_combobox.grid(row=3, column=1, sticky=tk.W, padx=10, pady=10)
     token_method_combobox.current(0)
     
+    # Presupuesto de resaltado de sintaxis por archivo
+    ttk.Label(advanced_frame, text="Límite de resaltado (KB):").grid(
+        row=4, column=0, sticky=tk.W, padx=10, pady=10)
+    highlight_kb_spinbox = ttk.Spinbox(advanced_frame, from_=64, to=65536, increment=64)
+    highlight_kb_spinbox.grid(row=4, column=1, sticky=tk.W, padx=10, pady=10)
+    highlight_kb_spinbox.insert(0, "1024")
+    
+    ttk.Label(advanced_frame, text="Tiempo máximo de resaltado (ms):").grid(
+        row=5, column=0, sticky=tk.W, padx=10, pady=10)
+    highlight_ms_spinbox = ttk.Spinbox(advanced_frame, from_=50, to=10000, increment=50)
+    highlight_ms_spinbox.grid(row=5, column=1, sticky=tk.W, padx=10, pady=10)
+    highlight_ms_spinbox.insert(0, "300")
+    
+    # Modo de archivos grandes del visor
+    ttk.Label(advanced_frame, text="Carga progresiva desde (KB):").grid(
+        row=6, column=0, sticky=tk.W, padx=10, pady=10)
+    large_file_kb_spinbox = ttk.Spinbox(advanced_frame, from_=256, to=1048576, increment=256)
+    large_file_kb_spinbox.grid(row=6, column=1, sticky=tk.W, padx=10, pady=10)
+    large_file_kb_spinbox.insert(0, "2048")
+    
+    ttk.Label(advanced_frame, text="Solo vista previa desde (MB):").grid(
+        row=7, column=0, sticky=tk.W, padx=10, pady=10)
+    large_file_cap_spinbox = ttk.Spinbox(advanced_frame, from_=1, to=4096)
+    large_file_cap_spinbox.grid(row=7, column=1, sticky=tk.W, padx=10, pady=10)
+    large_file_cap_spinbox.insert(0, "20")
+    
+    # Guarda de líneas largas (archivos minificados)
+    ttk.Label(advanced_frame, text="Línea larga a partir de (caracteres):").grid(
+        row=8, column=0, sticky=tk.W, padx=10, pady=10)
+    long_line_spinbox = ttk.Spinbox(advanced_frame, from_=1000, to=1000000, increment=1000)
+    long_line_spinbox.grid(row=8, column=1, sticky=tk.W, padx=10, pady=10)
+    long_line_spinbox.insert(0, "10000")
+    
+    ttk.Label(advanced_frame, text="Mostrar líneas largas:").grid(
+        row=9, column=0, sticky=tk.W, padx=10, pady=10)
+    long_line_mode_combobox = ttk.Combobox(advanced_frame, values=["Truncar", "Ajustar"])
+    long_line_mode_combobox.grid(row=9, column=1, sticky=tk.W, padx=10, pady=10)
+    long_line_mode_combobox.current(0)
+    
+    # Vocabulario BPE local para el conteo exacto de tokens (método "Avanzado")
+    ttk.Label(advanced_frame, text="Vocabulario BPE (opcional):").grid(
+        row=10, column=0, sticky=tk.W, padx=10, pady=10)
+    vocab_frame = ttk.Frame(advanced_frame)
+    vocab_frame.grid(row=10, column=1, sticky=tk.W+tk.E, padx=10, pady=10)
+    bpe_vocab_entry = ttk.Entry(vocab_frame)
+    bpe_vocab_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+    
+    def browse_vocab():
+        path = filedialog.askopenfilename(
+            parent=settings_window,
+            title="Seleccionar vocabulario BPE",
+            filetypes=[("Vocabulario tiktoken", "*.tiktoken"), ("Vocabulario GPT-2", "vocab.json"),
+                       ("Todos los archivos", "*.*")]
+        )
+        if path:
+            bpe_vocab_entry.delete(0, tk.END)
+            bpe_vocab_entry.insert(0, path)
+    
+    ttk.Button(vocab_frame, text="Examinar", command=browse_vocab).pack(side=tk.LEFT, padx=(5, 0))
+    
+    # Índice persistente del proyecto para la búsqueda
+    project_index_var = tk.BooleanVar(value=False)
+    project_index_check = ttk.Checkbutton(advanced_frame, text="Usar índice persistente en la búsqueda del proyecto",
+                                          variable=project_index_var)
+    project_index_check.grid(row=11, column=0, columnspan=2, sticky=tk.W, padx=10, pady=10)
+    
     # Configurar expansión
     for tab_frame in [general_frame, file_types_frame, format_frame, advanced_frame]:
         tab_frame.columnconfigure(1, weight=1)
@@ -158,13 +264,28 @@ def open_settings_dialog(parent):
                 'format': {
                     'file_header': file_header_entry.get(),
                     'selection_header': selection_header_entry.get(),
-                    'whole_file_text': whole_file_entry.get()
+                    'whole_file_text': whole_file_entry.get(),
+                    'minify': minify_var.get(),
+                    'minify_docstrings': minify_docstrings_var.get(),
+                    'minify_indent_tabs': minify_tabs_var.get(),
+                    'dedup': dedup_var.get(),
+                    'dedup_min_lines': int(dedup_lines_spinbox.get()),
+                    'repo_map': repo_map_var.get(),
+                    'repo_map_tokens': int(repo_map_tokens_spinbox.get())
                 },
                 'advanced': {
                     'recent_folders_count': int(recent_folders_spinbox.get()),
                     'autosave': autosave_var.get(),
                     'autosave_interval': int(autosave_spinbox.get()),
-                    'token_method': token_method_combobox.get()
+                    'token_method': token_method_combobox.get(),
+                    'highlight_max_kb': int(highlight_kb_spinbox.get()),
+                    'highlight_max_ms': int(highlight_ms_spinbox.get()),
+                    'large_file_threshold_kb': int(large_file_kb_spinbox.get()),
+                    'large_file_cap_mb': int(large_file_cap_spinbox.get()),
+                    'long_line_threshold': int(long_line_spinbox.get()),
+                    'long_line_mode': long_line_mode_combobox.get(),
+                    'bpe_vocab_path': bpe_vocab_entry.get().strip(),
+                    'project_index': project_index_var.get()
                 }
             }
             
@@ -179,6 +300,8 @@ def open_settings_dialog(parent):
             # Aplicar configuración
             if hasattr(parent, '_apply_theme'):
                 parent._apply_theme()
+            if hasattr(parent, '_apply_settings'):
+                parent._apply_settings()
             
             # Notificar al usuario
             from tkinter import messagebox
@@ -224,6 +347,22 @@ def open_settings_dialog(parent):
                 if 'whole_file_text' in fmt:
                     whole_file_entry.delete(0, tk.END)
                     whole_file_entry.insert(0, fmt['whole_file_text'])
+                if 'minify' in fmt:
+                    minify_var.set(fmt['minify'])
+                if 'minify_docstrings' in fmt:
+                    minify_docstrings_var.set(fmt['minify_docstrings'])
+                if 'minify_indent_tabs' in fmt:
+                    minify_tabs_var.set(fmt['minify_indent_tabs'])
+                if 'dedup' in fmt:
+                    dedup_var.set(fmt['dedup'])
+                if 'dedup_min_lines' in fmt:
+                    dedup_lines_spinbox.delete(0, tk.END)
+                    dedup_lines_spinbox.insert(0, str(fmt['dedup_min_lines']))
+                if 'repo_map' in fmt:
+                    repo_map_var.set(fmt['repo_map'])
+                if 'repo_map_tokens' in fmt:
+                    repo_map_tokens_spinbox.delete(0, tk.END)
+                    repo_map_tokens_spinbox.insert(0, str(fmt['repo_map_tokens']))
             
             if 'advanced' in saved_settings:
                 adv = saved_settings['advanced']
@@ -237,6 +376,28 @@ def open_settings_dialog(parent):
                     autosave_spinbox.insert(0, str(adv['autosave_interval']))
                 if 'token_method' in adv:
                     token_method_combobox.set(adv['token_method'])
+                if 'highlight_max_kb' in adv:
+                    highlight_kb_spinbox.delete(0, tk.END)
+                    highlight_kb_spinbox.insert(0, str(adv['highlight_max_kb']))
+                if 'highlight_max_ms' in adv:
+                    highlight_ms_spinbox.delete(0, tk.END)
+                    highlight_ms_spinbox.insert(0, str(adv['highlight_max_ms']))
+                if 'large_file_threshold_kb' in adv:
+                    large_file_kb_spinbox.delete(0, tk.END)
+                    large_file_kb_spinbox.insert(0, str(adv['large_file_threshold_kb']))
+                if 'large_file_cap_mb' in adv:
+                    large_file_cap_spinbox.delete(0, tk.END)
+                    large_file_cap_spinbox.insert(0, str(adv['large_file_cap_mb']))
+                if 'long_line_threshold' in adv:
+                    long_line_spinbox.delete(0, tk.END)
+                    long_line_spinbox.insert(0, str(adv['long_line_threshold']))
+                if 'long_line_mode' in adv:
+                    long_line_mode_combobox.set(adv['long_line_mode'])
+                if 'bpe_vocab_path' in adv:
+                    bpe_vocab_entry.delete(0, tk.END)
+                    bpe_vocab_entry.insert(0, adv['bpe_vocab_path'])
+                if 'project_index' in adv:
+                    project_index_var.set(adv['project_index'])
     except Exception as e:
         print(f"Error al cargar configuración: {str(e)}")
     
@@ -271,6 +432,16 @@ def open_settings_dialog(parent):
             whole_file_entry.delete(0, tk.END)
             whole_file_entry.insert(0, "Archivo completo incluido")
             
+            minify_var.set(False)
+            minify_docstrings_var.set(True)
+            minify_tabs_var.set(False)
+            dedup_var.set(False)
+            dedup_lines_spinbox.delete(0, tk.END)
+            dedup_lines_spinbox.insert(0, "6")
+            repo_map_var.set(False)
+            repo_map_tokens_spinbox.delete(0, tk.END)
+            repo_map_tokens_spinbox.insert(0, "1000")
+            
             recent_folders_spinbox.delete(0, tk.END)
             recent_folders_spinbox.insert(0, "5")
             
@@ -279,6 +450,23 @@ def open_settings_dialog(parent):
             autosave_spinbox.insert(0, "5")
             
             token_method_combobox.current(0)
+            
+            highlight_kb_spinbox.delete(0, tk.END)
+            highlight_kb_spinbox.insert(0, "1024")
+            highlight_ms_spinbox.delete(0, tk.END)
+            highlight_ms_spinbox.insert(0, "300")
+            
+            large_file_kb_spinbox.delete(0, tk.END)
+            large_file_kb_spinbox.insert(0, "2048")
+            large_file_cap_spinbox.delete(0, tk.END)
+            large_file_cap_spinbox.insert(0, "20")
+            
+            long_line_spinbox.delete(0, tk.END)
+            long_line_spinbox.insert(0, "10000")
+            long_line_mode_combobox.current(0)
+            
+            bpe_vocab_entry.delete(0, tk.END)
+            project_index_var.set(False)
     
     defaults_button = ttk.Button(button_frame, text="Restaurar predeterminados", 
                                 command=restore_defaults)
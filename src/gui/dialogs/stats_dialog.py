@@ -75,14 +75,15 @@ def show_stats_dialog(parent, stats):
     row += 1  # Espacio adicional
     add_stat_row("Tamaño total:", f"{stats['total_chars']} caracteres", is_header=True)
     
-    # Tokens aproximados
+    # Tokens (exactos si hay un vocabulario BPE disponible)
     tokens = stats['approx_tokens']
+    token_method = stats.get('token_method', "aproximados")
     token_color = "green" if tokens < 4000 else ("orange" if tokens < 8000 else "red")
     
     token_frame = ttk.Frame(stats_frame)
     token_frame.grid(row=row, column=0, columnspan=2, sticky=tk.W+tk.E, pady=3)
     
-    token_label = ttk.Label(token_frame, text="Tokens aproximados:", font=("Segoe UI", 10, "bold"))
+    token_label = ttk.Label(token_frame, text=f"Tokens {token_method}:", font=("Segoe UI", 10, "bold"))
     token_label.pack(side=tk.LEFT)
     
     token_value = ttk.Label(token_frame, text=str(tokens), font=("Segoe UI", 10, "bold"))
@@ -90,6 +91,18 @@ def show_stats_dialog(parent, stats):
     
     row += 1
     
+    # Tokens tras la minimización al exportar (si está activada)
+    if 'minified_tokens' in stats:
+        minified = stats['minified_tokens']
+        saved = 100 * (tokens - minified) / tokens if tokens else 0
+        add_stat_row("Tras minimizar:", f"{minified} (-{saved:.0f}%)", indent=True)
+    
+    # Ahorro por la sustitución de bloques repetidos entre archivos
+    dedup = stats.get('dedup')
+    if dedup:
+        add_stat_row("Bloques repetidos:", dedup['blocks'], indent=True)
+        add_stat_row("Ahorro por bloques repetidos:", f"{dedup['bytes']} bytes · {dedup['tokens']} tokens", indent=True)
+    
     # Mostrar archivos individuales si hay un número razonable
     if len(stats.get('files', [])) > 0 and len(stats.get('files', [])) <= 10:
         row += 1  # Espacio adicional
@@ -110,10 +123,13 @@ def show_stats_dialog(parent, stats):
             file_icon_label = ttk.Label(file_frame, text="📄")
             file_icon_label.pack(side=tk.LEFT, padx=(5, 3))
             
-            file_name_label = ttk.Label(file_frame, text=file_name, font=("Segoe UI", 9))
+            mode_text = {'head': " (solo el inicio)", 'outline': " (esquema)",
+                         'excluded': " (excluido)"}.get(file_info.get('mode'), "")
+            file_name_label = ttk.Label(file_frame, text=file_name + mode_text, font=("Segoe UI", 9))
             file_name_label.pack(side=tk.LEFT)
             
-            file_size_label = ttk.Label(file_frame, text=f"{file_size} caracteres", 
+            file_tokens = file_info.get('tokens', file_size // 4)
+            file_size_label = ttk.Label(file_frame, text=f"{file_size} caracteres · {file_tokens} tokens", 
                                       font=("Segoe UI", 8))
             file_size_label.pack(side=tk.RIGHT)
             
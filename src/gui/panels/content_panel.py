@@ -4,15 +4,38 @@
 Panel para visualizar el contenido de los archivos con resaltado de sintaxis.
 """
 import os
+import mmap
 import tkinter as tk
 from tkinter import ttk
 
 from src.gui.panels.base_panel import Panel
+from src.utils.long_lines import LongLineGuard
 
 class FileContentPanel(Panel):
     """Panel para mostrar el contenido de archivos con resaltado de sintaxis."""
     
-    def __init__(self, parent, syntax_highlighter, on_add_selection, on_context_menu):
+    # Avisos a mostrar cuando el resaltado se ha degradado por presupuesto
+    HIGHLIGHT_NOTICES = {
+        "keywords": "Resaltado simplificado (solo palabras clave): archivo grande o costoso de analizar",
+        "plain": "Resaltado desactivado: el archivo supera el presupuesto de resaltado",
+    }
+    
+    # Caracteres insertados de inmediato y en cada paso de carga progresiva
+    FIRST_CHUNK_CHARS = 64 * 1024
+    STREAM_CHUNK_CHARS = 256 * 1024
+    
+    # Bytes cargados al inicio y al final en modo vista previa (y por cada "cargar más")
+    PREVIEW_BYTES = 1024 * 1024
+    
+    # Marca de Tk donde se insertan los bloques de "cargar más"
+    PREVIEW_MARK = "preview_gap"
+    PREVIEW_TAG = "preview_marker"
+    
+    # Tag de los marcadores de líneas largas truncadas
+    LONG_LINE_TAG = "long_line_marker"
+    
+    def __init__(self, parent, syntax_highlighter, on_add_selection, on_context_menu, on_add_whole_file=None,
+                 on_pull_callees=None, get_structure=None):
         """
         Inicializa el panel de contenido de archivos.
         
@@ -21,12 +44,40 @@ class FileContentPanel(Panel):
             syntax_highlighter: Instancia de SyntaxHighlighter
             on_add_selection: Callback al añadir una selección
             on_context_menu: Callback para mostrar el menú contextual
+            on_add_whole_file: Callback para añadir el archivo original completo
+            on_pull_callees: Callback para añadir las funciones llamadas desde la selección
+            get_structure: Función (ruta) -> FileStructure del archivo, para la
+                selección estructural
         """
         self.syntax_highlighter = syntax_highlighter
         self.on_add_selection = on_add_selection
         self.on_context_menu = on_context_menu
+        self.on_add_whole_file = on_add_whole_file
+        self.on_pull_callees = on_pull_callees
+        self.get_structure = get_structure
         self.current_file = None
         self.highlight_tag = "selection_highlight"
+        
+        # Límites del modo de archivos grandes
+        self.large_file_threshold = 2 * 1024 * 1024
+        self.large_file_cap = 20 * 1024 * 1024
+        
+        # Guarda de líneas largas ("truncate" o "wrap")
+        self.long_line_threshold = 10000
+        self.long_line_mode = "truncate"
+        self.long_line_guard = None
+        self._notices = {}
+        
+        # Estado de la carga progresiva / vista previa en curso
+        self._stream_file = None
+        self._stream_job = None
+        self._stream_loaded = 0
+        self._stream_size = 0
+        self._preview = None
+        
+        # Selecciones anteriores a cada ampliación estructural (para reducirla)
+        self._structure_history = []
+        self._structure_selection = None
         super().__init__(parent)
     
     def _create_widgets(self):
@@ -102,14 +153,35 @@ class FileContentPanel(Panel):
             label="Añadir selección al contexto",
             command=self._handle_add_selection
         )
+        if self.on_pull_callees:
+            self.content_menu.add_command(
+                label="Añadir funciones llamadas...",
+                command=self._handle_pull_callees
+            )
         self.content_menu.add_command(
             label="Copiar", 
             command=self._copy_selection
         )
+        if self.get_structure:
+            self.content_menu.add_separator()
+            self.content_menu.add_command(label="Seleccionar función", command=lambda: self.select_enclosing("function"))
+            self.content_menu.add_command(label="Seleccionar clase", command=lambda: self.select_enclosing("class"))
+            self.content_menu.add_command(label="Seleccionar bloque", command=lambda: self.select_enclosing("block"))
+            self.content_menu.add_command(label="Ampliar selección", command=self.grow_selection,
+                                          accelerator="Alt+Arriba")
+            self.content_menu.add_command(label="Reducir selección", command=self.shrink_selection,
+                                          accelerator="Alt+Abajo")
         
         # Vincular el menú contextual
         self.content_text.bind("<Button-3>", self._handle_context_menu)
         
+        # Selección estructural con el teclado (el widget deshabilitado no toma
+        # el foco al hacer clic, así que se le da explícitamente)
+        if self.get_structure:
+            self.content_text.bind("<Button-1>", lambda event: self.content_text.focus_set(), add="+")
+            self.content_text.bind("<Alt-Up>", lambda event: self.grow_selection() and "break")
+            self.content_text.bind("<Alt-Down>", lambda event: self.shrink_selection() and "break")
+        
 
         
         # Crear estilo para el botón de selección
@@ -124,11 +196,89 @@ class FileContentPanel(Panel):
             style="Selection.TButton"
         )
         self.add_selection_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.add_whole_file_btn = ttk.Button(
+            self.selection_frame,
+            text="Añadir archivo completo",
+            command=self._handle_add_whole_file,
+            style="Selection.TButton"
+        )
+        self.add_whole_file_btn.pack(side=tk.LEFT, padx=5)
+        
+        # Botón para alternar entre líneas largas truncadas y ajustadas (oculto por defecto)
+        self.long_line_btn = ttk.Button(
+            self.selection_frame,
+            text="Ajustar líneas largas",
+            command=self._toggle_long_line_mode,
+            style="Selection.TButton"
+        )
+        
+        # Aviso cuando el archivo se muestra con un modo reducido
+        self.notice_var = tk.StringVar(value="")
+        self.notice_label = ttk.Label(
+            self.selection_frame,
+            textvariable=self.notice_var,
+            font=("Segoe UI", 9, "italic"),
+            foreground="#CC6600"
+        )
+        self.notice_label.pack(side=tk.LEFT, padx=10)
+        
+        # Botón para cargar más contenido en modo vista previa (oculto por defecto)
+        self.load_more_btn = ttk.Button(
+            self.selection_frame,
+            text="Cargar más",
+            command=self._load_more_preview,
+            style="Selection.TButton"
+        )
+    
+    def set_large_file_limits(self, threshold_bytes=None, cap_bytes=None):
+        """
+        Configura los límites del modo de archivos grandes.
+        
+        Args:
+            threshold_bytes (int, optional): Tamaño a partir del cual se carga por bloques
+            cap_bytes (int, optional): Tamaño a partir del cual solo se muestra una vista previa
+        """
+        if threshold_bytes is not None:
+            self.large_file_threshold = threshold_bytes
+        if cap_bytes is not None:
+            self.large_file_cap = cap_bytes
+    
+    def set_long_line_options(self, threshold=None, mode=None):
+        """
+        Configura la guarda de líneas largas.
+        
+        Args:
+            threshold (int, optional): Longitud a partir de la cual una línea es larga
+            mode (str, optional): "truncate" para truncarlas o "wrap" para ajustarlas
+        """
+        if threshold is not None:
+            self.long_line_threshold = threshold
+        if mode in ("truncate", "wrap"):
+            self.long_line_mode = mode
+    
+    def set_notice(self, text, source="general"):
+        """
+        Muestra (o limpia, si está vacío) un aviso bajo el contenido.
+        
+        Args:
+            text (str): Texto del aviso
+            source (str): Origen del aviso; cada origen sustituye solo su propio aviso
+        """
+        if text:
+            self._notices[source] = text
+        else:
+            self._notices.pop(source, None)
+        self.notice_var.set(" · ".join(self._notices.values()))
     
     def load_file(self, file_path):
         """
         Carga el contenido de un archivo en el widget Text.
         
+        Los archivos que superan el umbral de archivos grandes se cargan de
+        forma progresiva, y los que superan el límite solo muestran el
+        inicio y el final, con la opción de cargar más.
+        
         Args:
             file_path (str): Ruta del archivo a cargar
             
@@ -136,19 +286,37 @@ class FileContentPanel(Panel):
             bool: True si se cargó correctamente
         """
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                content = f.read()
+            # Cancelar cualquier carga progresiva anterior
+            self._cancel_stream()
+            self.load_more_btn.pack_forget()
+            self.long_line_btn.pack_forget()
+            self._notices = {}
+            self.set_notice("")
+            
+            size = os.path.getsize(file_path)
             
             self.current_file = file_path
+            self._structure_history = []
+            self._structure_selection = None
             
             # Actualizar el widget Text
-            self.content_text.config(state=tk.NORMAL)
+            self.content_text.config(state=tk.NORMAL, wrap=tk.NONE)
             self.content_text.delete(1.0, tk.END)
-            self.content_text.insert(tk.END, content)
             
-            # Aplicar resaltado de sintaxis según extensión
-            file_ext = os.path.splitext(file_path)[1].lower()
-            self.syntax_highlighter.highlight(self.content_text, file_ext)
+            # Detectar (y según el modo truncar) las líneas demasiado largas
+            self.long_line_guard = self._new_long_line_guard()
+            
+            if self.large_file_cap and size > self.large_file_cap:
+                self._load_preview(file_path, size)
+            elif self.large_file_threshold and size > self.large_file_threshold:
+                self._start_stream(file_path, size)
+            else:
+                with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                    content = f.read()
+                guard = self.long_line_guard
+                self.content_text.insert(tk.END, guard.feed(content) + guard.flush())
+                self._apply_long_line_view()
+                self._highlight_current(file_path, cacheable=not guard.truncated)
             
             self.content_text.config(state=tk.DISABLED)
             
@@ -160,13 +328,316 @@ class FileContentPanel(Panel):
             print(f"Error al cargar archivo: {str(e)}")
             return False
     
+    def _highlight_current(self, file_path, cacheable=True):
+        """
+        Aplica el resaltado de sintaxis al contenido mostrado.
+        
+        Args:
+            file_path (str): Ruta del archivo mostrado
+            cacheable (bool): Si el widget contiene el archivo completo y sin
+                modificar, de modo que los spans se pueden guardar en caché
+        """
+        # Aplicar resaltado de sintaxis según extensión
+        file_ext = os.path.splitext(file_path)[1].lower()
+        mode = self.syntax_highlighter.highlight(
+            self.content_text, file_ext, file_path if cacheable else None
+        )
+        self.set_notice(self.HIGHLIGHT_NOTICES.get(mode, ""), "highlight")
+        
+        # El resaltado reinicia los tags: volver a marcar las líneas truncadas
+        self._tag_long_line_markers()
+    
+    def _new_long_line_guard(self):
+        """Crea la guarda de líneas largas con la configuración actual."""
+        return LongLineGuard(self.long_line_threshold, truncate=self.long_line_mode == "truncate")
+    
+    def _apply_long_line_view(self, extra_count=0):
+        """
+        Ajusta el widget y muestra el aviso si hay líneas demasiado largas.
+        
+        Args:
+            extra_count (int): Líneas largas detectadas fuera de la guarda principal
+                (por ejemplo, en el final de una vista previa)
+        """
+        guard = self.long_line_guard
+        if not guard:
+            return
+        
+        count = len(guard.long_lines) + extra_count
+        if not count:
+            return
+        
+        if guard.truncate:
+            self.content_text.config(wrap=tk.NONE)
+            self.set_notice(
+                f"{count} líneas muy largas truncadas y sin resaltar; "
+                f"'Añadir archivo completo' incluye el original",
+                "long_lines"
+            )
+            self.long_line_btn.config(text="Ajustar líneas largas")
+        else:
+            self.content_text.config(wrap=tk.CHAR)
+            self.set_notice(f"{count} líneas muy largas ajustadas y sin resaltar", "long_lines")
+            self.long_line_btn.config(text="Truncar líneas largas")
+        
+        if not self.long_line_btn.winfo_ismapped():
+            self.long_line_btn.pack(side=tk.LEFT, padx=5)
+    
+    def _tag_long_line_markers(self):
+        """Marca visualmente los indicadores de contenido oculto en líneas truncadas."""
+        guard = self.long_line_guard
+        if not guard or not guard.truncated:
+            return
+        
+        self.content_text.tag_configure(self.LONG_LINE_TAG, foreground="#CC6600")
+        for line in guard.long_lines:
+            self.content_text.tag_add(self.LONG_LINE_TAG, f"{line}.{guard.threshold}", f"{line}.end")
+    
+    def _toggle_long_line_mode(self):
+        """Alterna entre líneas largas truncadas y ajustadas y recarga el archivo."""
+        self.long_line_mode = "wrap" if self.long_line_mode == "truncate" else "truncate"
+        if self.current_file:
+            self.load_file(self.current_file)
+    
+    def get_original_text(self, start, end):
+        """
+        Obtiene el texto original del archivo entre dos posiciones del widget.
+        
+        Si el rango toca líneas truncadas, el texto se reconstruye desde el
+        archivo en disco, de modo que la selección incluye la línea completa y
+        no el marcador de contenido oculto.
+        
+        Args:
+            start (str): Índice de inicio en el widget ("línea.columna")
+            end (str): Índice de fin en el widget ("línea.columna")
+            
+        Returns:
+            str: Texto original del rango
+        """
+        text = self.content_text.get(start, end)
+        guard = self.long_line_guard
+        if not guard or not guard.truncated or self._preview or not self.current_file:
+            return text
+        
+        start_line, start_col = map(int, start.split('.'))
+        end_line, end_col = map(int, end.split('.'))
+        if not any(start_line <= line <= end_line for line in guard.long_lines):
+            return text
+        
+        # Leer solo las líneas afectadas del archivo original
+        lines = []
+        with open(self.current_file, 'r', encoding='utf-8', errors='replace', newline='') as f:
+            for number, line in enumerate(f, 1):
+                if number > end_line:
+                    break
+                if number >= start_line:
+                    lines.append(line)
+        if not lines:
+            return text
+        
+        # Las columnas posteriores al umbral de una línea truncada equivalen al final de la línea
+        if end_line in guard.long_lines and end_col >= guard.threshold:
+            lines[-1] = lines[-1].rstrip('\r\n')
+        else:
+            lines[-1] = lines[-1][:end_col]
+        lines[0] = lines[0][min(start_col, guard.threshold):]
+        return ''.join(lines)
+    
+    def get_file_lines(self, start, end):
+        """
+        Obtiene las líneas del archivo que ocupa un rango del widget.
+        
+        En la vista previa de un archivo grande solo la parte inicial (antes
+        del separador) conserva la numeración del archivo; del final mostrado
+        no se sabe en qué línea empieza.
+        
+        Args:
+            start (str): Índice de inicio en el widget ("línea.columna")
+            end (str): Índice de fin en el widget ("línea.columna")
+        
+        Returns:
+            tuple: (primera línea, última línea) o None si el rango no tiene
+                líneas conocidas del archivo
+        """
+        if self._preview and self.content_text.compare(end, ">", self.PREVIEW_MARK):
+            return None
+        first_line = int(start.split('.')[0])
+        last_line, last_column = map(int, end.split('.'))
+        # Una selección que termina al principio de una línea no la incluye
+        if last_column == 0 and last_line > first_line:
+            last_line -= 1
+        return first_line, last_line
+    
+    def _cancel_stream(self):
+        """Cancela la carga progresiva en curso y libera el archivo abierto."""
+        if self._stream_job is not None:
+            self.content_text.after_cancel(self._stream_job)
+            self._stream_job = None
+        if self._stream_file is not None:
+            self._stream_file.close()
+            self._stream_file = None
+        self._preview = None
+    
+    def _start_stream(self, file_path, size):
+        """
+        Inserta el primer bloque de un archivo grande y programa el resto.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            size (int): Tamaño del archivo en bytes
+        """
+        self._stream_file = open(file_path, 'r', encoding='utf-8', errors='replace')
+        self._stream_size = size
+        first_chunk = self._stream_file.read(self.FIRST_CHUNK_CHARS)
+        self._stream_loaded = len(first_chunk)
+        self.content_text.insert(tk.END, self.long_line_guard.feed(first_chunk))
+        self._apply_long_line_view()
+        self._update_stream_notice()
+        self._stream_job = self.content_text.after_idle(self._stream_next_chunk)
+    
+    def _stream_next_chunk(self):
+        """Inserta el siguiente bloque del archivo en tiempo ocioso."""
+        self._stream_job = None
+        if self._stream_file is None:
+            return
+        
+        chunk = self._stream_file.read(self.STREAM_CHUNK_CHARS)
+        if chunk:
+            self.content_text.config(state=tk.NORMAL)
+            self.content_text.insert(tk.END, self.long_line_guard.feed(chunk))
+            self.content_text.config(state=tk.DISABLED)
+            self._apply_long_line_view()
+            self._stream_loaded += len(chunk)
+            self._update_stream_notice()
+            # Ceder el control al bucle de eventos antes del siguiente bloque
+            self._stream_job = self.content_text.after(1, self._stream_next_chunk)
+            return
+        
+        # Carga completada: cerrar el archivo y aplicar el resaltado
+        self._stream_file.close()
+        self._stream_file = None
+        self.set_notice("", "load")
+        self.content_text.config(state=tk.NORMAL)
+        self.content_text.insert(tk.END, self.long_line_guard.flush())
+        self._apply_long_line_view()
+        self._highlight_current(self.current_file, cacheable=not self.long_line_guard.truncated)
+        self.content_text.config(state=tk.DISABLED)
+    
+    def _update_stream_notice(self):
+        """Muestra el progreso de la carga progresiva."""
+        percent = min(100, int(self._stream_loaded * 100 / max(1, self._stream_size)))
+        self.set_notice(f"Archivo grande: cargando... {percent}%", "load")
+    
+    def _load_preview(self, file_path, size):
+        """
+        Carga solo el inicio y el final de un archivo que supera el límite.
+        
+        Los cortes se hacen en saltos de línea para no partir caracteres UTF-8.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            size (int): Tamaño del archivo en bytes
+        """
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            head_end = mm.rfind(b'\n', 0, self.PREVIEW_BYTES) + 1 or self.PREVIEW_BYTES
+            tail_start = mm.find(b'\n', size - self.PREVIEW_BYTES) + 1 or size - self.PREVIEW_BYTES
+            tail_start = max(tail_start, head_end)
+            head = mm[:head_end].decode('utf-8', errors='replace')
+            tail = mm[tail_start:].decode('utf-8', errors='replace')
+        
+        self._preview = {
+            'path': file_path,
+            'size': size,
+            'loaded_end': head_end,
+            'tail_start': tail_start
+        }
+        
+        # La guarda de líneas largas continúa con los bloques de "cargar más";
+        # el final usa su propia guarda, ya que sus números de línea no se conocen
+        tail_guard = self._new_long_line_guard()
+        self.content_text.insert(tk.END, self.long_line_guard.feed(head))
+        self.content_text.mark_set(self.PREVIEW_MARK, "end-1c")
+        self.content_text.mark_gravity(self.PREVIEW_MARK, tk.LEFT)
+        self.content_text.insert(tk.END, tail_guard.feed(tail) + tail_guard.flush())
+        self._apply_long_line_view(extra_count=len(tail_guard.long_lines))
+        
+        # El contenido no es el archivo completo: no se cachea el resaltado
+        self._highlight_current(file_path, cacheable=False)
+        
+        # A partir de aquí lo insertado en la marca queda antes de ella
+        self.content_text.mark_gravity(self.PREVIEW_MARK, tk.RIGHT)
+        self.content_text.tag_configure(self.PREVIEW_TAG, foreground="#CC6600")
+        self._insert_preview_marker()
+        self._update_preview_notice()
+        self.load_more_btn.pack(side=tk.LEFT, padx=5)
+    
+    def _insert_preview_marker(self):
+        """Inserta el separador que indica cuánto contenido queda por cargar."""
+        omitted = self._preview['tail_start'] - self._preview['loaded_end']
+        marker = f"\n[... {omitted / (1024 * 1024):.1f} MB sin cargar ...]\n\n"
+        self.content_text.insert(self.PREVIEW_MARK, marker, self.PREVIEW_TAG)
+        # Dejar la marca justo antes del separador
+        self.content_text.mark_set(self.PREVIEW_MARK, f"{self.PREVIEW_MARK}-{len(marker)}c")
+    
+    def _update_preview_notice(self):
+        """Muestra cuánto del archivo se está visualizando en modo vista previa."""
+        preview = self._preview
+        shown = preview['loaded_end'] + (preview['size'] - preview['tail_start'])
+        self.set_notice(
+            f"Vista previa: {shown / (1024 * 1024):.1f} MB de "
+            f"{preview['size'] / (1024 * 1024):.1f} MB (inicio y final)",
+            "load"
+        )
+    
+    def _load_more_preview(self):
+        """Carga el siguiente bloque del archivo en la vista previa."""
+        preview = self._preview
+        if not preview:
+            return
+        
+        start = preview['loaded_end']
+        with open(preview['path'], 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = min(start + self.PREVIEW_BYTES, preview['tail_start'])
+            if end < preview['tail_start']:
+                end = mm.rfind(b'\n', start, end) + 1 or end
+            chunk = mm[start:end].decode('utf-8', errors='replace')
+        
+        self.content_text.config(state=tk.NORMAL)
+        self.content_text.delete(self.PREVIEW_MARK, f"{self.PREVIEW_TAG}.last")
+        self.content_text.insert(self.PREVIEW_MARK, self.long_line_guard.feed(chunk))
+        self._apply_long_line_view()
+        preview['loaded_end'] = end
+        
+        if end >= preview['tail_start']:
+            # El inicio ya alcanza al final: el archivo está completo
+            self._preview = None
+            self.load_more_btn.pack_forget()
+            self.set_notice("", "load")
+        else:
+            self._insert_preview_marker()
+            self._update_preview_notice()
+        self.content_text.config(state=tk.DISABLED)
+    
     def _handle_add_selection(self):
         """Maneja el evento de añadir selección."""
         if self.on_add_selection:
             self.on_add_selection(self.content_text)
     
+    def _handle_pull_callees(self):
+        """Maneja el evento de añadir las funciones llamadas desde la selección."""
+        if self.on_pull_callees:
+            self.on_pull_callees(self.content_text)
+    
+    def _handle_add_whole_file(self):
+        """Maneja el evento de añadir el archivo completo (original) al contexto."""
+        if self.on_add_whole_file:
+            self.on_add_whole_file()
+    
     def _handle_context_menu(self, event):
         """Muestra el menú contextual."""
+        # Sin selección, las órdenes estructurales parten del punto del clic
+        if not self.content_text.tag_ranges(tk.SEL):
+            self.content_text.mark_set(tk.INSERT, f"@{event.x},{event.y}")
         if self.on_context_menu:
             self.on_context_menu(event, self.content_text, self.content_menu)
     
@@ -181,6 +652,189 @@ class FileContentPanel(Panel):
         except tk.TclError:
             pass  # No hay selección
     
+    # Tipos de región de cada orden "Seleccionar ..."
+    STRUCTURE_KINDS = {
+        "function": {"function"},
+        "class": {"class"},
+        "block": {"block", "function", "class"},
+    }
+    
+    # Nombre de cada tipo de región en los avisos
+    STRUCTURE_LABELS = {"function": "Función", "class": "Clase", "block": "Bloque", "statement": "Sentencia"}
+    
+    def _current_structure(self):
+        """
+        Obtiene la estructura del archivo mostrado.
+        
+        Returns:
+            FileStructure: Estructura o None si no está disponible (p. ej. en
+                la vista previa de un archivo grande, que no tiene todas las líneas)
+        """
+        if not self.get_structure or not self.current_file or self._preview:
+            return None
+        return self.get_structure(self.current_file)
+    
+    def _selected_lines(self):
+        """
+        Obtiene las líneas de la selección actual o, si no hay, la del cursor.
+        
+        Returns:
+            tuple: (primera línea, última línea, True si la selección ocupa
+                exactamente líneas completas)
+        """
+        ranges = self.content_text.tag_ranges(tk.SEL)
+        if not ranges:
+            line = int(self.content_text.index(tk.INSERT).split('.')[0])
+            return line, line, False
+        
+        start = self.content_text.index(ranges[0])
+        end = self.content_text.index(ranges[-1])
+        first_line, first_column = map(int, start.split('.'))
+        last_line, last_column = map(int, end.split('.'))
+        # Una selección que termina al principio de una línea no la incluye
+        if last_column == 0 and last_line > first_line:
+            last_line -= 1
+            whole = first_column == 0
+        else:
+            whole = first_column == 0 and self.content_text.compare(end, "==", f"{last_line}.0 lineend")
+        return first_line, last_line, whole
+    
+    def _select_lines(self, first_line, last_line, region=None):
+        """
+        Selecciona líneas completas y las muestra.
+        
+        Args:
+            first_line (int): Primera línea (desde 1)
+            last_line (int): Última línea (incluida)
+            region (Region, optional): Región seleccionada, para el aviso
+        """
+        start = f"{first_line}.0"
+        end = self.content_text.index(f"{last_line}.0 lineend")
+        self.content_text.tag_remove(tk.SEL, "1.0", tk.END)
+        self.content_text.tag_add(tk.SEL, start, end)
+        self.content_text.mark_set(tk.INSERT, start)
+        self.content_text.see(end)
+        self.content_text.see(start)
+        self._structure_selection = (start, end)
+        
+        text = ""
+        if region is not None:
+            label = self.STRUCTURE_LABELS.get(region.kind, "Región")
+            name = f" {region.name}" if region.name else ""
+            text = f"{label}{name}: líneas {first_line}-{last_line}"
+        self.set_notice(text, "structure")
+    
+    def _current_selection(self):
+        """Devuelve la selección actual como (inicio, fin) o None."""
+        ranges = self.content_text.tag_ranges(tk.SEL)
+        if not ranges:
+            return None
+        return (self.content_text.index(ranges[0]), self.content_text.index(ranges[-1]))
+    
+    def _remember_selection(self):
+        """Guarda la selección actual antes de ampliarla."""
+        current = self._current_selection()
+        # Una selección hecha a mano invalida el historial anterior
+        if current != self._structure_selection:
+            self._structure_history = []
+        self._structure_history.append(current or self.content_text.index(tk.INSERT))
+    
+    def select_enclosing(self, kind):
+        """
+        Selecciona la función, clase o bloque que contiene la selección (o el cursor).
+        
+        Si la selección ya es exactamente una región de ese tipo, se pasa a la
+        que la contiene.
+        
+        Args:
+            kind (str): "function", "class" o "block"
+        
+        Returns:
+            bool: True si se encontró una región
+        """
+        structure = self._current_structure()
+        if structure is None:
+            return False
+        first_line, last_line, _ = self._selected_lines()
+        region = structure.enclosing(first_line, last_line, self.STRUCTURE_KINDS.get(kind), strict=True)
+        if region is None:
+            self.set_notice(f"No hay {self.STRUCTURE_LABELS.get(kind, kind).lower()} alrededor de la selección", "structure")
+            return False
+        self._remember_selection()
+        self._select_lines(region.start_line, region.end_line, region)
+        return True
+    
+    def grow_selection(self):
+        """
+        Amplía la selección a la siguiente unidad estructural.
+        
+        Primero se completa a líneas enteras y después se pasa a la sentencia,
+        bloque, función o clase más pequeña que la contiene.
+        
+        Returns:
+            bool: True si la selección cambió
+        """
+        structure = self._current_structure()
+        if structure is None:
+            return False
+        first_line, last_line, whole = self._selected_lines()
+        if whole:
+            region = structure.enclosing(first_line, last_line, strict=True)
+            if region is None:
+                return False
+            self._remember_selection()
+            self._select_lines(region.start_line, region.end_line, region)
+        else:
+            self._remember_selection()
+            self._select_lines(first_line, last_line)
+        return True
+    
+    def shrink_selection(self):
+        """
+        Reduce la selección deshaciendo la última ampliación o, si la selección
+        se hizo a mano, a la mayor región que contiene en la línea del cursor.
+        
+        Returns:
+            bool: True si la selección cambió
+        """
+        if self._structure_history and self._current_selection() == self._structure_selection:
+            previous = self._structure_history.pop()
+            self.content_text.tag_remove(tk.SEL, "1.0", tk.END)
+            if isinstance(previous, tuple):
+                self.content_text.tag_add(tk.SEL, *previous)
+                self.content_text.mark_set(tk.INSERT, previous[0])
+                self._structure_selection = previous
+            else:
+                self.content_text.mark_set(tk.INSERT, previous)
+                self._structure_selection = None
+            self.set_notice("", "structure")
+            return True
+        
+        structure = self._current_structure()
+        if structure is None or not self.content_text.tag_ranges(tk.SEL):
+            return False
+        first_line, last_line, _ = self._selected_lines()
+        line = min(max(int(self.content_text.index(tk.INSERT).split('.')[0]), first_line), last_line)
+        region = structure.largest_inside(first_line, last_line, line)
+        if region is None:
+            return False
+        self._structure_history = []
+        self._select_lines(region.start_line, region.end_line, region)
+        return True
+    
+    def show_line(self, line):
+        """
+        Desplaza el visor hasta una línea y la selecciona.
+        
+        Args:
+            line (int): Número de línea (desde 1)
+        """
+        index = f"{line}.0"
+        self.content_text.tag_remove(tk.SEL, "1.0", tk.END)
+        self.content_text.tag_add(tk.SEL, index, f"{index} lineend")
+        self.content_text.mark_set(tk.INSERT, index)
+        self.content_text.see(index)
+    
     def highlight_selection(self, start_pos, end_pos):
         """
         Aplica resaltado visual a una región seleccionada.
@@ -207,9 +861,11 @@ class FileContentPanel(Panel):
         Aplica resaltado a los rangos especificados.
         
         Args:
-            ranges (list): Lista de tuplas (inicio, fin)
+            ranges (list): Lista de tuplas (inicio, fin); los rangos None (no
+                conocidos) se omiten
         """
         self.content_text.config(state=tk.NORMAL)
-        for start_pos, end_pos in ranges:
-            self.highlight_selection(start_pos, end_pos)
+        for selection_range in ranges:
+            if selection_range:
+                self.highlight_selection(*selection_range)
         self.content_text.config(state=tk.DISABLED)
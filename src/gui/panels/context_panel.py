@@ -12,7 +12,21 @@ from src.gui.panels.base_panel import Panel
 class ContextPanel(Panel):
     """Panel para mostrar y gestionar el contexto seleccionado."""
     
-    def __init__(self, parent, on_copy, on_save, on_clear, on_context_menu, on_stats, on_instructions=None):
+    # Tamaños de ventana de contexto disponibles para el medidor {etiqueta: tokens}
+    CONTEXT_BUDGETS = {
+        "8K": 8192,
+        "32K": 32768,
+        "128K": 131072,
+        "200K": 200000,
+        "1M": 1000000
+    }
+    DEFAULT_BUDGET = "128K"
+    
+    # Número máximo de archivos en el desglose (los de más tokens primero)
+    BREAKDOWN_LIMIT = 200
+    
+    def __init__(self, parent, on_copy, on_save, on_clear, on_context_menu, on_stats, on_instructions=None,
+                 on_budget_change=None, on_pack=None, on_reset_pack=None):
         """
         Inicializa el panel de contexto.
         
@@ -24,6 +38,9 @@ class ContextPanel(Panel):
             on_context_menu: Callback para menú contextual
             on_stats: Callback para mostrar estadísticas
             on_instructions: Callback para gestionar instrucciones
+            on_budget_change: Callback al cambiar el tamaño de contexto del medidor
+            on_pack: Callback para ajustar el contexto al presupuesto
+            on_reset_pack: Callback para deshacer el ajuste al presupuesto
         """
         self.on_copy = on_copy
         self.on_save = on_save
@@ -34,6 +51,13 @@ class ContextPanel(Panel):
         self.context_selection_markers = {}
         self.remove_handler = None
         self.instruction_manager = None
+        self.on_budget_change = on_budget_change
+        self.on_pack = on_pack
+        self.on_reset_pack = on_reset_pack
+        self.priority_handler = None
+        # Proveedor del desglose por archivo (se consulta solo si está visible)
+        self.breakdown_provider = None
+        self._breakdown_pending = False
         super().__init__(parent)
     
     def _create_widgets(self):
@@ -174,6 +198,62 @@ class ContextPanel(Panel):
         )
         self.clear_btn.pack(side=tk.LEFT, padx=5)
         
+        # Medidor de tokens usados frente al tamaño de contexto del modelo
+        self.meter_frame = ttk.Frame(self.frame)
+        self.meter_frame.pack(fill=tk.X, padx=5, pady=(0, 5))
+        
+        ttk.Label(self.meter_frame, text="Tokens:").pack(side=tk.LEFT)
+        
+        self.token_meter = ttk.Progressbar(self.meter_frame, orient=tk.HORIZONTAL, length=200, mode='determinate',
+                                           maximum=self.CONTEXT_BUDGETS[self.DEFAULT_BUDGET])
+        self.token_meter.pack(side=tk.LEFT, padx=5)
+        
+        self.token_meter_label = ttk.Label(self.meter_frame, text="0")
+        self.token_meter_label.pack(side=tk.LEFT, padx=5)
+        
+        self.budget_var = tk.StringVar(value=self.DEFAULT_BUDGET)
+        self.budget_combobox = ttk.Combobox(self.meter_frame, textvariable=self.budget_var, width=6,
+                                            values=list(self.CONTEXT_BUDGETS.keys()), state="readonly")
+        self.budget_combobox.pack(side=tk.LEFT, padx=5)
+        self.budget_combobox.bind("<<ComboboxSelected>>", self._on_budget_selected)
+        
+        self.breakdown_var = tk.BooleanVar(value=False)
+        self.breakdown_check = ttk.Checkbutton(self.meter_frame, text="Desglose por archivo",
+                                               variable=self.breakdown_var, command=self._toggle_breakdown)
+        self.breakdown_check.pack(side=tk.LEFT, padx=5)
+        
+        self.pack_btn = ttk.Button(
+            self.meter_frame,
+            text="Ajustar al presupuesto",
+            command=self._handle_pack,
+            style="Context.TButton",
+            padding=button_padding
+        )
+        self.pack_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.reset_pack_btn = ttk.Button(
+            self.meter_frame,
+            text="Deshacer ajuste",
+            command=self._handle_reset_pack,
+            style="Context.TButton",
+            padding=button_padding
+        )
+        self.reset_pack_btn.pack(side=tk.LEFT, padx=5)
+        
+        # Desglose por archivo (oculto por defecto)
+        self.breakdown_frame = ttk.Frame(self.frame)
+        self.breakdown_tree = ttk.Treeview(self.breakdown_frame, columns=("tokens", "share"), height=6)
+        self.breakdown_tree.heading("#0", text="Archivo")
+        self.breakdown_tree.heading("tokens", text="Tokens")
+        self.breakdown_tree.heading("share", text="% del contexto")
+        self.breakdown_tree.column("tokens", width=90, anchor=tk.E, stretch=False)
+        self.breakdown_tree.column("share", width=110, anchor=tk.E, stretch=False)
+        breakdown_scroll = ttk.Scrollbar(self.breakdown_frame, command=self.breakdown_tree.yview)
+        self.breakdown_tree.configure(yscrollcommand=breakdown_scroll.set)
+        breakdown_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.breakdown_tree.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self._meter_tokens = 0
+        
         # Crear widget Text para el contexto con scrollbars
         self.context_scrolly = ttk.Scrollbar(self.frame)
         self.context_scrolly.pack(side=tk.RIGHT, fill=tk.Y)
@@ -210,9 +290,121 @@ class ContextPanel(Panel):
         self.context_menu = tk.Menu(self.context_text, tearoff=0)
         self.context_menu.add_command(label="Eliminar selección", command=self._handle_remove_selected)
         
+        # Prioridad del archivo al ajustar el contexto al presupuesto
+        self.priority_var = tk.StringVar(value="normal")
+        priority_menu = tk.Menu(self.context_menu, tearoff=0)
+        for label, value in (("Alta", "alta"), ("Normal", "normal"), ("Baja", "baja")):
+            priority_menu.add_radiobutton(label=label, value=value, variable=self.priority_var,
+                                          command=self._handle_priority)
+        self.context_menu.add_cascade(label="Prioridad del archivo", menu=priority_menu)
+        
         # Vincular eventos
         self.context_text.bind("<Button-3>", self._show_context_menu)
     
+    def get_budget_label(self):
+        """
+        Obtiene el tamaño de contexto elegido en el medidor.
+        
+        Returns:
+            str: Etiqueta del tamaño (clave de CONTEXT_BUDGETS)
+        """
+        return self.budget_var.get()
+    
+    def get_budget_tokens(self):
+        """
+        Obtiene el presupuesto de tokens del tamaño de contexto elegido.
+        
+        Returns:
+            int: Número de tokens del presupuesto
+        """
+        return self.CONTEXT_BUDGETS.get(self.budget_var.get(), self.CONTEXT_BUDGETS[self.DEFAULT_BUDGET])
+    
+    def set_budget(self, label):
+        """
+        Selecciona el tamaño de contexto del medidor.
+        
+        Args:
+            label (str): Etiqueta del tamaño (clave de CONTEXT_BUDGETS)
+        """
+        if label in self.CONTEXT_BUDGETS:
+            self.budget_var.set(label)
+            self.update_token_meter(self._meter_tokens)
+    
+    def _on_budget_selected(self, event=None):
+        """Maneja el cambio de tamaño de contexto en el medidor."""
+        self.update_token_meter(self._meter_tokens)
+        if self.on_budget_change:
+            self.on_budget_change(self.budget_var.get())
+    
+    def update_token_meter(self, used_tokens, method_label=None):
+        """
+        Actualiza el medidor de tokens (coste constante; el desglose solo se
+        recalcula si está visible y de forma diferida).
+        
+        Args:
+            used_tokens (int): Tokens usados por el contexto
+            method_label (str, optional): Descripción del método de conteo
+        """
+        self._meter_tokens = used_tokens
+        budget = self.get_budget_tokens()
+        percent = used_tokens * 100 / budget if budget else 0
+        
+        self.token_meter.configure(maximum=budget, value=min(used_tokens, budget))
+        text = f"{used_tokens:,} / {budget:,} ({percent:.0f}%)".replace(",", ".")
+        if method_label:
+            text += f" · {method_label}"
+        if used_tokens > budget:
+            text += " · excede el presupuesto"
+        self.token_meter_label.config(text=text)
+        
+        if self.breakdown_var.get() and not self._breakdown_pending:
+            self._breakdown_pending = True
+            self.frame.after_idle(self._refresh_breakdown)
+    
+    def _toggle_breakdown(self):
+        """Muestra u oculta el desglose de tokens por archivo."""
+        if self.breakdown_var.get():
+            self.breakdown_frame.pack(fill=tk.X, padx=5, pady=(0, 5), after=self.meter_frame)
+            self._refresh_breakdown()
+        else:
+            self.breakdown_frame.pack_forget()
+    
+    def _refresh_breakdown(self):
+        """Rellena el desglose con los archivos que más tokens usan."""
+        self._breakdown_pending = False
+        if not self.breakdown_var.get() or not self.breakdown_provider:
+            return
+        
+        self.breakdown_tree.delete(*self.breakdown_tree.get_children())
+        total = self._meter_tokens or 1
+        for file_path, tokens in self.breakdown_provider(self.BREAKDOWN_LIMIT):
+            self.breakdown_tree.insert("", "end", text=os.path.basename(file_path),
+                                       values=(tokens, f"{tokens * 100 / total:.1f}%"))
+    
+    def _handle_pack(self):
+        """Maneja el evento de ajustar el contexto al presupuesto."""
+        if self.on_pack:
+            self.on_pack(self.get_budget_tokens())
+    
+    def _handle_reset_pack(self):
+        """Maneja el evento de deshacer el ajuste al presupuesto."""
+        if self.on_reset_pack:
+            self.on_reset_pack()
+    
+    def _handle_priority(self):
+        """Maneja el cambio de prioridad desde el menú contextual."""
+        if self.priority_handler:
+            self.priority_handler(self.priority_var.get())
+    
+    def set_priority_handler(self, handler):
+        """
+        Establece el controlador para cambiar la prioridad de un archivo.
+        
+        Args:
+            handler: Función a llamar con la nueva prioridad
+        """
+        self.priority_handler = handler
+    
     def _handle_stats(self):
         """Maneja el evento de mostrar estadísticas del contexto."""
         if self.on_stats:
@@ -262,12 +454,14 @@ class ContextPanel(Panel):
         if self.on_context_menu:
             self.on_context_menu(event, self.context_text, self.context_menu)
     
-    def update_context(self, selections):
+    def update_context(self, selections, selection_lines=None):
         """
         Actualiza la visualización del contexto.
         
         Args:
             selections (dict): Diccionario con las selecciones
+            selection_lines (dict, optional): Líneas de cada selección
+                {ruta: [(primera, última) o None]}, para mostrarlas en su encabezado
         """
         # Importar os si necesario (alternativa mejor: asegurar que está importado arriba)
         import os
@@ -325,8 +519,13 @@ class ContextPanel(Panel):
                 
                 # Si no hay archivo completo, mostrar selecciones individuales
                 if not has_whole_file:
+                    file_lines = (selection_lines or {}).get(file_path, [])
                     for i, (selection, _) in enumerate(file_selections):
-                        selection_header = f"Selección {i+1}:\n"
+                        lines = file_lines[i] if i < len(file_lines) else None
+                        if lines:
+                            selection_header = f"Selección {i+1} (líneas {lines[0]}-{lines[1]}):\n"
+                        else:
+                            selection_header = f"Selección {i+1}:\n"
                         self.context_text.insert(tk.END, selection_header, "selection_header")
                         
                         # Guardar posición de inicio
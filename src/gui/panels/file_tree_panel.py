@@ -12,7 +12,9 @@ from src.gui.panels.base_panel import Panel
 class FileTreePanel(Panel):
     """Panel para mostrar y seleccionar archivos."""
     
-    def __init__(self, parent, on_file_select, on_checkbox_click, on_add_selected_files=None):
+    def __init__(self, parent, on_file_select, on_checkbox_click, on_add_selected_files=None,
+                 on_add_with_dependencies=None, on_add_outline=None, on_select_similar=None,
+                 on_add_without_near_duplicates=None, on_show_related=None):
         """
         Inicializa el panel de archivos.
         
@@ -21,10 +23,21 @@ class FileTreePanel(Panel):
             on_file_select: Callback para cuando se selecciona un archivo
             on_checkbox_click: Callback para cuando se hace clic en una casilla
             on_add_selected_files: Callback para añadir múltiples archivos seleccionados
+            on_add_with_dependencies: Callback para añadir archivos junto con sus dependencias
+            on_add_outline: Callback para añadir archivos solo como esquema
+            on_select_similar: Callback para seleccionar los archivos casi duplicados
+            on_add_without_near_duplicates: Callback para añadir archivos dejando
+                uno solo por grupo de casi duplicados
+            on_show_related: Callback para mostrar los archivos relacionados con la selección
         """
         self.on_file_select = on_file_select
         self.on_checkbox_click = on_checkbox_click
         self.on_add_selected_files = on_add_selected_files
+        self.on_add_with_dependencies = on_add_with_dependencies
+        self.on_add_outline = on_add_outline
+        self.on_select_similar = on_select_similar
+        self.on_add_without_near_duplicates = on_add_without_near_duplicates
+        self.on_show_related = on_show_related
         self.show_hidden_files = False  # Agregar opción para archivos ocultos
         super().__init__(parent)
     
@@ -125,6 +138,21 @@ class FileTreePanel(Panel):
             label="Añadir al contexto",
             command=self._on_add_selected_files
         )
+        if self.on_add_with_dependencies:
+            self.tree_menu.add_command(
+                label="Añadir con dependencias",
+                command=self._on_add_with_dependencies
+            )
+        if self.on_add_outline:
+            self.tree_menu.add_command(
+                label="Añadir solo el esquema",
+                command=self._on_add_outline
+            )
+        if self.on_add_without_near_duplicates:
+            self.tree_menu.add_command(
+                label="Añadir sin casi duplicados",
+                command=self._on_add_without_near_duplicates
+            )
         self.tree_menu.add_command(
             label="Marcar como no incluidos",
             command=lambda: self._set_checkbox_state(False)
@@ -134,6 +162,19 @@ class FileTreePanel(Panel):
             label="Seleccionar todos",
             command=lambda: self._select_all_files(None)
         )
+        if self.on_select_similar:
+            self.tree_menu.add_command(
+                label="Seleccionar archivos similares",
+                command=self._on_select_similar
+            )
+        if self.on_show_related:
+            self.tree_menu.add_command(
+                label="Mostrar archivos relacionados",
+                command=self._on_show_related
+            )
+        
+        # Archivos que pertenecen a un grupo de casi duplicados
+        self.file_tree.tag_configure("near_duplicate", foreground="#b8860b")
         
         # Vincular eventos
         self.file_tree.bind("<<TreeviewSelect>>", self._on_tree_select)
@@ -168,6 +209,41 @@ class FileTreePanel(Panel):
             if selected_items:
                 self.on_add_selected_files(selected_items)
     
+    def _on_add_with_dependencies(self):
+        """Llama al callback para añadir los archivos seleccionados con sus dependencias."""
+        if self.on_add_with_dependencies:
+            selected_items = self.file_tree.selection()
+            if selected_items:
+                self.on_add_with_dependencies(selected_items)
+    
+    def _on_add_outline(self):
+        """Llama al callback para añadir los archivos seleccionados como esquema."""
+        if self.on_add_outline:
+            selected_items = self.file_tree.selection()
+            if selected_items:
+                self.on_add_outline(selected_items)
+    
+    def _on_select_similar(self):
+        """Llama al callback para seleccionar los archivos casi duplicados de la selección."""
+        if self.on_select_similar:
+            selected_items = self.file_tree.selection()
+            if selected_items:
+                self.on_select_similar(selected_items)
+    
+    def _on_add_without_near_duplicates(self):
+        """Llama al callback para añadir la selección dejando un archivo por grupo de casi duplicados."""
+        if self.on_add_without_near_duplicates:
+            selected_items = self.file_tree.selection()
+            if selected_items:
+                self.on_add_without_near_duplicates(selected_items)
+    
+    def _on_show_related(self):
+        """Llama al callback para mostrar los archivos relacionados con la selección."""
+        if self.on_show_related:
+            selected_items = self.file_tree.selection()
+            if selected_items:
+                self.on_show_related(selected_items)
+    
     def _show_tree_context_menu(self, event):
         """Muestra el menú contextual para el árbol de archivos."""
         # Seleccionar el elemento bajo el cursor si no está seleccionado
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Panel lateral con los archivos del proyecto sugeridos para la tarea actual.
+"""
+import os
+import tkinter as tk
+from tkinter import ttk
+
+from src.gui.panels.base_panel import Panel
+
+class SuggestionsPanel(Panel):
+    """Panel que muestra los archivos más relevantes para una descripción de la tarea."""
+    
+    def __init__(self, parent, on_suggest, on_add, on_open=None, on_use_instruction=None):
+        """
+        Inicializa el panel de sugerencias.
+        
+        Args:
+            parent: Widget padre
+            on_suggest: Callback (consulta) para buscar archivos relevantes
+            on_add: Callback (ruta) para añadir un archivo sugerido al contexto
+            on_open: Callback (ruta) para mostrar un archivo sugerido
+            on_use_instruction: Callback para usar la instrucción actual como consulta
+        """
+        self.on_suggest = on_suggest
+        self.on_add = on_add
+        self.on_open = on_open
+        self.on_use_instruction = on_use_instruction
+        self.root_folder = None
+        # Ruta de cada fila {ID del elemento: ruta}
+        self.item_paths = {}
+        super().__init__(parent)
+    
+    def _create_widgets(self):
+        """Crea los widgets del panel."""
+        self.frame = ttk.Frame(self.parent)
+        
+        title = ttk.Label(self.frame, text="Archivos sugeridos", font=("Segoe UI", 9, "bold"))
+        title.pack(fill=tk.X, padx=10, pady=(10, 5))
+        
+        # Descripción de la tarea
+        self.query_var = tk.StringVar()
+        self.query_entry = ttk.Entry(self.frame, textvariable=self.query_var)
+        self.query_entry.pack(fill=tk.X, padx=10)
+        self.query_entry.bind("<Return>", lambda event: self._handle_suggest())
+        
+        buttons_frame = ttk.Frame(self.frame)
+        buttons_frame.pack(fill=tk.X, padx=10, pady=5)
+        ttk.Button(buttons_frame, text="Sugerir", command=self._handle_suggest).pack(side=tk.LEFT)
+        if self.on_use_instruction:
+            ttk.Button(
+                buttons_frame,
+                text="Usar instrucción",
+                command=self.on_use_instruction
+            ).pack(side=tk.LEFT, padx=(5, 0))
+        
+        # Lista de sugerencias
+        list_frame = ttk.Frame(self.frame)
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=10)
+        
+        self.results_tree = ttk.Treeview(list_frame, columns=("add", "file", "terms"), show="headings",
+                                         selectmode="browse")
+        self.results_tree.heading("add", text="")
+        self.results_tree.heading("file", text="Archivo")
+        self.results_tree.heading("terms", text="Coincide con")
+        self.results_tree.column("add", width=30, minwidth=30, stretch=tk.NO, anchor=tk.CENTER)
+        self.results_tree.column("file", width=200, minwidth=120)
+        self.results_tree.column("terms", width=120, minwidth=60)
+        
+        results_scroll = ttk.Scrollbar(list_frame, command=self.results_tree.yview)
+        results_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.results_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.results_tree.configure(yscrollcommand=results_scroll.set)
+        
+        self.status_var = tk.StringVar(value="Describa la tarea o use la instrucción actual")
+        self.status_label = ttk.Label(self.frame, textvariable=self.status_var, wraplength=220,
+                                      font=("Segoe UI", 8, "italic"))
+        self.status_label.pack(fill=tk.X, padx=10, pady=(5, 10))
+        
+        # Un clic en "+" añade el archivo; un clic en el nombre lo muestra
+        self.results_tree.bind("<ButtonRelease-1>", self._handle_click)
+        self.results_tree.bind("<Double-1>", self._handle_double_click)
+    
+    def set_root_folder(self, folder):
+        """
+        Establece la carpeta del proyecto (para mostrar rutas relativas) y vacía la lista.
+        
+        Args:
+            folder (str): Carpeta raíz del proyecto
+        """
+        self.root_folder = folder
+        self.clear()
+    
+    def get_query(self):
+        """
+        Obtiene la descripción de la tarea escrita.
+        
+        Returns:
+            str: Consulta actual
+        """
+        return self.query_var.get().strip()
+    
+    def set_query(self, query):
+        """
+        Establece la descripción de la tarea.
+        
+        Args:
+            query (str): Nueva consulta
+        """
+        self.query_var.set(query)
+    
+    def set_status(self, text):
+        """
+        Muestra un mensaje de estado bajo la lista.
+        
+        Args:
+            text (str): Mensaje
+        """
+        self.status_var.set(text)
+    
+    def clear(self):
+        """Vacía la lista de sugerencias."""
+        self.results_tree.delete(*self.results_tree.get_children())
+        self.item_paths = {}
+    
+    def set_results(self, results, status=None):
+        """
+        Muestra las sugerencias.
+        
+        Args:
+            results (list): Tuplas (ruta, puntuación, términos coincidentes) de
+                mayor a menor relevancia
+            status (str, optional): Mensaje de estado (por defecto, el número de
+                sugerencias)
+        """
+        self.clear()
+        for file_path, score, terms in results:
+            item_id = self.results_tree.insert("", "end", values=("＋", self._relative_path(file_path), ", ".join(terms)))
+            self.item_paths[item_id] = file_path
+        
+        if status:
+            self.set_status(status)
+        elif results:
+            self.set_status(f"{len(results)} archivos sugeridos. Pulse ＋ para añadir uno al contexto.")
+        else:
+            self.set_status("No se encontraron archivos relevantes")
+    
+    def remove_file(self, file_path):
+        """
+        Quita un archivo de la lista (p. ej. al añadirlo al contexto).
+        
+        Args:
+            file_path (str): Ruta del archivo
+        """
+        for item_id, path in list(self.item_paths.items()):
+            if path == file_path:
+                self.results_tree.delete(item_id)
+                del self.item_paths[item_id]
+    
+    def _relative_path(self, file_path):
+        if not self.root_folder:
+            return file_path
+        try:
+            return os.path.relpath(file_path, self.root_folder)
+        except ValueError:
+            return file_path
+    
+    def _handle_suggest(self):
+        """Pide las sugerencias para la consulta escrita."""
+        query = self.get_query()
+        if query and self.on_suggest:
+            self.on_suggest(query)
+    
+    def _handle_click(self, event):
+        """Añade el archivo al pulsar en "+" o lo muestra al pulsar en su nombre."""
+        if self.results_tree.identify_region(event.x, event.y) != "cell":
+            return
+        item_id = self.results_tree.identify_row(event.y)
+        file_path = self.item_paths.get(item_id)
+        if not file_path:
+            return
+        if self.results_tree.identify_column(event.x) == "#1":
+            if self.on_add:
+                self.on_add(file_path)
+        elif self.on_open:
+            self.on_open(file_path)
+    
+    def _handle_double_click(self, event):
+        """Añade el archivo al hacer doble clic en su nombre."""
+        item_id = self.results_tree.identify_row(event.y)
+        file_path = self.item_paths.get(item_id)
+        if file_path and self.on_add and self.results_tree.identify_column(event.x) != "#1":
+            self.on_add(file_path)
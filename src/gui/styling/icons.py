@@ -17,6 +17,7 @@ class IconManager:
         """
         self.theme_manager = theme_manager
         self.icons = {}
+        self.icons_theme = None
         self.create_icons()
     
     def create_icons(self):
@@ -32,6 +33,9 @@ class IconManager:
                 'fg_color': "#333333",
             }
         
+        # Recordar el tema con el que se generaron los íconos
+        self.icons_theme = self.theme_manager.current_theme if self.theme_manager else None
+        
         # Definir colores para los diferentes tipos de archivos
         icon_colors = {
             "directory": "#FFD700",  # Dorado para carpetas
@@ -70,6 +74,9 @@ class IconManager:
     def update_icons(self):
         """Actualiza los íconos según el tema actual."""
         if self.theme_manager:
+            # Solo regenerar si el tema ha cambiado desde la última vez
+            if self.theme_manager.current_theme == self.icons_theme:
+                return
             # Volver a crear los íconos con los colores actualizados
             self.create_icons()
     
@@ -6,6 +6,7 @@ Punto de entrada principal para el Selector de Contexto para LLMs.
 
 import os
 import sys
+import multiprocessing
 
 # Añadir el directorio raíz al path para importaciones
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -47,4 +48,6 @@ def main():
         raise
 
 if __name__ == "__main__":
+    # Necesario para los procesos de trabajo en el ejecutable empaquetado
+    multiprocessing.freeze_support()
     main()
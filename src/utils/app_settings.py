@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Utilidades para leer la configuración de la aplicación (app_settings.json).
+"""
+import os
+import json
+
+# Ruta del archivo de configuración de la aplicación
+APP_SETTINGS_FILE = os.path.join(os.path.dirname(__file__), "..", "..", "config", "app_settings.json")
+
+def load_app_settings():
+    """
+    Carga la configuración de la aplicación.
+    
+    Returns:
+        dict: Configuración guardada o diccionario vacío si no existe o no es válida
+    """
+    try:
+        if os.path.exists(APP_SETTINGS_FILE):
+            with open(APP_SETTINGS_FILE, 'r') as f:
+                return json.load(f)
+    except Exception as e:
+        print(f"Error al cargar configuración: {str(e)}")
+    return {}
+
+def get_app_setting(section, key, default=None):
+    """
+    Obtiene un valor concreto de la configuración de la aplicación.
+    
+    Args:
+        section (str): Sección de la configuración ('general', 'advanced'...)
+        key (str): Clave dentro de la sección
+        default: Valor a devolver si la clave no existe
+        
+    Returns:
+        Valor configurado o el valor por defecto
+    """
+    return load_app_settings().get(section, {}).get(key, default)
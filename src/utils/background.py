@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Utilidades para ejecutar trabajo en segundo plano desde la interfaz.
+
+Tkinter no admite llamadas desde otros hilos, así que el resultado de la tarea
+se deja en una cola y se recoge desde el bucle de eventos con after().
+"""
+import queue
+import threading
+
+class BackgroundTask:
+    """Tarea que se ejecuta en un hilo y entrega su resultado en el hilo de la interfaz."""
+    
+    def __init__(self, widget, func, on_done=None, on_error=None, poll_interval=50):
+        """
+        Inicializa la tarea (no la inicia).
+        
+        Args:
+            widget: Widget de Tkinter cuyo bucle de eventos recibe el resultado
+            func (callable): Función a ejecutar; recibe el evento de cancelación
+            on_done (callable, optional): Función (resultado) llamada al terminar
+            on_error (callable, optional): Función (excepción) llamada si falla
+            poll_interval (int): Intervalo (ms) de comprobación del resultado
+        """
+        self.widget = widget
+        self.func = func
+        self.on_done = on_done
+        self.on_error = on_error
+        self.poll_interval = poll_interval
+        self.cancel_event = threading.Event()
+        self._results = queue.Queue()
+        self._thread = None
+    
+    def start(self):
+        """
+        Inicia la tarea.
+        
+        Returns:
+            BackgroundTask: La propia tarea
+        """
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self.widget.after(self.poll_interval, self._poll)
+        return self
+    
+    def cancel(self):
+        """Pide a la tarea que se detenga; no se llamará a on_done."""
+        self.cancel_event.set()
+    
+    def is_running(self):
+        """
+        Indica si la tarea sigue en ejecución.
+        
+        Returns:
+            bool: True si el hilo no ha terminado
+        """
+        return self._thread is not None and self._thread.is_alive()
+    
+    def _run(self):
+        try:
+            self._results.put((True, self.func(self.cancel_event)))
+        except Exception as e:
+            self._results.put((False, e))
+    
+    def _poll(self):
+        try:
+            success, value = self._results.get_nowait()
+        except queue.Empty:
+            try:
+                self.widget.after(self.poll_interval, self._poll)
+            except Exception:
+                # El widget se ha destruido
+                pass
+            return
+        
+        if self.cancel_event.is_set():
+            return
+        if success:
+            if self.on_done:
+                self.on_done(value)
+        elif self.on_error:
+            self.on_error(value)
+        else:
+            print(f"Error en tarea en segundo plano: {str(value)}")
+
+def run_in_background(widget, func, on_done=None, on_error=None):
+    """
+    Ejecuta una función en segundo plano y entrega su resultado a la interfaz.
+    
+    Args:
+        widget: Widget de Tkinter cuyo bucle de eventos recibe el resultado
+        func (callable): Función a ejecutar; recibe el evento de cancelación
+        on_done (callable, optional): Función (resultado) llamada al terminar
+        on_error (callable, optional): Función (excepción) llamada si falla
+    
+    Returns:
+        BackgroundTask: Tarea iniciada
+    """
+    return BackgroundTask(widget, func, on_done, on_error).start()
@@ -4,8 +4,39 @@
 Utilidades para operaciones con archivos.
 """
 import os
+import sys
+import hashlib
 import tkinter as tk
 
+# Nombre de la carpeta de la aplicación dentro de la caché del usuario
+APP_CACHE_NAME = "SelectorDeContexto"
+
+def get_user_cache_dir(app_name=APP_CACHE_NAME):
+    """
+    Obtiene la carpeta de caché del usuario para la aplicación.
+    
+    Se usa la ubicación habitual de cada sistema (%LOCALAPPDATA% en Windows,
+    ~/Library/Caches en macOS y $XDG_CACHE_HOME o ~/.cache en los demás), no
+    la carpeta de instalación, que puede ser de solo lectura o compartida.
+    
+    Args:
+        app_name (str): Nombre de la carpeta de la aplicación
+        
+    Returns:
+        str: Ruta de la carpeta (puede no existir todavía)
+    """
+    home = os.path.expanduser("~")
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.join(home, "AppData", "Local")
+        return os.path.join(base, app_name, "cache")
+    if sys.platform == 'darwin':
+        return os.path.join(home, "Library", "Caches", app_name)
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(home, ".cache")
+    return os.path.join(base, app_name)
+
+# Carpeta donde se guardan los índices y cachés persistentes
+CACHE_DIR = get_user_cache_dir()
+
 def save_to_file(content, file_path):
     """
     Guarda texto en un archivo.
@@ -43,6 +74,26 @@ def ensure_directory_exists(directory):
         print(f"Error al crear directorio: {str(e)}")
         return False
 
+def get_project_cache_file(project_root, name):
+    """
+    Obtiene la ruta de un archivo de caché propio de un proyecto.
+    
+    El nombre incluye un resumen de la ruta absoluta del proyecto, de modo que
+    cada carpeta abierta tiene sus propios índices.
+    
+    Args:
+        project_root (str): Carpeta raíz del proyecto
+        name (str): Nombre base del archivo (p. ej. "scan.json")
+        
+    Returns:
+        str: Ruta del archivo dentro de la carpeta de caché
+    """
+    root = os.path.normcase(os.path.abspath(project_root))
+    digest = hashlib.blake2b(root.encode('utf-8', errors='replace'), digest_size=8).hexdigest()
+    base, ext = os.path.splitext(name)
+    ensure_directory_exists(CACHE_DIR)
+    return os.path.join(CACHE_DIR, f"{base}_{digest}{ext}")
+
 def get_file_extension(file_path):
     """
     Obtiene la extensión de un archivo.
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detección y truncado de líneas patológicamente largas (archivos minificados,
+JSON en una sola línea...) antes de mostrarlas en un widget Text.
+"""
+
+class LongLineGuard:
+    """
+    Filtro incremental que detecta líneas demasiado largas para el visor.
+    
+    Se alimenta por bloques (sirve tanto para un archivo completo como para la
+    carga progresiva) y conserva el número de línea de cada línea larga. En modo
+    truncado, cada línea larga se muestra solo hasta el umbral, seguida de un
+    marcador con los caracteres ocultos; el número de líneas no cambia, así que
+    las posiciones (línea, columna) anteriores al umbral coinciden con el original.
+    """
+    
+    MARKER_FORMAT = " … [+{hidden} caracteres ocultos]"
+    
+    def __init__(self, threshold=10000, truncate=True):
+        """
+        Inicializa el filtro.
+        
+        Args:
+            threshold (int): Longitud a partir de la cual una línea se considera larga
+            truncate (bool): Si se ocultan los caracteres que superan el umbral
+        """
+        self.threshold = threshold
+        self.truncate = truncate
+        # Líneas largas encontradas {número_de_línea: longitud_original}
+        self.long_lines = {}
+        self._line = 1
+        self._col = 0
+    
+    @property
+    def truncated(self):
+        """bool: True si se ha ocultado contenido de alguna línea."""
+        return self.truncate and bool(self.long_lines)
+    
+    def feed(self, text):
+        """
+        Procesa un bloque de texto.
+        
+        Args:
+            text (str): Siguiente bloque del contenido
+        
+        Returns:
+            str: Texto a mostrar para este bloque
+        """
+        out = []
+        pos = 0
+        length = len(text)
+        
+        while pos < length:
+            newline = text.find('\n', pos)
+            end = length if newline == -1 else newline
+            
+            if self.truncate and self._col + (end - pos) > self.threshold:
+                # Mostrar solo lo que falta hasta el umbral
+                keep = max(0, self.threshold - self._col)
+                out.append(text[pos:pos + keep])
+            else:
+                out.append(text[pos:end])
+            
+            self._col += end - pos
+            if newline == -1:
+                break
+            
+            out.append(self._end_line())
+            out.append('\n')
+            pos = newline + 1
+        
+        return ''.join(out)
+    
+    def flush(self):
+        """
+        Cierra la última línea (si el contenido no termina en salto de línea).
+        
+        Returns:
+            str: Texto pendiente a mostrar (el marcador de la última línea, si procede)
+        """
+        return self._end_line()
+    
+    def _end_line(self):
+        """Registra la línea actual si es larga y devuelve su marcador."""
+        marker = ""
+        if self._col > self.threshold:
+            self.long_lines[self._line] = self._col
+            if self.truncate:
+                marker = self.MARKER_FORMAT.format(hidden=self._col - self.threshold)
+        self._line += 1
+        self._col = 0
+        return marker
@@ -3,84 +3,366 @@
 """
 Módulo para resaltado de sintaxis de código.
 """
+import os
 import re
+import time
 import tkinter as tk
+from array import array
+from collections import OrderedDict
+
+class TokenSpanCache:
+    """
+    Caché LRU de spans de tokens ya calculados por el resaltador.
+    
+    Cada entrada guarda tres arrays compactos paralelos (id de tag, inicio y fin)
+    junto con el modo de resaltado usado, y se indexa por (ruta, mtime, tamaño,
+    lenguaje), de modo que al volver a un archivo sin cambios solo hay que
+    volver a aplicar los tags.
+    """
+    
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        """
+        Inicializa la caché.
+        
+        Args:
+            max_bytes (int): Memoria máxima (en bytes) ocupada por los spans
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+    
+    @staticmethod
+    def make_key(file_path, language):
+        """
+        Construye la clave de caché para un archivo.
+        
+        Args:
+            file_path (str): Ruta del archivo
+            language (str): Lenguaje (extensión normalizada) usado para resaltar
+            
+        Returns:
+            tuple: Clave (ruta, mtime, tamaño, lenguaje) o None si no se puede leer
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return (os.path.normpath(file_path), stat.st_mtime_ns, stat.st_size, language)
+    
+    @staticmethod
+    def _entry_size(spans):
+        """Calcula los bytes ocupados por una entrada de spans."""
+        return sum(len(part) * part.itemsize for part in spans)
+    
+    def get(self, key):
+        """
+        Obtiene los spans de una clave, marcándola como usada recientemente.
+        
+        Args:
+            key (tuple): Clave de caché
+            
+        Returns:
+            tuple: ((tag_ids, starts, ends), modo) o None si no está en caché
+        """
+        if key is None:
+            return None
+        
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+    
+    def put(self, key, spans, mode="full"):
+        """
+        Guarda los spans de una clave, expulsando las entradas más antiguas
+        si se supera el límite de memoria.
+        
+        Args:
+            key (tuple): Clave de caché
+            spans (tuple): (tag_ids, starts, ends)
+            mode (str): Modo de resaltado con el que se calcularon los spans
+        """
+        if key is None:
+            return
+        
+        size = self._entry_size(spans)
+        if size > self.max_bytes:
+            return  # Una entrada mayor que la caché completa no se guarda
+        
+        if key in self._entries:
+            old_spans, _ = self._entries.pop(key)
+            self.current_bytes -= self._entry_size(old_spans)
+        
+        self._entries[key] = (spans, mode)
+        self.current_bytes += size
+        
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, (old_spans, _) = self._entries.popitem(last=False)
+            self.current_bytes -= self._entry_size(old_spans)
+            self.evictions += 1
+    
+    def clear(self):
+        """Vacía la caché conservando las estadísticas."""
+        self._entries.clear()
+        self.current_bytes = 0
+    
+    def get_stats(self):
+        """
+        Obtiene estadísticas de uso de la caché.
+        
+        Returns:
+            dict: Aciertos, fallos, tasa de acierto, entradas y memoria usada
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / lookups) if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes
+        }
 
 class SyntaxHighlighter:
     """Clase para resaltar sintaxis en widgets Text de Tkinter."""
     
-    def __init__(self):
-        """Inicializa el resaltador de sintaxis."""
+    # Número máximo de rangos que se pasan en una sola llamada a tag_add
+    TAG_BATCH_SIZE = 500
+    
+    # Modos de resaltado, de más completo a más barato
+    MODE_FULL = "full"
+    MODE_KEYWORDS = "keywords"
+    MODE_PLAIN = "plain"
+    
+    # Tipos de token con patrones lineales que se mantienen en modo reducido
+    KEYWORD_TOKEN_TYPES = {'keyword', 'builtin', 'number', 'boolean', 'decorator'}
+    
+    # Tamaño aproximado (en caracteres) de los bloques de líneas analizados
+    # entre comprobaciones del presupuesto de tiempo
+    CHUNK_SIZE = 8 * 1024
+    
+    # Bloques más largos que esto (líneas enormes) no se analizan con los
+    # patrones completos, porque una sola búsqueda no se puede interrumpir
+    MAX_FULL_BLOCK = 16 * 1024
+    
+    # Partes de varias líneas de los patrones: (subpatrón, apertura, cierre).
+    # No se buscan con la expresión regular (cada apertura sin cierre la haría
+    # recorrer el resto del texto), sino su apertura y después el cierre
+    MULTILINE_DELIMITERS = [
+        (r'\/\*[\s\S]*?\*\/', r'\/\*', '*/'),
+        (r'<!--[\s\S]*?-->', r'<!--', '-->'),
+        (r'```[\s\S]*?```', r'```', '```'),
+    ]
+    
+    LIGHT_THEME_COLORS = {
+        # Colores básicos
+        'keyword': '#0000FF',   # Azul
+        'builtin': '#7D0252',   # Púrpura
+        'string': '#008000',    # Verde
+        'comment': '#808080',   # Gris
+        'number': '#FF8000',    # Naranja
+        'decorator': '#AA5500',  # Naranja oscuro
+        'class': '#0000FF',     # Azul
+        'function': '#AA0000',  # Rojo oscuro
+        
+        # HTML/CSS
+        'tag': '#008080',       # Verde azulado
+        'attribute': '#7D0252', # Púrpura
+        'selector': '#800000',  # Marrón
+        'property': '#0000FF',  # Azul
+        'value': '#008000',     # Verde
+        
+        # JSON
+        'key': '#0000FF',       # Azul
+        'boolean': '#008000',   # Verde
+        
+        # Markdown
+        'heading1': '#000080',  # Azul marino
+        'heading2': '#000080',  # Azul marino
+        'heading3': '#000080',  # Azul marino
+        'heading4': '#000080',  # Azul marino
+        'bold': '#000000',      # Negro
+        'italic': '#000000',    # Negro
+        'link': '#0000FF',      # Azul
+        'code': '#800000',      # Marrón
+        'codeblock': '#800000', # Marrón
+        'quote': '#808080',     # Gris
+        'list': '#000000',      # Negro
+        'numlist': '#000000',   # Negro
+    }
+    
+    DARK_THEME_COLORS = {
+        # Colores básicos
+        'keyword': '#569CD6',   # Azul claro
+        'builtin': '#C586C0',   # Púrpura claro
+        'string': '#6A9955',    # Verde claro
+        'comment': '#6A9955',   # Verde claro
+        'number': '#B5CEA8',    # Verde claro
+        'decorator': '#DCDCAA',  # Amarillo claro
+        'class': '#4EC9B0',     # Verde azulado
+        'function': '#DCDCAA',  # Amarillo claro
+        
+        # HTML/CSS
+        'tag': '#569CD6',       # Azul claro
+        'attribute': '#9CDCFE', # Azul claro
+        'selector': '#D7BA7D',  # Amarillo claro
+        'property': '#9CDCFE',  # Azul claro
+        'value': '#CE9178',     # Naranja claro
+        
+        # JSON
+        'key': '#9CDCFE',       # Azul claro
+        'boolean': '#569CD6',   # Azul claro
+        
+        # Markdown
+        'heading1': '#569CD6',  # Azul claro
+        'heading2': '#569CD6',  # Azul claro
+        'heading3': '#569CD6',  # Azul claro
+        'heading4': '#569CD6',  # Azul claro
+        'bold': '#DCDCAA',      # Amarillo claro
+        'italic': '#DCDCAA',    # Amarillo claro
+        'link': '#CE9178',      # Naranja claro
+        'code': '#D7BA7D',      # Amarillo claro
+        'codeblock': '#D7BA7D', # Amarillo claro
+        'quote': '#57A64A',     # Verde claro
+        'list': '#DCDCAA',      # Amarillo claro
+        'numlist': '#DCDCAA',   # Amarillo claro
+    }
+    
+    def __init__(self, cache_max_bytes=16 * 1024 * 1024, max_bytes=1024 * 1024, max_ms=300):
+        """
+        Inicializa el resaltador de sintaxis.
+        
+        Args:
+            cache_max_bytes (int): Memoria máxima de la caché de spans
+            max_bytes (int): Tamaño máximo de archivo para el resaltado completo
+            max_ms (int): Tiempo máximo (ms) de cada pasada de resaltado
+        """
+        # Presupuesto de resaltado por archivo
+        self.max_bytes = max_bytes
+        self.max_ms = max_ms
+        # Las líneas más largas que esto no se resaltan (0 = sin límite)
+        self.max_line_length = 0
+        self._long_line_regex = None
+        
         # Inicializar tema primero
         self.current_theme = "light"
-        # Luego inicializar patrones y tags según lenguaje
+        self._build_palette(self.current_theme)
+        # Luego inicializar patrones y tags según lenguaje (una sola vez)
         self._init_patterns()
+        # Caché de spans calculados por archivo
+        self.span_cache = TokenSpanCache(cache_max_bytes)
     
     def _init_patterns(self):
         """Inicializa los patrones de resaltado por lenguaje."""
         self.language_patterns = {
             # Python
             '.py': [
-                ('keyword', r'\b(and|as|assert|async|await|break|class|continue|def|del|elif|else|except|finally|for|from|global|if|import|in|is|lambda|nonlocal|not|or|pass|raise|return|try|while|with|yield)\b', self._get_color('keyword')),
-                ('builtin', r'\b(True|False|None|self|print|input|open|len|range|str|int|float|list|dict|set|tuple)\b', self._get_color('builtin')),
-                ('string', r'(\"\"\".*?\"\"\"|\'\'\'.*?\'\'\'|\".*?\"|\'.*?\')', self._get_color('string')),
-                ('comment', r'#.*$', self._get_color('comment')),
-                ('number', r'\b(0x[0-9a-fA-F]+|\d+\.?\d*|\.\d+)\b', self._get_color('number')),
-                ('decorator', r'@\w+', self._get_color('decorator')),
-                ('class', r'\bclass\s+(\w+)', self._get_color('class')),
-                ('function', r'\bdef\s+(\w+)', self._get_color('function')),
+                ('keyword', r'\b(and|as|assert|async|await|break|class|continue|def|del|elif|else|except|finally|for|from|global|if|import|in|is|lambda|nonlocal|not|or|pass|raise|return|try|while|with|yield)\b'),
+                ('builtin', r'\b(True|False|None|self|print|input|open|len|range|str|int|float|list|dict|set|tuple)\b'),
+                ('string', r'(\"\"\".*?\"\"\"|\'\'\'.*?\'\'\'|\".*?\"|\'.*?\')'),
+                ('comment', r'#.*$'),
+                ('number', r'\b(0x[0-9a-fA-F]+|\d+\.?\d*|\.\d+)\b'),
+                ('decorator', r'@\w+'),
+                ('class', r'\bclass\s+(\w+)'),
+                ('function', r'\bdef\s+(\w+)'),
             ],
             
             # JavaScript
             '.js': [
-                ('keyword', r'\b(break|case|catch|class|const|continue|debugger|default|delete|do|else|export|extends|finally|for|function|if|import|in|instanceof|new|return|super|switch|this|throw|try|typeof|var|void|while|with|yield|let|static|enum|await|implements|package|protected|interface|private|public)\b', self._get_color('keyword')),
-                ('builtin', r'\b(document|window|Array|String|Object|Number|Boolean|Function|Console|Math|Date|RegExp)\b', self._get_color('builtin')),
-                ('string', r'(\"\"\".*?\"\"\"|\'\'\'.*?\'\'\'|\".*?\"|\'.*?\'|`.*?`)', self._get_color('string')),
-                ('comment', r'(\/\/.*$|\/\*[\s\S]*?\*\/)', self._get_color('comment')),
-                ('number', r'\b(0x[0-9a-fA-F]+|\d+\.?\d*|\.\d+)\b', self._get_color('number')),
-                ('function', r'\b(\w+)\s*\(', self._get_color('function')),
+                ('keyword', r'\b(break|case|catch|class|const|continue|debugger|default|delete|do|else|export|extends|finally|for|function|if|import|in|instanceof|new|return|super|switch|this|throw|try|typeof|var|void|while|with|yield|let|static|enum|await|implements|package|protected|interface|private|public)\b'),
+                ('builtin', r'\b(document|window|Array|String|Object|Number|Boolean|Function|Console|Math|Date|RegExp)\b'),
+                ('string', r'(\"\"\".*?\"\"\"|\'\'\'.*?\'\'\'|\".*?\"|\'.*?\'|`.*?`)'),
+                ('comment', r'(\/\/.*$|\/\*[\s\S]*?\*\/)'),
+                ('number', r'\b(0x[0-9a-fA-F]+|\d+\.?\d*|\.\d+)\b'),
+                ('function', r'\b(\w+)\s*\('),
             ],
             
             # HTML
             '.html': [
-                ('tag', r'<\/?[\w\s="/.\':-]*>?', self._get_color('tag')),
-                ('attribute', r'\s([\w-]+)="', self._get_color('attribute')),
-                ('string', r'"[^"]*"', self._get_color('string')),
-                ('comment', r'<!--[\s\S]*?-->', self._get_color('comment')),
+                ('tag', r'<\/?[\w\s="/.\':-]*>?'),
+                ('attribute', r'\s([\w-]+)="'),
+                ('string', r'"[^"]*"'),
+                ('comment', r'<!--[\s\S]*?-->'),
             ],
             
             # CSS
             '.css': [
-                ('selector', r'[\w\d\s,.#*:>+~[\]()=^$|"\']*\{', self._get_color('selector')),
-                ('property', r'\s([\w-]+):', self._get_color('property')),
-                ('value', r':\s*(.*?);', self._get_color('value')),
-                ('comment', r'\/\*[\s\S]*?\*\/', self._get_color('comment')),
+                ('selector', r'(?:^|(?<=[{};]))[\w\d\s,.#*:>+~[\]()=^$|"\']*\{'),
+                ('property', r'\s([\w-]+):'),
+                ('value', r':\s*(.*?);'),
+                ('comment', r'\/\*[\s\S]*?\*\/'),
             ],
             
             # JSON
             '.json': [
-                ('key', r'"[\w\d_-]*"(?=\s*:)', self._get_color('key')),
-                ('string', r':\s*".*?"', self._get_color('string')),
-                ('number', r':\s*\b(0x[0-9a-fA-F]+|\d+\.?\d*|\.\d+)\b', self._get_color('number')),
-                ('boolean', r':\s*(true|false|null)\b', self._get_color('boolean')),
+                ('key', r'"[\w\d_-]*"(?=\s*:)'),
+                ('string', r':\s*".*?"'),
+                ('number', r':\s*\b(0x[0-9a-fA-F]+|\d+\.?\d*|\.\d+)\b'),
+                ('boolean', r':\s*(true|false|null)\b'),
             ],
             
             # Markdown
             '.md': [
-                ('heading1', r'^#\s.*$', self._get_color('heading1')),
-                ('heading2', r'^##\s.*$', self._get_color('heading2')),
-                ('heading3', r'^###\s.*$', self._get_color('heading3')),
-                ('heading4', r'^####\s.*$', self._get_color('heading4')),
-                ('bold', r'\*\*.*?\*\*', self._get_color('bold')),
-                ('italic', r'\*.*?\*', self._get_color('italic')),
-                ('link', r'\[.*?\]\(.*?\)', self._get_color('link')),
-                ('code', r'`.*?`', self._get_color('code')),
-                ('codeblock', r'```[\s\S]*?```', self._get_color('codeblock')),
-                ('quote', r'^>\s.*$', self._get_color('quote')),
-                ('list', r'^\s*[\*\-\+]\s.*$', self._get_color('list')),
-                ('numlist', r'^\s*\d+\.\s.*$', self._get_color('numlist')),
+                ('heading1', r'^#\s.*$'),
+                ('heading2', r'^##\s.*$'),
+                ('heading3', r'^###\s.*$'),
+                ('heading4', r'^####\s.*$'),
+                ('bold', r'\*\*.*?\*\*'),
+                ('italic', r'\*.*?\*'),
+                ('link', r'\[.*?\]\(.*?\)'),
+                ('code', r'`.*?`'),
+                ('codeblock', r'```[\s\S]*?```'),
+                ('quote', r'^>\s.*$'),
+                ('list', r'^\s*[\*\-\+]\s.*$'),
+                ('numlist', r'^\s*\d+\.\s.*$'),
             ],
         }
+        
+        # Patrones compilados por lenguaje; no dependen del tema. Los que
+        # pueden abarcar varias líneas no se analizan por bloques de líneas y
+        # guardan el cierre de su parte de varias líneas.
+        self.compiled_patterns = {
+            extension: [self._compile_pattern(token_type, pattern) for token_type, pattern in patterns]
+            for extension, patterns in self.language_patterns.items()
+        }
+        
+        # Identificadores numéricos de tags para guardar spans de forma compacta
+        self.token_types = []
+        self.token_type_ids = {}
+        for patterns in self.language_patterns.values():
+            for token_type, _ in patterns:
+                if token_type not in self.token_type_ids:
+                    self.token_type_ids[token_type] = len(self.token_types)
+                    self.token_types.append(token_type)
+    
+    def _compile_pattern(self, token_type, pattern):
+        """
+        Compila un patrón de resaltado.
+        
+        En los patrones de varias líneas la parte [\s\S]*? se sustituye por
+        un grupo 'open' con solo su apertura; el cierre se busca aparte.
+        
+        Args:
+            token_type (str): Tipo de token
+            pattern (str): Expresión regular
+        
+        Returns:
+            tuple: (tipo de token, patrón compilado, cierre o None si el patrón
+                es de una sola línea)
+        """
+        for multiline, opening, closing in self.MULTILINE_DELIMITERS:
+            if multiline in pattern:
+                pattern = pattern.replace(multiline, f"(?P<open>{opening})")
+                return token_type, re.compile(pattern, re.MULTILINE), closing
+        return token_type, re.compile(pattern, re.MULTILINE), None
     
     def _get_color(self, token_type):
         """
@@ -92,138 +374,335 @@ class SyntaxHighlighter:
         Returns:
             str: Color en formato hexadecimal
         """
-        light_theme_colors = {
-            # Colores básicos
-            'keyword': '#0000FF',   # Azul
-            'builtin': '#7D0252',   # Púrpura
-            'string': '#008000',    # Verde
-            'comment': '#808080',   # Gris
-            'number': '#FF8000',    # Naranja
-            'decorator': '#AA5500',  # Naranja oscuro
-            'class': '#0000FF',     # Azul
-            'function': '#AA0000',  # Rojo oscuro
-            
-            # HTML/CSS
-            'tag': '#008080',       # Verde azulado
-            'attribute': '#7D0252', # Púrpura
-            'selector': '#800000',  # Marrón
-            'property': '#0000FF',  # Azul
-            'value': '#008000',     # Verde
+        return self.palette.get(token_type, self.default_color)
+    
+    def _build_palette(self, theme):
+        """
+        Precalcula la paleta de colores de un tema.
+        
+        Args:
+            theme (str): Nombre del tema ('light' o 'dark')
+        """
+        if theme == 'dark':
+            self.palette = dict(self.DARK_THEME_COLORS)
+            self.default_color = '#FFFFFF'
+        else:
+            self.palette = dict(self.LIGHT_THEME_COLORS)
+            self.default_color = '#000000'
+    
+    def update_theme(self, theme, text_widget=None):
+        """
+        Actualiza el tema del resaltador de sintaxis.
+        
+        Los colores son solo propiedades de los tags, así que no se vuelve a
+        analizar el texto: basta con reconfigurar los tags existentes.
+        
+        Args:
+            theme (str): Nombre del tema ('light' o 'dark')
+            text_widget (tk.Text, optional): Widget ya resaltado a recolorear
+        """
+        self.current_theme = theme
+        self._build_palette(theme)
+        
+        if text_widget is not None:
+            existing_tags = set(text_widget.tag_names())
+            for token_type in self.token_types:
+                if token_type in existing_tags:
+                    text_widget.tag_configure(token_type, foreground=self._get_color(token_type))
+    
+    def _resolve_extension(self, extension):
+        """
+        Normaliza una extensión al lenguaje con patrones que le corresponde.
+        
+        Args:
+            extension (str): Extensión del archivo
             
-            # JSON
-            'key': '#0000FF',       # Azul
-            'boolean': '#008000',   # Verde
+        Returns:
+            str: Extensión con patrones conocidos o None si no se resalta
+        """
+        extension = extension.lower()
+        
+        if extension in self.language_patterns:
+            return extension
+        
+        # Si no es una extensión conocida, buscar una similar
+        if extension in ['.jsx', '.tsx']:
+            return '.js'
+        elif extension in ['.htm', '.xhtml']:
+            return '.html'
+        elif extension in ['.scss', '.sass', '.less']:
+            return '.css'
+        elif extension in ['.yaml', '.yml']:
+            return '.json'
+        
+        # No aplicar resaltado a texto plano ni a extensiones desconocidas
+        return None
+    
+    def set_budget(self, max_bytes=None, max_ms=None, max_line_length=None):
+        """
+        Actualiza el presupuesto de resaltado por archivo.
+        
+        Args:
+            max_bytes (int, optional): Tamaño máximo para el resaltado completo
+            max_ms (int, optional): Tiempo máximo (ms) de cada pasada
+            max_line_length (int, optional): Longitud de línea a partir de la
+                cual la línea no se resalta (0 para no limitar)
+        """
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        if max_ms is not None:
+            self.max_ms = max_ms
+        if max_line_length is not None and max_line_length != self.max_line_length:
+            self.max_line_length = max_line_length
+            self._long_line_regex = None
+            # Los spans guardados se calcularon con otro límite
+            self.span_cache.clear()
+    
+    def _mask_long_lines(self, content):
+        """
+        Sustituye por espacios las líneas demasiado largas.
+        
+        Los desplazamientos no cambian, así que los spans del resto del texto
+        siguen siendo válidos y las líneas largas quedan sin resaltar.
+        
+        Args:
+            content (str): Texto a analizar
             
-            # Markdown
-            'heading1': '#000080',  # Azul marino
-            'heading2': '#000080',  # Azul marino
-            'heading3': '#000080',  # Azul marino
-            'heading4': '#000080',  # Azul marino
-            'bold': '#000000',      # Negro
-            'italic': '#000000',    # Negro
-            'link': '#0000FF',      # Azul
-            'code': '#800000',      # Marrón
-            'codeblock': '#800000', # Marrón
-            'quote': '#808080',     # Gris
-            'list': '#000000',      # Negro
-            'numlist': '#000000',   # Negro
-        }
+        Returns:
+            str: Texto con las líneas largas enmascaradas
+        """
+        if not self.max_line_length:
+            return content
+        
+        if self._long_line_regex is None:
+            # Anclado al inicio de línea para que la búsqueda sea lineal
+            self._long_line_regex = re.compile(r'^[^\n]{%d,}' % (self.max_line_length + 1), re.MULTILINE)
+        
+        return self._long_line_regex.sub(lambda match: ' ' * len(match.group()), content)
+    
+    def _iter_chunks(self, content):
+        """
+        Divide el contenido en bloques de líneas completas.
         
-        dark_theme_colors = {
-            # Colores básicos
-            'keyword': '#569CD6',   # Azul claro
-            'builtin': '#C586C0',   # Púrpura claro
-            'string': '#6A9955',    # Verde claro
-            'comment': '#6A9955',   # Verde claro
-            'number': '#B5CEA8',    # Verde claro
-            'decorator': '#DCDCAA',  # Amarillo claro
-            'class': '#4EC9B0',     # Verde azulado
-            'function': '#DCDCAA',  # Amarillo claro
-            
-            # HTML/CSS
-            'tag': '#569CD6',       # Azul claro
-            'attribute': '#9CDCFE', # Azul claro
-            'selector': '#D7BA7D',  # Amarillo claro
-            'property': '#9CDCFE',  # Azul claro
-            'value': '#CE9178',     # Naranja claro
+        Args:
+            content (str): Texto a dividir
             
-            # JSON
-            'key': '#9CDCFE',       # Azul claro
-            'boolean': '#569CD6',   # Azul claro
+        Yields:
+            tuple: (desplazamiento, bloque)
+        """
+        length = len(content)
+        offset = 0
+        while offset < length:
+            end = content.find('\n', offset + self.CHUNK_SIZE)
+            end = length if end == -1 else end + 1
+            yield offset, content[offset:end]
+            offset = end
+    
+    def _compute_spans(self, content, extension, mode=MODE_FULL, deadline=None):
+        """
+        Ejecuta los patrones de un lenguaje y devuelve los spans encontrados.
+        
+        Los patrones de una sola línea se aplican por bloques de líneas para
+        poder comprobar el presupuesto de tiempo entre bloque y bloque.
+        
+        Args:
+            content (str): Texto a analizar
+            extension (str): Extensión normalizada del lenguaje
+            mode (str): Modo de resaltado (completo o solo palabras clave)
+            deadline (float, optional): Instante (perf_counter) límite
             
-            # Markdown
-            'heading1': '#569CD6',  # Azul claro
-            'heading2': '#569CD6',  # Azul claro
-            'heading3': '#569CD6',  # Azul claro
-            'heading4': '#569CD6',  # Azul claro
-            'bold': '#DCDCAA',      # Amarillo claro
-            'italic': '#DCDCAA',    # Amarillo claro
-            'link': '#CE9178',      # Naranja claro
-            'code': '#D7BA7D',      # Amarillo claro
-            'codeblock': '#D7BA7D', # Amarillo claro
-            'quote': '#57A64A',     # Verde claro
-            'list': '#DCDCAA',      # Amarillo claro
-            'numlist': '#DCDCAA',   # Amarillo claro
-        }
+        Returns:
+            tuple: Arrays paralelos (tag_ids, starts, ends) o None si se agotó el tiempo
+        """
+        tag_ids = array('H')
+        starts = array('I')
+        ends = array('I')
         
-        if self.current_theme == 'dark':
-            return dark_theme_colors.get(token_type, '#FFFFFF')
-        else:
-            return light_theme_colors.get(token_type, '#000000')
+        for token_type, regex, closing in self.compiled_patterns.get(extension, []):
+            if mode == self.MODE_KEYWORDS and token_type not in self.KEYWORD_TOKEN_TYPES:
+                continue
+            
+            tag_id = self.token_type_ids[token_type]
+            if closing is not None:
+                found = self._find_multiline(regex, closing, content, deadline)
+                if found is None:
+                    return None
+                for start, end in found:
+                    tag_ids.append(tag_id)
+                    starts.append(start)
+                    ends.append(end)
+                continue
+            
+            for offset, block in self._iter_chunks(content):
+                if deadline is not None and time.perf_counter() > deadline:
+                    return None
+                if mode == self.MODE_FULL and len(block) > self.MAX_FULL_BLOCK:
+                    return None
+                
+                # Buscar todas las coincidencias
+                for match in regex.finditer(block):
+                    if match.end() > match.start():
+                        tag_ids.append(tag_id)
+                        starts.append(offset + match.start())
+                        ends.append(offset + match.end())
+        
+        return tag_ids, starts, ends
     
-    def update_theme(self, theme):
+    def _find_multiline(self, regex, closing, content, deadline=None):
         """
-        Actualiza el tema del resaltador de sintaxis.
+        Busca las coincidencias de un patrón de varias líneas en tiempo lineal.
+        
+        Cada apertura se cierra con la primera aparición de su cierre. Si una
+        apertura no tiene cierre, tampoco lo tienen las siguientes, que ya no
+        se buscan; el resto de alternativas del patrón sí.
         
         Args:
-            theme (str): Nombre del tema ('light' o 'dark')
+            regex (re.Pattern): Patrón con el grupo 'open' (la apertura)
+            closing (str): Texto que cierra la parte de varias líneas
+            content (str): Texto a analizar
+            deadline (float, optional): Instante (perf_counter) límite
+        
+        Returns:
+            list: Rangos (inicio, fin) o None si se agotó el tiempo
         """
-        self.current_theme = theme
-        self._init_patterns()
+        found = []
+        position = 0
+        can_close = True
+        length = len(content)
+        while position <= length:
+            if deadline is not None and time.perf_counter() > deadline:
+                return None
+            match = regex.search(content, position)
+            if match is None:
+                break
+            start, end = match.span()
+            if match.group('open') is not None:
+                close = content.find(closing, end) if can_close else -1
+                if close == -1:
+                    can_close = False
+                    position = start + 1
+                    continue
+                end = close + len(closing)
+            if end > start:
+                found.append((start, end))
+            position = max(end, start + 1)
+        return found
+    
+    def _compute_within_budget(self, content, extension):
+        """
+        Calcula los spans respetando el presupuesto de bytes y de tiempo.
+        
+        Si el archivo supera el tamaño máximo (en bytes UTF-8) o el análisis
+        completo agota el tiempo, se degrada a un modo más barato (solo
+        palabras clave) y, en último caso, a texto plano.
+        
+        Args:
+            content (str): Texto a analizar
+            extension (str): Extensión normalizada del lenguaje
+            
+        Returns:
+            tuple: ((tag_ids, starts, ends), modo)
+        """
+        empty = (array('H'), array('I'), array('I'))
+        size = len(content)
+        
+        if self.max_bytes and size > self.max_bytes * 4:
+            return empty, self.MODE_PLAIN
+        if self.max_bytes and not content.isascii():
+            # El presupuesto es en bytes: fuera de ASCII un carácter puede
+            # ocupar varios en UTF-8
+            size = len(content.encode('utf-8', errors='replace'))
+            if size > self.max_bytes * 4:
+                return empty, self.MODE_PLAIN
+        
+        modes = [self.MODE_KEYWORDS]
+        if not self.max_bytes or size <= self.max_bytes:
+            modes.insert(0, self.MODE_FULL)
+        
+        for mode in modes:
+            deadline = None
+            if self.max_ms:
+                deadline = time.perf_counter() + self.max_ms / 1000.0
+            spans = self._compute_spans(content, extension, mode, deadline)
+            if spans is not None:
+                return spans, mode
+        
+        return empty, self.MODE_PLAIN
+    
+    def _apply_spans(self, text_widget, extension, spans):
+        """
+        Configura los tags de un lenguaje y aplica los spans al widget.
+        
+        Args:
+            text_widget (tk.Text): Widget de texto a resaltar
+            extension (str): Extensión normalizada del lenguaje
+            spans (tuple): Arrays paralelos (tag_ids, starts, ends)
+        """
+        # Crear tags para cada tipo de token
+        for token_type, _, _ in self.compiled_patterns.get(extension, []):
+            text_widget.tag_configure(token_type, foreground=self._get_color(token_type))
+        
+        # Agrupar los índices por tag para aplicar muchos rangos por llamada
+        indices_by_tag = {}
+        tag_ids, starts, ends = spans
+        for tag_id, start, end in zip(tag_ids, starts, ends):
+            indices_by_tag.setdefault(tag_id, []).extend(
+                (f"1.0+{start}c", f"1.0+{end}c")
+            )
+        
+        batch = self.TAG_BATCH_SIZE * 2
+        for tag_id, indices in indices_by_tag.items():
+            token_type = self.token_types[tag_id]
+            for i in range(0, len(indices), batch):
+                text_widget.tag_add(token_type, *indices[i:i + batch])
+    
+    def get_cache_stats(self):
+        """
+        Obtiene las estadísticas de la caché de spans.
+        
+        Returns:
+            dict: Estadísticas de la caché
+        """
+        return self.span_cache.get_stats()
     
-    def highlight(self, text_widget, extension):
+    def highlight(self, text_widget, extension, file_path=None):
         """
         Aplica resaltado de sintaxis a un widget de texto.
         
+        Si se indica la ruta del archivo, los spans calculados se guardan en
+        caché y al volver a abrir el mismo archivo sin cambios solo se
+        vuelven a aplicar los tags. Ningún archivo puede superar el
+        presupuesto de resaltado: si lo hace se usa un modo más barato.
+        
         Args:
             text_widget (tk.Text): Widget de texto a resaltar
             extension (str): Extensión que determina el lenguaje
+            file_path (str, optional): Ruta del archivo mostrado en el widget
+            
+        Returns:
+            str: Modo de resaltado aplicado ('full', 'keywords' o 'plain'),
+                 o None si el lenguaje no tiene resaltado
         """
         # Reiniciar el estado del widget
         text_widget.tag_delete(*text_widget.tag_names())
         
-        # Normalizar la extensión
-        extension = extension.lower()
+        extension = self._resolve_extension(extension)
+        if extension is None:
+            return None
         
-        # Si no es una extensión conocida, buscar una similar
-        if extension not in self.language_patterns:
-            if extension in ['.jsx', '.tsx']:
-                extension = '.js'
-            elif extension in ['.htm', '.xhtml']:
-                extension = '.html'
-            elif extension in ['.scss', '.sass', '.less']:
-                extension = '.css'
-            elif extension in ['.yaml', '.yml']:
-                extension = '.json'
-            elif extension in ['.txt', '.log']:
-                return  # No aplicar resaltado a archivos de texto plano
-            else:
-                return  # No aplicar resaltado a extensiones desconocidas
-        
-        # Obtener el contenido completo del widget
-        content = text_widget.get("1.0", tk.END)
-        
-        # Obtener los patrones del lenguaje
-        patterns = self.language_patterns.get(extension, [])
+        cache_key = None
+        entry = None
+        if file_path:
+            cache_key = TokenSpanCache.make_key(file_path, extension)
+            entry = self.span_cache.get(cache_key)
         
-        # Crear tags para cada tipo de token
-        for token_type, pattern, color in patterns:
-            text_widget.tag_configure(token_type, foreground=color)
-            
-            # Buscar todas las coincidencias
-            for match in re.finditer(pattern, content, re.MULTILINE):
-                start_index = f"1.0+{match.start()}c"
-                end_index = f"1.0+{match.end()}c"
-                
-                # Aplicar el tag a la región
-                text_widget.tag_add(token_type, start_index, end_index)
+        if entry is None:
+            # Obtener el contenido completo del widget
+            content = self._mask_long_lines(text_widget.get("1.0", tk.END))
+            spans, mode = self._compute_within_budget(content, extension)
+            self.span_cache.put(cache_key, spans, mode)
+        else:
+            spans, mode = entry
+        
+        self._apply_spans(text_widget, extension, spans)
+        return mode
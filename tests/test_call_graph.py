@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la resolución de llamadas del grafo de llamadas.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.core.call_graph import CallGraph
+from src.core.file_manager import FileManager
+from src.core.import_graph import ImportGraph
+from src.core.symbol_index import SymbolIndex
+
+TOKENIZER = '''
+class BPETokenizer:
+    def encode(self, text):
+        return text
+
+class TokenSpanCache:
+    def get(self, key):
+        return key
+    
+    def lookup(self, key):
+        return key
+'''
+
+USER = '''
+from tokenizer import BPETokenizer
+
+def run(original, tokenizer, cache):
+    original.encode('utf-8')
+    tokenizer.encode('a')
+    cache.get('a')
+    cache.lookup('a')
+    data.lookup('a')
+
+def typed(source: BPETokenizer, other: "Optional[BPETokenizer]"):
+    source.encode('a')
+    other.encode('a')
+
+class Worker:
+    def __init__(self):
+        self.engine = BPETokenizer()
+    
+    def work(self):
+        self.engine.encode('a')
+'''
+
+class ResolveMethodTest(unittest.TestCase):
+    """Las llamadas a métodos de objetos se resuelven solo con pistas fiables."""
+    
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        paths = {}
+        for name, source in (("tokenizer.py", TOKENIZER), ("user.py", USER)):
+            paths[name] = os.path.join(self.folder, name)
+            with open(paths[name], 'w', encoding='utf-8') as f:
+                f.write(source)
+        self.user = paths["user.py"]
+        self.lines = USER.split('\n')
+        
+        symbol_index = SymbolIndex(self.folder, FileManager(), os.path.join(self.folder, "symbols.json"))
+        symbol_index.update({path: (os.stat(path).st_mtime_ns, os.path.getsize(path)) for path in paths.values()})
+        import_graph = ImportGraph(self.folder, os.path.join(self.folder, "imports.json"))
+        self.call_graph = CallGraph(symbol_index, import_graph)
+    
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+    
+    def callees_of(self, text):
+        line = self.lines.index(text) + 1
+        return [symbol.qualname for symbol in self.call_graph.callees(self.user, line, line)]
+    
+    def test_builtin_method_names_are_not_resolved(self):
+        self.assertEqual(self.callees_of("    original.encode('utf-8')"), [])
+        self.assertEqual(self.callees_of("    cache.get('a')"), [])
+        # Ni siquiera si el nombre del objeto coincide con la clase
+        self.assertEqual(self.callees_of("    tokenizer.encode('a')"), [])
+    
+    def test_receiver_name_matches_class(self):
+        self.assertEqual(self.callees_of("    cache.lookup('a')"), ["TokenSpanCache.lookup"])
+    
+    def test_unrelated_receiver_is_not_resolved(self):
+        self.assertEqual(self.callees_of("    data.lookup('a')"), [])
+    
+    def test_type_hints(self):
+        self.assertEqual(self.callees_of("    source.encode('a')"), ["BPETokenizer.encode"])
+        self.assertEqual(self.callees_of("    other.encode('a')"), ["BPETokenizer.encode"])
+    
+    def test_attribute_created_in_init(self):
+        self.assertEqual(self.callees_of("        self.engine.encode('a')"), ["BPETokenizer.encode"])
+
+class ImportedModuleChangeTest(unittest.TestCase):
+    """Las resoluciones se descartan si cambia un módulo importado."""
+    
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        package = os.path.join(self.folder, "paquete")
+        os.makedirs(package)
+        self.paths = {}
+        sources = (
+            (os.path.join(package, "__init__.py"), "from .primero import ayuda\n"),
+            (os.path.join(package, "primero.py"), "def ayuda():\n    return 1\n"),
+            (os.path.join(package, "segundo.py"), "def ayuda():\n    return 2\n"),
+            (os.path.join(self.folder, "uso.py"), "import paquete\n\ndef run():\n    paquete.ayuda()\n"),
+        )
+        for path, source in sources:
+            self.write(path, source)
+        self.init_path = sources[0][0]
+        self.user = sources[3][0]
+        
+        paths = [path for path, _ in sources]
+        symbol_index = SymbolIndex(self.folder, FileManager(), os.path.join(self.folder, "symbols.json"))
+        symbol_index.update({path: (os.stat(path).st_mtime_ns, os.path.getsize(path)) for path in paths})
+        import_graph = ImportGraph(self.folder, os.path.join(self.folder, "imports.json"))
+        self.call_graph = CallGraph(symbol_index, import_graph)
+    
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+    
+    @staticmethod
+    def write(path, source):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(source)
+    
+    def callee_file(self):
+        callees = self.call_graph.callees(self.user, 4, 4)
+        return [os.path.basename(symbol.file_path) for symbol in callees]
+    
+    def test_reexport_change_is_seen(self):
+        self.assertEqual(self.callee_file(), ["primero.py"])
+        # El archivo de la llamada no cambia, solo el paquete que reexporta
+        self.write(self.init_path, "from .segundo import ayuda  # cambiado\n")
+        self.assertEqual(self.callee_file(), ["segundo.py"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del empaquetado del contexto en un presupuesto de tokens.
+"""
+import itertools
+import random
+import unittest
+
+from src.core.context_packer import ContextPacker
+
+class ContextPackerTest(unittest.TestCase):
+    """El plan elegido respeta el presupuesto y se acerca al óptimo."""
+    
+    def setUp(self):
+        self.packer = ContextPacker()
+    
+    def item(self, key, full, outline=None, head=None, **kwargs):
+        options = {'full': full}
+        if outline is not None:
+            options['outline'] = outline
+        if head is not None:
+            options['head'] = head
+        return self.packer.build_item(key, options, **kwargs)
+    
+    def test_everything_fits(self):
+        items = [self.item("a", 100, 30), self.item("b", 200, 50)]
+        result = self.packer.pack(items, 1000)
+        self.assertEqual(result['plan'], {"a": 'full', "b": 'full'})
+        self.assertEqual(result['tokens'], 300)
+    
+    def test_tight_budget_uses_cheaper_representations(self):
+        items = [self.item("a", 1000, 200, 50), self.item("b", 1000, 200, 50)]
+        result = self.packer.pack(items, 450)
+        self.assertLessEqual(result['tokens'], 450)
+        self.assertEqual(result['plan'], {"a": 'outline', "b": 'outline'})
+    
+    def test_nothing_fits(self):
+        result = self.packer.pack([self.item("a", 1000)], 10)
+        self.assertEqual(result['plan'], {"a": 'excluded'})
+        self.assertEqual(result['tokens'], 0)
+    
+    def test_priority_decides_who_keeps_the_full_file(self):
+        items = [self.item("baja", 500, 100, priority='baja'), self.item("alta", 500, 100, priority='alta')]
+        plan = self.packer.pack(items, 650)['plan']
+        self.assertEqual(plan, {"baja": 'outline', "alta": 'full'})
+    
+    def test_single_valuable_item_beats_efficient_ones(self):
+        # El voraz llenaría el presupuesto con los pequeños; el grande vale más
+        items = [self.item("grande", 900, priority='alta')] + [self.item(f"p{i}", 100) for i in range(2)]
+        plan = self.packer.pack(items, 1000)['plan']
+        self.assertEqual(plan["grande"], 'full')
+    
+    def test_close_to_optimum_on_random_instances(self):
+        generator = random.Random(7)
+        for _ in range(50):
+            items = []
+            for index in range(4):
+                full = generator.randint(50, 500)
+                items.append(self.item(index, full, generator.randint(10, full), generator.randint(5, full),
+                                       priority=generator.choice(['alta', 'normal', 'baja']),
+                                       recency=generator.random()))
+            budget = generator.randint(50, 1200)
+            result = self.packer.pack(items, budget)
+            
+            best = 0.0
+            for combination in itertools.product(*(item['options'] for item in items)):
+                if sum(option[1] for option in combination) <= budget:
+                    best = max(best, sum(option[2] for option in combination))
+            self.assertLessEqual(result['tokens'], budget)
+            self.assertGreaterEqual(result['value'], 0.5 * best - 1e-9)
+
+if __name__ == '__main__':
+    unittest.main()
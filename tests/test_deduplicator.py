@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la sustitución de bloques repetidos.
+"""
+import unittest
+
+from src.core.deduplicator import BlockDeduplicator
+
+# Cabecera de licencia que se repite en varios archivos
+LICENSE = [f"# Copyright (c) 2024 Ejemplo. Línea de la licencia número {number}." for number in range(1, 9)]
+
+class BlockDeduplicatorTest(unittest.TestCase):
+    """Los bloques repetidos se sustituyen por una referencia a su primera aparición."""
+    
+    def setUp(self):
+        self.deduplicator = BlockDeduplicator(min_lines=4, min_chars=50)
+    
+    def test_repeated_block_cites_file_lines(self):
+        first = "\n".join(["import os"] + LICENSE + ["a = 1"])
+        second = "\n".join(LICENSE + ["b = 2"])
+        texts, stats = self.deduplicator.deduplicate([("a.py", first, 1), ("b.py", second, 1)])
+        self.assertEqual(texts[0], first)
+        self.assertEqual(texts[1], "[... 8 líneas idénticas a a.py, líneas 2-9 ...]\nb = 2")
+        self.assertEqual((stats['blocks'], stats['lines']), (1, 8))
+    
+    def test_selection_first_line_offsets_the_reference(self):
+        first = "\n".join(LICENSE)
+        texts, _ = self.deduplicator.deduplicate([("a.py (selección 1)", first, 40), ("b.py", first, 1)])
+        self.assertEqual(texts[1], "[... 8 líneas idénticas a a.py (selección 1), líneas 40-47 ...]")
+    
+    def test_unknown_first_line_cites_relative_lines(self):
+        first = "\n".join(["x"] + LICENSE)
+        texts, _ = self.deduplicator.deduplicate([("a.py", first, None), ("b.py", "\n".join(LICENSE), 1)])
+        self.assertEqual(texts[1], "[... 8 líneas idénticas a a.py, líneas 2-9 de su texto exportado ...]")
+    
+    def test_short_or_blank_blocks_are_kept(self):
+        short = "\n".join(["x = 1"] * 6)
+        texts, stats = self.deduplicator.deduplicate([("a.py", short, 1), ("b.py", short, 1)])
+        self.assertEqual(texts, [short, short])
+        self.assertEqual(stats['blocks'], 0)
+    
+    def test_repetition_within_a_document(self):
+        text = "\n".join(LICENSE + ["medio"] + LICENSE)
+        texts, _ = self.deduplicator.deduplicate([("a.py", text, 1)])
+        self.assertEqual(texts[0], "\n".join(LICENSE + ["medio", "[... 8 líneas idénticas a a.py, líneas 1-8 ...]"]))
+    
+    def test_indentation_of_the_reference(self):
+        indented = [f"    {line}" for line in LICENSE]
+        texts, _ = self.deduplicator.deduplicate([("a.py", "\n".join(indented), 1),
+                                                  ("b.py", "\n".join(["def f():"] + indented), 1)])
+        self.assertEqual(texts[1], "def f():\n    [... 8 líneas idénticas a a.py, líneas 1-8 ...]")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la ubicación de la caché.
+"""
+import os
+import sys
+import unittest
+from unittest import mock
+
+from src.utils import file_utils
+
+class CacheDirTest(unittest.TestCase):
+    """La caché va en la carpeta del usuario, no en la de instalación."""
+    
+    def test_cache_dir_is_outside_install_tree(self):
+        install_root = os.path.abspath(os.path.join(os.path.dirname(file_utils.__file__), "..", ".."))
+        cache_dir = os.path.abspath(file_utils.CACHE_DIR)
+        self.assertFalse(cache_dir.startswith(install_root + os.sep))
+    
+    @unittest.skipUnless(os.name == 'posix' and sys.platform != 'darwin', "Solo en Linux y similares")
+    def test_xdg_cache_home(self):
+        with mock.patch.dict(os.environ, {'XDG_CACHE_HOME': "/tmp/xdg"}):
+            self.assertEqual(file_utils.get_user_cache_dir("App"), os.path.join("/tmp/xdg", "App"))
+        with mock.patch.dict(os.environ, {'XDG_CACHE_HOME': ""}):
+            self.assertEqual(file_utils.get_user_cache_dir("App"),
+                             os.path.join(os.path.expanduser("~"), ".cache", "App"))
+    
+    def test_project_cache_files_are_per_project(self):
+        first = file_utils.get_project_cache_file("/proyecto/a", "scan.json")
+        second = file_utils.get_project_cache_file("/proyecto/b", "scan.json")
+        self.assertNotEqual(first, second)
+        self.assertEqual(os.path.dirname(first), file_utils.CACHE_DIR)
+        self.assertTrue(os.path.basename(first).startswith("scan_"))
+
+if __name__ == '__main__':
+    unittest.main()
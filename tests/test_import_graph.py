@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la expansión de dependencias del grafo de importaciones.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.core.import_graph import ImportGraph
+
+# Cadena de importaciones: main -> a -> b -> c
+SOURCES = {
+    "main.py": "import a\n",
+    "a.py": "import b\n" + "x = 1\n" * 9,
+    "b.py": "import c\n" + "y = 2\n" * 19,
+    "c.py": "z = 3\n" * 30,
+}
+
+class ExpandTest(unittest.TestCase):
+    """La expansión respeta el presupuesto y las rutas excluidas."""
+    
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.paths = {}
+        for name, source in SOURCES.items():
+            self.paths[name] = os.path.join(self.folder, name)
+            with open(self.paths[name], 'w', encoding='utf-8') as f:
+                f.write(source)
+        self.graph = ImportGraph(self.folder, os.path.join(self.folder, "imports.json"))
+        self.costs = []
+    
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+    
+    def token_cost(self, path):
+        # Una "token" por línea, registrando cada consulta
+        self.costs.append(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            return len(f.read().splitlines())
+    
+    def names(self, found):
+        return [(os.path.basename(path), depth, tokens) for path, depth, tokens in found]
+    
+    def test_returns_costs_once(self):
+        found = self.graph.expand([self.paths["main.py"]], None, token_cost=self.token_cost)
+        self.assertEqual(self.names(found), [("a.py", 1, 10), ("b.py", 2, 20), ("c.py", 3, 30)])
+        self.assertEqual(len(self.costs), 3)
+    
+    def test_without_token_cost(self):
+        found = self.graph.expand([self.paths["main.py"]], 1)
+        self.assertEqual(self.names(found), [("a.py", 1, None)])
+    
+    def test_budget(self):
+        found = self.graph.expand([self.paths["main.py"]], None, 30, self.token_cost)
+        self.assertEqual(self.names(found), [("a.py", 1, 10), ("b.py", 2, 20)])
+    
+    def test_excluded_paths_are_traversed_but_not_charged(self):
+        found = self.graph.expand([self.paths["main.py"]], None, 30, self.token_cost,
+                                  exclude=[self.paths["b.py"]])
+        self.assertEqual(self.names(found), [("a.py", 1, 10)])
+        self.assertNotIn(self.paths["b.py"], self.costs)
+        
+        found = self.graph.expand([self.paths["main.py"]], None, 40, self.token_cost,
+                                  exclude=[self.paths["b.py"]])
+        self.assertEqual(self.names(found), [("a.py", 1, 10), ("c.py", 3, 30)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la minimización del código al exportar.
+"""
+import unittest
+
+from src.core.minifier import Minifier, minify_python, minify_with_lexer
+
+class MinifyWithLexerTest(unittest.TestCase):
+    """El lexer genérico quita comentarios sin tocar cadenas ni literales."""
+    
+    def test_c_comments(self):
+        source = "int a = 1; // uno\n\n/* dos\n   tres */\nint b = 2;"
+        self.assertEqual(minify_with_lexer(source, 'c'), "int a = 1;\nint b = 2;")
+    
+    def test_comment_between_tokens_becomes_space(self):
+        self.assertEqual(minify_with_lexer("a/* x */b", 'c'), "a b")
+    
+    def test_strings_are_kept(self):
+        source = 'var url = "http://example.com"; // c'
+        self.assertEqual(minify_with_lexer(source, 'js'), 'var url = "http://example.com";')
+    
+    def test_multiline_template_is_kept(self):
+        source = "const t = `a\n\n  // no es un comentario\n`;"
+        self.assertEqual(minify_with_lexer(source, 'js'), source)
+    
+    def test_js_regex_with_block_comment_opener(self):
+        source = 'url.replace(/\\/*$/, ""); f(); /* k */ g();'
+        self.assertEqual(minify_with_lexer(source, 'js'), 'url.replace(/\\/*$/, ""); f();  g();')
+    
+    def test_js_regex_with_line_comment_opener(self):
+        source = '/https?:\\/\\//; // c'
+        self.assertEqual(minify_with_lexer(source, 'js'), '/https?:\\/\\//;')
+    
+    def test_js_division_is_not_regex(self):
+        source = "x = a / b; // c\ny = a / b / c; /* d */"
+        self.assertEqual(minify_with_lexer(source, 'js'), "x = a / b;\ny = a / b / c;")
+    
+    def test_cpp_raw_string(self):
+        source = 'auto s = R"(a "// b)"; // c'
+        self.assertEqual(minify_with_lexer(source, 'c'), 'auto s = R"(a "// b)";')
+    
+    def test_cpp_raw_string_with_delimiter(self):
+        source = 'auto s = R"xy(a )" /* b)xy"; /* c */'
+        self.assertEqual(minify_with_lexer(source, 'c'), 'auto s = R"xy(a )" /* b)xy";')
+    
+    def test_rust_raw_string(self):
+        source = 'let s = r#"a // "b"#; // c'
+        self.assertEqual(minify_with_lexer(source, 'c'), 'let s = r#"a // "b"#;')
+    
+    def test_ruby_percent_literal(self):
+        source = "x = %q(a #b (c)) # c\ny = 5 % 3 # d"
+        self.assertEqual(minify_with_lexer(source, 'ruby'), "x = %q(a #b (c))\ny = 5 % 3")
+    
+    def test_ruby_heredoc(self):
+        source = "s = <<~EOS\n  a # b\n\n  EOS\nputs s # c"
+        self.assertEqual(minify_with_lexer(source, 'ruby'), "s = <<~EOS\n  a # b\n\n  EOS\nputs s")
+    
+    def test_ruby_shift_is_not_heredoc(self):
+        self.assertEqual(minify_with_lexer("x = a << b # c", 'ruby'), "x = a << b")
+    
+    def test_shell_heredoc(self):
+        source = "#!/bin/sh\ncat <<EOF # c\na # b\nEOF\necho $# # d"
+        self.assertEqual(minify_with_lexer(source, 'shell'), "#!/bin/sh\ncat <<EOF\na # b\nEOF\necho $#")
+    
+    def test_shell_quoted_heredoc_with_tabs(self):
+        source = "cat <<-'EOF'\n\ta # b\n\tEOF\n"
+        self.assertEqual(minify_with_lexer(source, 'shell'), "cat <<-'EOF'\n\ta # b\n\tEOF")
+    
+    def test_perl_quote_like_operators(self):
+        source = "$s =~ s/#a/#b/g; # c\nmy @w = qw(a #b); # d\nmy $x = $a / $b; # e"
+        self.assertEqual(minify_with_lexer(source, 'perl'),
+                         "$s =~ s/#a/#b/g;\nmy @w = qw(a #b);\nmy $x = $a / $b;")
+    
+    def test_unterminated_heredoc_is_not_protected(self):
+        self.assertEqual(minify_with_lexer("cat <<EOF # c\na # b", 'shell'), "cat <<EOF\na")
+    
+    def test_yaml_block_scalar_is_kept(self):
+        source = "steps:\n  run: |  # c\n    # build step\n\n    make all\n  name: x # d\n"
+        self.assertEqual(minify_with_lexer(source, 'yaml'),
+                         "steps:\n  run: |\n    # build step\n\n    make all\n  name: x")
+    
+    def test_yaml_folded_and_keep_blocks(self):
+        source = "- >-\n  a\n\n  # b\n- |+\n  c\n\n\nd: 1 # e"
+        self.assertEqual(minify_with_lexer(source, 'yaml'), "- >-\n  a\n\n  # b\n- |+\n  c\n\n\nd: 1")
+    
+    def test_yaml_quotes_and_apostrophes(self):
+        source = "a: 'x # y'\nb: it's # c\nc: \"z # w\""
+        self.assertEqual(minify_with_lexer(source, 'yaml'), "a: 'x # y'\nb: it's\nc: \"z # w\"")
+
+class MinifyPythonTest(unittest.TestCase):
+    """La minimización de Python usa tokenize y ast."""
+    
+    def test_comments_and_docstrings(self):
+        source = 'def f():\n    """Doc."""\n    # c\n    return "# no"  # c\n'
+        self.assertEqual(minify_python(source), 'def f():\n    return "# no"')
+    
+    def test_docstring_only_body_keeps_a_statement(self):
+        self.assertEqual(minify_python('def f():\n    """Doc."""\n'), 'def f():\n    ...')
+    
+    def test_multiline_string_is_kept(self):
+        source = 'x = """a\n\n  # b\n"""\n'
+        self.assertEqual(minify_python(source), 'x = """a\n\n  # b\n"""')
+    
+    def test_indent_tabs(self):
+        source = "if a:\n    if b:\n        c()\n"
+        self.assertEqual(minify_python(source, indent_tabs=True), "if a:\n\tif b:\n\t\tc()")
+
+class MinifierTest(unittest.TestCase):
+    """El minimizador elige el lexer por la extensión del archivo."""
+    
+    def test_unsupported_language_is_unchanged(self):
+        self.assertEqual(Minifier().minify("a # b", "notes.txt"), "a # b")
+    
+    def test_yaml_uses_block_scalars(self):
+        source = "steps:\n  run: |\n    # build step\n\n    make all\n  name: x\n"
+        self.assertEqual(Minifier().minify(source, "ci.yml"), source.rstrip())
+    
+    def test_python_fragment_falls_back_to_lexer(self):
+        self.assertEqual(Minifier().minify("foo(a,  # c\n", "x.py"), "foo(a,")
+
+if __name__ == '__main__':
+    unittest.main()
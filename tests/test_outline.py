@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del esquema de archivos Python.
+"""
+import unittest
+
+from src.core.outline import extract_python_outline
+
+class PythonOutlineTest(unittest.TestCase):
+    """Las firmas se conservan completas y los cuerpos se omiten."""
+    
+    def test_multiline_signature_with_body_on_closing_line(self):
+        source = "class A:\n    def q(self, a,\n          b): return a\n"
+        self.assertEqual(extract_python_outline(source),
+                         "class A:\n    def q(self, a,\n          b):\n        ...")
+    
+    def test_one_line_definition(self):
+        self.assertEqual(extract_python_outline("def t(x={'a': 1}): pass\n"), "def t(x={'a': 1}):\n    ...")
+    
+    def test_multiline_signature_with_docstring(self):
+        source = "@decorador\ndef s(\n    a,\n) -> dict:  # comentario\n    '''Documentación.'''\n    return {}\n"
+        self.assertEqual(extract_python_outline(source),
+                         '@decorador\ndef s(\n    a,\n) -> dict:\n    """Documentación."""')
+
+if __name__ == '__main__':
+    unittest.main()
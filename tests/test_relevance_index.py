@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del índice de relevancia (BM25).
+"""
+import heapq
+import itertools
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from src.core.relevance_index import RelevanceIndex, tokenize
+
+class RelevanceIndexTest(unittest.TestCase):
+    """La poda de los mejores resultados no cambia lo que se devuelve."""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = tempfile.mkdtemp()
+        generator = random.Random(3)
+        # Vocabulario con frecuencias muy distintas, como en el código real
+        syllables = ["ka", "lo", "mi", "nu", "pe", "ri", "so", "tu"]
+        vocabulary = ["".join(word) for word in itertools.product(syllables, repeat=3)][:200]
+        weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+        entries = {}
+        for number in range(120):
+            path = os.path.join(cls.folder, f"archivo{number}.py")
+            words = generator.choices(vocabulary, weights, k=generator.randint(20, 300))
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(" ".join(words))
+            stat = os.stat(path)
+            entries[path] = (stat.st_mtime_ns, stat.st_size)
+        cls.index = RelevanceIndex(cls.folder, os.path.join(cls.folder, "relevance.sqlite"))
+        cls.index.update(entries)
+        # Términos raros y comunes mezclados: los comunes aportan poco y se podan
+        cls.queries = [" ".join(generator.sample(vocabulary[40:], generator.randint(1, 4))
+                                + generator.sample(vocabulary[:10], generator.randint(0, 6)))
+                       for _ in range(40)]
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.index.close()
+        shutil.rmtree(cls.folder, ignore_errors=True)
+    
+    def test_tokenize_splits_identifiers(self):
+        terms = tokenize("parseHTTPRequest snake_case")
+        for term in ("parsehttprequest", "parse", "http", "request", "snakecase", "snake", "case"):
+            self.assertIn(term, terms)
+    
+    def test_top_results_match_full_scoring(self):
+        pruned_queries = 0
+        for query in self.queries:
+            for top in (1, 5, 20):
+                full, _ = self.index._score(query)
+                pruned, _ = self.index._score(query, top)
+                pruned_queries += len(pruned) < len(full)
+                expected = heapq.nlargest(top, full.items(), key=lambda item: item[1])
+                found = heapq.nlargest(top, pruned.items(), key=lambda item: item[1])
+                self.assertEqual([round(score, 9) for _, score in found],
+                                 [round(score, 9) for _, score in expected], query)
+                for doc_id, score in found:
+                    self.assertAlmostEqual(score, full[doc_id], places=9)
+        # La poda se ha aplicado de verdad en la mayoría de las consultas
+        self.assertGreater(pruned_queries, len(self.queries))
+    
+    def test_search_excludes_paths(self):
+        query = self.queries[0]
+        first = self.index.search(query, limit=3)
+        excluded = {first[0][0]}
+        again = self.index.search(query, limit=3, exclude=excluded)
+        self.assertEqual([path for path, _, _ in again], [path for path, _, _ in self.index.search(query, 4)
+                                                          if path not in excluded][:3])
+    
+    def test_relevance_is_normalized(self):
+        paths = [path for path, _, _ in self.index.search(self.queries[1], limit=5)]
+        relevance = self.index.get_relevance(self.queries[1], paths)
+        self.assertEqual(max(relevance.values()), 1.0)
+        self.assertEqual(relevance[paths[0]], 1.0)
+
+class ConcurrentAccessTest(unittest.TestCase):
+    """Las consultas no esperan a las actualizaciones y el índice cerrado no se reabre."""
+    
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.entries = {}
+        for name, text in (("parser.py", "parse tokens parser"), ("render.py", "render template")):
+            path = os.path.join(self.folder, name)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            stat = os.stat(path)
+            self.entries[path] = (stat.st_mtime_ns, stat.st_size)
+        self.index = RelevanceIndex(self.folder, os.path.join(self.folder, "relevance.sqlite"))
+        self.index.update(self.entries)
+    
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.folder, ignore_errors=True)
+    
+    def test_query_during_write(self):
+        results = []
+        search = threading.Thread(target=lambda: results.append(self.index.search("parse", limit=5)))
+        # Una actualización a medio escribir mantiene el bloqueo y la transacción abierta
+        with self.index._lock:
+            self.index.connection.execute("DELETE FROM terms")
+            search.start()
+            search.join(timeout=5)
+            finished = not search.is_alive()
+            self.index.connection.rollback()
+        search.join()
+        self.assertTrue(finished)
+        self.assertEqual([os.path.basename(path) for path, _, _ in results[0]], ["parser.py"])
+    
+    def test_closed_index_is_not_reopened(self):
+        self.index.close()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            self.index.update(self.entries)
+
+if __name__ == '__main__':
+    unittest.main()
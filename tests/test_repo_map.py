@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del mapa del repositorio.
+"""
+import os
+import unittest
+
+from src.core.repo_map import RepoMap, _render_tree
+from src.core.symbol_index import Symbol
+
+class SymbolFiles:
+    """Índice de símbolos mínimo: solo lo que RepoMap.sync consulta."""
+    
+    def __init__(self, files):
+        self.files = files
+
+class RenderTreeTest(unittest.TestCase):
+    """El árbol indica cuántos archivos quedan fuera y dónde."""
+    
+    PATHS = ['a.py', 'b.py', 'c.py', 'gui/x.py', 'gui/panels/p1.py', 'gui/panels/p2.py',
+             'docs/d.md', 'docs/e.md', 'lib/deep/f.py', 'lib/deep/g.py']
+    
+    def test_root_files_and_hidden_folders_are_counted_apart(self):
+        text = _render_tree([('a.py', None), ('gui/x.py', None), ('lib/deep/f.py', None)], self.PATHS)
+        self.assertEqual(text.split('\n')[-1], "(+2 archivos en la raíz, +2 archivos en 1 carpeta no mostrada)")
+    
+    def test_joined_folders_report_their_own_omitted_files(self):
+        text = _render_tree([('lib/deep/f.py', None)], self.PATHS)
+        self.assertIn("lib/deep/ (+1 archivos)\n  f.py", text)
+    
+    def test_folder_with_other_files_is_not_joined(self):
+        text = _render_tree([('gui/panels/p1.py', ('Panel', 1))], self.PATHS)
+        self.assertIn("gui/ (+2 archivos)\n  panels/ (+1 archivos)\n    p1.py: Panel", text)
+    
+    def test_everything_shown(self):
+        self.assertEqual(_render_tree([('a.py', ('f', 1)), ('a.py', ('C.m', 3))], ['a.py']), "a.py: f, C(m)")
+    
+    def test_nothing_shown(self):
+        self.assertEqual(_render_tree([], self.PATHS), "")
+
+class RenderBudgetTest(unittest.TestCase):
+    """El mapa incluye tantas entradas como caben en el presupuesto."""
+    
+    def setUp(self):
+        self.root = os.path.abspath("proyecto")
+        files = {}
+        entries = {}
+        for folder in range(5):
+            for number in range(5):
+                path = os.path.join(self.root, f"carpeta{folder}", f"modulo{number}.py")
+                files[path] = ((1, 1), [Symbol(f"funcion{number}", f"funcion{number}", 'function', path, 1, 2)])
+                entries[path] = (1, 1)
+        self.repo_map = RepoMap(self.root)
+        self.assertTrue(self.repo_map.sync(entries, SymbolFiles(files)))
+    
+    @staticmethod
+    def token_cost(text):
+        return len(text.split())
+    
+    def test_map_fits_the_budget(self):
+        for budget in (15, 30, 60):
+            text = self.repo_map.render(budget, self.token_cost)
+            self.assertTrue(text)
+            self.assertLessEqual(self.token_cost(text), budget)
+    
+    def test_larger_budget_shows_more(self):
+        small = self.repo_map.render(20, self.token_cost)
+        large = self.repo_map.render(1000, self.token_cost)
+        self.assertGreater(len(large.split('\n')), len(small.split('\n')))
+        self.assertNotIn("(+", large)
+        self.assertEqual(large.count("funcion"), 25)
+    
+    def test_too_small_budget_gives_empty_map(self):
+        self.assertEqual(self.repo_map.render(0, self.token_cost), "")
+    
+    def test_invalidate_renders_with_the_new_counter(self):
+        text = self.repo_map.render(30, self.token_cost)
+        self.assertEqual(self.repo_map.render(30, len), text)
+        self.repo_map.invalidate()
+        self.assertLessEqual(len(self.repo_map.render(30, len)), 30)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de las ventanas de contexto del gestor de selecciones.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.core.selection_manager import SelectionManager
+
+class ExpandSelectionsTest(unittest.TestCase):
+    """Las selecciones de líneas se amplían y se funden en ventanas."""
+    
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.folder, "data.txt")
+        self.lines = [f"linea {number}" for number in range(1, 101)]
+        self.content = "\n".join(self.lines)
+        with open(self.file_path, 'w', encoding='utf-8') as f:
+            f.write(self.content)
+        self.manager = SelectionManager()
+    
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+    
+    def add_lines(self, first, last):
+        self.assertTrue(self.manager.add_line_range(self.file_path, self.content, first, last))
+    
+    def test_selection_lines(self):
+        self.add_lines(10, 12)
+        self.assertEqual(self.manager.get_selection_lines(self.file_path, 0), (10, 12))
+    
+    def test_selection_ending_at_line_start_excludes_that_line(self):
+        self.manager.add_selection(self.file_path, "linea 5\n", ("5.0", "6.0"))
+        self.assertEqual(self.manager.get_selection_lines(self.file_path, 0), (5, 5))
+    
+    def test_overlapping_windows_are_merged(self):
+        self.add_lines(10, 10)
+        self.add_lines(14, 14)
+        self.add_lines(50, 50)
+        changed, windows = self.manager.expand_selections(radius=2)
+        self.assertEqual((changed, windows), (1, 2))
+        self.assertEqual(self.manager.get_all_selection_lines()[self.file_path], [(8, 16), (48, 52)])
+        texts = [text for text, _ in self.manager.selections[self.file_path]]
+        self.assertEqual(texts[0], "\n".join(self.lines[7:16]))
+        self.assertEqual(texts[1], "\n".join(self.lines[47:52]))
+    
+    def test_adjacent_windows_are_merged(self):
+        self.add_lines(10, 11)
+        self.add_lines(12, 13)
+        self.manager.expand_selections(radius=0)
+        self.assertEqual(self.manager.get_all_selection_lines()[self.file_path], [(10, 13)])
+    
+    def test_windows_are_clamped_to_the_file(self):
+        self.add_lines(1, 2)
+        self.add_lines(99, 100)
+        self.manager.expand_selections(radius=5)
+        self.assertEqual(self.manager.get_all_selection_lines()[self.file_path], [(1, 7), (94, 100)])
+    
+    def test_selection_without_range_is_kept(self):
+        self.add_lines(20, 21)
+        self.manager.add_selection(self.file_path, "linea 99")
+        self.manager.expand_selections(radius=1)
+        self.assertEqual(self.manager.get_all_selection_lines()[self.file_path], [(19, 22), None])
+        self.assertEqual(self.manager.selections[self.file_path][1], ("linea 99", False))
+    
+    def test_whole_file_is_not_changed(self):
+        self.manager.add_whole_file(self.file_path, self.content)
+        self.assertEqual(self.manager.expand_selections(radius=3), (0, 0))
+    
+    def test_export_headers_show_file_lines(self):
+        self.add_lines(30, 31)
+        self.manager.add_selection(self.file_path, "linea 99")
+        context = self.manager.get_formatted_context()
+        self.assertIn("Selección 1 (líneas 30-31):", context)
+        self.assertIn("Selección 2:", context)
+
+class DedupExportTest(unittest.TestCase):
+    """Las referencias a bloques repetidos citan las líneas del archivo original."""
+    
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.block = [f'CONSTANTE_{number} = "valor bastante largo de la constante {number}"' for number in range(8)]
+        self.manager = SelectionManager()
+        self.manager.set_dedup_options(True, min_lines=4)
+        
+        self.first_path = os.path.join(self.folder, "a.py")
+        lines = [f"x_{number} = {number}" for number in range(1, 29)] + ["# comentario"] + self.block
+        self.first_content = "\n".join(lines)
+        self.second_path = os.path.join(self.folder, "b.py")
+        self.second_content = "\n".join(["import os"] + self.block)
+        for path, content in ((self.first_path, self.first_content), (self.second_path, self.second_content)):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(content)
+    
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+    
+    def export_second(self):
+        self.manager.add_line_range(self.first_path, self.first_content, 28, 37)
+        self.manager.add_whole_file(self.second_path, self.second_content)
+        texts, _ = self.manager._get_export_texts()
+        return texts[(self.second_path, 0)]
+    
+    def test_reference_cites_selection_lines(self):
+        self.assertEqual(self.export_second(),
+                         "import os\n[... 8 líneas idénticas a a.py (selección 1), líneas 30-37 ...]")
+    
+    def test_minified_reference_cites_relative_lines(self):
+        self.manager.set_minify_options(True)
+        # La minimización quita el comentario: el bloque pasa a las líneas 2-9
+        self.assertIn("líneas 2-9 de su texto exportado", self.export_second())
+
+class LazyOutlineCostTest(unittest.TestCase):
+    """El coste como esquema solo se calcula al ajustar al presupuesto."""
+    
+    def setUp(self):
+        self.manager = SelectionManager()
+        self.outlined = []
+        get_outline = self.manager.outline_builder.get_outline
+        def counting_get_outline(content, file_path):
+            self.outlined.append(file_path)
+            return get_outline(content, file_path)
+        self.manager.outline_builder.get_outline = counting_get_outline
+        
+        self.file_path = "modulo.py"
+        functions = [f"def funcion_{number}(valor):\n    return valor * {number} + sum(range(valor))\n"
+                     for number in range(60)]
+        self.manager.add_whole_file(self.file_path, "\n".join(functions))
+    
+    def test_adding_a_file_does_not_build_its_outline(self):
+        self.assertEqual(self.outlined, [])
+        self.assertNotIn('outline', self.manager.file_token_options[self.file_path])
+    
+    def test_packing_uses_the_outline(self):
+        full_tokens = self.manager.file_token_options[self.file_path]['full']
+        result = self.manager.pack_to_budget(full_tokens // 2)
+        self.assertEqual(self.outlined, [self.file_path])
+        self.assertEqual(result['plan'], {self.file_path: 'outline'})
+        self.assertLess(self.manager.get_context_tokens(), full_tokens // 2)
+
+if __name__ == '__main__':
+    unittest.main()
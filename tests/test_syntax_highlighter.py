@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del presupuesto del resaltador de sintaxis.
+"""
+import time
+import unittest
+
+from src.utils.syntax_highlighter import SyntaxHighlighter
+
+class ComputeSpansTest(unittest.TestCase):
+    """Los spans se calculan sin pasarse del presupuesto."""
+    
+    def setUp(self):
+        self.highlighter = SyntaxHighlighter(max_ms=300)
+    
+    def spans_of(self, content, extension, token_type):
+        spans, _ = self.highlighter._compute_within_budget(content, extension)
+        tag_id = self.highlighter.token_type_ids[token_type]
+        return [content[start:end] for tag, start, end in zip(*spans) if tag == tag_id]
+    
+    def test_block_comments(self):
+        content = "a(); /* uno\n dos */ b(); // tres\n/* cuatro */"
+        self.assertEqual(self.spans_of(content, '.js', 'comment'),
+                         ["/* uno\n dos */", "// tres", "/* cuatro */"])
+    
+    def test_unterminated_comment_keeps_line_comments(self):
+        content = "/* a */ b(); /* c\n// d\n"
+        self.assertEqual(self.spans_of(content, '.js', 'comment'), ["/* a */", "// d"])
+    
+    def test_html_comments_and_markdown_code_blocks(self):
+        self.assertEqual(self.spans_of("<p><!-- a\nb --></p>", '.html', 'comment'), ["<!-- a\nb -->"])
+        self.assertEqual(self.spans_of("x\n```\ncode\n```\n", '.md', 'codeblock'), ["```\ncode\n```"])
+    
+    def test_unterminated_openers_are_linear(self):
+        content = "/* x\n" * 20000
+        started = time.perf_counter()
+        _, mode = self.highlighter._compute_within_budget(content, '.js')
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertEqual(mode, SyntaxHighlighter.MODE_FULL)
+    
+    def test_size_budget_counts_bytes(self):
+        highlighter = SyntaxHighlighter(max_bytes=100, max_ms=0)
+        _, mode = highlighter._compute_within_budget("a = 1\n" * 10, '.py')
+        self.assertEqual(mode, SyntaxHighlighter.MODE_FULL)
+        # 90 caracteres, pero 120 bytes en UTF-8
+        _, mode = highlighter._compute_within_budget("€ = 1\n" * 15, '.py')
+        self.assertEqual(mode, SyntaxHighlighter.MODE_KEYWORDS)
+
+if __name__ == '__main__':
+    unittest.main()